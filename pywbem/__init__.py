@@ -50,7 +50,15 @@ from ._listener import *  # noqa: F403,F401
 from ._recorder import *  # noqa: F403,F401
 from .config import *  # noqa: F403,F401
 from ._statistics import *  # noqa: F403,F401
+from ._fanout import *  # noqa: F403,F401
+from ._schema_cache import *  # noqa: F403,F401
 from ._logging import *  # noqa: F403,F401
+# These modules use syntax of Python 3.6 (async/await and asynchronous
+# generators). They are not checked by flake8 and pylint and not
+# byte-compiled on older Python versions (see makefile and setup_commands.py).
+if sys.version_info[0:2] >= (3, 6):
+    from ._async_operations import *  # noqa: F403,F401
+    from ._async_listener import *  # noqa: F403,F401
 
 from ._version import __version__  # noqa: F401
 
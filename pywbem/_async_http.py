@@ -0,0 +1,519 @@
+#
+# (C) Copyright 2018 IBM Corp.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the Free Software
+# Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+'''
+Send HTTP/HTTPS requests to a WBEM server using :mod:`py:asyncio` streams.
+
+This module is the :mod:`py:asyncio` counterpart of the `cim_http` module and
+is used by :class:`~pywbem.AsyncWBEMConnection`. Like the `cim_http` module,
+it does not know anything about the fact that the data being transferred is
+CIM-XML.
+
+This module requires Python 3.6 or higher.
+'''
+
+from __future__ import print_function, absolute_import
+
+import os
+import ssl
+import time
+import base64
+import asyncio
+import getpass
+
+from six.moves import urllib
+
+from .cim_http import parse_url, get_default_ca_certs, HTTPConnectionPool, \
+    compress_body, get_decompressor, decompress_body, XML_DECLARATION
+from .exceptions import ConnectionError, AuthError, TimeoutError, HTTPError
+from ._nocasedict import NocaseDict
+from ._utils import _ensure_unicode, _ensure_bytes
+
+__all__ = []
+
+
+class AsyncHTTPConnection(object):
+    # pylint: disable=too-few-public-methods
+    """
+    An HTTP connection to a WBEM server, represented by the pair of
+    :mod:`py:asyncio` streams of its socket.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        """Close the connection."""
+        self.writer.close()
+
+
+class AsyncHTTPConnectionPool(HTTPConnectionPool):
+    """
+    A pool of idle persistent :class:`AsyncHTTPConnection` objects.
+
+    The pool behaves like :class:`~pywbem.cim_http.HTTPConnectionPool`,
+    except for how stale connections are detected.
+    """
+
+    @staticmethod
+    def _is_stale(conn):
+        """
+        Return a boolean indicating whether an idle connection cannot be used
+        for another request, because it has been closed by either side.
+        """
+        return conn.writer.is_closing() or conn.reader.at_eof()
+
+
+class _ServerClosedError(Exception):
+    """
+    Internal exception indicating that the server closed the connection
+    without returning any response.
+    """
+    pass
+
+
+def _ssl_context(cert_file, key_file, ca_certs):
+    """
+    Return an SSL context for the connection to the WBEM server, with the
+    same settings as used by `cim_http.HTTPSConnection`.
+    """
+    ctx = ssl.SSLContext(getattr(ssl, 'PROTOCOL_TLS_CLIENT',
+                                 ssl.PROTOCOL_SSLv23))
+    if cert_file:
+        ctx.load_cert_chain(cert_file, keyfile=key_file)
+    if ca_certs:
+        ctx.verify_mode = ssl.CERT_REQUIRED
+        if os.path.isdir(ca_certs):
+            ctx.load_verify_locations(capath=ca_certs)
+        else:
+            ctx.load_verify_locations(cafile=ca_certs)
+        ctx.check_hostname = True
+    else:
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+    return ctx
+
+
+async def _open_connection(conn_key, host, port, ssl_context):
+    """
+    Open a new connection to the WBEM server and return it as an
+    :class:`AsyncHTTPConnection` object.
+    """
+    try:
+        if conn_key[0] == 'file':
+            reader, writer = await asyncio.open_unix_connection(conn_key[1])
+        else:
+            reader, writer = await asyncio.open_connection(
+                host, port, ssl=ssl_context,
+                server_hostname=host if ssl_context else None)
+    except ssl.SSLError as exc:
+        raise ConnectionError("SSL error %s: %s" % (exc.__class__, exc))
+    except OSError as exc:
+        raise ConnectionError("Socket error: %s" % exc)
+    return AsyncHTTPConnection(reader, writer)
+
+
+async def _read_chunked_body(reader):
+    """
+    Read an HTTP response body with chunked transfer encoding.
+    """
+    chunks = []
+    while True:
+        line = await reader.readline()
+        try:
+            size = int(line.split(b';', 1)[0].strip(), 16)
+        except ValueError:
+            raise ConnectionError("The server returned an invalid chunk "
+                                  "size line: %r" % line)
+        if size == 0:
+            # Skip the trailer section
+            while line not in (b'\r\n', b'\n', b''):
+                line = await reader.readline()
+            return b''.join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)  # CRLF after the chunk data
+
+
+async def _read_response(reader):
+    """
+    Read an HTTP response from the connection.
+
+    Returns:
+
+      tuple(version, status, reason, headers, body, will_close), with
+      version being 10 or 11 as for `httplib.HTTPResponse.version`, and
+      headers being a list of tuple(name, value).
+
+    Raises:
+
+      _ServerClosedError: The server closed the connection before sending a
+        status line.
+    """
+    line = await reader.readline()
+    if not line:
+        raise _ServerClosedError()
+    try:
+        parts = line.decode('iso-8859-1').rstrip('\r\n').split(None, 2)
+        version = {'HTTP/1.0': 10, 'HTTP/1.1': 11}[parts[0]]
+        status = int(parts[1])
+        reason = parts[2] if len(parts) > 2 else ''
+    except (KeyError, IndexError, ValueError):
+        raise ConnectionError("The server returned a bad HTTP status line: "
+                              "%r" % line)
+
+    headers = []
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('iso-8859-1').partition(':')
+        headers.append((name.strip(), value.strip()))
+    hdrs = NocaseDict(headers)
+
+    conn_hdr = hdrs.get('Connection', '').lower()
+    will_close = 'close' in conn_hdr or \
+        (version == 10 and 'keep-alive' not in conn_hdr)
+    if 'chunked' in hdrs.get('Transfer-Encoding', '').lower():
+        body = await _read_chunked_body(reader)
+    elif 'Content-Length' in hdrs:
+        try:
+            length = int(hdrs['Content-Length'])
+        except ValueError:
+            raise ConnectionError("The server returned an invalid "
+                                  "Content-Length header: %r" %
+                                  hdrs['Content-Length'])
+        body = await reader.readexactly(length)
+    else:
+        # The body is delimited by the server closing the connection
+        body = await reader.read()
+        will_close = True
+
+    return version, status, reason, headers, body, will_close
+
+
+async def async_wbem_request(url, data, creds, cimxml_headers=None, x509=None,
+                             ca_certs=None, no_verification=False,
+                             timeout=None, recorders=None, conn_id=None,
+                             pool=None, compression=None,
+                             compression_stats=None, idempotent=False):
+    # pylint: disable=too-many-arguments,too-many-locals
+    # pylint: disable=too-many-branches,too-many-statements
+    """
+    Send an HTTP or HTTPS request to a WBEM server and return the response,
+    using :mod:`py:asyncio` streams.
+
+    This function is a :term:`py:coroutine` with the same behavior as
+    :func:`~pywbem.cim_http.wbem_request`, with these differences:
+
+    * The local authentication challenges of OpenPegasus and OpenWBEM are not
+      supported; an HTTP status 401 always raises
+      :exc:`~pywbem.AuthError`.
+
+    * The timeout applies to the request as a whole, including connecting to
+      the WBEM server.
+
+    * The response cannot be streamed.
+
+    Parameters:
+
+      url (:term:`string`):
+        URL of the WBEM server. For details, see the `url` parameter of
+        :meth:`~pywbem.WBEMConnection.__init__`.
+
+      data (:term:`string`):
+        The CIM-XML formatted data to be sent as a request to the WBEM server.
+
+      creds:
+        Credentials for authenticating with the WBEM server.
+        For details, see the `creds` parameter of
+        :meth:`~pywbem.WBEMConnection.__init__`.
+
+      cimxml_headers (:term:`py:iterable` of tuple(string,string)):
+        CIM-XML extension header fields for the request, see
+        :func:`~pywbem.cim_http.wbem_request`.
+
+      x509:
+        Used for HTTPS with certificates.
+        For details, see the `x509` parameter of
+        :meth:`~pywbem.WBEMConnection.__init__`.
+
+      ca_certs:
+        Used for HTTPS with certificates.
+        For details, see the `ca_certs` parameter of
+        :meth:`~pywbem.WBEMConnection.__init__`.
+
+      no_verification:
+        Used for HTTPS with certificates.
+        For details, see the `no_verification` parameter of
+        :meth:`~pywbem.WBEMConnection.__init__`.
+
+      timeout (:term:`number`):
+        Timeout in seconds for the request. If the request has not completed
+        within the timeout duration, its connection is closed and
+        :exc:`~pywbem.TimeoutError` is raised. `None` means there is no
+        timeout.
+
+      recorders (List of :class:`~pywbem.BaseOperationRecorder`):
+        List of enabled operation recorders, into which the HTTP request and
+        HTTP response will be staged as attributes.
+
+      conn_id (:term:`string`)
+        string that uniquely defines a connection.  Used as part of any
+        logs created.
+
+      pool (:class:`AsyncHTTPConnectionPool`):
+        Pool of persistent connections to be used for the request. For
+        details, see the `pool` parameter of
+        :func:`~pywbem.cim_http.wbem_request`.
+
+      compression (:term:`string`):
+        Content coding for compressing the request body and decompressing the
+        response body. For details, see the `compression` parameter of
+        :func:`~pywbem.cim_http.wbem_request`.
+
+      compression_stats (list):
+        List that is updated with the measurements for the compressed bodies.
+        For details, see the `compression_stats` parameter of
+        :func:`~pywbem.cim_http.wbem_request`.
+
+      idempotent (:class:`py:bool`):
+        Boolean indicating that the request can safely be performed more than
+        once. For details, see the `idempotent` parameter of
+        :func:`~pywbem.cim_http.wbem_request`.
+
+    Returns:
+
+        Tuple containing:
+
+            The CIM-XML formatted response data from the WBEM server, as a
+            :term:`byte string` object.
+
+            The server response time in seconds as floating point number if
+            this data was received from the server. If no data returned
+            from server `None` is returned.
+
+    Raises:
+
+        :exc:`~pywbem.AuthError`
+        :exc:`~pywbem.ConnectionError`
+        :exc:`~pywbem.TimeoutError`
+        :exc:`~pywbem.HTTPError`
+    """
+
+    if not cimxml_headers:
+        cimxml_headers = []
+
+    host, port, use_ssl = parse_url(_ensure_unicode(url))
+
+    key_file = None
+    cert_file = None
+
+    if use_ssl and x509 is not None:
+        cert_file = x509.get('cert_file')
+        key_file = x509.get('key_file')
+
+    data = _ensure_bytes(data)
+
+    # As in cim_http.wbem_request(), the request body is a list of buffers,
+    # so that the XML declaration and the header are not prepended to copies
+    # of the data.
+    body_data = [XML_DECLARATION, data]
+    if compression is not None:
+        start_time = time.time()
+        body_data = [compress_body(body_data, compression)]
+        if compression_stats is not None:
+            compression_stats[0] += len(XML_DECLARATION) + len(data)
+            compression_stats[1] += len(body_data[0])
+            compression_stats[2] += time.time() - start_time
+    body_len = sum([len(buf) for buf in body_data])
+
+    if not no_verification and ca_certs is None:
+        ca_certs = get_default_ca_certs()
+    elif no_verification:
+        ca_certs = None
+
+    local = False
+    ssl_context = None
+    if use_ssl:
+        conn_key = ('https', host, port, cert_file, key_file, ca_certs,
+                    timeout)
+        ssl_context = _ssl_context(cert_file, key_file, ca_certs)
+    elif url.startswith('http'):
+        conn_key = ('http', host, port, timeout)
+    else:
+        if url.startswith('file:'):
+            url_ = url[5:]
+        else:
+            url_ = url
+        conn_key = ('file', url_)
+        local = True
+
+    locallogin = None
+    if host in ('localhost', 'localhost6', '127.0.0.1', '::1'):
+        local = True
+    if local:
+        try:
+            locallogin = getpass.getuser()
+        except (KeyError, ImportError):
+            locallogin = None
+
+    method = 'POST'
+    target = '/cimom'
+
+    if recorders:
+        for recorder in recorders:
+            recorder.stage_http_request(conn_id, 11, url, target, method,
+                                        dict(cimxml_headers),
+                                        XML_DECLARATION + data)
+
+            # We want clean response data when an exception is raised before
+            # the HTTP response comes in:
+            recorder.stage_http_response1(conn_id, None, None, None, None)
+            recorder.stage_http_response2(None)
+
+    host_hdr = '[%s]' % host if ':' in host else host
+    headers = [
+        ('Host', '%s:%s' % (host_hdr, port)),
+        ('Content-type', 'application/xml; charset="utf-8"'),
+        ('Content-length', str(body_len)),
+    ]
+    if compression is not None:
+        headers.append(('Content-Encoding', compression))
+        headers.append(('Accept-Encoding', 'gzip, deflate'))
+    else:
+        headers.append(('Accept-Encoding', 'identity'))
+    if creds is not None:
+        auth = '%s:%s' % (creds[0], creds[1])
+        auth64 = _ensure_unicode(base64.b64encode(
+            _ensure_bytes(auth))).replace('\n', '')
+        headers.append(('Authorization', 'Basic %s' % auth64))
+    elif locallogin is not None:
+        headers.append(('PegasusAuthorization', 'Local "%s"' % locallogin))
+
+    # See cim_http.wbem_request() for the encoding of the header fields.
+    for n, v in cimxml_headers:
+        v = _ensure_unicode(v)
+        v = urllib.parse.quote(v)
+        headers.append((n, v))
+
+    request = [_ensure_bytes(
+        u'%s %s HTTP/1.1\r\n%s\r\n\r\n' %
+        (method, target, u'\r\n'.join([u'%s: %s' % h for h in headers])))]
+    request.extend(body_data)
+
+    async def roundtrip():
+        """
+        Send the request on a pooled or new connection, and return the
+        connection and the response.
+        """
+        conn = pool.get(conn_key) if pool is not None else None
+        reused = conn is not None
+        while True:
+            if conn is None:
+                conn = await _open_connection(conn_key, host, port,
+                                              ssl_context)
+            # Indicates that the request has been sent completely, so that
+            # the server may have performed it.
+            request_sent = False
+            try:
+                conn.writer.writelines(request)
+                await conn.writer.drain()
+                request_sent = True
+                return conn, await _read_response(conn.reader)
+            except (_ServerClosedError, ConnectionResetError,
+                    BrokenPipeError) as exc:
+                conn.close()
+                if reused and (idempotent or not request_sent):
+                    # The server has closed the pooled connection in the
+                    # mean time. Retry on a new connection.
+                    conn = None
+                    reused = False
+                    continue
+                if isinstance(exc, _ServerClosedError):
+                    raise ConnectionError("The server closed the "
+                                          "connection without returning "
+                                          "any response")
+                raise ConnectionError("Socket error: %s" % exc)
+            except asyncio.IncompleteReadError as exc:
+                conn.close()
+                raise ConnectionError("HTTP incomplete read: %s" % exc)
+            except OSError as exc:
+                conn.close()
+                raise ConnectionError("Socket error: %s" % exc)
+            except BaseException:
+                # Includes cancellation, e.g. due to the timeout.
+                conn.close()
+                raise
+
+    try:
+        conn, response = await asyncio.wait_for(roundtrip(), timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError("The client timed out and closed the socket "
+                           "after %.0fs." % timeout)
+    version, status, reason, resp_headers, body, will_close = response
+
+    if pool is not None and not will_close:
+        pool.put(conn_key, conn)
+    else:
+        conn.close()
+
+    resp_hdrs = NocaseDict(resp_headers)
+
+    # Attempt to get the optional response time header sent from the server
+    svr_resp_time = resp_hdrs.get('WBEMServerResponseTime', None)
+    if svr_resp_time:
+        try:
+            # convert to float and map from microsec to sec.
+            svr_resp_time = float(svr_resp_time) / 1000000
+        except ValueError:
+            pass
+
+    if recorders:
+        for recorder in recorders:
+            recorder.stage_http_response1(conn_id, version, status, reason,
+                                          dict(resp_headers))
+
+    if status != 200:
+        if status == 401:
+            raise AuthError(reason)
+
+        cimerror_hdr = resp_hdrs.get('CIMError', None)
+        if cimerror_hdr is not None:
+            cimdetails = {}
+            pgdetails_hdr = resp_hdrs.get('PGErrorDetail', None)
+            if pgdetails_hdr is not None:
+                # pylint: disable=too-many-function-args
+                cimdetails['PGErrorDetail'] = \
+                    urllib.parse.unquote(pgdetails_hdr)
+            raise HTTPError(status, reason, cimerror_hdr, cimdetails)
+
+        raise HTTPError(status, reason)
+
+    try:
+        decompressor = get_decompressor(resp_hdrs.get('Content-Encoding', None))
+    except ValueError as exc:
+        raise ConnectionError("Cannot decode the response body: %s" % exc)
+    if decompressor is not None:
+        body = decompress_body(decompressor, body, compression_stats)
+
+    if recorders:
+        for recorder in recorders:
+            recorder.stage_http_response2(body)
+
+    return body, svr_resp_time
@@ -0,0 +1,442 @@
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the Free Software
+# Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+"""
+*New in pywbem 0.13 as experimental.*
+
+The :class:`~pywbem.AsyncWBEMListener` class provides a WBEM listener service
+that serves all connections from WBEM servers in a single :mod:`py:asyncio`
+event loop, instead of in a thread per connection as
+:class:`~pywbem.WBEMListener` does. Connections are kept open for further
+export requests (HTTP/1.1 persistent connections), so a large number of WBEM
+servers can send indications to the listener with a bounded amount of memory
+per connection.
+
+The listener validates the HTTP header fields and the export request messages
+in the same way as :class:`~pywbem.WBEMListener`, and delivers the received
+indications in the same way to the callback functions registered with
+:meth:`~pywbem.WBEMListener.add_callback`. Without delivery queue, the
+callback functions are called in the thread of the event loop and must
+therefore not block.
+
+Example::
+
+    import asyncio
+    from pywbem import AsyncWBEMListener
+
+    def process_indication(indication, host):
+        print("Received CIM indication from %s: %r" % (host, indication))
+
+    async def main():
+        async with AsyncWBEMListener('0.0.0.0', http_port=5988) as listener:
+            listener.add_callback(process_indication)
+            await listener.start()
+
+            ... # wait for some condition to end listening
+
+    asyncio.get_event_loop().run_until_complete(main())
+
+This class is available on Python 3.6 and higher.
+"""
+
+from __future__ import absolute_import
+
+import ssl
+import time
+import errno
+import asyncio
+import logging
+import email.utils
+
+from six.moves import http_client
+
+from ._version import __version__
+from ._listener import WBEMListener, check_export_headers, \
+    process_export_request, error_response_body, success_response_body
+from ._nocasedict import NocaseDict
+from .cim_constants import _statuscode2name
+from .exceptions import CIMError
+
+__all__ = ['AsyncWBEMListener']
+
+# Default number of seconds an idle persistent connection is kept open
+DEFAULT_KEEPALIVE_TIMEOUT = 60
+
+# Maximum size in Bytes of a line of the HTTP request line and header fields
+_MAX_LINE_SIZE = 64 * 1024
+
+# Maximum number of HTTP header fields in a request
+_MAX_HEADERS = 100
+
+
+class _BadRequest(Exception):
+    """
+    Internal exception indicating that an HTTP request cannot be processed.
+    The connection is closed after sending the HTTP error response.
+    """
+
+    def __init__(self, http_code, msg):
+        super(_BadRequest, self).__init__(msg)
+        self.http_code = http_code
+
+
+async def _read_request(reader, max_request_size):
+    """
+    Read an HTTP request from the connection.
+
+    Returns:
+
+      tuple(method, version, headers, body), with version being the HTTP
+      version string (e.g. 'HTTP/1.1') and headers being a
+      :class:`~pywbem._nocasedict.NocaseDict`, or `None` if the client closed
+      the connection before sending another request.
+
+    Raises:
+
+      _BadRequest: Invalid or too large request.
+      asyncio.IncompleteReadError: The client closed the connection in the
+        middle of the request.
+    """
+    try:
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode('iso-8859-1').rstrip('\r\n').split()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+            raise _BadRequest(400, "Bad HTTP request line: %r" % line)
+        method, _, version = parts
+
+        headers = NocaseDict()
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n'):
+                break
+            if not line:
+                raise asyncio.IncompleteReadError(line, None)
+            if len(headers) >= _MAX_HEADERS:
+                raise _BadRequest(431, "Too many HTTP header fields")
+            name, _, value = line.decode('iso-8859-1').partition(':')
+            headers[name.strip()] = value.strip()
+    except ValueError:
+        # Raised by readline() when the line exceeds the stream limit
+        raise _BadRequest(431, "HTTP request line or header field too long")
+
+    try:
+        content_len = int(headers.get('Content-Length', 0))
+    except ValueError:
+        raise _BadRequest(400, "Invalid Content-Length header value: %s" %
+                          headers['Content-Length'])
+    if content_len > max_request_size:
+        raise _BadRequest(413, "Request body of %s Bytes exceeds the "
+                          "maximum of %s Bytes" %
+                          (content_len, max_request_size))
+    body = await reader.readexactly(content_len) if content_len else b''
+    return method, version, headers, body
+
+
+class AsyncWBEMListener(WBEMListener):
+    """
+    *New in pywbem 0.13 as experimental.*
+
+    A WBEM listener whose HTTP and HTTPS servers run in a :mod:`py:asyncio`
+    event loop.
+
+    This class has the same init parameters, properties and methods as
+    :class:`~pywbem.WBEMListener`, except that
+    :meth:`~pywbem.AsyncWBEMListener.start` and
+    :meth:`~pywbem.AsyncWBEMListener.stop` are :term:`py:coroutine`
+    functions, and that this class is used as an asynchronous context manager
+    (``async with``) instead of as a context manager.
+
+    If a delivery queue with the ``'block'`` overflow policy is used, a full
+    delivery queue is waited for in a thread of the default executor of the
+    event loop, so that the event loop is not blocked.
+    """
+
+    def __init__(self, host, http_port=None, https_port=None,
+                 certfile=None, keyfile=None,
+                 keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT, **kwargs):
+        """
+        Parameters:
+
+          host, http_port, https_port, certfile, keyfile:
+            See the same-named init parameters of
+            :class:`~pywbem.WBEMListener`.
+
+          keepalive_timeout (:term:`number`):
+            Time in seconds after which a connection is closed when no further
+            request is received on it, or when a request is not received
+            completely. `None` means that there is no timeout.
+
+          **kwargs:
+            The remaining init parameters of :class:`~pywbem.WBEMListener`,
+            e.g. `queue_size` or `max_request_size`.
+        """
+        # pylint: disable=too-many-arguments
+        super(AsyncWBEMListener, self).__init__(
+            host, http_port=http_port, https_port=https_port,
+            certfile=certfile, keyfile=keyfile, **kwargs)
+        self._keepalive_timeout = keepalive_timeout
+
+    def __enter__(self):
+        """
+        Raises :exc:`py:TypeError`, because this class must be used as an
+        asynchronous context manager.
+        """
+        raise TypeError("%s must be used as an asynchronous context manager "
+                        "('async with')" % self.__class__.__name__)
+
+    async def __aenter__(self):
+        """
+        Enter method when the class is used as an asynchronous context manager.
+
+        Returns the listener object.
+        """
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """
+        Exit method when the class is used as an asynchronous context manager.
+
+        Stops the listener by calling :meth:`~pywbem.AsyncWBEMListener.stop`.
+        """
+        await self.stop()
+        return False  # re-raise any exceptions
+
+    @property
+    def keepalive_timeout(self):
+        """
+        :term:`number`: Time in seconds after which an idle connection is
+        closed, or `None` if there is no timeout.
+        """
+        return self._keepalive_timeout
+
+    async def _start_server(self, port, ssl_context):
+        """
+        Start a server listening on the port in the current event loop and
+        return it.
+        """
+        try:
+            return await asyncio.start_server(
+                self._handle_connection, self._host, port, ssl=ssl_context,
+                limit=_MAX_LINE_SIZE)
+        except OSError as exc:
+            if exc.errno == errno.EADDRINUSE:
+                # Reraise with improved error message
+                raise OSError(errno.EADDRINUSE,
+                              "WBEM listener port %s already in use" % port)
+            raise
+
+    async def start(self):
+        """
+        Start the WBEM listener servers in the current event loop, if they
+        are not yet running.
+
+        This method is a :term:`py:coroutine`.
+
+        A server for CIM-XML over HTTP is started if an HTTP port was
+        specified for the listener, and a server for CIM-XML over HTTPS is
+        started if an HTTPS port was specified for the listener.
+
+        The listener must be stopped again in order to free the TCP/IP port it
+        listens on, using :meth:`~pywbem.AsyncWBEMListener.stop` or by using
+        the listener as an asynchronous context manager.
+
+        Raises:
+
+          :exc:`~py:exceptions.OSError`:
+            with :attr:`~OSError.errno` =
+            :data:`py:errno.EADDRINUSE` when the WBEM listener port is already
+            in use.
+        """
+        if self._http_port:
+            if not self._http_server:
+                self._http_server = await self._start_server(
+                    self._http_port, None)
+        else:
+            self._http_server = None
+
+        if self._https_port:
+            if not self._https_server:
+                ssl_context = ssl.SSLContext(
+                    getattr(ssl, 'PROTOCOL_TLS_SERVER',
+                            ssl.PROTOCOL_SSLv23))
+                ssl_context.load_cert_chain(self._certfile,
+                                            keyfile=self._keyfile)
+                self._https_server = await self._start_server(
+                    self._https_port, ssl_context)
+        else:
+            self._https_server = None
+
+        self._start_workers()
+
+    async def stop(self):
+        """
+        Stop the WBEM listener servers, if they are running.
+
+        This method is a :term:`py:coroutine`.
+
+        If there is a delivery queue, the indications remaining in it are
+        delivered before this method returns.
+        """
+        for server in (self._http_server, self._https_server):
+            if server:
+                server.close()
+                await server.wait_closed()
+        self._http_server = None
+        self._https_server = None
+
+        if self._workers:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self._stop_workers)
+
+    async def _deliver_async(self, indication, host):
+        """
+        Deliver an indication via :meth:`deliver_indication` without blocking
+        the event loop.
+        """
+        if self._queue is not None and self._overflow_policy == 'block':
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self.deliver_indication,
+                                       indication, host)
+        else:
+            self.deliver_indication(indication, host)
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Serve the export requests received on a connection, until the
+        connection is closed by the client or needs to be closed.
+        """
+        peername = writer.get_extra_info('peername')
+        host = peername[0] if peername else ''
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(
+                        _read_request(reader, self._max_request_size),
+                        self._keepalive_timeout)
+                except _BadRequest as exc:
+                    await self._send_response(
+                        writer, 'HTTP/1.0', host, '-', exc.http_code,
+                        close=True, cim_error_details=str(exc))
+                    break
+                if request is None:
+                    break
+                method, version, headers, body = request
+
+                conn_hdr = headers.get('Connection', '').lower()
+                close = 'close' in conn_hdr or \
+                    (version == 'HTTP/1.0' and 'keep-alive' not in conn_hdr)
+
+                await self._handle_request(writer, method, version, headers,
+                                           body, host, close)
+                if close:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError,
+                ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(self, writer, method, version, headers, body,
+                              host, close):
+        """
+        Handle an HTTP request and send back the response.
+        """
+        # pylint: disable=too-many-arguments
+        if method != 'POST':
+            # Invalid method for listener. See DSP0200 for details on this.
+            await self._send_response(writer, version, host, method, 405,
+                                      close=close,
+                                      headers=[('Allow', 'POST')])
+            return
+
+        http_error = check_export_headers(headers)
+        if http_error is None:
+            http_error, msgid, methodname, cim_error, indication = \
+                process_export_request(body,
+                                       headers.get('Content-Encoding', None),
+                                       self._max_request_size)
+        if http_error is not None:
+            http_code, cim_error_hdr, cim_error_details = http_error
+            await self._send_response(writer, version, host, method,
+                                      http_code, close=close,
+                                      cim_error=cim_error_hdr,
+                                      cim_error_details=cim_error_details)
+            return
+
+        if cim_error is None:
+            try:
+                await self._deliver_async(indication, host)
+            except CIMError as exc:
+                # The delivery queue is full and its overflow policy is
+                # 'reject'
+                cim_error = (exc.status_code, exc.status_description)
+
+        if cim_error is not None:
+            resp_body = error_response_body(msgid, methodname, *cim_error)
+        else:
+            resp_body = success_response_body(msgid, methodname)
+        await self._send_response(writer, version, host, method, 200,
+                                  close=close, body=resp_body,
+                                  cim_status=cim_error)
+
+    async def _send_response(self, writer, version, host, method, http_code,
+                             close, headers=None, body=b'', cim_error=None,
+                             cim_error_details=None, cim_status=None):
+        """
+        Send an HTTP response back to the WBEM server and log it in the same
+        way as :class:`~pywbem.WBEMListener`.
+        """
+        # pylint: disable=too-many-arguments
+        resp_version = 'HTTP/1.0' if version == 'HTTP/1.0' else 'HTTP/1.1'
+        lines = [
+            '%s %s %s' % (resp_version, http_code,
+                          http_client.responses.get(http_code, '')),
+            'Server: pywbem-listener/%s asyncio' % __version__,
+            'Date: %s' % email.utils.formatdate(time.time(), usegmt=True),
+            'CIMExport: MethodResponse',
+        ]
+        if body:
+            lines.append('Content-Type: text/html')
+        lines.append('Content-Length: %s' % len(body))
+        if cim_error is not None:
+            lines.append('CIMError: %s' % cim_error)
+        if cim_error_details is not None:
+            lines.append('CIMErrorDetails: %s' % cim_error_details)
+        for header, value in headers or []:
+            lines.append('%s: %s' % (header, value))
+        if close:
+            lines.append('Connection: close')
+        elif resp_version == 'HTTP/1.0':
+            lines.append('Connection: keep-alive')
+        head = ('\r\n'.join(lines) + '\r\n\r\n').encode('iso-8859-1')
+        writer.write(head + body)
+        await writer.drain()
+
+        log_prefix = '%s %s from %s' % (version, method, host)
+        self.logger.log(logging.INFO, '%s: HTTP status %s', log_prefix,
+                        http_code)
+        if http_code != 200:
+            self.logger.log(logging.WARNING,
+                            '%s: HTTP status %s; CIMError: %s, '
+                            'CIMErrorDetails: %s', log_prefix, http_code,
+                            cim_error, cim_error_details)
+        elif cim_status is not None:
+            self.logger.log(logging.WARNING,
+                            '%s: HTTP status %s; CIM error response: %s: %s',
+                            log_prefix, http_code,
+                            _statuscode2name(cim_status[0]), cim_status[1])
@@ -0,0 +1,918 @@
+#
+# (C) Copyright 2018 IBM Corp.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the Free Software
+# Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+"""
+*New in pywbem 0.13 as experimental.*
+
+Objects of the :class:`~pywbem.AsyncWBEMConnection` class represent a
+connection to a WBEM server whose WBEM operations are :mod:`py:asyncio`
+:term:`py:coroutine` functions, so that a single thread can have many
+operations in flight, on the same or on different connections.
+
+The CIM-XML requests and responses are created and parsed in the same way as
+for :class:`~pywbem.WBEMConnection`; only the HTTP requests are sent using
+:mod:`py:asyncio` streams.
+
+Example::
+
+    import asyncio
+    import pywbem
+
+    async def get_instances(url):
+        conn = pywbem.AsyncWBEMConnection(url, ('user', 'password'))
+        insts = []
+        async for inst in conn.IterEnumerateInstances('CIM_ComputerSystem'):
+            insts.append(inst)
+        return insts
+
+    urls = ['https://server1', 'https://server2']
+    loop = asyncio.get_event_loop()
+    results = loop.run_until_complete(
+        asyncio.gather(*[get_instances(url) for url in urls]))
+
+This class is available on Python 3.6 and higher.
+"""
+
+from __future__ import absolute_import
+
+import time
+import asyncio
+import functools
+
+from .cim_constants import CIM_ERR_NOT_SUPPORTED
+from .cim_obj import CIMClassName
+from .cim_http import parse_url
+from .cim_operations import WBEMConnection, _validateIterCommonParams, \
+    _to_pretty_xml, _IDEMPOTENT_OPERATIONS
+from .config import DEFAULT_ITER_MAXOBJECTCOUNT
+from .exceptions import CIMError
+from .tupleparse import parse_cim
+from .tupletree import xml_to_tupletree_sax
+from ._statistics import Statistics
+from ._async_http import async_wbem_request, AsyncHTTPConnectionPool
+
+__all__ = ['AsyncWBEMConnection']
+
+
+class _RequestCaptured(BaseException):
+    """
+    Internal exception that ends the execution of an operation method of
+    :class:`~pywbem.WBEMConnection` once its CIM-XML request has been created.
+
+    It is derived from :exc:`py:BaseException`, so that it passes the
+    exception handling of the operation methods.
+    """
+    pass
+
+
+class _Exchange(object):
+    # pylint: disable=too-few-public-methods
+    """
+    The CIM-XML request and response of one execution of an operation of
+    :class:`~pywbem.AsyncWBEMConnection`.
+    """
+
+    def __init__(self):
+        # tuple(cimxml_headers, request_data), once the request is created
+        self.request = None
+        # tuple(last_raw_request, last_request), if debug is enabled
+        self.debug_request = None
+        # tuple(reply_xml, server_response_time), if the request succeeded
+        self.reply = None
+        # exception raised by the HTTP request, if it failed
+        self.error = None
+        # _HTTPStaging object, if operation recorders are used
+        self.staging = None
+
+
+class _HTTPStaging(object):
+    """
+    Stand-in for the operation recorders of a connection, that keeps the
+    HTTP request and response staged during the HTTP request of an operation,
+    for staging them in the operation recorders when the operation result is
+    processed.
+    """
+
+    def __init__(self):
+        self._stagings = []
+
+    def stage_http_request(self, *args):
+        # pylint: disable=missing-docstring
+        self._stagings.append(('stage_http_request', args))
+
+    def stage_http_response1(self, *args):
+        # pylint: disable=missing-docstring
+        self._stagings.append(('stage_http_response1', args))
+
+    def stage_http_response2(self, *args):
+        # pylint: disable=missing-docstring
+        self._stagings.append(('stage_http_response2', args))
+
+    def replay(self, recorders):
+        """Stage the kept HTTP request and response in the recorders."""
+        for recorder in recorders:
+            for name, args in self._stagings:
+                getattr(recorder, name)(*args)
+
+
+class _IterQueryInstancesReturn(object):
+    """
+    The return data for :meth:`~pywbem.AsyncWBEMConnection.IterQueryInstances`,
+    with the same interface as the return data of
+    :meth:`~pywbem.WBEMConnection.IterQueryInstances`.
+    """
+
+    def __init__(self, instances, query_result_class=None):
+        """Save any query_result_class and instances returned"""
+        self._query_result_class = query_result_class
+        self.instances = instances
+
+    @property
+    def query_result_class(self):
+        """
+        :class:`~pywbem.CIMClass`: The query result class, if requested
+        via the `ReturnQueryResultClass` parameter.
+
+        `None`, if a query result class was not requested.
+        """
+        return self._query_result_class
+
+    @property
+    def generator(self):
+        """
+        :term:`py:generator` iterating :class:`~pywbem.CIMInstance`:
+        A generator object that iterates the CIM instances representing
+        the query result. These instances do not have an instance path
+        set.
+        """
+        for inst in self.instances:
+            yield inst
+
+
+def _operation(name):
+    """
+    Return the coroutine function for the operation method `name` of
+    :class:`~pywbem.AsyncWBEMConnection`, that executes the operation method
+    of :class:`~pywbem.WBEMConnection` with the same name.
+    """
+    method = getattr(WBEMConnection, name)
+
+    @functools.wraps(method)
+    async def operation(self, *args, **kwargs):
+        # pylint: disable=protected-access
+        return await self._run_operation(method, args, kwargs)
+
+    operation.__doc__ = """
+        :term:`py:coroutine` version of
+        :meth:`pywbem.WBEMConnection.%s`.
+
+        The parameters, result and raised exceptions are the same as for
+        that method.
+        """ % name
+    return operation
+
+
+class AsyncWBEMConnection(WBEMConnection):
+    """
+    *New in pywbem 0.13 as experimental.*
+
+    A client's connection to a WBEM server, whose WBEM operations are
+    :mod:`py:asyncio` :term:`py:coroutine` functions.
+
+    The WBEM operation methods of this class have the same parameters,
+    results and exceptions as the corresponding methods of
+    :class:`~pywbem.WBEMConnection`, except that they need to be awaited.
+    The ``Iter...()`` methods return :term:`py:asynchronous iterator`
+    objects, except for :meth:`~pywbem.AsyncWBEMConnection.IterQueryInstances`,
+    which needs to be awaited.
+
+    Any number of operations can execute concurrently on one connection
+    object. Each operation uses its own HTTP connection to the WBEM server,
+    which is taken from the pool of persistent connections if the
+    `keep_alive` init parameter is `True`. The ``last_...`` properties are
+    set by the operations as they complete, and the timeout applies to the
+    HTTP request of each operation as a whole.
+
+    Statistics and operation recorders are supported. The debug support is
+    supported as well, but is only meaningful if operations do not execute
+    concurrently.
+
+    The :meth:`~pywbem.AsyncWBEMConnection.ExecuteBatch` method performs the
+    operations of the batch concurrently, as individual requests.
+
+    The ``StreamEnumerate...()`` methods of :class:`~pywbem.WBEMConnection`,
+    the local authentication challenges of OpenPegasus and OpenWBEM, and the
+    `schema_cache` init parameter are not supported.
+
+    The CIM-XML request and the processing of the CIM-XML response of each
+    operation is performed by the operation methods of
+    :class:`~pywbem.WBEMConnection`, which are executed twice: Once until
+    the request has been created, and, after the HTTP request has been
+    performed, once more to process the response.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        The parameters are the same as for
+        :meth:`pywbem.WBEMConnection.__init__`, except that the
+        `verify_callback` parameter is ignored.
+
+        Raises:
+
+            ValueError: The `schema_cache` parameter is specified.
+        """
+        super(AsyncWBEMConnection, self).__init__(*args, **kwargs)
+        if self.schema_cache is not None:
+            raise ValueError("The schema_cache parameter is not supported by "
+                             "AsyncWBEMConnection")
+        if self._pool is not None:
+            self._pool = AsyncHTTPConnectionPool()
+        self._no_statistics = Statistics(False)
+        self._exchange = None
+
+    async def _run_operation(self, method, args, kwargs):
+        """
+        Execute an operation method of :class:`~pywbem.WBEMConnection`,
+        performing its HTTP request asynchronously, and return its result.
+
+        The method is executed a first time without statistics and operation
+        recorders until its CIM-XML request has been created, and once more
+        after the HTTP request for processing the response.
+        """
+        start_time = time.time()
+        exc = None
+        exchange = _Exchange()
+        compression_stats = [0, 0, 0.0]
+        try:
+            try:
+                self._call_method(method, args, kwargs, exchange, False)
+            except _RequestCaptured:
+                pass
+            except Exception:
+                if self._operation_recorders:
+                    # Repeat the failing method so the failure is recorded
+                    self._call_method(method, args, kwargs, exchange, True)
+                raise
+
+            if self._operation_recorders:
+                exchange.staging = _HTTPStaging()
+            cimxml_headers, request_data = exchange.request
+            try:
+                exchange.reply = await async_wbem_request(
+                    self.url, request_data, self.creds, cimxml_headers,
+                    x509=self.x509,
+                    ca_certs=self.ca_certs,
+                    no_verification=self.no_verification,
+                    timeout=self.timeout,
+                    recorders=[exchange.staging] if exchange.staging else None,
+                    conn_id=self.conn_id,
+                    pool=self._pool,
+                    compression=self._compression,
+                    compression_stats=compression_stats,
+                    idempotent=method.__name__ in _IDEMPOTENT_OPERATIONS)
+            except Exception as exce:  # pylint: disable=broad-except
+                # Raised when the response is processed by the method
+                exchange.error = exce
+
+            return self._call_method(method, args, kwargs, exchange, True)
+
+        except Exception as exce:
+            exc = exce
+            raise
+        finally:
+            request_len = len(exchange.request[1]) if exchange.request else 0
+            reply_len = len(exchange.reply[0]) if exchange.reply else 0
+            server_time = exchange.reply[1] if exchange.reply else None
+            stats = self.statistics.get_op_statistic(method.__name__)
+            self._last_operation_time = stats.stop_timer(
+                request_len, reply_len, server_time, exc,
+                start_time=start_time, compression=compression_stats)
+
+    def _call_method(self, method, args, kwargs, exchange, record):
+        # pylint: disable=too-many-arguments
+        """
+        Execute an operation method of :class:`~pywbem.WBEMConnection` for
+        the exchange, with statistics disabled, and with the operation
+        recorders disabled unless `record` is `True`.
+
+        This method does not yield to the event loop, so no other operation
+        can execute while the statistics and recorders are changed.
+        """
+        saved = self._statistics, self._operation_recorders
+        self._statistics = self._no_statistics
+        if not record:
+            self._operation_recorders = []
+        self._exchange = exchange
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._exchange = None
+            self._statistics, self._operation_recorders = saved
+
+    def _perform_exchange(self, create_request, process_response):
+        """
+        Perform the CIM-XML request of the operation method that is being
+        executed: In the first execution of the method, create the request
+        and end the method. In the second execution, process the response.
+        """
+        exchange = self._exchange
+        if exchange is None:
+            raise RuntimeError("The operations of AsyncWBEMConnection must be "
+                               "awaited")
+
+        if exchange.request is None:
+            exchange.request = create_request()
+            if self.debug:
+                exchange.debug_request = (self._last_raw_request,
+                                          self._last_request)
+            raise _RequestCaptured()
+
+        # Reset request and reply information, because other operations may
+        # have completed in the mean time.
+        self._last_request_len = len(exchange.request[1])
+        self._last_reply_len = 0
+        self._last_server_response_time = None
+        if self.debug:
+            self._last_raw_request, self._last_request = \
+                exchange.debug_request
+            self._last_raw_reply = None
+            self._last_reply = None
+
+        if exchange.staging is not None:
+            exchange.staging.replay(self._operation_recorders)
+        if exchange.error is not None:
+            raise exchange.error
+
+        reply_xml, self._last_server_response_time = exchange.reply
+
+        self._last_reply_len = len(reply_xml)
+
+        # Set the raw response before parsing (which can fail)
+        if self.debug:
+            self._last_raw_reply = reply_xml
+
+        # Parse the XML into a tuple tree (may raise ParseError):
+        tt_ = xml_to_tupletree_sax(reply_xml, "CIM-XML response")
+        tup_tree = parse_cim(tt_)
+
+        # Set the pretty response after parsing (it could fail otherwise)
+        if self.debug:
+            self._last_reply = _to_pretty_xml(reply_xml)
+
+        return process_response(tup_tree)
+
+    def _imethodcall(self, methodname, namespace, response_params_rqd=None,
+                     **params):
+        """
+        Perform an intrinsic CIM-XML operation, see
+        :meth:`~pywbem.AsyncWBEMConnection._perform_exchange`.
+        """
+        return self._perform_exchange(
+            lambda: self._imethodcall_request(methodname, namespace,
+                                              **params),
+            lambda tup_tree: self._compact_result(self._imethodcall_result(
+                methodname, tup_tree, response_params_rqd)))
+
+    def _methodcall(self, methodname, objectname, Params=None, **params):
+        """
+        Perform an extrinsic CIM-XML method call, see
+        :meth:`~pywbem.AsyncWBEMConnection._perform_exchange`.
+        """
+        return self._perform_exchange(
+            lambda: self._methodcall_request(methodname, objectname, Params,
+                                             **params),
+            lambda tup_tree: self._methodcall_result(methodname, tup_tree))
+
+    def _complete_paths(self, paths, ClassName, namespace):
+        """
+        Set the namespace and host of instance paths returned by the
+        traditional enumeration operations, if not set.
+        """
+        # pylint: disable=unused-variable
+        host, port, ssl = parse_url(self.url)
+
+        # get namespace for the operation
+        if namespace is None and isinstance(ClassName, CIMClassName):
+            namespace = ClassName.namespace
+        namespace = self._iparam_namespace_from_namespace(namespace)
+
+        for path in paths:
+            if path.namespace is None:
+                path.namespace = namespace
+            if path.host is None:
+                path.host = host
+
+    async def _iter_pull(self, use_pull_attr, open_op, pull_op, result_attr,
+                         MaxObjectCount, traditional_op):
+        # pylint: disable=too-many-arguments,invalid-name
+        """
+        Asynchronous generator implementing the ``Iter...()`` methods.
+
+        The pull operations are used if the connection attribute
+        `use_pull_attr` is not `False`; the open operation (a coroutine
+        function without arguments) determines whether they are supported if
+        that attribute is `None`. Otherwise, `traditional_op` (a coroutine
+        function without arguments returning a list) is used.
+        """
+        if getattr(self, use_pull_attr) is not False:
+            try:
+                pull_result = await open_op()
+            except CIMError as ce:
+                if getattr(self, use_pull_attr) is None and \
+                        ce.status_code == CIM_ERR_NOT_SUPPORTED:
+                    setattr(self, use_pull_attr, False)
+                else:
+                    raise
+            else:
+                # Open operation succeeded; set use_pull flag
+                setattr(self, use_pull_attr, True)
+                try:
+                    for obj in getattr(pull_result, result_attr):
+                        yield obj
+
+                    # Loop to pull while more while eos not returned.
+                    while not pull_result.eos:
+                        pull_result = await pull_op(
+                            pull_result.context, MaxObjectCount=MaxObjectCount)
+
+                        for obj in getattr(pull_result, result_attr):
+                            yield obj
+
+                # Cleanup if caller closes the iterator before exhausting it
+                finally:
+                    if not pull_result.eos:
+                        await self.CloseEnumeration(pull_result.context)
+                return
+
+        for obj in await traditional_op():
+            yield obj
+
+    EnumerateInstances = _operation('EnumerateInstances')
+    EnumerateInstanceNames = _operation('EnumerateInstanceNames')
+    GetInstance = _operation('GetInstance')
+    ModifyInstance = _operation('ModifyInstance')
+    CreateInstance = _operation('CreateInstance')
+    DeleteInstance = _operation('DeleteInstance')
+    Associators = _operation('Associators')
+    AssociatorNames = _operation('AssociatorNames')
+    References = _operation('References')
+    ReferenceNames = _operation('ReferenceNames')
+    InvokeMethod = _operation('InvokeMethod')
+    ExecQuery = _operation('ExecQuery')
+
+    def StreamEnumerateInstances(self, *args, **kwargs):
+        """
+        Not supported by :class:`~pywbem.AsyncWBEMConnection`; use
+        :meth:`~pywbem.AsyncWBEMConnection.IterEnumerateInstances` instead.
+        """
+        raise NotImplementedError("StreamEnumerateInstances() is not "
+                                  "supported by AsyncWBEMConnection")
+
+    def StreamEnumerateInstanceNames(self, *args, **kwargs):
+        """
+        Not supported by :class:`~pywbem.AsyncWBEMConnection`; use
+        :meth:`~pywbem.AsyncWBEMConnection.IterEnumerateInstancePaths`
+        instead.
+        """
+        raise NotImplementedError("StreamEnumerateInstanceNames() is not "
+                                  "supported by AsyncWBEMConnection")
+
+    async def ExecuteBatch(self, Operations):
+        # pylint: disable=invalid-name
+        """
+        Asynchronous version of :meth:`pywbem.WBEMConnection.ExecuteBatch`.
+
+        The parameters, the result and the raised exceptions are the same as
+        for that method. Instead of a multiple operation request, the
+        operations are performed as individual requests that execute
+        concurrently (using :func:`py:asyncio.gather`).
+        """
+        operations = list(Operations)
+        for method_name, _ in operations:
+            if method_name not in self._BATCH_OPERATIONS:
+                raise ValueError(
+                    "Operation %r is not supported in batches (supported "
+                    "are: %s)" % (method_name,
+                                  ', '.join(self._BATCH_OPERATIONS)))
+
+        async def call(method_name, kwargs):
+            """Perform an operation, returning a CIMError as its result."""
+            try:
+                return await getattr(self, method_name)(**kwargs)
+            except CIMError as exc:
+                return exc
+
+        return await asyncio.gather(
+            *[call(method_name, kwargs) for method_name, kwargs in operations])
+
+    def IterEnumerateInstances(self, ClassName, namespace=None,
+                               LocalOnly=None,
+                               DeepInheritance=None, IncludeQualifiers=None,
+                               IncludeClassOrigin=None, PropertyList=None,
+                               FilterQueryLanguage=None, FilterQuery=None,
+                               OperationTimeout=None, ContinueOnError=None,
+                               MaxObjectCount=DEFAULT_ITER_MAXOBJECTCOUNT,
+                               **extra):
+        # pylint: disable=invalid-name
+        """
+        :term:`py:asynchronous iterator` version of
+        :meth:`pywbem.WBEMConnection.IterEnumerateInstances`.
+
+        The parameters, the iterated instances and the raised exceptions are
+        the same as for that method. The returned asynchronous iterator is
+        used with ``async for``; invalid parameters are detected when
+        calling this method.
+        """
+        _validateIterCommonParams(MaxObjectCount, OperationTimeout)
+
+        async def enumerate_instances():
+            """Traditional operation, if pull is not supported."""
+            if FilterQuery is not None or FilterQueryLanguage is not None:
+                raise ValueError('EnumerateInstances does not support'
+                                 ' FilterQuery.')
+            if ContinueOnError is not None:
+                raise ValueError('EnumerateInstances does not support '
+                                 'ContinueOnError.')
+            instances = await self.EnumerateInstances(
+                ClassName, namespace=namespace, LocalOnly=LocalOnly,
+                DeepInheritance=DeepInheritance,
+                IncludeQualifiers=IncludeQualifiers,
+                IncludeClassOrigin=IncludeClassOrigin,
+                PropertyList=PropertyList, **extra)
+            self._complete_paths([inst.path for inst in instances],
+                                 ClassName, namespace)
+            return instances
+
+        return self._iter_pull(
+            '_use_enum_inst_pull_operations',
+            functools.partial(
+                self.OpenEnumerateInstances,
+                ClassName, namespace=namespace, LocalOnly=LocalOnly,
+                DeepInheritance=DeepInheritance,
+                IncludeQualifiers=IncludeQualifiers,
+                IncludeClassOrigin=IncludeClassOrigin,
+                PropertyList=PropertyList,
+                FilterQueryLanguage=FilterQueryLanguage,
+                FilterQuery=FilterQuery,
+                OperationTimeout=OperationTimeout,
+                ContinueOnError=ContinueOnError,
+                MaxObjectCount=MaxObjectCount, **extra),
+            self.PullInstancesWithPath, 'instances', MaxObjectCount,
+            enumerate_instances)
+
+    def IterEnumerateInstancePaths(self, ClassName, namespace=None,
+                                   FilterQueryLanguage=None, FilterQuery=None,
+                                   OperationTimeout=None, ContinueOnError=None,
+                                   MaxObjectCount=DEFAULT_ITER_MAXOBJECTCOUNT,
+                                   **extra):
+        # pylint: disable=invalid-name
+        """
+        :term:`py:asynchronous iterator` version of
+        :meth:`pywbem.WBEMConnection.IterEnumerateInstancePaths`.
+
+        The parameters, the iterated instance paths and the raised
+        exceptions are the same as for that method. The returned
+        asynchronous iterator is used with ``async for``; invalid parameters
+        are detected when calling this method.
+        """
+        _validateIterCommonParams(MaxObjectCount, OperationTimeout)
+
+        async def enumerate_instance_names():
+            """Traditional operation, if pull is not supported."""
+            if FilterQuery is not None or FilterQueryLanguage is not None:
+                raise ValueError('EnumerateInstanceNames does not support'
+                                 ' FilterQuery.')
+            if ContinueOnError is not None:
+                raise ValueError('EnumerateInstanceNames does not support '
+                                 'ContinueOnError.')
+            paths = await self.EnumerateInstanceNames(
+                ClassName, namespace=namespace, **extra)
+            self._complete_paths(paths, ClassName, namespace)
+            return paths
+
+        return self._iter_pull(
+            '_use_enum_path_pull_operations',
+            functools.partial(
+                self.OpenEnumerateInstancePaths,
+                ClassName, namespace=namespace,
+                FilterQueryLanguage=FilterQueryLanguage,
+                FilterQuery=FilterQuery,
+                OperationTimeout=OperationTimeout,
+                ContinueOnError=ContinueOnError,
+                MaxObjectCount=MaxObjectCount, **extra),
+            self.PullInstancePaths, 'paths', MaxObjectCount,
+            enumerate_instance_names)
+
+    def IterAssociatorInstances(self, InstanceName, AssocClass=None,
+                                ResultClass=None,
+                                Role=None, ResultRole=None,
+                                IncludeQualifiers=None,
+                                IncludeClassOrigin=None, PropertyList=None,
+                                FilterQueryLanguage=None, FilterQuery=None,
+                                OperationTimeout=None, ContinueOnError=None,
+                                MaxObjectCount=DEFAULT_ITER_MAXOBJECTCOUNT,
+                                **extra):
+        # pylint: disable=invalid-name
+        """
+        :term:`py:asynchronous iterator` version of
+        :meth:`pywbem.WBEMConnection.IterAssociatorInstances`.
+
+        The parameters, the iterated instances and the raised exceptions are
+        the same as for that method. The returned asynchronous iterator is
+        used with ``async for``; invalid parameters are detected when
+        calling this method.
+        """
+        _validateIterCommonParams(MaxObjectCount, OperationTimeout)
+
+        async def associators():
+            """Traditional operation, if pull is not supported."""
+            if FilterQuery is not None or FilterQueryLanguage is not None:
+                raise ValueError('Associators does not support'
+                                 ' FilterQuery.')
+            if ContinueOnError is not None:
+                raise ValueError('Associators does not support '
+                                 'ContinueOnError.')
+            return await self.Associators(
+                InstanceName,
+                AssocClass=AssocClass,
+                ResultClass=ResultClass,
+                Role=Role,
+                ResultRole=ResultRole,
+                IncludeQualifiers=IncludeQualifiers,
+                IncludeClassOrigin=IncludeClassOrigin,
+                PropertyList=PropertyList, **extra)
+
+        return self._iter_pull(
+            '_use_assoc_inst_pull_operations',
+            functools.partial(
+                self.OpenAssociatorInstances,
+                InstanceName,
+                AssocClass=AssocClass,
+                ResultClass=ResultClass,
+                Role=Role,
+                ResultRole=ResultRole,
+                IncludeQualifiers=IncludeQualifiers,
+                IncludeClassOrigin=IncludeClassOrigin,
+                PropertyList=PropertyList,
+                FilterQueryLanguage=FilterQueryLanguage,
+                FilterQuery=FilterQuery,
+                OperationTimeout=OperationTimeout,
+                ContinueOnError=ContinueOnError,
+                MaxObjectCount=MaxObjectCount, **extra),
+            self.PullInstancesWithPath, 'instances', MaxObjectCount,
+            associators)
+
+    def IterAssociatorInstancePaths(self, InstanceName, AssocClass=None,
+                                    ResultClass=None,
+                                    Role=None, ResultRole=None,
+                                    FilterQueryLanguage=None, FilterQuery=None,
+                                    OperationTimeout=None,
+                                    ContinueOnError=None,
+                                    MaxObjectCount=DEFAULT_ITER_MAXOBJECTCOUNT,
+                                    **extra):
+        # pylint: disable=invalid-name
+        """
+        :term:`py:asynchronous iterator` version of
+        :meth:`pywbem.WBEMConnection.IterAssociatorInstancePaths`.
+
+        The parameters, the iterated instance paths and the raised
+        exceptions are the same as for that method. The returned
+        asynchronous iterator is used with ``async for``; invalid parameters
+        are detected when calling this method.
+        """
+        _validateIterCommonParams(MaxObjectCount, OperationTimeout)
+
+        async def associator_names():
+            """Traditional operation, if pull is not supported."""
+            if FilterQuery is not None or FilterQueryLanguage is not None:
+                raise ValueError('AssociatorNames does not support'
+                                 ' FilterQuery.')
+            if ContinueOnError is not None:
+                raise ValueError('AssociatorNames does not support '
+                                 'ContinueOnError.')
+            return await self.AssociatorNames(
+                InstanceName,
+                AssocClass=AssocClass,
+                ResultClass=ResultClass,
+                Role=Role,
+                ResultRole=ResultRole, **extra)
+
+        return self._iter_pull(
+            '_use_assoc_path_pull_operations',
+            functools.partial(
+                self.OpenAssociatorInstancePaths,
+                InstanceName,
+                AssocClass=AssocClass,
+                ResultClass=ResultClass,
+                Role=Role,
+                ResultRole=ResultRole,
+                FilterQueryLanguage=FilterQueryLanguage,
+                FilterQuery=FilterQuery,
+                OperationTimeout=OperationTimeout,
+                ContinueOnError=ContinueOnError,
+                MaxObjectCount=MaxObjectCount, **extra),
+            self.PullInstancePaths, 'paths', MaxObjectCount,
+            associator_names)
+
+    def IterReferenceInstances(self, InstanceName, ResultClass=None,
+                               Role=None, IncludeQualifiers=None,
+                               IncludeClassOrigin=None, PropertyList=None,
+                               FilterQueryLanguage=None, FilterQuery=None,
+                               OperationTimeout=None, ContinueOnError=None,
+                               MaxObjectCount=DEFAULT_ITER_MAXOBJECTCOUNT,
+                               **extra):
+        # pylint: disable=invalid-name
+        """
+        :term:`py:asynchronous iterator` version of
+        :meth:`pywbem.WBEMConnection.IterReferenceInstances`.
+
+        The parameters, the iterated instances and the raised exceptions are
+        the same as for that method. The returned asynchronous iterator is
+        used with ``async for``; invalid parameters are detected when
+        calling this method.
+        """
+        _validateIterCommonParams(MaxObjectCount, OperationTimeout)
+
+        async def references():
+            """Traditional operation, if pull is not supported."""
+            if FilterQuery is not None or FilterQueryLanguage is not None:
+                raise ValueError('References does not support'
+                                 ' FilterQuery.')
+            if ContinueOnError is not None:
+                raise ValueError('References does not support '
+                                 'ContinueOnError.')
+            return await self.References(
+                InstanceName,
+                ResultClass=ResultClass,
+                Role=Role,
+                IncludeQualifiers=IncludeQualifiers,
+                IncludeClassOrigin=IncludeClassOrigin,
+                PropertyList=PropertyList, **extra)
+
+        return self._iter_pull(
+            '_use_ref_inst_pull_operations',
+            functools.partial(
+                self.OpenReferenceInstances,
+                InstanceName,
+                ResultClass=ResultClass,
+                Role=Role,
+                IncludeQualifiers=IncludeQualifiers,
+                IncludeClassOrigin=IncludeClassOrigin,
+                PropertyList=PropertyList,
+                FilterQueryLanguage=FilterQueryLanguage,
+                FilterQuery=FilterQuery,
+                OperationTimeout=OperationTimeout,
+                ContinueOnError=ContinueOnError,
+                MaxObjectCount=MaxObjectCount, **extra),
+            self.PullInstancesWithPath, 'instances', MaxObjectCount,
+            references)
+
+    def IterReferenceInstancePaths(self, InstanceName, ResultClass=None,
+                                   Role=None,
+                                   FilterQueryLanguage=None, FilterQuery=None,
+                                   OperationTimeout=None, ContinueOnError=None,
+                                   MaxObjectCount=DEFAULT_ITER_MAXOBJECTCOUNT,
+                                   **extra):
+        # pylint: disable=invalid-name
+        """
+        :term:`py:asynchronous iterator` version of
+        :meth:`pywbem.WBEMConnection.IterReferenceInstancePaths`.
+
+        The parameters, the iterated instance paths and the raised
+        exceptions are the same as for that method. The returned
+        asynchronous iterator is used with ``async for``; invalid parameters
+        are detected when calling this method.
+        """
+        _validateIterCommonParams(MaxObjectCount, OperationTimeout)
+
+        async def reference_names():
+            """Traditional operation, if pull is not supported."""
+            if FilterQuery is not None or FilterQueryLanguage is not None:
+                raise ValueError('ReferenceNames does not support'
+                                 ' FilterQuery.')
+            if ContinueOnError is not None:
+                raise ValueError('ReferenceNames does not support '
+                                 'ContinueOnError.')
+            return await self.ReferenceNames(
+                InstanceName,
+                ResultClass=ResultClass,
+                Role=Role, **extra)
+
+        return self._iter_pull(
+            '_use_ref_path_pull_operations',
+            functools.partial(
+                self.OpenReferenceInstancePaths,
+                InstanceName,
+                ResultClass=ResultClass,
+                Role=Role,
+                FilterQueryLanguage=FilterQueryLanguage,
+                FilterQuery=FilterQuery,
+                OperationTimeout=OperationTimeout,
+                ContinueOnError=ContinueOnError,
+                MaxObjectCount=MaxObjectCount, **extra),
+            self.PullInstancePaths, 'paths', MaxObjectCount,
+            reference_names)
+
+    async def IterQueryInstances(self, FilterQueryLanguage, FilterQuery,
+                                 namespace=None, ReturnQueryResultClass=None,
+                                 OperationTimeout=None, ContinueOnError=None,
+                                 MaxObjectCount=DEFAULT_ITER_MAXOBJECTCOUNT,
+                                 **extra):
+        # pylint: disable=invalid-name
+        """
+        :term:`py:coroutine` version of
+        :meth:`pywbem.WBEMConnection.IterQueryInstances`.
+
+        The parameters, result and raised exceptions are the same as for
+        that method.
+        """
+        _validateIterCommonParams(MaxObjectCount, OperationTimeout)
+
+        if self._use_query_pull_operations is not False:
+            try:
+                pull_result = await self.OpenQueryInstances(
+                    FilterQueryLanguage,
+                    FilterQuery,
+                    namespace=namespace,
+                    ReturnQueryResultClass=ReturnQueryResultClass,
+                    OperationTimeout=OperationTimeout,
+                    ContinueOnError=ContinueOnError,
+                    MaxObjectCount=MaxObjectCount, **extra)
+            except CIMError as ce:
+                if self._use_query_pull_operations is None and \
+                        ce.status_code == CIM_ERR_NOT_SUPPORTED:
+                    self._use_query_pull_operations = False
+                else:
+                    raise
+            else:
+                # Open operation succeeded; set use_pull flag
+                self._use_query_pull_operations = True
+
+                instances = pull_result.instances
+
+                # get QueryResultClass from if returned with open request.
+                qrc = pull_result.query_result_class if \
+                    ReturnQueryResultClass else None
+
+                try:
+                    while not pull_result.eos:
+                        pull_result = await self.PullInstances(
+                            pull_result.context,
+                            MaxObjectCount=MaxObjectCount)
+                        instances.extend(pull_result.instances)
+                finally:
+                    if not pull_result.eos:
+                        await self.CloseEnumeration(pull_result.context)
+
+                return _IterQueryInstancesReturn(instances,
+                                                 query_result_class=qrc)
+
+        if ReturnQueryResultClass is not None:
+            raise ValueError('ExecQuery does not support'
+                             ' ReturnQueryResultClass.')
+
+        if ContinueOnError is not None:
+            raise ValueError('ExecQuery does not support '
+                             'ContinueOnError.')
+
+        instances = await self.ExecQuery(FilterQueryLanguage, FilterQuery,
+                                         namespace=namespace, **extra)
+
+        return _IterQueryInstancesReturn(instances)
+
+    OpenEnumerateInstances = _operation('OpenEnumerateInstances')
+    OpenEnumerateInstancePaths = _operation('OpenEnumerateInstancePaths')
+    OpenAssociatorInstances = _operation('OpenAssociatorInstances')
+    OpenAssociatorInstancePaths = _operation('OpenAssociatorInstancePaths')
+    OpenReferenceInstances = _operation('OpenReferenceInstances')
+    OpenReferenceInstancePaths = _operation('OpenReferenceInstancePaths')
+    OpenQueryInstances = _operation('OpenQueryInstances')
+    PullInstancesWithPath = _operation('PullInstancesWithPath')
+    PullInstancePaths = _operation('PullInstancePaths')
+    PullInstances = _operation('PullInstances')
+    CloseEnumeration = _operation('CloseEnumeration')
+    EnumerateClasses = _operation('EnumerateClasses')
+    EnumerateClassNames = _operation('EnumerateClassNames')
+    GetClass = _operation('GetClass')
+    ModifyClass = _operation('ModifyClass')
+    CreateClass = _operation('CreateClass')
+    DeleteClass = _operation('DeleteClass')
+    EnumerateQualifiers = _operation('EnumerateQualifiers')
+    GetQualifier = _operation('GetQualifier')
+    SetQualifier = _operation('SetQualifier')
+    DeleteQualifier = _operation('DeleteQualifier')
@@ -0,0 +1,362 @@
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the Free Software
+# Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+"""
+*New in pywbem 0.13 as experimental.*
+
+The :class:`~pywbem.FanOutExecutor` class performs the same operation against
+a set of WBEM servers in parallel, on a bounded pool of threads, and returns
+the results of the servers in the order in which they complete.
+
+The servers are represented by :class:`~pywbem.WBEMConnection` or
+:class:`~pywbem.WBEMServer` objects. Each of these objects is used by only one
+thread at a time, so the usual restriction that a connection must not be used
+concurrently by multiple threads is satisfied, as long as the same object is
+not specified more than once.
+
+The following example retrieves the advertised management profiles of a number
+of WBEM servers, and the instances of a class from the same servers::
+
+    servers = [pywbem.WBEMServer(pywbem.WBEMConnection(url, creds))
+               for url in server_urls]
+
+    executor = pywbem.FanOutExecutor(servers, max_workers=20, timeout=30,
+                                     stats_enabled=True)
+
+    for server, profiles, exc in executor.execute('profiles'):
+        if exc:
+            print("%s failed: %s" % (server.url, exc))
+        else:
+            print("%s: %s profiles" % (server.url, len(profiles)))
+
+    for server, insts, exc in executor.execute(
+            lambda server: list(server.conn.IterEnumerateInstances(
+                'CIM_ComputerSystem', namespace='root/cimv2'))):
+        ...
+
+    print(executor.statistics.formatted())
+"""
+
+from __future__ import absolute_import
+
+import time
+import types
+import threading
+from collections import namedtuple
+import six
+from six.moves import queue
+
+from ._statistics import Statistics
+from .exceptions import TimeoutError  # pylint: disable=redefined-builtin
+
+__all__ = ['FanOutExecutor', 'fanout_result_tuple']
+
+# Default maximum number of worker threads of a FanOutExecutor
+DEFAULT_FANOUT_WORKERS = 10
+
+# Results returned by FanOutExecutor.execute()
+# pylint: disable=invalid-name
+fanout_result_tuple = namedtuple("fanout_result_tuple",
+                                 ["target", "result", "exception"])
+
+
+class FanOutExecutor(object):
+    """
+    *New in pywbem 0.13 as experimental.*
+
+    An executor that performs an operation against a set of WBEM servers in
+    parallel, on a bounded pool of worker threads.
+
+    The time the operation takes for each server is maintained in a
+    :class:`~pywbem.Statistics` object of the executor (see
+    :attr:`~pywbem.FanOutExecutor.statistics`), where the operation statistic
+    for a server is named by the URL of the server. Multiple executions of the
+    executor accumulate into this statistics. Since the fan-out operation may
+    consist of multiple WBEM operations, the request and reply lengths of the
+    operation statistics are not maintained and are always 0.
+    """
+
+    def __init__(self, targets, max_workers=DEFAULT_FANOUT_WORKERS,
+                 timeout=None, stats_enabled=False):
+        # pylint: disable=line-too-long
+        """
+        Parameters:
+
+          targets (iterable of :class:`~pywbem.WBEMConnection` or :class:`~pywbem.WBEMServer`):
+            The WBEM servers against which the operations are performed.
+
+          max_workers (:term:`integer`):
+            Maximum number of worker threads performing operations at the
+            same time. Must be positive.
+
+          timeout (:term:`number`):
+            Timeout in seconds for the operation against a single server,
+            measured from the point in time the operation for that server
+            was started. `None` means that there is no timeout.
+
+            Threads cannot be interrupted in Python, so when the timeout
+            expires for a server, the operation against that server continues
+            until it returns on its own (e.g. because the timeout of its
+            connection expires), and its outcome is then discarded. In order
+            not to slow down the remaining servers, the worker thread that
+            performs that operation is replaced by a new worker thread.
+
+          stats_enabled (:class:`py:bool`):
+            Initial enablement status for the statistics of the executor.
+
+        Raises:
+
+          ValueError: Invalid max_workers or timeout.
+        """  # noqa: E501
+        # pylint: enable=line-too-long
+        self._targets = list(targets)
+        if max_workers < 1:
+            raise ValueError("max_workers must be positive, but is: %r" %
+                             max_workers)
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be positive, but is: %r" %
+                             timeout)
+        self._max_workers = max_workers
+        self._timeout = timeout
+        self._statistics = Statistics(stats_enabled)
+        self._stats_lock = threading.Lock()
+
+    def __repr__(self):
+        """
+        Return a representation of the :class:`~pywbem.FanOutExecutor` object
+        with all attributes, that is suitable for debugging.
+        """
+        return "%s(targets=%r, max_workers=%r, timeout=%r, " \
+            "stats_enabled=%r)" % \
+            (self.__class__.__name__, self._targets, self._max_workers,
+             self._timeout, self._statistics.enabled)
+
+    @property
+    def targets(self):
+        """
+        list of :class:`~pywbem.WBEMConnection` or :class:`~pywbem.WBEMServer`:
+        The WBEM servers against which the operations are performed.
+        """
+        return self._targets
+
+    @property
+    def max_workers(self):
+        """
+        :term:`integer`: Maximum number of worker threads performing
+        operations at the same time.
+        """
+        return self._max_workers
+
+    @property
+    def timeout(self):
+        """
+        :term:`number`: Timeout in seconds for the operation against a single
+        server, or `None` if there is no timeout.
+        """
+        return self._timeout
+
+    @property
+    def statistics(self):
+        """
+        :class:`~pywbem.Statistics`: Statistics over the times the operations
+        took, per server.
+        """
+        return self._statistics
+
+    @staticmethod
+    def _make_call(operation, args, kwargs):
+        """
+        Return a function that performs the operation against a target and
+        returns its result.
+        """
+        if callable(operation):
+            return lambda target: operation(target, *args, **kwargs)
+
+        def call(target):
+            """Perform the named operation against the target."""
+            attr = getattr(target, operation)
+            if callable(attr):
+                result = attr(*args, **kwargs)
+            else:
+                # A property such as WBEMServer.profiles
+                result = attr
+            # The Iter...() methods return generators whose operations are
+            # performed only while iterating.
+            if isinstance(result, types.GeneratorType):
+                result = list(result)
+            return result
+
+        return call
+
+    def _finish(self, index, start_time, outcome, finished):
+        """
+        Mark the operation against a target as finished with the specified
+        outcome ('completed', 'failed' or 'timedout'), and record its time in
+        the statistics.
+
+        Returns `False` if the operation had already been marked as finished
+        (which happens when the timeout expires at the same time the operation
+        completes), and `True` otherwise.
+        """
+        with self._stats_lock:
+            if index in finished:
+                return False
+            finished[index] = outcome
+            op_stat = self._statistics.get_op_statistic(
+                self._targets[index].url)
+            op_stat.stop_timer(0, 0, exception=(outcome != 'completed'),
+                               start_time=start_time)
+        return True
+
+    def _worker(self, call, jobs, results, finished, state):
+        """
+        Worker thread function that performs the operation for the targets
+        it takes from the job queue, until the job queue is empty or the
+        execution has been abandoned.
+        """
+        while not state['closed']:
+            try:
+                index = jobs.get_nowait()
+            except queue.Empty:
+                return
+            start_time = time.time()
+            results.put((index, start_time, None, None))
+            try:
+                result = call(self._targets[index])
+            except Exception as exc:  # pylint: disable=broad-except
+                if self._finish(index, start_time, 'failed', finished):
+                    results.put((index, None, None, exc))
+            else:
+                if self._finish(index, start_time, 'completed', finished):
+                    results.put((index, None, result, None))
+
+    def execute(self, operation, *args, **kwargs):
+        """
+        Perform an operation against all servers of this executor in parallel
+        and return the results as they complete.
+
+        The operation is performed lazily, i.e. the worker threads are started
+        when iterating over the returned generator begins. If the iteration is
+        abandoned before it is exhausted (e.g. because the generator is
+        closed), no further operations are started.
+
+        Parameters:
+
+          operation (:term:`callable` or :term:`string`):
+            The operation to be performed against each server.
+
+            If a callable, it is called with the server object (i.e. the
+            :class:`~pywbem.WBEMConnection` or :class:`~pywbem.WBEMServer`
+            object) as the first positional argument, followed by the
+            specified `args` and `kwargs`, and its return value is the result
+            for that server.
+
+            If a string, it is the name of a method or property of the server
+            object. A method is called with the specified `args` and
+            `kwargs`, and a property is simply retrieved. If the result is a
+            generator (as returned by the `Iter...()` methods of
+            :class:`~pywbem.WBEMConnection`), it is converted to a list.
+
+          *args:
+            Positional arguments for the operation.
+
+          **kwargs:
+            Keyword arguments for the operation.
+
+        Returns:
+
+          :term:`py:generator` iterating :func:`~py:collections.namedtuple`:
+          A generator object that yields one named tuple for each server, in
+          the order in which the operations complete. The named tuple has the
+          following attributes:
+
+          * **target** (:class:`~pywbem.WBEMConnection` or
+            :class:`~pywbem.WBEMServer`): The server object.
+
+          * **result**: The result of the operation for the server, or `None`
+            if it failed.
+
+          * **exception** (:exc:`py:Exception`): The exception raised by the
+            operation for the server, or `None` if it succeeded. If the
+            timeout of the executor expired for the server, this is a
+            :exc:`~pywbem.TimeoutError` exception.
+        """
+        call = self._make_call(operation, args, kwargs)
+
+        jobs = queue.Queue()
+        for index in six.moves.range(len(self._targets)):
+            jobs.put(index)
+        # The worker threads put a tuple (index, start_time, result, exc)
+        # when starting an operation (with start_time set) and when the
+        # operation has finished (with start_time being None)
+        results = queue.Queue()
+        # Outcome of the finished operations, by target index
+        finished = {}
+        state = {'closed': False}
+
+        def start_worker():
+            """Start a worker thread."""
+            thread = threading.Thread(
+                target=self._worker,
+                args=(call, jobs, results, finished, state))
+            thread.daemon = True
+            thread.start()
+
+        # Start times of the operations in progress, by target index
+        running = {}
+        returned = 0
+
+        try:
+            for _ in six.moves.range(min(self._max_workers,
+                                         len(self._targets))):
+                start_worker()
+
+            while returned < len(self._targets):
+
+                wait_time = None
+                if self._timeout is not None and running:
+                    deadline = min(six.itervalues(running)) + self._timeout
+                    wait_time = max(deadline - time.time(), 0)
+                try:
+                    index, start_time, result, exc = \
+                        results.get(timeout=wait_time)
+                except queue.Empty:
+                    now = time.time()
+                    for index, start_time in list(running.items()):
+                        if now - start_time < self._timeout or \
+                                not self._finish(index, start_time,
+                                                 'timedout', finished):
+                            continue
+                        del running[index]
+                        returned += 1
+                        if not jobs.empty():
+                            start_worker()
+                        target = self._targets[index]
+                        yield fanout_result_tuple(
+                            target, None,
+                            TimeoutError("Operation against %s did not "
+                                         "complete within %s s" %
+                                         (target.url, self._timeout)))
+                    continue
+
+                if start_time is not None:
+                    running[index] = start_time
+                    continue
+                del running[index]
+                returned += 1
+                yield fanout_result_tuple(self._targets[index], result, exc)
+        finally:
+            state['closed'] = True
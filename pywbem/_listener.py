@@ -129,22 +129,28 @@ WBEMListener class
 import sys
 import errno
 import re
+import time
 import logging
 import ssl
 import threading
+import zlib
 import six
 from six.moves import BaseHTTPServer
 from six.moves import socketserver
 from six.moves import http_client
+from six.moves import queue
 
 from . import cim_xml
 from ._version import __version__
 from .cim_obj import CIMInstance
 from .cim_constants import CIM_ERR_NOT_SUPPORTED, CIM_ERR_INVALID_PARAMETER, \
+    CIM_ERR_SERVER_LIMITS_EXCEEDED, CIM_ERR_SERVER_IS_SHUTTING_DOWN, \
     _statuscode2name
 from .tupleparse import parse_cim
 from .tupletree import xml_to_tupletree_sax
-from .exceptions import ParseError, VersionError
+from .exceptions import CIMError, ParseError, VersionError
+from ._statistics import Statistics
+from .cim_http import get_decompressor
 
 # CIM-XML protocol related versions implemented by the WBEM listener.
 # These are returned in export message responses.
@@ -172,9 +178,255 @@ TOKEN_CHARSET_FINDALL_PATTERN = re.compile(
     r'(?:; *charset="?([^";, ]*)"?)?'
     r'(?:, *)?')
 
+# Overflow policies for a full indication delivery queue
+OVERFLOW_POLICIES = ('block', 'drop-oldest', 'reject')
+
+# Default maximum size in Bytes of the body of an export request message
+DEFAULT_MAX_REQUEST_SIZE = 16 * 1024 * 1024
+
 __all__ = ['WBEMListener', 'callback_interface']
 
 
+def check_export_headers(headers):
+    """
+    Check the HTTP header fields of a CIM-XML export request message, as
+    described in :term:`DSP0200`.
+
+    Parameters:
+
+      headers: HTTP header fields of the request, as an object whose `get()`
+        method looks up header fields case-insensitively.
+
+    Returns:
+
+      tuple(http_code, cim_error, cim_error_details) describing the HTTP error
+      to be sent back, or `None` if the header fields are valid.
+    """
+
+    # Accept header check described in DSP0200
+    accept = headers.get('Accept', 'text/xml')
+    if accept not in ('text/xml', 'application/xml', '*/*'):
+        return (406, 'header-mismatch',
+                'Invalid Accept header value: %s '
+                '(need text/xml, application/xml or */*)' % accept)
+
+    # Accept-Charset header check described in DSP0200
+    accept_charset = headers.get('Accept-Charset', 'UTF-8')
+    tq_list = re.findall(TOKEN_QUALITY_FINDALL_PATTERN, accept_charset)
+    found = False
+    if tq_list is not None:
+        for token, quality in tq_list:
+            if token.lower() in ('utf-8', '*'):
+                found = True
+                break
+    if not found:
+        return (406, 'header-mismatch',
+                'Invalid Accept-Charset header value: %s '
+                '(need UTF-8 or *)' % accept_charset)
+
+    # Accept-Encoding header check described in DSP0200
+    accept_encoding = headers.get('Accept-Encoding', 'Identity')
+    tq_list = re.findall(TOKEN_QUALITY_FINDALL_PATTERN, accept_encoding)
+    identity_acceptable = False
+    identity_found = False
+    if tq_list is not None:
+        for token, quality in tq_list:
+            quality = 1 if quality == '' else float(quality)
+            if token.lower() == 'identity':
+                identity_found = True
+                if quality > 0:
+                    identity_acceptable = True
+                break
+        if not identity_found:
+            for token, quality in tq_list:
+                quality = 1 if quality == '' else float(quality)
+                if token == '*' and quality > 0:
+                    identity_acceptable = True
+                    break
+    if not identity_acceptable:
+        return (406, 'header-mismatch',
+                'Invalid Accept-Encoding header value: %s '
+                '(need Identity to be acceptable)' % accept_encoding)
+
+    # Accept-Language header check described in DSP0200.
+    # Ignored, because this WBEM listener does not support multiple
+    # languages, and hence any language is allowed to be returned.
+
+    # Accept-Range header check described in DSP0200
+    accept_range = headers.get('Accept-Range', None)
+    if accept_range is not None:
+        return (406, 'header-mismatch',
+                'Accept-Range header is not permitted %s' % accept_range)
+
+    # Content-Type header check described in DSP0200
+    content_type = headers.get('Content-Type', None)
+    if content_type is None:
+        return (406, 'header-mismatch', 'Content-Type header is required')
+    tc_list = re.findall(TOKEN_CHARSET_FINDALL_PATTERN, content_type)
+    found = False
+    if tc_list is not None:
+        for token, charset in tc_list:
+            if token.lower() in ('text/xml', 'application/xml') and \
+               (charset == '' or charset.lower() == 'utf-8'):
+                found = True
+                break
+    if not found:
+        return (406, 'header-mismatch',
+                'Invalid Content-Type header value: %s '
+                '(need text/xml or application/xml with '
+                'charset=utf-8 or empty)' % content_type)
+
+    # Content-Encoding header check described in DSP0200. Besides identity,
+    # compressed request bodies are accepted (see process_export_request()).
+    content_encoding = headers.get('Content-Encoding', 'identity')
+    if content_encoding.strip().lower() not in ('identity', 'gzip', 'x-gzip',
+                                                'deflate'):
+        return (406, 'header-mismatch',
+                'Invalid Content-Encoding header value: '
+                '%s (listener supports only identity, gzip and deflate)' %
+                content_encoding)
+
+    # Content-Language header check described in DSP0200.
+    # Ignored, because this WBEM listener does not support multiple
+    # languages, and hence any language is allowed in the request.
+
+    # The following headers are ignored. They are not allowed to be used
+    # by servers, but listeners are not required to reject them:
+    # Content-Range, Expires, If-Range, Range.
+
+    return None
+
+
+def process_export_request(body, content_encoding=None, max_size=None):
+    """
+    Parse the body of a CIM-XML export request message and check its export
+    method and parameters.
+
+    Parameters:
+
+      body (:term:`byte string`): The body of the request message.
+
+      content_encoding (:term:`string`): The value of the Content-Encoding
+        header field of the request message. A body compressed with gzip or
+        deflate is decompressed before it is parsed. `None` means identity.
+
+      max_size (:term:`integer`): Maximum size in Bytes of the decompressed
+        body, or `None` for no limit.
+
+    Returns:
+
+      tuple(http_error, msgid, methodname, cim_error, indication), with:
+
+      * http_error: tuple(http_code, cim_error, cim_error_details) describing
+        the HTTP error to be sent back, or `None`. If not `None`, the other
+        items are `None`.
+      * msgid, methodname: Message ID and export method name of the request.
+      * cim_error: tuple(status_code, status_description) describing the
+        CIM error response to be sent back, or `None`.
+      * indication: The :class:`~pywbem.CIMInstance` object of the indication
+        to be delivered, if both errors are `None`.
+    """
+    decompressor = get_decompressor(content_encoding)
+    if decompressor is not None:
+        try:
+            if max_size is None:
+                body = decompressor.decompress(body) + decompressor.flush()
+            else:
+                body = decompressor.decompress(body, max_size + 1)
+                if len(body) > max_size:
+                    return ((413, None,
+                             "Decompressed request body exceeds the maximum "
+                             "of %s Bytes" % max_size),
+                            None, None, None, None)
+        except zlib.error as exc:
+            return ((400, "request-not-well-formed",
+                     "Invalid compressed request body: %s" % exc),
+                    None, None, None, None)
+
+    try:
+        msgid, methodname, params = \
+            ListenerRequestHandler.parse_export_request(body)
+    except ParseError as exc:
+        return ((400, "request-not-well-formed", str(exc)),
+                None, None, None, None)
+    except VersionError as exc:
+        if str(exc).startswith("DTD"):
+            http_error = (400, "unsupported-dtd-version", str(exc))
+        elif str(exc).startswith("Protocol"):
+            http_error = (400, "unsupported-protocol-version", str(exc))
+        else:
+            http_error = (400, "unsupported-version", str(exc))
+        return (http_error, None, None, None, None)
+
+    if methodname != 'ExportIndication':
+        return (None, msgid, methodname,
+                (CIM_ERR_NOT_SUPPORTED,
+                 'Unknown export method: %s' % methodname), None)
+
+    if len(params) != 1 or 'NewIndication' not in params:
+        return (None, msgid, methodname,
+                (CIM_ERR_INVALID_PARAMETER,
+                 'Expecting one parameter NewIndication, got %s' %
+                 ','.join(params.keys())), None)
+
+    indication_inst = params['NewIndication']
+
+    if not isinstance(indication_inst, CIMInstance):
+        return (None, msgid, methodname,
+                (CIM_ERR_INVALID_PARAMETER,
+                 'NewIndication parameter is not a CIM instance, but %r' %
+                 indication_inst), None)
+
+    return (None, msgid, methodname, None, indication_inst)
+
+
+def error_response_body(msgid, methodname, status_code, status_desc,
+                        error_insts=None):
+    """
+    Return the body of a CIM-XML export response message that indicates
+    error, as a :term:`byte string`.
+    """
+    resp_xml = cim_xml.CIM(
+        cim_xml.MESSAGE(
+            cim_xml.SIMPLEEXPRSP(
+                cim_xml.EXPMETHODRESPONSE(
+                    methodname,
+                    cim_xml.ERROR(
+                        str(status_code),
+                        status_desc,
+                        error_insts),
+                    ),  # noqa: E123
+                ),  # noqa: E123
+            msgid, IMPLEMENTED_PROTOCOL_VERSION),
+        IMPLEMENTED_CIM_VERSION, IMPLEMENTED_DTD_VERSION)
+
+    resp_body = '<?xml version="1.0" encoding="utf-8" ?>\n' + \
+                resp_xml.toxml()
+
+    if isinstance(resp_body, six.text_type):
+        resp_body = resp_body.encode("utf-8")
+    return resp_body
+
+
+def success_response_body(msgid, methodname):
+    """
+    Return the body of a CIM-XML export response message that indicates
+    success, as a :term:`byte string`.
+    """
+    # The XML string is built directly, because this response is sent
+    # for every indication.
+    resp_xml = cim_xml._message_str(
+        u'<SIMPLEEXPRSP><EXPMETHODRESPONSE%s/></SIMPLEEXPRSP>' %
+        cim_xml._attrs_str([('NAME', methodname)]),
+        msgid, IMPLEMENTED_PROTOCOL_VERSION,
+        IMPLEMENTED_CIM_VERSION, IMPLEMENTED_DTD_VERSION)
+    resp_body = '<?xml version="1.0" encoding="utf-8" ?>\n' + resp_xml
+
+    if isinstance(resp_body, six.text_type):
+        resp_body = resp_body.encode("utf-8")
+    return resp_body
+
+
 class ThreadedHTTPServer(socketserver.ThreadingMixIn,
                          BaseHTTPServer.HTTPServer):
     """Defines an HTTPServer class for indication reception"""
@@ -249,157 +501,46 @@ class ListenerRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
         CIM indication to the stored listener object.
         """
 
-        # Accept header check described in DSP0200
-        accept = self.headers.get('Accept', 'text/xml')
-        if accept not in ('text/xml', 'application/xml', '*/*'):
-            self.send_http_error(406, 'header-mismatch',
-                                 'Invalid Accept header value: %s '
-                                 '(need text/xml, application/xml or */*)' %
-                                 accept)
+        http_error = check_export_headers(self.headers)
+        if http_error is not None:
+            self.send_http_error(*http_error)
             return
 
-        # Accept-Charset header check described in DSP0200
-        accept_charset = self.headers.get('Accept-Charset', 'UTF-8')
-        tq_list = re.findall(TOKEN_QUALITY_FINDALL_PATTERN, accept_charset)
-        found = False
-        if tq_list is not None:
-            for token, quality in tq_list:
-                if token.lower() in ('utf-8', '*'):
-                    found = True
-                    break
-        if not found:
-            self.send_http_error(406, 'header-mismatch',
-                                 'Invalid Accept-Charset header value: %s '
-                                 '(need UTF-8 or *)' %
-                                 accept_charset)
-            return
-
-        # Accept-Encoding header check described in DSP0200
-        accept_encoding = self.headers.get('Accept-Encoding', 'Identity')
-        tq_list = re.findall(TOKEN_QUALITY_FINDALL_PATTERN, accept_encoding)
-        identity_acceptable = False
-        identity_found = False
-        if tq_list is not None:
-            for token, quality in tq_list:
-                quality = 1 if quality == '' else float(quality)
-                if token.lower() == 'identity':
-                    identity_found = True
-                    if quality > 0:
-                        identity_acceptable = True
-                    break
-            if not identity_found:
-                for token, quality in tq_list:
-                    quality = 1 if quality == '' else float(quality)
-                    if token == '*' and quality > 0:
-                        identity_acceptable = True
-                        break
-        if not identity_acceptable:
-            self.send_http_error(406, 'header-mismatch',
-                                 'Invalid Accept-Encoding header value: %s '
-                                 '(need Identity to be acceptable)' %
-                                 accept_encoding)
-            return
-
-        # Accept-Language header check described in DSP0200.
-        # Ignored, because this WBEM listener does not support multiple
-        # languages, and hence any language is allowed to be returned.
-
-        # Accept-Range header check described in DSP0200
-        accept_range = self.headers.get('Accept-Range', None)
-        if accept_range is not None:
-            self.send_http_error(406, 'header-mismatch',
-                                 'Accept-Range header is not permitted %s' %
-                                 accept_range)
-            return
-
-        # Content-Type header check described in DSP0200
-        content_type = self.headers.get('Content-Type', None)
-        if content_type is None:
-            self.send_http_error(406, 'header-mismatch',
-                                 'Content-Type header is required')
-            return
-        tc_list = re.findall(TOKEN_CHARSET_FINDALL_PATTERN, content_type)
-        found = False
-        if tc_list is not None:
-            for token, charset in tc_list:
-                if token.lower() in ('text/xml', 'application/xml') and \
-                   (charset == '' or charset.lower() == 'utf-8'):
-                    found = True
-                    break
-        if not found:
-            self.send_http_error(406, 'header-mismatch',
-                                 'Invalid Content-Type header value: %s '
-                                 '(need text/xml or application/xml with '
-                                 'charset=utf-8 or empty)' %
-                                 content_type)
-            return
-
-        # Content-Encoding header check described in DSP0200
-        content_encoding = self.headers.get('Content-Encoding', 'identity')
-        if content_encoding.lower() != 'identity':
-            self.send_http_error(406, 'header-mismatch',
-                                 'Invalid Content-Encoding header value: '
-                                 '%s (listener supports only identity)' %
-                                 content_encoding)
-            return
-
-        # Content-Language header check described in DSP0200.
-        # Ignored, because this WBEM listener does not support multiple
-        # languages, and hence any language is allowed in the request.
-
-        # The following headers are ignored. They are not allowed to be used
-        # by servers, but listeners are not required to reject them:
-        # Content-Range, Expires, If-Range, Range.
-
         # Start processing the request
+        max_size = self.server.listener.max_request_size
         content_len = int(self.headers.get('Content-Length', 0))
+        if content_len > max_size:
+            # The request body is not read
+            self.close_connection = True
+            self.send_http_error(413, None,
+                                 "Request body of %s Bytes exceeds the "
+                                 "maximum of %s Bytes" %
+                                 (content_len, max_size))
+            return
         body = self.rfile.read(content_len)
 
-        try:
-            msgid, methodname, params = self.parse_export_request(body)
-        except ParseError as exc:
-            self.send_http_error(400, "request-not-well-formed", str(exc))
+        http_error, msgid, methodname, cim_error, indication = \
+            process_export_request(body,
+                                   self.headers.get('Content-Encoding', None),
+                                   max_size)
+        if http_error is not None:
+            self.send_http_error(*http_error)
             return
-        except VersionError as exc:
-            if str(exc).startswith("DTD"):
-                self.send_http_error(400, "unsupported-dtd-version",
-                                     str(exc))
-            elif str(exc).startswith("Protocol"):
-                self.send_http_error(400, "unsupported-protocol-version",
-                                     str(exc))
-            else:
-                self.send_http_error(400, "unsupported-version", str(exc))
-            return
-
-        if methodname == 'ExportIndication':
-
-            if len(params) != 1 or 'NewIndication' not in params:
-                self.send_error_response(msgid, methodname,
-                                         CIM_ERR_INVALID_PARAMETER,
-                                         'Expecting one parameter '
-                                         'NewIndication, got %s' %
-                                         ','.join(params.keys()))
-                return
-
-            indication_inst = params['NewIndication']
 
-            if not isinstance(indication_inst, CIMInstance):
-                self.send_error_response(msgid, methodname,
-                                         CIM_ERR_INVALID_PARAMETER,
-                                         'NewIndication parameter is not '
-                                         'a CIM instance, but %r' %
-                                         indication_inst)
-                return
+        if cim_error is None:
             # server.listener created in WBEMListener.start function
-            self.server.listener.deliver_indication(indication_inst,
-                                                    self.client_address[0])
-
-            self.send_success_response(msgid, methodname)
+            try:
+                self.server.listener.deliver_indication(
+                    indication, self.client_address[0])
+            except CIMError as exc:
+                # The delivery queue is full and its overflow policy is
+                # 'reject'
+                cim_error = (exc.status_code, exc.status_description)
 
+        if cim_error is not None:
+            self.send_error_response(msgid, methodname, *cim_error)
         else:
-            self.send_error_response(msgid, methodname,
-                                     CIM_ERR_NOT_SUPPORTED,
-                                     'Unknown export method: %s' % methodname)
+            self.send_success_response(msgid, methodname)
 
     def send_http_error(self, http_code, cim_error=None,
                         cim_error_details=None, headers=None):
@@ -428,25 +569,8 @@ class ListenerRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
         """Send a CIM-XML response message back to the WBEM server that
         indicates error."""
 
-        resp_xml = cim_xml.CIM(
-            cim_xml.MESSAGE(
-                cim_xml.SIMPLEEXPRSP(
-                    cim_xml.EXPMETHODRESPONSE(
-                        methodname,
-                        cim_xml.ERROR(
-                            str(status_code),
-                            status_desc,
-                            error_insts),
-                        ),  # noqa: E123
-                    ),  # noqa: E123
-                msgid, IMPLEMENTED_PROTOCOL_VERSION),
-            IMPLEMENTED_CIM_VERSION, IMPLEMENTED_DTD_VERSION)
-
-        resp_body = '<?xml version="1.0" encoding="utf-8" ?>\n' + \
-                    resp_xml.toxml()
-
-        if isinstance(resp_body, six.text_type):
-            resp_body = resp_body.encode("utf-8")
+        resp_body = error_response_body(msgid, methodname, status_code,
+                                        status_desc, error_insts)
 
         http_code = 200
         self.send_response(http_code, http_client.responses.get(http_code, ''))
@@ -464,19 +588,7 @@ class ListenerRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
         """Send a CIM-XML response message back to the WBEM server that
         indicates success."""
 
-        resp_xml = cim_xml.CIM(
-            cim_xml.MESSAGE(
-                cim_xml.SIMPLEEXPRSP(
-                    cim_xml.EXPMETHODRESPONSE(
-                        methodname),
-                    ),  # noqa: E123
-                msgid, IMPLEMENTED_PROTOCOL_VERSION),
-            IMPLEMENTED_CIM_VERSION, IMPLEMENTED_DTD_VERSION)
-        resp_body = '<?xml version="1.0" encoding="utf-8" ?>\n' + \
-                    resp_xml.toxml()
-
-        if isinstance(resp_body, six.text_type):
-            resp_body = resp_body.encode("utf-8")
+        resp_body = success_response_body(msgid, methodname)
 
         http_code = 200
         self.send_response(http_code, http_client.responses.get(http_code, ''))
@@ -599,10 +711,23 @@ class WBEMListener(object):
     The listener must be stopped in order to free the TCP/IP port it listens
     on. Using this class as a context manager ensures that the listener is
     stopped when leaving the context manager scope.
+
+    By default, the received indications are delivered to the callback
+    functions in the thread that handles the HTTP request, before the response
+    is sent back to the WBEM server. If a delivery queue is configured (see
+    the `queue_size` init parameter), the received indications are put into
+    that queue and the response is sent back right away. A pool of delivery
+    threads takes the indications from the queue and delivers them to the
+    callback functions. This allows the listener to absorb bursts of
+    indications and decouples the WBEM servers from slow callback functions.
     """
 
+    # pylint: disable=too-many-arguments
     def __init__(self, host, http_port=None, https_port=None,
-                 certfile=None, keyfile=None):
+                 certfile=None, keyfile=None, queue_size=None,
+                 delivery_workers=1, overflow_policy='block',
+                 stats_enabled=False,
+                 max_request_size=DEFAULT_MAX_REQUEST_SIZE):
         """
         Parameters:
 
@@ -640,6 +765,59 @@ class WBEMListener(object):
 
             `None` means not to use a private key file. Setting up a port
             for HTTPS requires specifying a private key file.
+
+          queue_size (:term:`integer`):
+            *New in pywbem 0.13 as experimental.*
+
+            Maximum number of received indications in the delivery queue of
+            this listener. Must be positive.
+
+            `None` means that there is no delivery queue, and that the
+            indications are delivered in the threads handling the HTTP
+            requests.
+
+          delivery_workers (:term:`integer`):
+            *New in pywbem 0.13 as experimental.*
+
+            Number of threads that deliver the indications from the delivery
+            queue to the callback functions. Must be positive. Ignored if
+            there is no delivery queue.
+
+            If this is more than one, the callback functions are called
+            concurrently and the indications may be delivered in an order that
+            is different from the order in which they were received.
+
+          overflow_policy (:term:`string`):
+            *New in pywbem 0.13 as experimental.*
+
+            Policy when an indication is received and the delivery queue is
+            full. Ignored if there is no delivery queue. Must be one of:
+
+            * ``'block'``: The thread handling the HTTP request waits until
+              the delivery queue has space, so the WBEM server receives the
+              response later.
+            * ``'drop-oldest'``: The oldest indication in the delivery queue
+              is discarded to make space for the received indication.
+            * ``'reject'``: The received indication is discarded and the WBEM
+              server receives an error response with status
+              ``CIM_ERR_SERVER_LIMITS_EXCEEDED``.
+
+          stats_enabled (:class:`py:bool`):
+            *New in pywbem 0.13 as experimental.*
+
+            Initial enablement status for the statistics of this listener
+            (see :attr:`~pywbem.WBEMListener.statistics`).
+
+          max_request_size (:term:`integer`):
+            *New in pywbem 0.13 as experimental.*
+
+            Maximum size in Bytes of the body of an export request message,
+            before and after decompressing a compressed body. Larger requests
+            are rejected with HTTP status 413.
+
+        Raises:
+
+          ValueError: Invalid queue_size, delivery_workers or overflow_policy.
         """
 
         self._host = host
@@ -683,6 +861,37 @@ class WBEMListener(object):
         self._https_server = None  # ThreadedHTTPServer for HTTPS
         self._https_thread = None  # Thread for HTTPS
 
+        if queue_size is not None and queue_size < 1:
+            raise ValueError("queue_size must be positive, but is: %r" %
+                             queue_size)
+        if delivery_workers < 1:
+            raise ValueError("delivery_workers must be positive, but is: %r" %
+                             delivery_workers)
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError("overflow_policy must be one of %s, but is: %r" %
+                             (', '.join(OVERFLOW_POLICIES), overflow_policy))
+        self._queue_size = queue_size
+        self._delivery_workers = delivery_workers
+        self._overflow_policy = overflow_policy
+        self._max_request_size = max_request_size
+
+        # Delivery queue with tuples (indication, host, receive_time), and
+        # the threads delivering from it while the listener is started
+        self._queue = queue.Queue(queue_size) if queue_size else None
+        self._workers = []
+        # Indicates that the delivery threads are being stopped, so that no
+        # indications are put into the delivery queue behind the `None`
+        # items that stop the delivery threads. Changed with the lock held.
+        self._stopping = False
+
+        # Protects the counters and the statistics, and serializes the
+        # replacement of the oldest indication in the delivery queue
+        self._lock = threading.Lock()
+        self._max_queue_depth = 0
+        self._dropped_count = 0
+        self._rejected_count = 0
+        self._statistics = Statistics(stats_enabled)
+
         self._logger = logging.getLogger('pywbem.listener.%s' % id(self))
 
         self._callbacks = []  # Registered callback functions
@@ -693,9 +902,12 @@ class WBEMListener(object):
         with all attributes, that is suitable for debugging.
         """
         return "%s(host=%r, http_port=%s, https_port=%s, " \
-               "certfile=%r, keyfile=%r, logger=%r, _callbacks=%r)" % \
+               "certfile=%r, keyfile=%r, queue_size=%s, " \
+               "delivery_workers=%s, overflow_policy=%r, logger=%r, " \
+               "_callbacks=%r)" % \
                (self.__class__.__name__, self.host, self.http_port,
-                self.https_port, self.certfile, self.keyfile, self.logger,
+                self.https_port, self.certfile, self.keyfile, self.queue_size,
+                self.delivery_workers, self.overflow_policy, self.logger,
                 self._callbacks)
 
     def __enter__(self):
@@ -792,6 +1004,103 @@ class WBEMListener(object):
         """
         return self._keyfile
 
+    @property
+    def queue_size(self):
+        """
+        :term:`integer`: Maximum number of received indications in the
+        delivery queue of this listener.
+
+        `None` means there is no delivery queue.
+
+        *New in pywbem 0.13 as experimental.*
+        """
+        return self._queue_size
+
+    @property
+    def delivery_workers(self):
+        """
+        :term:`integer`: Number of threads that deliver the indications from
+        the delivery queue to the callback functions.
+
+        *New in pywbem 0.13 as experimental.*
+        """
+        return self._delivery_workers
+
+    @property
+    def overflow_policy(self):
+        """
+        :term:`string`: Policy when an indication is received and the delivery
+        queue is full: ``'block'``, ``'drop-oldest'`` or ``'reject'``.
+
+        *New in pywbem 0.13 as experimental.*
+        """
+        return self._overflow_policy
+
+    @property
+    def max_request_size(self):
+        """
+        :term:`integer`: Maximum size in Bytes of the body of an export
+        request message.
+
+        *New in pywbem 0.13 as experimental.*
+        """
+        return self._max_request_size
+
+    @property
+    def queue_depth(self):
+        """
+        :term:`integer`: Current number of indications in the delivery queue.
+
+        *New in pywbem 0.13 as experimental.*
+        """
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def max_queue_depth(self):
+        """
+        :term:`integer`: Maximum number of indications that have been in the
+        delivery queue at the same time.
+
+        *New in pywbem 0.13 as experimental.*
+        """
+        return self._max_queue_depth
+
+    @property
+    def dropped_count(self):
+        """
+        :term:`integer`: Number of indications that have been discarded from
+        the delivery queue because of the ``'drop-oldest'`` overflow policy.
+
+        *New in pywbem 0.13 as experimental.*
+        """
+        return self._dropped_count
+
+    @property
+    def rejected_count(self):
+        """
+        :term:`integer`: Number of indications that have been rejected because
+        of the ``'reject'`` overflow policy.
+
+        *New in pywbem 0.13 as experimental.*
+        """
+        return self._rejected_count
+
+    @property
+    def statistics(self):
+        """
+        :class:`~pywbem.Statistics`: Statistics of this listener.
+
+        The operation statistic named ``'DeliverIndication'`` contains the
+        times from receiving an indication until it has been delivered to all
+        callback functions, including the time the indication waited in the
+        delivery queue. An indication for which a callback function raised an
+        exception is counted as an exception. The request and reply lengths
+        are not maintained and are always 0.
+
+        *New in pywbem 0.13 as experimental.*
+        """
+        return self._statistics
+
     @property
     def logger(self):
         """
@@ -898,9 +1207,14 @@ class WBEMListener(object):
             self._https_server = None
             self._https_thread = None
 
+        self._start_workers()
+
     def stop(self):
         """
         Stop the WBEM listener threads, if they are running.
+
+        If there is a delivery queue, the indications remaining in it are
+        delivered before this method returns.
         """
 
         # Stopping the server will cause its `serve_forever()` method
@@ -919,13 +1233,58 @@ class WBEMListener(object):
             self._https_server = None
             self._https_thread = None
 
+        self._stop_workers()
+
+    def _start_workers(self):
+        """
+        Start the delivery threads, if there is a delivery queue and they are
+        not yet running.
+        """
+        if self._queue is not None and not self._workers:
+            self._stopping = False
+            for _ in six.moves.range(self._delivery_workers):
+                thread = threading.Thread(target=self._deliver_worker)
+                thread.daemon = True  # Exit thread upon main thread exit
+                self._workers.append(thread)
+                thread.start()
+
+    def _stop_workers(self):
+        """
+        Stop the delivery threads, if they are running, after they have
+        delivered the indications remaining in the delivery queue.
+        """
+        if self._workers:
+            # Once this is set, deliver_indication() no longer puts
+            # indications into the delivery queue. Because the 'drop-oldest'
+            # policy removes items from the queue with the lock held, it
+            # cannot remove any of the `None` items put in below.
+            with self._lock:
+                self._stopping = True
+            # Each delivery thread terminates when it takes a `None` from the
+            # delivery queue, after the indications before it.
+            for _ in self._workers:
+                self._queue.put(None)
+            for thread in self._workers:
+                thread.join()
+            self._workers = []
+            # Deliver the indications that a concurrent 'block' or 'reject'
+            # delivery has put into the delivery queue behind the `None` items
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    self._deliver(*item)
+
     def deliver_indication(self, indication, host):
         """
         This function is called by the listener threads for each received
         indication. It is not supposed to be called by the user.
 
         It delivers the indication to all callback functions that have been
-        added to the listener.
+        added to the listener. If there is a delivery queue, the indication is
+        put into the delivery queue instead, subject to its overflow policy.
 
         If a callback function raises any exception this is logged as an error
         using the listener logger and the next registered callback function is
@@ -938,14 +1297,94 @@ class WBEMListener(object):
 
           host (:term:`string`):
             Host name or IP address of WBEM server sending the indication.
+
+        Raises:
+
+          :exc:`~pywbem.CIMError`: CIM_ERR_SERVER_LIMITS_EXCEEDED, if the
+            delivery queue is full and the overflow policy is ``'reject'``.
+
+          :exc:`~pywbem.CIMError`: CIM_ERR_SERVER_IS_SHUTTING_DOWN, if there
+            is a delivery queue and the listener is being stopped.
+        """
+        receive_time = time.time()
+        if self._queue is None:
+            self._deliver(indication, host, receive_time)
+            return
+
+        item = (indication, host, receive_time)
+        if self._stopping:
+            self._reject_stopping()
+        if self._overflow_policy == 'block':
+            self._queue.put(item)
+        elif self._overflow_policy == 'drop-oldest':
+            with self._lock:
+                if self._stopping:
+                    self._reject_stopping()
+                while True:
+                    try:
+                        self._queue.put_nowait(item)
+                        break
+                    except queue.Full:
+                        try:
+                            self._queue.get_nowait()
+                        except queue.Empty:
+                            continue
+                        self._dropped_count += 1
+        else:
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                with self._lock:
+                    self._rejected_count += 1
+                raise CIMError(CIM_ERR_SERVER_LIMITS_EXCEEDED,
+                               "Indication delivery queue of the listener is "
+                               "full (%s indications)" % self._queue_size)
+
+        depth = self._queue.qsize()
+        if depth > self._max_queue_depth:
+            with self._lock:
+                self._max_queue_depth = max(self._max_queue_depth, depth)
+
+    @staticmethod
+    def _reject_stopping():
+        """
+        Reject an indication that is received while the delivery threads are
+        being stopped.
         """
+        raise CIMError(CIM_ERR_SERVER_IS_SHUTTING_DOWN,
+                       "Indication listener is being stopped")
+
+    def _deliver(self, indication, host, receive_time):
+        """
+        Deliver an indication to all callback functions, and record the time
+        since it was received in the statistics.
+        """
+        exception = False
         for callback in self._callbacks:
             try:
                 callback(indication, host)
             except Exception as exc:  # pylint: disable=broad-except
+                exception = True
                 self.logger.log(logging.ERROR, "Indication delivery callback "
                                 "function raised %s: %s",
                                 exc.__class__.__name__, exc)
+        if self._statistics.enabled:
+            with self._lock:
+                op_stat = self._statistics.get_op_statistic(
+                    'DeliverIndication')
+                op_stat.stop_timer(0, 0, exception=exception,
+                                   start_time=receive_time)
+
+    def _deliver_worker(self):
+        """
+        Delivery thread function that delivers the indications from the
+        delivery queue, until it takes a `None` from the delivery queue.
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._deliver(*item)
 
     def add_callback(self, callback):
         """
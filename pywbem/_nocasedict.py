@@ -57,6 +57,21 @@ from .config import DEBUG_WARNING_ORIGIN
 
 __all__ = []
 
+# Shared lower-cased keys of all NocaseDict objects, by original key. This
+# avoids creating equal lower-cased key strings for the properties and
+# qualifiers of many objects of the same class. Because the keys are
+# typically CIM element names, the number of keys is bounded by the schema
+# size; the table is limited to _LOWER_KEYS_MAX entries for other uses.
+_LOWER_KEYS = {}
+_LOWER_KEYS_MAX = 10000
+
+# Types of values that cannot be modified in place. The hash value of a
+# NocaseDict object is cached only if all of its values have one of these
+# types, because the cache is invalidated only when the dictionary itself is
+# modified.
+_IMMUTABLE_VALUE_TYPES = six.string_types + six.integer_types + \
+    (float, type(None))
+
 
 class NocaseDict(object):
     # pylint: disable=too-many-lines
@@ -140,6 +155,10 @@ class NocaseDict(object):
         # is the tuple (original key, value).
         self._data = OrderedDict()
 
+        # Cached hash value, or `None` if not cached. Reset by any
+        # modification of the dictionary.
+        self._hash = None
+
         # Flag indicating whether unnamed keys (a key of `None`) is allowed.
         # Can be set to allow unnamed keys.
         self.allow_unnamed_keys = False
@@ -202,7 +221,13 @@ class NocaseDict(object):
         from the input key.
         """
         if isinstance(key, six.string_types):
-            return key.lower()
+            try:
+                return _LOWER_KEYS[key]
+            except KeyError:
+                lower_key = key.lower()
+                if len(_LOWER_KEYS) < _LOWER_KEYS_MAX:
+                    _LOWER_KEYS[key] = lower_key
+                return lower_key
         elif self.allow_unnamed_keys and key is None:
             return None
         else:
@@ -236,6 +261,7 @@ class NocaseDict(object):
         """
         k = self._real_key(key)
         self._data[k] = (key, value)
+        self._hash = None
 
     def __delitem__(self, key):
         """
@@ -251,6 +277,7 @@ class NocaseDict(object):
             del self._data[k]
         except KeyError:
             raise KeyError('Key %r not found' % key)
+        self._hash = None
 
     def __len__(self):
         """
@@ -405,6 +432,7 @@ class NocaseDict(object):
         Remove all items from the dictionary.
         """
         self._data.clear()
+        self._hash = None
 
     def copy(self):
         """
@@ -413,8 +441,14 @@ class NocaseDict(object):
         """
         result = NocaseDict()
         result._data = self._data.copy()  # pylint: disable=protected-access
+        result._hash = self._hash  # pylint: disable=protected-access
         return result
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Hash values of strings differ between Python processes
+        self._hash = None
+
     def __eq__(self, other):
         """
         Invoked when two dictionaries are compared with the `==` operator.
@@ -422,7 +456,11 @@ class NocaseDict(object):
         The comparison is based on matching key/value pairs.
         The keys are looked up case-insensitively.
         """
-        # TODO #1062: Could compare hash values for better performance
+        if isinstance(other, NocaseDict):
+            # pylint: disable=protected-access
+            if self._hash is not None and other._hash is not None and \
+                    self._hash != other._hash:
+                return False
         for key, self_value in self.iteritems():
             if key not in other:
                 return False
@@ -497,6 +535,15 @@ class NocaseDict(object):
         default hash function of objects (which is based on id()), is that
         hashable objects which compare equal must have the same hash value.
         This method ensures that that condition is satisfied.
+
+        The hash value is cached until the dictionary is modified, if all
+        values are of immutable types (strings, numbers, `None`).
         """
+        if self._hash is not None:
+            return self._hash
         fs = frozenset([(k, self._data[k][1]) for k in self._data])
-        return hash(fs)
+        hash_ = hash(fs)
+        if all(isinstance(item[1], _IMMUTABLE_VALUE_TYPES)
+               for item in six.itervalues(self._data)):
+            self._hash = hash_
+        return hash_
@@ -399,6 +399,8 @@ class BaseOperationRecorder(object):
         self._http_response_payload = None
         self._pull_op = pull_op
 
+        self._schema_cache_hit = False
+
     def stage_wbem_connection(self, wbem_connection):
         """
         Stage information about the connection. Used only by
@@ -449,6 +451,17 @@ class BaseOperationRecorder(object):
         # pylint: disable=attribute-defined-outside-init
         self._http_response_payload = payload
 
+    def stage_schema_cache_hit(self, conn_id, url, namespace):
+        """
+        *New in pywbem 0.13 as experimental.*
+
+        Stage that the result of the operation was served from the schema
+        cache of the connection, so that no HTTP request was sent.
+        conn_id, url and namespace unused here. Used in log
+        """
+        # pylint: disable=attribute-defined-outside-init
+        self._schema_cache_hit = True
+
     def record_staged(self):
         """Encode staged information on request and result to output"""
         if self.enabled:
@@ -458,6 +471,9 @@ class BaseOperationRecorder(object):
             pwresult = OpResult(
                 self._pywbem_result_ret,
                 self._pywbem_result_exc)
+            if self._schema_cache_hit:
+                self.record(pwargs, pwresult, None, None)
+                return
             httpreq = HttpRequest(
                 self._http_request_version,
                 self._http_request_url,
@@ -496,14 +512,16 @@ class BaseOperationRecorder(object):
             that is recorded.
 
             `None`, if no HTTP request had been sent (e.g. because an exception
-            was raised before getting there).
+            was raised before getting there, or because the result was served
+            from the schema cache of the connection).
 
           http_response (:class:`~pywbem.HttpResponse`):
             The HTTP response received by the :class:`~pywbem.WBEMConnection`
             method that is recorded.
 
             `None`, if no HTTP response had been received (e.g. because an
-            exception was raised before getting there).
+            exception was raised before getting there, or because the result
+            was served from the schema cache of the connection).
         """
         raise NotImplementedError
 
@@ -825,6 +843,16 @@ class LogOperationRecorder(BaseOperationRecorder):
                                   self._http_response_version,
                                   header_str, upayload)
 
+    def stage_schema_cache_hit(self, conn_id, url, namespace):
+        """
+        Log that the result of the operation was served from the schema cache
+        of the connection, in place of the HTTP request and response.
+        """
+        if self.enabled and self.http_detail_level is not None and \
+                self.httplogger.isEnabledFor(logging.DEBUG):
+            self.httplogger.debug('SchemaCache:%s %s %s', conn_id, url,
+                                  namespace)
+
     def record_staged(self):
         """
         Not used for logging. The logs are output in the various
@@ -844,6 +872,10 @@ class TestClientRecorder(BaseOperationRecorder):
     An operation recorder that generates test cases for each recorded
     operation. The test cases are in the YAML format suitable for the
     `test_client` unit test module of the pywbem project.
+
+    No test cases are generated for operations that were served from the
+    schema cache of the connection, because they have no HTTP request and
+    response.
     """
 
     # HTTP header fields to exclude when creating the testcase
@@ -896,6 +928,9 @@ class TestClientRecorder(BaseOperationRecorder):
         Parameters: See :meth:`pywbem.BaseOperationRecorder.record`.
         """
 
+        if self._schema_cache_hit:
+            return
+
         testcase = OrderedDict()
         testcase['name'] = pywbem_args.method
         testcase['description'] = 'Generated by TestClientRecorder'
@@ -0,0 +1,455 @@
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the Free Software
+# Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+"""
+*New in pywbem 0.13 as experimental.*
+
+The :class:`~pywbem.SchemaCache` class caches the class declarations and
+qualifier declarations that are retrieved from WBEM servers by a
+:class:`~pywbem.WBEMConnection` object, so that repeated retrievals of the
+same schema elements do not need to go to the WBEM server.
+
+A schema cache is used by a connection by specifying it in the `schema_cache`
+init parameter of :class:`~pywbem.WBEMConnection`. The following operations
+are served from the cache if the cache contains the result of an earlier
+operation with the same parameters on the same WBEM server and namespace:
+
+* :meth:`~pywbem.WBEMConnection.GetClass`
+* :meth:`~pywbem.WBEMConnection.EnumerateClasses`
+* :meth:`~pywbem.WBEMConnection.EnumerateClassNames`
+* :meth:`~pywbem.WBEMConnection.GetQualifier`
+* :meth:`~pywbem.WBEMConnection.EnumerateQualifiers`
+
+The following operations invalidate all cached results for the WBEM server
+and namespace they target, regardless of whether they succeed:
+
+* :meth:`~pywbem.WBEMConnection.CreateClass`
+* :meth:`~pywbem.WBEMConnection.ModifyClass`
+* :meth:`~pywbem.WBEMConnection.DeleteClass`
+* :meth:`~pywbem.WBEMConnection.SetQualifier`
+* :meth:`~pywbem.WBEMConnection.DeleteQualifier`
+
+The cache has an in-memory tier with a bounded number of entries that are
+evicted in least-recently-used order, and an optional on-disk tier in a
+directory, where the results are stored in CIM-XML format. The on-disk tier
+survives the process and can be shared by multiple processes. Cached results
+expire after a time-to-live. Changes to the schema that are made by other
+clients of the WBEM server are not detected before the results expire.
+
+A schema cache can be used by multiple connections to the same or to
+different WBEM servers at the same time; the cached results are kept apart
+by the URL of the connection and by the user in its credentials, because a
+WBEM server may return different results to different users.
+
+Operations that are served from the cache are passed to the operation
+recorders of the connection without an HTTP request and response.
+
+Example::
+
+    cache = pywbem.SchemaCache(ttl=24 * 3600,
+                               directory=os.path.expanduser('~/.pywbem'))
+    conn = pywbem.WBEMConnection(url, creds, schema_cache=cache)
+
+    cls = conn.GetClass('CIM_ManagedElement')  # from the WBEM server
+    cls = conn.GetClass('CIM_ManagedElement')  # from the cache
+"""
+
+from __future__ import absolute_import
+
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import threading
+from copy import deepcopy
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+import six
+
+from .cim_obj import CIMClassName
+from .tupletree import xml_to_tupletree_sax
+from .tupleparse import parse_any
+from .exceptions import ParseError
+
+__all__ = ['SchemaCache']
+
+# Default maximum number of results in the in-memory tier of a SchemaCache
+DEFAULT_SCHEMA_CACHE_SIZE = 1000
+
+# Default time-to-live of the results in a SchemaCache, in seconds
+DEFAULT_SCHEMA_CACHE_TTL = 3600
+
+# Operations whose results are cached
+CACHED_OPERATIONS = frozenset([
+    'GetClass', 'EnumerateClasses', 'EnumerateClassNames', 'GetQualifier',
+    'EnumerateQualifiers'])
+
+# Operations that invalidate the cached results of their namespace
+INVALIDATING_OPERATIONS = frozenset([
+    'CreateClass', 'ModifyClass', 'DeleteClass', 'SetQualifier',
+    'DeleteQualifier'])
+
+
+def _key_value(value):
+    """
+    Return the normalized form of an operation parameter value in the key of
+    a cached result, ignoring the lexical case of names.
+
+    The normalized form consists of unicode strings, numbers, booleans,
+    `None` and lists, so that its JSON representation is the same on
+    Python 2 and Python 3.
+    """
+    if isinstance(value, CIMClassName):
+        return six.text_type(value.classname).lower()
+    if isinstance(value, six.string_types):
+        return six.text_type(value).lower()
+    if isinstance(value, (list, tuple)):
+        return [_key_value(v) for v in value]
+    if value is None or isinstance(value, (bool, six.integer_types)):
+        return value
+    return six.text_type(value)
+
+
+# Names of the on-disk directories for the URLs
+_URL_DIR_PATTERN = re.compile(r'^[0-9a-f]{40}$')
+
+
+def _hash(text):
+    """Return a hash string of a unicode string, for use as a file name."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class SchemaCache(object):
+    """
+    *New in pywbem 0.13 as experimental.*
+
+    A cache for the class declarations and qualifier declarations retrieved
+    by :class:`~pywbem.WBEMConnection` objects.
+
+    The methods of this class are thread-safe.
+    """
+
+    def __init__(self, maxsize=DEFAULT_SCHEMA_CACHE_SIZE,
+                 ttl=DEFAULT_SCHEMA_CACHE_TTL, directory=None):
+        """
+        Parameters:
+
+          maxsize (:term:`integer`):
+            Maximum number of operation results in the in-memory tier of the
+            cache. Must be positive. When the maximum is reached, the least
+            recently used result is removed from the in-memory tier.
+
+          ttl (:term:`number`):
+            Time-to-live of the cached results in seconds, measured from the
+            point in time the result was retrieved from the WBEM server.
+            `None` means that the cached results do not expire.
+
+          directory (:term:`string`):
+            Path name of the directory of the on-disk tier of the cache. The
+            directory is created if it does not exist.
+
+            `None` means that the cache has no on-disk tier.
+
+        Raises:
+
+          ValueError: Invalid maxsize or ttl.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive, but is: %r" %
+                             maxsize)
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive, but is: %r" % ttl)
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._directory = directory
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        # Cached results by (url, namespace, key), as tuples (time,
+        # objects), in least recently used order
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+
+    def __repr__(self):
+        """
+        Return a representation of the :class:`~pywbem.SchemaCache` object
+        with all attributes, that is suitable for debugging.
+        """
+        return "%s(maxsize=%r, ttl=%r, directory=%r, entries=%r, hits=%r, " \
+            "misses=%r)" % \
+            (self.__class__.__name__, self._maxsize, self._ttl,
+             self._directory, len(self._entries), self._hits, self._misses)
+
+    def __len__(self):
+        """
+        Return the number of operation results in the in-memory tier of the
+        cache.
+        """
+        return len(self._entries)
+
+    @property
+    def maxsize(self):
+        """
+        :term:`integer`: Maximum number of operation results in the in-memory
+        tier of the cache.
+        """
+        return self._maxsize
+
+    @property
+    def ttl(self):
+        """
+        :term:`number`: Time-to-live of the cached results in seconds, or
+        `None` if the cached results do not expire.
+        """
+        return self._ttl
+
+    @property
+    def directory(self):
+        """
+        :term:`string`: Path name of the directory of the on-disk tier of the
+        cache, or `None` if the cache has no on-disk tier.
+        """
+        return self._directory
+
+    @property
+    def hits(self):
+        """
+        :term:`integer`: Number of operations that were served from the
+        cache.
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        :term:`integer`: Number of cacheable operations that were not served
+        from the cache.
+        """
+        return self._misses
+
+    @staticmethod
+    def _key(operation, params, user):
+        """
+        Return the key of the result of an operation with the specified
+        operation parameters performed by the specified user, as a unicode
+        string.
+        """
+        key_params = dict((name, _key_value(value))
+                          for name, value in six.iteritems(params))
+        key_user = six.text_type(user) if user is not None else None
+        return six.text_type(json.dumps([operation, key_user, key_params],
+                                        sort_keys=True))
+
+    def _path(self, url, namespace=None, key=None):
+        """
+        Return the path name of the on-disk directory for the URL, of the
+        on-disk directory for the URL and namespace, or of the file for the
+        URL, namespace and key.
+        """
+        path = os.path.join(self._directory, _hash(url))
+        if namespace is not None:
+            path = os.path.join(path, _hash(namespace.lower()))
+            if key is not None:
+                path = os.path.join(path, _hash(key) + '.xml')
+        return path
+
+    def _expired(self, stored_time):
+        """Return a boolean indicating whether a cached result expired."""
+        return self._ttl is not None and time.time() - stored_time > self._ttl
+
+    def _load(self, path):
+        """
+        Return a tuple (time, objects) with the result stored in an on-disk
+        file, or `None` if the file does not exist, has expired or cannot be
+        parsed. Expired and invalid files are removed.
+        """
+        try:
+            stored_time = os.path.getmtime(path)
+            if self._expired(stored_time):
+                os.remove(path)
+                return None
+            with open(path, 'rb') as fp:
+                data = fp.read()
+            tup_tree = parse_any(xml_to_tupletree_sax(
+                data, "schema cache file %s" % path))
+        except (IOError, OSError):
+            return None
+        except ParseError:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return stored_time, tup_tree[2]
+
+    def _save(self, path, objects):
+        """
+        Store a result in an on-disk file, replacing any existing file
+        atomically.
+        """
+        data = u'<IRETURNVALUE>%s</IRETURNVALUE>' % \
+            u''.join([obj.tocimxmlstr() for obj in objects])
+        tmp_path = '%s.%s.%s.tmp' % (path, os.getpid(),
+                                     threading.current_thread().ident)
+        try:
+            dir_path = os.path.dirname(path)
+            if not os.path.isdir(dir_path):
+                os.makedirs(dir_path)
+            with open(tmp_path, 'wb') as fp:
+                fp.write(data.encode('utf-8'))
+            try:
+                os.rename(tmp_path, path)
+            except OSError:
+                # On Windows, the target file must not exist
+                os.remove(path)
+                os.rename(tmp_path, path)
+        except (IOError, OSError):
+            # The on-disk tier is best effort: Another process may have
+            # removed the directory in the mean time.
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _add(self, entry_key, stored_time, objects):
+        """
+        Add a result to the in-memory tier, evicting the least recently used
+        results if needed.
+        """
+        self._entries.pop(entry_key, None)
+        self._entries[entry_key] = (stored_time, objects)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def lookup(self, url, namespace, operation, params, user=None):
+        """
+        Return the cached result of an operation.
+
+        Parameters:
+
+          url (:term:`string`): URL of the WBEM server.
+
+          namespace (:term:`string`): Namespace of the operation.
+
+          operation (:term:`string`): Name of the operation, e.g.
+            'GetClass'.
+
+          params (:class:`py:dict`): Operation parameters of the operation
+            that are passed to the WBEM server, by parameter name.
+
+          user (:term:`string`): Name of the user that performs the
+            operation, or `None` if no credentials are used. The results are
+            cached separately for each user.
+
+        Returns:
+
+          :term:`py:list`: A copy of the list of CIM objects in the result of
+          the operation, or `None` if the cache does not contain an unexpired
+          result for the operation.
+        """
+        key = self._key(operation, params, user)
+        entry_key = (url, namespace.lower(), key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[entry_key]
+                entry = None
+            if entry is None and self._directory is not None:
+                entry = self._load(self._path(url, namespace, key))
+            if entry is None:
+                self._misses += 1
+                return None
+            self._add(entry_key, *entry)
+            self._hits += 1
+            objects = entry[1]
+        return deepcopy(objects)
+
+    def store(self, url, namespace, operation, params, objects, user=None):
+        """
+        Store the result of an operation in the cache.
+
+        Parameters:
+
+          url (:term:`string`): URL of the WBEM server.
+
+          namespace (:term:`string`): Namespace of the operation.
+
+          operation (:term:`string`): Name of the operation, e.g.
+            'GetClass'.
+
+          params (:class:`py:dict`): Operation parameters of the operation
+            that are passed to the WBEM server, by parameter name.
+
+          objects (:term:`py:list`): The CIM objects in the result of the
+            operation (:class:`~pywbem.CIMClass`,
+            :class:`~pywbem.CIMClassName` or
+            :class:`~pywbem.CIMQualifierDeclaration`). A copy is stored.
+
+          user (:term:`string`): Name of the user that performed the
+            operation, or `None` if no credentials are used.
+        """
+        key = self._key(operation, params, user)
+        objects = deepcopy(objects)
+        with self._lock:
+            self._add((url, namespace.lower(), key), time.time(), objects)
+            if self._directory is not None:
+                self._save(self._path(url, namespace, key), objects)
+
+    def invalidate(self, url, namespace=None):
+        """
+        Remove the cached results for a WBEM server, or for a namespace of a
+        WBEM server, from the in-memory tier and from the on-disk tier of the
+        cache. The results of all users are removed.
+
+        Parameters:
+
+          url (:term:`string`): URL of the WBEM server.
+
+          namespace (:term:`string`): Namespace whose results are removed.
+            `None` means that the results for all namespaces of the WBEM
+            server are removed.
+        """
+        lower_ns = namespace.lower() if namespace is not None else None
+        with self._lock:
+            for entry_key in list(self._entries):
+                if entry_key[0] != url:
+                    continue
+                if lower_ns is None or entry_key[1] == lower_ns:
+                    del self._entries[entry_key]
+            if self._directory is not None:
+                shutil.rmtree(self._path(url, namespace), ignore_errors=True)
+
+    def clear(self):
+        """
+        Remove all cached results from the in-memory tier and from the
+        on-disk tier of the cache.
+
+        Other files in the directory of the on-disk tier are not removed.
+        """
+        with self._lock:
+            self._entries.clear()
+            if self._directory is not None:
+                for name in os.listdir(self._directory):
+                    if not _URL_DIR_PATTERN.match(name):
+                        continue
+                    shutil.rmtree(os.path.join(self._directory, name),
+                                  ignore_errors=True)
@@ -193,6 +193,11 @@ class OperationStatistic(object):
         self._reply_len_min = float('inf')
         self._reply_len_max = float(0)
 
+        self._compression_count = 0
+        self._uncompressed_len_sum = float(0)
+        self._compressed_len_sum = float(0)
+        self._compression_time_sum = float(0)
+
     @property
     def stat_start_time(self):
         """
@@ -353,6 +358,44 @@ class OperationStatistic(object):
         """
         return self._reply_len_max
 
+    @property
+    def compression_count(self):
+        """
+        *New in pywbem 0.13 as experimental.*
+
+        :term:`integer`: The number of measured operations whose request or
+        response body was compressed.
+        """
+        return self._compression_count
+
+    @property
+    def avg_compression_ratio(self):
+        """
+        *New in pywbem 0.13 as experimental.*
+
+        :class:`py:float`: The ratio of the uncompressed size to the
+        compressed size of the compressed HTTP bodies of the measured
+        operations, or 0 if no bodies were compressed.
+        """
+        try:
+            return self._uncompressed_len_sum / self._compressed_len_sum
+        except ZeroDivisionError:
+            return 0.0
+
+    @property
+    def avg_compression_time(self):
+        """
+        *New in pywbem 0.13 as experimental.*
+
+        :class:`py:float`: The average time spent for compressing and
+        decompressing the HTTP bodies of the measured operations whose
+        request or response body was compressed, in seconds.
+        """
+        try:
+            return self._compression_time_sum / self._compression_count
+        except ZeroDivisionError:
+            return 0.0
+
     def reset(self):
         """
         Reset the statistics data for this object.
@@ -377,6 +420,11 @@ class OperationStatistic(object):
         self._reply_len_min = float('inf')
         self._reply_len_max = float(0)
 
+        self._compression_count = 0
+        self._uncompressed_len_sum = float(0)
+        self._compressed_len_sum = float(0)
+        self._compression_time_sum = float(0)
+
     def start_timer(self):
         """
         This is a low-level method that is called by pywbem at the begin of an
@@ -393,7 +441,7 @@ class OperationStatistic(object):
                 self._stat_start_time = self._start_time
 
     def stop_timer(self, request_len, reply_len, server_time=None,
-                   exception=False):
+                   exception=False, start_time=None, compression=None):
         """
         This is a low-level method is called by pywbem at the end of an
         operation. It completes the measurement for that operation by capturing
@@ -418,6 +466,25 @@ class OperationStatistic(object):
             server received the request to when it started sending the
             response. If `None`, there is no time from the server.
 
+          start_time (:term:`number`)
+            Point in time (as returned by :func:`py:time.time`) at which the
+            operation started. This allows measuring operations that execute
+            concurrently, for which
+            :meth:`~pywbem.OperationStatistic.start_timer` has not been
+            called. If `None`, the time recorded by
+            :meth:`~pywbem.OperationStatistic.start_timer` is used.
+
+            *New in pywbem 0.13.*
+
+          compression (:term:`py:sequence` of three numbers)
+            Measurements for the compressed HTTP bodies of the request and
+            response message: The uncompressed size and the compressed size
+            of the bodies in Bytes, and the time spent for compressing and
+            decompressing them in seconds. `None` or a compressed size of 0
+            means that no bodies were compressed.
+
+            *New in pywbem 0.13.*
+
         Returns:
 
           float: The elapsed time for the operation that just ended, or
@@ -425,11 +492,16 @@ class OperationStatistic(object):
           enabled.
         """
         if self.container.enabled:
-            if self._start_time is None:
+            if start_time is not None:
+                if not self._stat_start_time:
+                    self._stat_start_time = start_time
+            elif self._start_time is None:
                 raise RuntimeError('stop_timer() called without preceding '
                                    ' start_timer()')
-            dt = time.time() - self._start_time
-            self._start_time = None
+            else:
+                start_time = self._start_time
+                self._start_time = None
+            dt = time.time() - start_time
             self._count += 1
             self._time_sum += dt
             self._request_len_sum += request_len
@@ -461,6 +533,12 @@ class OperationStatistic(object):
             if reply_len < self._reply_len_min:
                 self._reply_len_min = reply_len
 
+            if compression is not None and compression[1]:
+                self._compression_count += 1
+                self._uncompressed_len_sum += compression[0]
+                self._compressed_len_sum += compression[1]
+                self._compression_time_sum += compression[2]
+
             return dt
         else:
             return None
@@ -485,7 +563,10 @@ class OperationStatistic(object):
                'max_request_len={s.max_request_len!r}, ' \
                'avg_reply_len={s.avg_reply_len!r}, ' \
                'min_reply_len={s.min_reply_len!r}, ' \
-               'max_reply_len={s.max_reply_len!r})'. \
+               'max_reply_len={s.max_reply_len!r}, ' \
+               'compression_count={s.compression_count!r}, ' \
+               'avg_compression_ratio={s.avg_compression_ratio!r}, ' \
+               'avg_compression_time={s.avg_compression_time!r})'. \
                format(s=self)
 
     formatted_header_w_svr = \
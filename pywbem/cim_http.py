@@ -42,7 +42,10 @@ import getpass
 from stat import S_ISSOCK
 import platform
 import base64
+import select
 import threading
+import time
+import zlib
 from datetime import datetime
 import warnings
 
@@ -123,6 +126,23 @@ def create_pywbem_ssl_context():
 DEFAULT_PORT_HTTP = 5988        # default port for http
 DEFAULT_PORT_HTTPS = 5989       # default port for https
 
+DEFAULT_POOL_MAXSIZE = 4        # default max. idle connections per pool key
+DEFAULT_POOL_IDLE_TIMEOUT = 30  # default idle timeout in seconds for pool
+
+DEFAULT_STREAM_CHUNK_SIZE = 65536  # default chunk size for streamed body
+
+# XML declaration that is sent before the CIM-XML data of a request
+XML_DECLARATION = b'<?xml version="1.0" encoding="utf-8" ?>\n'
+
+# HTTP content codings supported for compressing request and response bodies,
+# with the zlib window bits parameter for their format. 'x-gzip' is an alias
+# for 'gzip' (see RFC 7230).
+COMPRESSION_WBITS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'x-gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS,
+}
+
 
 #: Default directory paths to be used when the `ca_certs` parameter of
 #: :class:`~pywbem.WBEMConnection` is `None`. The first existing directory is
@@ -191,7 +211,7 @@ class HTTPTimeout(object):  # pylint: disable=too-few-public-methods
             self._timer.start()
             self._ts1 = datetime.now()
         self._shutdown = False
-        return
+        return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         if self._timeout is not None:
@@ -208,6 +228,29 @@ class HTTPTimeout(object):  # pylint: disable=too-few-public-methods
                                    "socket after %.0fs." % duration_sec)
         return False  # re-raise any other exceptions
 
+    @property
+    def http_conn(self):
+        """
+        The HTTP connection that is stopped when the timeout expires.
+
+        This attribute is settable, so that the timeout can be transferred to
+        a new connection when a request is retried on a different connection.
+        """
+        return self._http_conn
+
+    @http_conn.setter
+    def http_conn(self, http_conn):
+        """Setter method; for a description see the getter method."""
+        self._http_conn = http_conn
+
+    @property
+    def expired(self):
+        """
+        Boolean indicating whether the timeout has expired and the socket of
+        the HTTP connection has been shut down.
+        """
+        return bool(self._shutdown)
+
     def timer_expired(self):
         """
         This method is invoked in context of the timer thread, so we cannot
@@ -230,6 +273,380 @@ class HTTPTimeout(object):  # pylint: disable=too-few-public-methods
             self._timer.start()
 
 
+class HTTPBaseConnection:        # pylint: disable=no-init
+    """ Common base for specific connection classes. Implements
+        the send method
+    """
+    # pylint: disable=old-style-class,too-few-public-methods
+    def send(self, strng):
+        """
+        A copy of `httplib.HTTPConnection.send()`, with these fixes:
+
+        * We fix the problem that the connection gets closed upon error
+          32 (EPIPE), by not doing that (If the connection gets closed,
+          getresponse() fails). This problem was reported as Python issue
+          #5542, and the same fix we do here was integrated into Python
+          2.7 and 3.1 or 3.2, but not into Python 2.6 (so we still need
+          our fix here).
+
+        * Ensure that the data are bytes, not unicode.
+
+        * Support sending a list of buffers one after the other, so that
+          they do not need to be concatenated into a single byte string.
+        """
+        # NOTE: The attributes come from the httplib mixins in the
+        # subclasses so the disable=no-member hides worthless warnings.
+        if self.sock is None:  # pylint: disable=no-member
+            if self.auto_open:  # pylint: disable=no-member
+                self.connect()  # pylint: disable=no-member
+            else:
+                # We raise the same httplib exception the original function
+                # raises. Our caller will handle it.
+                raise httplib.NotConnected()
+        if self.debuglevel > 0:  # pylint: disable=no-member
+            print("send: %r" % strng)
+        blocksize = 8192
+        # TODO #418: Better approach needed than converting to Bytes
+        if hasattr(strng, 'read') and not isinstance(strng, list):
+            if self.debuglevel > 0:  # pylint: disable=no-member
+                print("sendIng a read()able")
+            data = strng.read(blocksize)
+            while data:
+                # pylint: disable=no-member
+                self.sock.sendall(_ensure_bytes(data))
+                data = strng.read(blocksize)
+        elif isinstance(strng, list):
+            for data in strng:
+                # pylint: disable=no-member
+                self.sock.sendall(_ensure_bytes(data))
+        else:
+            # For unknown reasons, the pylint disable must be on same line:
+            self.sock.sendall(_ensure_bytes(strng))  # noqa: E501 pylint: disable=no-member
+
+
+class HTTPConnection(HTTPBaseConnection, httplib.HTTPConnection):
+    """ Execute client connection without ssl using httplib. """
+    def __init__(self, host, port=None, timeout=None):
+        # Note: We do not use strict=True in the following call, because it
+        # is not clear what side effects that would have, and if no status
+        # line comes back we'll certainly find out about that.
+        httplib.HTTPConnection.__init__(self, host=host, port=port,
+                                        timeout=timeout)
+
+
+class HTTPSConnection(HTTPBaseConnection, httplib.HTTPSConnection):
+    """ Execute client connection with ssl using httplib."""
+    # pylint: disable=R0913,too-many-arguments
+    def __init__(self, host, port=None, key_file=None, cert_file=None,
+                 ca_certs=None, verify_callback=None, timeout=None):
+        # Note: We do not use strict=True in the following call, because it
+        # is not clear what side effects that would have, and if no status
+        # line comes back we'll certainly find out about that.
+        httplib.HTTPSConnection.__init__(self, host=host, port=port,
+                                         key_file=key_file,
+                                         cert_file=cert_file,
+                                         timeout=timeout)
+        self.ca_certs = ca_certs
+        self.verify_callback = verify_callback
+        # issue 297: Verify_callback is  not used in py 3
+        if verify_callback is not None and six.PY3:
+            warnings.warn("verify_callback parameter ignored",
+                          UserWarning)
+
+    def connect(self):
+        # pylint: disable=too-many-branches
+        """Connect to a host on a given (SSL) port."""
+
+        # Connect for M2Crypto ssl package
+        if _HAVE_M2CRYPTO:
+            # Calling httplib.HTTPSConnection.connect(self) does not work
+            # because of its ssl.wrap_socket() call. So we copy the code of
+            # that connect() method modulo the ssl.wrap_socket() call.
+
+            # Another change is that we do not pass the timeout value
+            # on to the socket call, because that does not work with
+            # M2Crypto.
+
+            if sys.version_info[0:2] >= (2, 7):
+                # the source_address parameter was added in Python 2.7
+                self.sock = socket.create_connection(
+                    (self.host, self.port), None, self.source_address)
+            else:
+                self.sock = socket.create_connection(
+                    (self.host, self.port), None)
+
+            # Removed code for tunneling support.
+
+            # End of code from httplib.HTTPSConnection.connect(self).
+
+            ctx = SSL.Context('sslv23')
+
+            if self.cert_file:
+                ctx.load_cert(self.cert_file, keyfile=self.key_file)
+            if self.ca_certs:
+                ctx.set_verify(
+                    SSL.verify_peer | SSL.verify_fail_if_no_peer_cert,
+                    depth=9, callback=self.verify_callback)
+                if os.path.isdir(self.ca_certs):
+                    ctx.load_verify_locations(capath=self.ca_certs)
+                else:
+                    ctx.load_verify_locations(cafile=self.ca_certs)
+            try:
+                self.sock = SSL.Connection(ctx, self.sock)
+
+                # Below is a body of SSL.Connection.connect() method
+                # except for the first line (socket connection).
+
+                # Removed code for tunneling support.
+
+                # Setting the timeout on the input socket does not work
+                # with M2Crypto, with such a timeout set it calls a
+                # different low level function (nbio instead of bio)
+                # that does not work. The symptom is that reading the
+                # response returns None.
+                # Therefore, we set the timeout at the level of the outer
+                # M2Crypto socket object.
+                # pylint: disable=using-constant-test
+
+                if self.timeout is not None:
+                    self.sock.set_socket_read_timeout(
+                        SSL.timeout(self.timeout))
+                    self.sock.set_socket_write_timeout(
+                        SSL.timeout(self.timeout))
+
+                self.sock.addr = (self.host, self.port)
+                self.sock.setup_ssl()
+                self.sock.set_connect_state()
+                ret = self.sock.connect_ssl()
+                if self.ca_certs:
+                    check = getattr(self.sock, 'postConnectionCheck',
+                                    self.sock.clientPostConnectionCheck)
+                    if check is not None:
+                        if not check(self.sock.get_peer_cert(), self.host):
+                            raise ConnectionError(
+                                'SSL error: post connection check failed')
+                return ret
+
+            except (SSLError, SSL.SSLError,
+                    SSL.Checker.SSLVerificationError) as arg:
+                raise ConnectionError(
+                    "SSL error %s: %s" % (arg.__class__, arg))
+
+        # Connect using Python SSL module
+        else:
+            # Setup the socket context
+
+            # Note: PROTOCOL_SSLv23 allows talking to servers with TLS but
+            # not with SSL. For details, see the table in
+            # https://docs.python.org/3/library/ssl.html#ssl.wrap_socket
+            # Within the defined set of protocol versions, SSLv23 selects
+            # the highest protocol version that both client and server
+            # support.
+            # TODO #893: Consider the use of default_context()
+            ctx = SSL.SSLContext(SSL.PROTOCOL_SSLv23)
+
+            if self.cert_file:
+                ctx.load_cert(self.cert_file, keyfile=self.key_file)
+            if self.ca_certs:
+                # We need to use CERT_REQUIRED to require that the server
+                # certificate is being validated by the client (against the
+                # certificates in ca_certs).
+                ctx.verify_mode = SSL.CERT_REQUIRED
+                if os.path.isdir(self.ca_certs):
+                    ctx.load_verify_locations(capath=self.ca_certs)
+                else:
+                    ctx.load_verify_locations(cafile=self.ca_certs)
+                ctx.check_hostname = True
+            else:
+                ctx.check_hostname = False
+                ctx.verify_mode = SSL.CERT_NONE
+
+            # setup the socket
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+
+            try:
+                self.sock = ctx.wrap_socket(sock,
+                                            server_hostname=self.host)
+                return self.sock.connect((self.host, self.port))
+
+            except SSLError as arg:
+                raise ConnectionError(
+                    "SSL error %s: %s" % (arg.__class__, arg))
+            except CertificateError as arg:
+                raise ConnectionError(
+                    "SSL certificate error %s: %s" % (arg.__class__, arg))
+
+
+class FileHTTPConnection(HTTPBaseConnection, httplib.HTTPConnection):
+    """Execute client connection based on a unix domain socket. """
+
+    def __init__(self, uds_path):
+        httplib.HTTPConnection.__init__(self, host='localhost')
+        self.uds_path = uds_path
+
+    def connect(self):
+        try:
+            socket_af = socket.AF_UNIX
+        except AttributeError:
+            raise ConnectionError(
+                'file URLs not supported on %s platform due '
+                'to missing AF_UNIX support' % platform.system())
+        self.sock = socket.socket(socket_af, socket.SOCK_STREAM)
+        self.sock.connect(self.uds_path)
+
+
+class HTTPConnectionPool(object):
+    """
+    A bounded pool of persistent (keep-alive) HTTP/1.1 connections.
+
+    Idle connections are kept per connection key, which identifies the target
+    of the connection and its TLS settings (see :func:`wbem_request` for how
+    the key is built). Connections to the same key are reused for subsequent
+    requests, which saves the TCP connection setup and the TLS handshake.
+
+    At most `maxsize` idle connections are kept per key; connections returned
+    beyond that are closed. Idle connections that were not used within
+    `idle_timeout` seconds, and idle connections whose socket has been closed
+    by the server or has unexpected data pending, are closed instead of being
+    handed out again.
+
+    The pool is thread-safe.
+    """
+
+    def __init__(self, maxsize=DEFAULT_POOL_MAXSIZE,
+                 idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT):
+        """
+        Parameters:
+
+          maxsize (:term:`integer`):
+            Maximum number of idle connections kept per connection key.
+            Must be a positive integer.
+
+          idle_timeout (:term:`number`):
+            Time in seconds an idle connection is kept before it is closed.
+            `None` means that idle connections do not expire.
+        """
+        if maxsize is None or maxsize < 1:
+            raise ValueError("maxsize must be > 0 but is %s" % maxsize)
+        self._maxsize = maxsize
+        self._idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        # Idle connections. Key: connection key,
+        # Value: list of tuple(connection, time when it became idle)
+        self._idle = {}
+
+    @property
+    def maxsize(self):
+        """
+        :term:`integer`: Maximum number of idle connections kept per
+        connection key.
+        """
+        return self._maxsize
+
+    @property
+    def idle_timeout(self):
+        """
+        :term:`number`: Time in seconds an idle connection is kept, or `None`.
+        """
+        return self._idle_timeout
+
+    def __len__(self):
+        """Return the total number of idle connections in the pool."""
+        with self._lock:
+            return sum([len(conns) for conns in six.itervalues(self._idle)])
+
+    def __repr__(self):
+        return "%s(maxsize=%r, idle_timeout=%r, idle=%r)" % \
+            (self.__class__.__name__, self.maxsize, self.idle_timeout,
+             len(self))
+
+    def get(self, key):
+        """
+        Return a healthy idle connection for the connection key and remove it
+        from the pool, or `None` if there is no such connection.
+
+        Idle connections for the key that turn out to be expired or stale are
+        closed.
+        """
+        now = time.time()
+        while True:
+            with self._lock:
+                conns = self._idle.get(key)
+                if not conns:
+                    return None
+                # Most recently used connection first
+                conn, idle_since = conns.pop()
+            if self._idle_timeout is not None and \
+                    now - idle_since > self._idle_timeout:
+                conn.close()
+                continue
+            if self._is_stale(conn):
+                conn.close()
+                continue
+            return conn
+
+    def put(self, key, conn):
+        """
+        Return a connection whose response has been completely read to the
+        pool, for reuse with the connection key.
+
+        If the pool already holds `maxsize` idle connections for the key, the
+        connection is closed instead.
+        """
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            if len(conns) < self._maxsize:
+                conns.append((conn, time.time()))
+                return
+        conn.close()
+
+    def close(self):
+        """
+        Close all idle connections in the pool.
+        """
+        with self._lock:
+            idle = self._idle
+            self._idle = {}
+        for conns in six.itervalues(idle):
+            for conn, _ in conns:
+                conn.close()
+
+    @staticmethod
+    def _is_stale(conn):
+        """
+        Return a boolean indicating whether an idle connection cannot be used
+        for another request.
+
+        An idle connection that is readable has either been closed by the
+        server (end of file is readable) or has unexpected data pending; in
+        both cases the next response could not be read reliably.
+        """
+        sock = conn.sock
+        if sock is None:
+            return True
+        try:
+            fileno = sock.fileno()
+        except socket.error:
+            return True
+        if fileno < 0:
+            # The socket has been closed
+            return True
+        try:
+            if hasattr(select, 'poll'):
+                # Unlike select(), poll() supports file descriptors beyond
+                # FD_SETSIZE, which a process with many connections uses.
+                # Besides readability, it reports errors and hang-ups.
+                poller = select.poll()
+                poller.register(fileno, select.POLLIN | select.POLLPRI)
+                return bool(poller.poll(0))
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (ValueError, select.error, socket.error):
+            # The socket has been closed or shut down
+            return True
+        return bool(readable)
+
+
 def parse_url(url, allow_defaults=True):
     """Return a tuple (`host`, `port`, `ssl`) from the URL specified in the
     `url` parameter.
@@ -343,13 +760,46 @@ def get_default_ca_certs():
     return get_default_ca_certs._path
 
 
-# pylint: disable=too-many-branches,too-many-statements,too-many-arguments
+def compress_body(data, content_coding):
+    """
+    Compress an HTTP body using a content coding ('gzip' or 'deflate'), and
+    return the compressed body as a :term:`byte string`.
+
+    The body may be specified as a :term:`byte string` or as a list of
+    :term:`byte string` objects that are compressed one after the other.
+    """
+    if not isinstance(data, list):
+        data = [data]
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED,
+                                  COMPRESSION_WBITS[content_coding])
+    return b''.join([compressor.compress(buf) for buf in data] +
+                    [compressor.flush()])
+
+
+def get_decompressor(content_coding):
+    """
+    Return a zlib decompression object for an HTTP body with a content coding
+    (the value of the Content-Encoding header field), or `None` for the
+    identity coding.
+
+    Raises ValueError for unsupported content codings.
+    """
+    content_coding = content_coding.strip().lower() if content_coding else ''
+    if content_coding in ('', 'identity'):
+        return None
+    try:
+        return zlib.decompressobj(COMPRESSION_WBITS[content_coding])
+    except KeyError:
+        raise ValueError('Unsupported content coding: %s' % content_coding)
+
+
 def wbem_request(url, data, creds, cimxml_headers=None, debug=False, x509=None,
                  verify_callback=None, ca_certs=None,
                  no_verification=False, timeout=None, recorders=None,
-                 conn_id=None):
+                 conn_id=None, pool=None, stream=False, compression=None,
+                 compression_stats=None, idempotent=False):
     # pylint: disable=too-many-arguments,unused-argument
-    # pylint: disable=too-many-locals
+    # pylint: disable=too-many-locals,too-many-branches,too-many-statements
     """
     Send an HTTP or HTTPS request to a WBEM server and return the response.
 
@@ -424,12 +874,72 @@ def wbem_request(url, data, creds, cimxml_headers=None, debug=False, x509=None,
         string that uniquely defines a connection.  Used as part of any
         logs created.
 
+      pool (:class:`HTTPConnectionPool`):
+        Pool of persistent connections to be used for the request.
+
+        If not `None`, an idle connection for the same target and TLS
+        settings is taken from the pool if available, and the connection is
+        returned to the pool after the response has been read, unless the
+        server indicated that it closes the connection. A request that fails
+        because the server has closed a pooled connection in the mean time
+        is transparently retried on a new connection, if the request had not
+        been sent completely, or if `idempotent` is `True`.
+
+        If `None`, a new connection is used for the request and is closed
+        after the response has been read.
+
+      stream (:class:`py:bool`):
+        Boolean indicating that the response body is not read by this
+        function, but is returned as an iterator of chunks that read the
+        body from the connection while being iterated. The connection is
+        returned to the pool (or closed) once the iterator is exhausted, and
+        is closed if the iterator is closed early. The response body is not
+        staged in the recorders in this case.
+
+        *New in pywbem 0.13.*
+
+      compression (:term:`string`):
+        Content coding ('gzip' or 'deflate') for compressing the request body.
+        If not `None`, the request advertises that the response body may be
+        compressed with gzip or deflate, and a compressed response body is
+        decompressed by this function (while being iterated, if `stream` is
+        `True`).
+
+        `None` means that the request body is not compressed, and that the
+        response body is requested without compression.
+
+        *New in pywbem 0.13.*
+
+      compression_stats (list):
+        If not `None`, a list of three numbers that is updated with the
+        measurements for the compressed request and response bodies: The
+        uncompressed size and the compressed size in Bytes are added to its
+        items 0 and 1, and the time in seconds spent for compressing and
+        decompressing is added to its item 2.
+
+        *New in pywbem 0.13.*
+
+      idempotent (:class:`py:bool`):
+        Boolean indicating that the request can safely be performed more than
+        once, e.g. because it is a read-only operation. If the server closes a
+        pooled connection after the request has been sent completely, the
+        request is retried on a new connection only if this is `True`,
+        because the server may have performed the request already.
+
+        *New in pywbem 0.13.*
+
     Returns:
 
         Tuple containing:
 
             The CIM-XML formatted response data from the WBEM server, as a
-            :term:`byte string` object.
+            :class:`py:bytearray` object (or as a :term:`byte string` object,
+            if the response body was compressed), or if `stream` is `True`,
+            as an iterator of :term:`byte string` chunks. The response data
+            is decompressed if the response body was compressed.
+
+            *Changed in pywbem 0.13: The response data is returned as a
+            :class:`py:bytearray` object, to avoid copying it.*
 
             The server response time in seconds as floating point number if
             this data was received from the server. If no data returned
@@ -443,218 +953,6 @@ def wbem_request(url, data, creds, cimxml_headers=None, debug=False, x509=None,
         :exc:`~pywbem.HTTPError`
     """
 
-    class HTTPBaseConnection:        # pylint: disable=no-init
-        """ Common base for specific connection classes. Implements
-            the send method
-        """
-        # pylint: disable=old-style-class,too-few-public-methods
-        def send(self, strng):
-            """
-            A copy of `httplib.HTTPConnection.send()`, with these fixes:
-
-            * We fix the problem that the connection gets closed upon error
-              32 (EPIPE), by not doing that (If the connection gets closed,
-              getresponse() fails). This problem was reported as Python issue
-              #5542, and the same fix we do here was integrated into Python
-              2.7 and 3.1 or 3.2, but not into Python 2.6 (so we still need
-              our fix here).
-
-            * Ensure that the data are bytes, not unicode.
-            """
-            # NOTE: The attributes come from the httplib mixins in the
-            # subclasses so the disable=no-member hides worthless warnings.
-            if self.sock is None:  # pylint: disable=no-member
-                if self.auto_open:  # pylint: disable=no-member
-                    self.connect()  # pylint: disable=no-member
-                else:
-                    # We raise the same httplib exception the original function
-                    # raises. Our caller will handle it.
-                    raise httplib.NotConnected()
-            if self.debuglevel > 0:  # pylint: disable=no-member
-                print("send: %r" % strng)
-            blocksize = 8192
-            # TODO #418: Better approach needed than converting to Bytes
-            if hasattr(strng, 'read') and not isinstance(strng, list):
-                if self.debuglevel > 0:  # pylint: disable=no-member
-                    print("sendIng a read()able")
-                data = strng.read(blocksize)
-                while data:
-                    # pylint: disable=no-member
-                    self.sock.sendall(_ensure_bytes(data))
-                    data = strng.read(blocksize)
-            else:
-                # For unknown reasons, the pylint disable must be on same line:
-                self.sock.sendall(_ensure_bytes(strng))  # noqa: E501 pylint: disable=no-member
-
-    class HTTPConnection(HTTPBaseConnection, httplib.HTTPConnection):
-        """ Execute client connection without ssl using httplib. """
-        def __init__(self, host, port=None, timeout=None):
-            # Note: We do not use strict=True in the following call, because it
-            # is not clear what side effects that would have, and if no status
-            # line comes back we'll certainly find out about that.
-            httplib.HTTPConnection.__init__(self, host=host, port=port,
-                                            timeout=timeout)
-
-    class HTTPSConnection(HTTPBaseConnection, httplib.HTTPSConnection):
-        """ Execute client connection with ssl using httplib."""
-        # pylint: disable=R0913,too-many-arguments
-        def __init__(self, host, port=None, key_file=None, cert_file=None,
-                     ca_certs=None, verify_callback=None, timeout=None):
-            # Note: We do not use strict=True in the following call, because it
-            # is not clear what side effects that would have, and if no status
-            # line comes back we'll certainly find out about that.
-            httplib.HTTPSConnection.__init__(self, host=host, port=port,
-                                             key_file=key_file,
-                                             cert_file=cert_file,
-                                             timeout=timeout)
-            self.ca_certs = ca_certs
-            self.verify_callback = verify_callback
-            # issue 297: Verify_callback is  not used in py 3
-            if verify_callback is not None and six.PY3:
-                warnings.warn("verify_callback parameter ignored",
-                              UserWarning)
-
-        def connect(self):
-            # pylint: disable=too-many-branches
-            """Connect to a host on a given (SSL) port."""
-
-            # Connect for M2Crypto ssl package
-            if _HAVE_M2CRYPTO:
-                # Calling httplib.HTTPSConnection.connect(self) does not work
-                # because of its ssl.wrap_socket() call. So we copy the code of
-                # that connect() method modulo the ssl.wrap_socket() call.
-
-                # Another change is that we do not pass the timeout value
-                # on to the socket call, because that does not work with
-                # M2Crypto.
-
-                if sys.version_info[0:2] >= (2, 7):
-                    # the source_address parameter was added in Python 2.7
-                    self.sock = socket.create_connection(
-                        (self.host, self.port), None, self.source_address)
-                else:
-                    self.sock = socket.create_connection(
-                        (self.host, self.port), None)
-
-                # Removed code for tunneling support.
-
-                # End of code from httplib.HTTPSConnection.connect(self).
-
-                ctx = SSL.Context('sslv23')
-
-                if self.cert_file:
-                    ctx.load_cert(self.cert_file, keyfile=self.key_file)
-                if self.ca_certs:
-                    ctx.set_verify(
-                        SSL.verify_peer | SSL.verify_fail_if_no_peer_cert,
-                        depth=9, callback=verify_callback)
-                    if os.path.isdir(self.ca_certs):
-                        ctx.load_verify_locations(capath=self.ca_certs)
-                    else:
-                        ctx.load_verify_locations(cafile=self.ca_certs)
-                try:
-                    self.sock = SSL.Connection(ctx, self.sock)
-
-                    # Below is a body of SSL.Connection.connect() method
-                    # except for the first line (socket connection).
-
-                    # Removed code for tunneling support.
-
-                    # Setting the timeout on the input socket does not work
-                    # with M2Crypto, with such a timeout set it calls a
-                    # different low level function (nbio instead of bio)
-                    # that does not work. The symptom is that reading the
-                    # response returns None.
-                    # Therefore, we set the timeout at the level of the outer
-                    # M2Crypto socket object.
-                    # pylint: disable=using-constant-test
-
-                    if self.timeout is not None:
-                        self.sock.set_socket_read_timeout(
-                            SSL.timeout(self.timeout))
-                        self.sock.set_socket_write_timeout(
-                            SSL.timeout(self.timeout))
-
-                    self.sock.addr = (self.host, self.port)
-                    self.sock.setup_ssl()
-                    self.sock.set_connect_state()
-                    ret = self.sock.connect_ssl()
-                    if self.ca_certs:
-                        check = getattr(self.sock, 'postConnectionCheck',
-                                        self.sock.clientPostConnectionCheck)
-                        if check is not None:
-                            if not check(self.sock.get_peer_cert(), self.host):
-                                raise ConnectionError(
-                                    'SSL error: post connection check failed')
-                    return ret
-
-                except (SSLError, SSL.SSLError,
-                        SSL.Checker.SSLVerificationError) as arg:
-                    raise ConnectionError(
-                        "SSL error %s: %s" % (arg.__class__, arg))
-
-            # Connect using Python SSL module
-            else:
-                # Setup the socket context
-
-                # Note: PROTOCOL_SSLv23 allows talking to servers with TLS but
-                # not with SSL. For details, see the table in
-                # https://docs.python.org/3/library/ssl.html#ssl.wrap_socket
-                # Within the defined set of protocol versions, SSLv23 selects
-                # the highest protocol version that both client and server
-                # support.
-                # TODO #893: Consider the use of default_context()
-                ctx = SSL.SSLContext(SSL.PROTOCOL_SSLv23)
-
-                if self.cert_file:
-                    ctx.load_cert(self.cert_file, keyfile=self.key_file)
-                if self.ca_certs:
-                    # We need to use CERT_REQUIRED to require that the server
-                    # certificate is being validated by the client (against the
-                    # certificates in ca_certs).
-                    ctx.verify_mode = SSL.CERT_REQUIRED
-                    if os.path.isdir(self.ca_certs):
-                        ctx.load_verify_locations(capath=self.ca_certs)
-                    else:
-                        ctx.load_verify_locations(cafile=self.ca_certs)
-                    ctx.check_hostname = True
-                else:
-                    ctx.check_hostname = False
-                    ctx.verify_mode = SSL.CERT_NONE
-
-                # setup the socket
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(self.timeout)
-
-                try:
-                    self.sock = ctx.wrap_socket(sock,
-                                                server_hostname=self.host)
-                    return self.sock.connect((self.host, self.port))
-
-                except SSLError as arg:
-                    raise ConnectionError(
-                        "SSL error %s: %s" % (arg.__class__, arg))
-                except CertificateError as arg:
-                    raise ConnectionError(
-                        "SSL certificate error %s: %s" % (arg.__class__, arg))
-
-    class FileHTTPConnection(HTTPBaseConnection, httplib.HTTPConnection):
-        """Execute client connection based on a unix domain socket. """
-
-        def __init__(self, uds_path):
-            httplib.HTTPConnection.__init__(self, host='localhost')
-            self.uds_path = uds_path
-
-        def connect(self):
-            try:
-                socket_af = socket.AF_UNIX
-            except AttributeError:
-                raise ConnectionError(
-                    'file URLs not supported on %s platform due '
-                    'to missing AF_UNIX support' % platform.system())
-            self.sock = socket.socket(socket_af, socket.SOCK_STREAM)
-            self.sock.connect(self.uds_path)
-
     if not cimxml_headers:
         cimxml_headers = []
 
@@ -675,7 +973,17 @@ def wbem_request(url, data, creds, cimxml_headers=None, debug=False, x509=None,
     # indicate UTF-8).
     data = _ensure_bytes(data)
 
-    data = b'<?xml version="1.0" encoding="utf-8" ?>\n' + data
+    # The request body is sent as a list of buffers, so that the XML
+    # declaration does not need to be prepended to a copy of the data.
+    body_data = [XML_DECLARATION, data]
+    if compression is not None:
+        start_time = time.time()
+        body_data = [compress_body(body_data, compression)]
+        if compression_stats is not None:
+            compression_stats[0] += len(XML_DECLARATION) + len(data)
+            compression_stats[1] += len(body_data[0])
+            compression_stats[2] += time.time() - start_time
+    body_len = sum([len(buf) for buf in body_data])
 
     # Note that certs get passed even if ca_certs is None and
     # no_verification=False
@@ -687,30 +995,46 @@ def wbem_request(url, data, creds, cimxml_headers=None, debug=False, x509=None,
     local = False
     svr_resp_time = None
     if use_ssl:
-        client = HTTPSConnection(host=host,
-                                 port=port,
-                                 key_file=key_file,
-                                 cert_file=cert_file,
-                                 ca_certs=ca_certs,
-                                 verify_callback=verify_callback,
-                                 timeout=timeout)
+        conn_key = ('https', host, port, cert_file, key_file, ca_certs,
+                    timeout)
+    elif url.startswith('http'):
+        conn_key = ('http', host, port, timeout)
     else:
-        if url.startswith('http'):
-            client = HTTPConnection(host=host, port=port, timeout=timeout)
+        if url.startswith('file:'):
+            url_ = url[5:]
         else:
-            if url.startswith('file:'):
-                url_ = url[5:]
-            else:
-                url_ = url
-            try:
-                status = os.stat(url_)
-                if S_ISSOCK(status.st_mode):
-                    client = FileHTTPConnection(url_)
-                    local = True
-                else:
-                    raise ConnectionError('File URL is not a socket: %s' % url)
-            except OSError as exc:
-                raise ConnectionError('Error with file URL %s: %s' % (url, exc))
+            url_ = url
+        conn_key = ('file', url_)
+        local = True
+
+    def new_client():
+        """Create a new (not yet connected) HTTP connection object."""
+        if use_ssl:
+            return HTTPSConnection(host=host,
+                                   port=port,
+                                   key_file=key_file,
+                                   cert_file=cert_file,
+                                   ca_certs=ca_certs,
+                                   verify_callback=verify_callback,
+                                   timeout=timeout)
+        if url.startswith('http'):
+            return HTTPConnection(host=host, port=port, timeout=timeout)
+        try:
+            status = os.stat(url_)
+            if S_ISSOCK(status.st_mode):
+                return FileHTTPConnection(url_)
+            raise ConnectionError('File URL is not a socket: %s' % url)
+        except OSError as exc:
+            raise ConnectionError('Error with file URL %s: %s' % (url, exc))
+
+    # A connection taken from the pool may turn out to have been closed by
+    # the server in the mean time (e.g. due to its keep-alive timeout). In
+    # that case, the request is transparently retried on a new connection,
+    # unless the server may already have performed a non-idempotent request.
+    client = pool.get(conn_key) if pool is not None else None
+    reused = client is not None
+    if client is None:
+        client = new_client()
 
     locallogin = None
     if host in ('localhost', 'localhost6', '127.0.0.1', '::1'):
@@ -727,25 +1051,30 @@ def wbem_request(url, data, creds, cimxml_headers=None, debug=False, x509=None,
     if recorders:
         for recorder in recorders:
             recorder.stage_http_request(conn_id, 11, url, target, method,
-                                        dict(cimxml_headers), data)
+                                        dict(cimxml_headers),
+                                        XML_DECLARATION + data)
 
             # We want clean response data when an exception is raised before
             # the HTTP response comes in:
             recorder.stage_http_response1(conn_id, None, None, None, None)
             recorder.stage_http_response2(None)
 
-    with HTTPTimeout(timeout, client):
+    with HTTPTimeout(timeout, client) as http_timeout:
 
         try_limit = 5  # Number of tries with authentication challenges.
 
         for num_tries in range(0, try_limit):  # pylint: disable=unused-variable
 
-            client.putrequest(method, target)
+            client.putrequest(method, target,
+                              skip_accept_encoding=compression is not None)
 
             standard_headers = [
                 ('Content-type', 'application/xml; charset="utf-8"'),
-                ('Content-length', str(len(data))),
+                ('Content-length', str(body_len)),
             ]
+            if compression is not None:
+                standard_headers.append(('Content-Encoding', compression))
+                standard_headers.append(('Accept-Encoding', 'gzip, deflate'))
             if local_auth_header:
                 standard_headers.append(local_auth_header)
             elif creds is not None:
@@ -770,6 +1099,10 @@ def wbem_request(url, data, creds, cimxml_headers=None, debug=False, x509=None,
                 v = urllib.parse.quote(v)
                 client.putheader(n, v)
 
+            # Indicates that the request has been sent completely, so that the
+            # server may have performed it.
+            request_sent = False
+
             try:
 
                 # See RFC 2616 section 8.2.2
@@ -788,9 +1121,15 @@ def wbem_request(url, data, creds, cimxml_headers=None, debug=False, x509=None,
                     # endheaders() is the first method in this sequence that
                     # actually sends something to the server (using send()).
                     client.endheaders()
-                    client.send(data)
+                    client.send(body_data)
+                    request_sent = True
                 except SocketErrors as exc:
-                    if exc.args[0] == errno.ECONNRESET:
+                    if reused and exc.args[0] in (errno.ECONNRESET,
+                                                  errno.EPIPE):
+                        # The pooled connection was stale; this is
+                        # detected and handled when reading the response.
+                        pass
+                    elif exc.args[0] == errno.ECONNRESET:
                         warnings.warn("Ignoring socket error ECONNRESET "
                                       "(connection reset), continuing with "
                                       "reading the response.",
@@ -829,6 +1168,9 @@ def wbem_request(url, data, creds, cimxml_headers=None, debug=False, x509=None,
 
                 if response.status != 200:
                     if response.status == 401:
+                        # Consume the response body so that the connection
+                        # can be used for the retry with authentication.
+                        response.read()
                         if not local:
                             raise AuthError(response.reason)
                         auth_chal = response.getheader('WWW-Authenticate', '')
@@ -910,11 +1252,26 @@ def wbem_request(url, data, creds, cimxml_headers=None, debug=False, x509=None,
 
                     raise HTTPError(response.status, response.reason)
 
-                body = response.read()
+                try:
+                    decompressor = get_decompressor(
+                        response.getheader('Content-Encoding', None))
+                except ValueError as exc:
+                    raise ConnectionError("Cannot decode the response body: "
+                                          "%s" % exc)
+
+                if stream:
+                    break
+
+                body = _read_response_body(response)
+
+                if decompressor is not None:
+                    body = decompress_body(decompressor, body,
+                                           compression_stats)
 
                 if recorders:
+                    recorded_body = bytes(body)
                     for recorder in recorders:
-                        recorder.stage_http_response2(body)
+                        recorder.stage_http_response2(recorded_body)
 
             except httplib.BadStatusLine as exc:
                 # Background: BadStatusLine is documented to be raised only
@@ -928,6 +1285,16 @@ def wbem_request(url, data, creds, cimxml_headers=None, debug=False, x509=None,
                 # a BadStatusLine exception with an empty line.
                 if exc.line is None or exc.line.strip().strip("'") in \
                         ('', 'None'):
+                    if reused and not http_timeout.expired and \
+                            (idempotent or not request_sent):
+                        # The server has closed the pooled connection
+                        # before it received the request. Retry on a new
+                        # connection.
+                        client.close()
+                        client = new_client()
+                        http_timeout.http_conn = client
+                        reused = False
+                        continue  # with next retry
                     # TODO 4/2018 AM Enable retry logic. For unknown reasons,
                     #   retrying causes testclient test case SocketError104 to
                     #   fail. Also, retrying needs to be tested with a real
@@ -956,14 +1323,157 @@ def wbem_request(url, data, creds, cimxml_headers=None, debug=False, x509=None,
                 # Base class for all httplib exceptions
                 raise ConnectionError("HTTP error: %s" % exc)
             except SocketErrors as exc:
+                if reused and not http_timeout.expired and \
+                        (idempotent or not request_sent) and \
+                        exc.args and exc.args[0] in (errno.ECONNRESET,
+                                                     errno.EPIPE):
+                    # The server has reset the pooled connection. Retry on
+                    # a new connection.
+                    client.close()
+                    client = new_client()
+                    http_timeout.http_conn = client
+                    reused = False
+                    continue  # with next retry
                 raise ConnectionError("Socket error: %s" % exc)
 
             # Operation was successful
             break
 
+    if stream:
+        body = _iter_response_body(response, client, pool, conn_key,
+                                   decompressor=decompressor,
+                                   compression_stats=compression_stats)
+        return body, svr_resp_time
+
+    # If an exception was raised, the connection is not returned to the pool
+    # and its socket is closed when the connection object is garbage
+    # collected.
+    if pool is not None and not response.will_close:
+        pool.put(conn_key, client)
+    else:
+        client.close()
+
     return body, svr_resp_time
 
 
+def _read_response_body(response, chunk_size=DEFAULT_STREAM_CHUNK_SIZE):
+    """
+    Read the body of an HTTP response into a :class:`py:bytearray` object and
+    return it.
+
+    If the length of the body is known, the body is read directly into a
+    bytearray of that size. Otherwise (e.g. for chunked transfer encoding),
+    the body is read in chunks of up to `chunk_size` bytes that are appended
+    to the bytearray, instead of joining a list of chunks. Either way, the
+    body exists only once in memory.
+    """
+    length = response.length
+    readinto = getattr(response, 'readinto', None)  # Not on Python 2
+    if length is not None and readinto is not None:
+        body = bytearray(length)
+        view = memoryview(body)
+        pos = 0
+        while pos < length:
+            size = readinto(view[pos:])
+            if not size:
+                raise httplib.IncompleteRead(bytes(body[:pos]), length - pos)
+            pos += size
+        return body
+    body = bytearray()
+    while True:
+        chunk = response.read(chunk_size)
+        if not chunk:
+            return body
+        body += chunk
+
+
+def decompress_body(decompressor, body, compression_stats, final=True,
+                    max_length=0):
+    """
+    Decompress (a chunk of) a compressed HTTP response body with a zlib
+    decompression object, and return the decompressed data.
+
+    If `final` is `True`, the end of the body has been reached and the
+    remaining decompressed data is returned as well. If `max_length` is
+    positive, at most that many Bytes are returned, and the input that has
+    not been decompressed is left in the `unconsumed_tail` attribute of the
+    decompression object.
+
+    Raises ConnectionError if the body is not validly compressed.
+    """
+    start_time = time.time()
+    try:
+        data = decompressor.decompress(body, max_length)
+        if final:
+            data += decompressor.flush()
+    except zlib.error as exc:
+        raise ConnectionError("The server returned an invalid compressed "
+                              "response body: %s" % exc)
+    if compression_stats is not None:
+        compression_stats[0] += len(data)
+        compression_stats[1] += len(body) - len(decompressor.unconsumed_tail)
+        compression_stats[2] += time.time() - start_time
+    return data
+
+
+def _iter_response_body(response, client, pool, conn_key,
+                        chunk_size=DEFAULT_STREAM_CHUNK_SIZE,
+                        decompressor=None, compression_stats=None):
+    """
+    Generator that reads the body of an HTTP response in chunks of up to
+    `chunk_size` bytes, and that returns the connection to the pool (or
+    closes it) when the body has been read completely.
+
+    If `decompressor` is not `None`, the chunks are decompressed with that
+    zlib decompression object, so that a compressed body is never held in
+    memory in its entirety, neither compressed nor decompressed.
+
+    If the generator is closed before the body has been read completely, or
+    if reading fails, the connection is closed.
+
+    Read timeouts are detected by the socket timeout of the connection, and
+    apply to each read individually.
+    """
+    try:
+        while True:
+            try:
+                chunk = response.read(chunk_size)
+            except socket.timeout as exc:
+                raise TimeoutError("The client timed out while reading the "
+                                   "response: %s" % exc)
+            except httplib.IncompleteRead as exc:
+                raise ConnectionError("HTTP incomplete read: %s" % exc)
+            except httplib.HTTPException as exc:
+                raise ConnectionError("HTTP error: %s" % exc)
+            except SocketErrors as exc:
+                raise ConnectionError("Socket error: %s" % exc)
+            if decompressor is not None:
+                # Decompress the chunk into chunks of up to chunk_size bytes
+                tail = chunk
+                while True:
+                    data = decompress_body(decompressor, tail,
+                                           compression_stats,
+                                           final=not chunk,
+                                           max_length=chunk_size)
+                    if data:
+                        yield data
+                    tail = decompressor.unconsumed_tail
+                    if not tail:
+                        break
+            elif chunk:
+                yield chunk
+            if not chunk:
+                break
+    except BaseException:
+        # Includes GeneratorExit, if the generator is closed early.
+        client.close()
+        raise
+    if pool is not None and not response.will_close:
+        pool.put(conn_key, client)
+    else:
+        client.close()
+
+
 def get_cimobject_header(obj):
     """
     Return the value for the CIM-XML extension header field 'CIMObject', using
@@ -269,9 +269,9 @@ else:
     from builtins import type as builtin_type  # pylint: disable=import-error
 
 __all__ = ['CIMClassName', 'CIMProperty', 'CIMInstanceName', 'CIMInstance',
-           'CIMClass', 'CIMMethod', 'CIMParameter', 'CIMQualifier',
-           'CIMQualifierDeclaration', 'tocimxml', 'tocimxmlstr', 'tocimobj',
-           'cimvalue']
+           'CompactCIMInstance', 'CIMClass', 'CIMMethod', 'CIMParameter',
+           'CIMQualifier', 'CIMQualifierDeclaration', 'tocimxml',
+           'tocimxmlstr', 'tocimobj', 'cimvalue']
 
 # Constants for MOF formatting output
 MOF_INDENT = 3
@@ -1091,6 +1091,74 @@ def _cim_qualifier(key, value):
     return qual
 
 
+def _frozen_error(obj):
+    """
+    Return the exception to be raised when modifying a frozen CIM object.
+    """
+    return TypeError("Frozen %s object cannot be modified" %
+                     obj.__class__.__name__)
+
+
+def _copy_path(path):
+    """
+    Return a copy of the path of a CIM object for use in a copy of the CIM
+    object. A frozen path is not copied, and `None` is returned as-is.
+    """
+    if path is None or path.frozen:
+        return path
+    return path.copy()
+
+
+class _FrozenKeybindings(NocaseDict):
+    """
+    Keybindings of a frozen :class:`~pywbem.CIMInstanceName` object, that
+    cannot be modified. Instance paths in keybinding values are frozen as
+    well, so the hash value can always be cached.
+
+    The :meth:`~NocaseDict.copy` method returns a modifiable `NocaseDict`
+    object.
+    """
+
+    def __init__(self, keybindings):
+        """
+        Parameters:
+
+          keybindings (NocaseDict): The keybindings to be frozen.
+        """
+        super(_FrozenKeybindings, self).__init__()
+        self.allow_unnamed_keys = True
+        # pylint: disable=protected-access
+        for k, item in six.iteritems(keybindings._data):
+            key, value = item
+            if isinstance(value, CIMInstanceName):
+                value = value.freeze()
+            self._data[k] = (key, value)
+
+    def _frozen_error(self):
+        # pylint: disable=no-self-use
+        """Return the exception to be raised when modifying the object."""
+        return TypeError("Keybindings of a frozen CIMInstanceName object "
+                         "cannot be modified")
+
+    def __setitem__(self, key, value):
+        raise self._frozen_error()
+
+    def __delitem__(self, key):
+        raise self._frozen_error()
+
+    def clear(self):
+        raise self._frozen_error()
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._hash = None
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = super(_FrozenKeybindings, self).__hash__()
+        return self._hash
+
+
 class CIMInstanceName(_CIMComparisonMixin):
     """
     A CIM instance path (aka *CIM instance name*).
@@ -1103,8 +1171,23 @@ class CIMInstanceName(_CIMComparisonMixin):
     value being based on its public attributes. Therefore, objects of this
     class can be used as members in a set (or as dictionary keys) only during
     periods in which their public attributes remain unchanged.
+
+    The hash value is cached until the public attributes are modified.
+
+    *New in pywbem 0.13 as experimental:* Objects of this class can be
+    frozen by :meth:`freeze`, which returns a :term:`hashable` copy that
+    cannot be modified.
     """
 
+    # Tuple (keybindings hash, hash) of the cached hash value, or `None`.
+    # Reset by the attribute setters. Modifications of the keybindings
+    # dictionary are detected by comparing its (cached) hash value.
+    _hash_cache = None
+
+    # Tuple of the lower-cased host, namespace and class name, for frozen
+    # objects. `None` for objects that are not frozen.
+    _frozen_names = None
+
     def __init__(self, classname, keybindings=None, host=None, namespace=None):
         # pylint: disable=line-too-long
         """
@@ -1185,9 +1268,12 @@ class CIMInstanceName(_CIMComparisonMixin):
     @classname.setter
     def classname(self, classname):
         """Setter method; for a description see the getter method."""
+        if self._frozen_names is not None:
+            raise _frozen_error(self)
 
         # pylint: disable=attribute-defined-outside-init
         self._classname = _ensure_unicode(classname)
+        self._hash_cache = None
 
         # We perform this check after the initialization to avoid errors
         # in test tools that show the object with repr().
@@ -1252,9 +1338,12 @@ class CIMInstanceName(_CIMComparisonMixin):
     @keybindings.setter
     def keybindings(self, keybindings):
         """Setter method; for a description see the getter method."""
+        if self._frozen_names is not None:
+            raise _frozen_error(self)
         # pylint: disable=attribute-defined-outside-init
         self._keybindings = NocaseDict()
         self._keybindings.allow_unnamed_keys = True
+        self._hash_cache = None
         if keybindings:
             try:
                 # This is used for iterables:
@@ -1289,6 +1378,8 @@ class CIMInstanceName(_CIMComparisonMixin):
     @namespace.setter
     def namespace(self, namespace):
         """Setter method; for a description see the getter method."""
+        if self._frozen_names is not None:
+            raise _frozen_error(self)
         # pylint: disable=attribute-defined-outside-init
         self._namespace = _ensure_unicode(namespace)
         if self._namespace is not None:
@@ -1296,6 +1387,7 @@ class CIMInstanceName(_CIMComparisonMixin):
             # Therefore, the stripping needs to be done after the unicode
             # conversion.
             self._namespace = self._namespace.strip('/')
+        self._hash_cache = None
 
     @property
     def host(self):
@@ -1316,8 +1408,11 @@ class CIMInstanceName(_CIMComparisonMixin):
     @host.setter
     def host(self, host):
         """Setter method; for a description see the getter method."""
+        if self._frozen_names is not None:
+            raise _frozen_error(self)
         # pylint: disable=attribute-defined-outside-init
         self._host = _ensure_unicode(host)
+        self._hash_cache = None
 
     def _cmp(self, other):
         """
@@ -1347,19 +1442,67 @@ class CIMInstanceName(_CIMComparisonMixin):
                 cmpname(self.classname, other.classname) or
                 cmpdict(self.keybindings, other.keybindings))
 
+    def __eq__(self, other):
+        """
+        Invoked when two CIM instance paths are compared with the `==`
+        operator.
+
+        If the hash values of both instance paths are cached and differ, the
+        instance paths are not equal without comparing their attributes.
+        Otherwise, the comparison is delegated to the `_cmp()` method.
+        """
+        if isinstance(other, CIMInstanceName):
+            hash1 = self._cached_hash()
+            if hash1 is not None:
+                # pylint: disable=protected-access
+                hash2 = other._cached_hash()
+                if hash2 is not None and hash1 != hash2:
+                    return False
+                if self._frozen_names is not None and \
+                        other._frozen_names is not None:
+                    return self._frozen_names == other._frozen_names and \
+                        self._keybindings == other._keybindings
+        return self._cmp(other) == 0
+
+    def __ne__(self, other):
+        """
+        Invoked when two CIM instance paths are compared with the `!=`
+        operator.
+
+        Implemented by delegating to the `==` operator.
+        """
+        return not self == other
+
+    def _cached_hash(self):
+        """
+        Return the cached hash value, or `None` if it is not cached or the
+        keybindings have been modified since it was cached.
+        """
+        cache = self._hash_cache
+        # pylint: disable=protected-access
+        if cache is not None and cache[0] == self._keybindings._hash:
+            return cache[1]
+        return None
+
     def __hash__(self):
         """
         Return a hash value based on the public attributes of this class, taking
         into account any case insensitivities described for these attributes.
         This approach causes this class to be :term:`unchanged-hashable`.
         """
-        hashes = (
-            _hash_name(self.host),
-            _hash_name(self.namespace),
-            _hash_name(self.classname),
-            _hash_dict(self.keybindings),
-        )
-        return hash(hashes)
+        hash_ = self._cached_hash()
+        if hash_ is None:
+            kb_hash = _hash_dict(self.keybindings)
+            hashes = (
+                _hash_name(self.host),
+                _hash_name(self.namespace),
+                _hash_name(self.classname),
+                kb_hash,
+            )
+            hash_ = hash(hashes)
+            # pylint: disable=attribute-defined-outside-init
+            self._hash_cache = (kb_hash, hash_)
+        return hash_
 
     def __str__(self):
         """
@@ -1421,9 +1564,54 @@ class CIMInstanceName(_CIMComparisonMixin):
     def __iter__(self):
         return six.iterkeys(self.keybindings)
 
+    @property
+    def frozen(self):
+        """
+        :class:`py:bool`: Indicates whether the instance path is frozen, see
+        :meth:`freeze`.
+
+        *New in pywbem 0.13 as experimental.*
+        """
+        return self._frozen_names is not None
+
+    def freeze(self):
+        """
+        Return a frozen copy of the :class:`~pywbem.CIMInstanceName` object,
+        or the object itself if it is already frozen.
+
+        *New in pywbem 0.13 as experimental.*
+
+        A frozen instance path cannot be modified: Setting its attributes or
+        modifying its keybindings raises `TypeError`. Instance paths in its
+        keybinding values are frozen as well. Its hash value and the
+        lower-cased form of its names used for comparisons are computed once
+        when it is frozen. Therefore, frozen instance paths are
+        :term:`hashable` and can be shared instead of being copied; for
+        example, :meth:`pywbem.CIMInstance.copy` shares a frozen instance path
+        with the copy, and :class:`~pywbem.CIMInstance` objects replace a
+        frozen instance path with a modifiable copy when a key property is
+        set.
+
+        :meth:`copy` returns a modifiable copy of a frozen instance path.
+        """
+        if self._frozen_names is not None:
+            return self
+        result = CIMInstanceName(self.classname, host=self.host,
+                                 namespace=self.namespace)
+        # pylint: disable=protected-access
+        result._keybindings = _FrozenKeybindings(self._keybindings)
+        result._frozen_names = (
+            None if self.host is None else self.host.lower(),
+            None if self.namespace is None else self.namespace.lower(),
+            self.classname.lower())
+        hash(result)
+        return result
+
     def copy(self):
         """
         Return a copy of the :class:`~pywbem.CIMInstanceName` object.
+
+        The copy of a frozen instance path is not frozen.
         """
 
         result = CIMInstanceName(self.classname)
@@ -1593,6 +1781,67 @@ class CIMInstanceName(_CIMComparisonMixin):
             cim_xml.NAMESPACEPATH(cim_xml.HOST(self.host), localnsp_xml),
             instancename_xml)
 
+    def _cimxml_str(self, ignore_host=False, ignore_namespace=False):
+        """
+        Return the CIM-XML representation of the
+        :class:`~pywbem.CIMInstanceName` object, as a :term:`unicode string`
+        that is built without creating :term:`Element` objects.
+
+        The result is identical to the result of
+        ``tocimxml(ignore_host, ignore_namespace).toxml()``.
+        """
+
+        kbs = []
+
+        for key, value in self.keybindings.items():
+
+            if isinstance(value, CIMInstanceName):
+                kbs.append(u'<KEYBINDING%s><VALUE.REFERENCE>%s'
+                           u'</VALUE.REFERENCE></KEYBINDING>' %
+                           (cim_xml._attrs_str([('NAME', key)]),
+                            value._cimxml_str()))
+                continue
+
+            if isinstance(value, bool):
+                type_ = 'boolean'
+                if value:
+                    value = u'TRUE'
+                else:
+                    value = u'FALSE'
+            elif isinstance(value, number_types):
+                type_ = 'numeric'
+                value = six.text_type(value)
+            elif isinstance(value, six.string_types):
+                type_ = 'string'
+                value = cim_xml._escape_text(_ensure_unicode(value))
+            else:
+                raise TypeError('Keybinding %s has invalid type: %s' %
+                                (key, builtin_type(value)))
+
+            kbs.append(u'<KEYBINDING%s><KEYVALUE VALUETYPE="%s">%s'
+                       u'</KEYVALUE></KEYBINDING>' %
+                       (cim_xml._attrs_str([('NAME', key)]), type_, value))
+
+        if kbs:
+            instancename_xml = u'<INSTANCENAME%s>%s</INSTANCENAME>' % \
+                (cim_xml._attrs_str([('CLASSNAME', self.classname)]),
+                 u''.join(kbs))
+        else:
+            instancename_xml = u'<INSTANCENAME%s/>' % \
+                cim_xml._attrs_str([('CLASSNAME', self.classname)])
+
+        if self.namespace is None or ignore_namespace:
+            return instancename_xml
+
+        if self.host is None or ignore_host:
+            return u'<LOCALINSTANCEPATH>%s%s</LOCALINSTANCEPATH>' % \
+                (cim_xml._localnamespacepath_str(self.namespace),
+                 instancename_xml)
+
+        return u'<INSTANCEPATH>%s%s</INSTANCEPATH>' % \
+            (cim_xml._namespacepath_str(self.host, self.namespace),
+             instancename_xml)
+
     def tocimxmlstr(self, indent=None, ignore_host=False,
                     ignore_namespace=False):
         """
@@ -1626,6 +1875,8 @@ class CIMInstanceName(_CIMComparisonMixin):
             The CIM-XML representation of the value, as a
             :term:`unicode string`.
         """
+        if indent is None:
+            return self._cimxml_str(ignore_host, ignore_namespace)
         xml_elem = self.tocimxml(ignore_host, ignore_namespace)
         return tocimxmlstr(xml_elem, indent)
 
@@ -2374,7 +2625,11 @@ class CIMInstance(_CIMComparisonMixin):
         """Setter method; for a description see the getter method."""
 
         # pylint: disable=attribute-defined-outside-init
-        self._path = copy(path)  # It is modified by the properties setter
+        if isinstance(path, CIMInstanceName) and path.frozen:
+            # It is replaced when the properties setter modifies it
+            self._path = path
+        else:
+            self._path = copy(path)  # It is modified by the properties setter
 
         # We perform this check after the initialization to avoid errors
         # in test tools that show the object with repr().
@@ -2508,8 +2763,15 @@ class CIMInstance(_CIMComparisonMixin):
 
         prop = _cim_property_value(key, value)
         self.properties[key] = prop
-        if self.path is not None and key in self.path.keybindings:
-            self.path[key] = prop.value
+        path = self.path
+        if path is not None and key in path.keybindings:
+            if path.frozen:
+                # The frozen path may be shared with other objects
+                if path.keybindings[key] == prop.value:
+                    return
+                # pylint: disable=attribute-defined-outside-init
+                path = self._path = path.copy()
+            path[key] = prop.value
 
     def __delitem__(self, key):
         del self.properties[key]
@@ -2528,7 +2790,7 @@ class CIMInstance(_CIMComparisonMixin):
         result = CIMInstance(self.classname)
         result.properties = self.properties.copy()
         result.qualifiers = self.qualifiers.copy()
-        result.path = None if self.path is None else self.path.copy()
+        result.path = _copy_path(self.path)
 
         return result
 
@@ -2719,6 +2981,44 @@ class CIMInstance(_CIMComparisonMixin):
             self.path.tocimxml(),
             instance_xml)
 
+    def _cimxml_str(self, ignore_path=False):
+        """
+        Return the CIM-XML representation of the
+        :class:`~pywbem.CIMInstance` object, as a :term:`unicode string`
+        that is built without creating :term:`Element` objects.
+
+        The result is identical to the result of
+        ``tocimxml(ignore_path).toxml()``.
+        """
+
+        for key, value in self.properties.items():
+            if not isinstance(value, CIMProperty):
+                raise TypeError("Property %s has invalid type: %s "
+                                "(must be CIMProperty)" %
+                                (key, builtin_type(value)))
+
+        children = [q._cimxml_str() for q in self.qualifiers.values()]
+        children.extend([p._cimxml_str() for p in self.properties.values()])
+        attrs = cim_xml._attrs_str([('CLASSNAME', self.classname)])
+        if children:
+            instance_xml = u'<INSTANCE%s>%s</INSTANCE>' % \
+                (attrs, u''.join(children))
+        else:
+            instance_xml = u'<INSTANCE%s/>' % attrs
+
+        if self.path is None or ignore_path:
+            return instance_xml
+
+        if self.path.namespace is None:
+            tag = u'VALUE.NAMEDINSTANCE'
+        elif self.path.host is None:
+            tag = u'VALUE.OBJECTWITHLOCALPATH'
+        else:
+            tag = u'VALUE.INSTANCEWITHPATH'
+
+        return u'<%s>%s%s</%s>' % \
+            (tag, self.path._cimxml_str(), instance_xml, tag)
+
     def tocimxmlstr(self, indent=None, ignore_path=False):
         """
         *New in pywbem 0.9.*
@@ -2748,6 +3048,8 @@ class CIMInstance(_CIMComparisonMixin):
             The CIM-XML representation of the object, as a
             :term:`unicode string`.
         """
+        if indent is None:
+            return self._cimxml_str(ignore_path)
         xml_elem = self.tocimxml(ignore_path)
         return tocimxmlstr(xml_elem, indent)
 
@@ -2805,6 +3107,408 @@ class CIMInstance(_CIMComparisonMixin):
         return u''.join(mof)
 
 
+class _CompactSchema(object):
+    # pylint: disable=too-few-public-methods
+    """
+    The property layout shared by :class:`~pywbem.CompactCIMInstance` objects
+    whose properties have the same names, types and other attributes in the
+    same order.
+
+    Each item of `props` is a tuple (key, name, type, reference_class,
+    embedded_object, is_array, array_size, class_origin, propagated) for one
+    property, where key is the dictionary key of the property in the
+    instance.
+    """
+
+    __slots__ = ('props', 'indexes')
+
+    def __init__(self, props):
+        self.props = props
+        # Index into the values list, by lower-cased property name
+        self.indexes = dict((p[0].lower(), i) for i, p in enumerate(props))
+
+    def __getstate__(self):
+        # Needed for pickling with protocols 0 and 1, because of __slots__
+        return self.props
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+
+class CompactCIMInstance(CIMInstance):
+    """
+    *New in pywbem 0.13 as experimental.*
+
+    A :class:`~pywbem.CIMInstance` that stores its property values in a
+    compact form, for reducing the memory used by large result sets.
+
+    Instead of a `NocaseDict`_ of :class:`~pywbem.CIMProperty` objects, an
+    object of this class has a list of property values and a reference to a
+    property schema with the names, types and other attributes of the
+    properties. The property schema is shared by all objects whose
+    properties have the same layout, e.g. the instances of a class returned by
+    an enumeration.
+
+    Objects of this class are created from :class:`~pywbem.CIMInstance`
+    objects using :meth:`~pywbem.CompactCIMInstance.from_instance`, or are
+    returned by the operations of a :class:`~pywbem.WBEMConnection` object
+    that was created with `compact_instances=True`.
+
+    Accessing the property values using the dictionary-like methods of the
+    instance (e.g. ``inst['p1']``, :meth:`~pywbem.CIMInstance.get`,
+    :meth:`~pywbem.CIMInstance.items`), the instance path, comparing the
+    instance, and generating its MOF representation use the compact form.
+    Accessing the :attr:`~pywbem.CIMInstance.properties` attribute, or
+    modifying the properties of the instance converts the instance to the
+    full representation with :class:`~pywbem.CIMProperty` objects. From then
+    on, the object behaves like a :class:`~pywbem.CIMInstance` object.
+
+    Objects of this class compare equal to :class:`~pywbem.CIMInstance` objects
+    with the same attributes, and have the same hash value.
+    """
+
+    @classmethod
+    def from_instance(cls, instance, schemas=None):
+        """
+        Return a :class:`~pywbem.CompactCIMInstance` object with the same
+        attributes as a :class:`~pywbem.CIMInstance` object.
+
+        The instance path, qualifiers and property values of the returned
+        object are shared with the input instance (no copies are made).
+
+        Instances with qualifiers on their property values cannot be
+        represented in the compact form. For such instances, the input
+        instance is returned.
+
+        Parameters:
+
+          instance (:class:`~pywbem.CIMInstance`):
+            The instance to be converted.
+
+          schemas (:class:`py:dict`):
+            A dictionary that is used to share property schemas between
+            objects created by multiple calls of this method. It is updated
+            by this method, and its content is opaque to the caller.
+
+            `None` means that the property schema is not shared with other
+            objects.
+
+        Returns:
+
+          :class:`~pywbem.CompactCIMInstance` or :class:`~pywbem.CIMInstance`:
+          The instance in the compact form, or the input instance.
+        """
+        if isinstance(instance, CompactCIMInstance) and \
+                instance._values is not None:
+            return instance
+        props = []
+        values = []
+        for key, prop in instance.properties.iteritems():
+            if not isinstance(prop, CIMProperty) or prop.qualifiers:
+                return instance
+            props.append((key, prop.name, prop.type, prop.reference_class,
+                          prop.embedded_object, prop.is_array,
+                          prop.array_size, prop.class_origin,
+                          prop.propagated))
+            values.append(prop.value)
+        props = tuple(props)
+        if schemas is None:
+            schema = _CompactSchema(props)
+        else:
+            schema = schemas.get(props)
+            if schema is None:
+                schema = schemas.setdefault(props, _CompactSchema(props))
+        return cls._create(instance.classname, schema, values, instance.path,
+                           instance.qualifiers or None)
+
+    @classmethod
+    def _create(cls, classname, schema, values, path, qualifiers):
+        # pylint: disable=too-many-arguments
+        """
+        Return a new object in the compact form, without checking or copying
+        the input arguments.
+        """
+        # pylint: disable=protected-access
+        inst = cls.__new__(cls)
+        inst._classname = classname
+        inst._path = path
+        inst._property_list = None
+        inst._properties = None
+        inst._qualifiers = qualifiers
+        inst._schema = schema
+        inst._values = values
+        return inst
+
+    @property
+    def is_compact(self):
+        """
+        :class:`py:bool`: Indicates whether the instance is still in the
+        compact form, i.e. has not been converted to the full representation
+        with :class:`~pywbem.CIMProperty` objects.
+        """
+        return self._values is not None
+
+    @property
+    def properties(self):
+        """
+        `NocaseDict`_: Properties of the CIM instance, see
+        :attr:`pywbem.CIMInstance.properties`.
+
+        Accessing this attribute converts the instance to the full
+        representation.
+        """
+        if self._values is not None:
+            self._properties = self._property_dict()
+            self._schema = None
+            self._values = None
+        return self._properties
+
+    @properties.setter
+    def properties(self, properties):
+        """Setter method; for a description see the getter method."""
+        self._schema = None
+        self._values = None
+        CIMInstance.properties.fset(self, properties)
+
+    @property
+    def qualifiers(self):
+        """
+        `NocaseDict`_: Qualifiers of the CIM instance, see
+        :attr:`pywbem.CIMInstance.qualifiers`.
+        """
+        if self._qualifiers is None:
+            self._qualifiers = NocaseDict()
+        return self._qualifiers
+
+    @qualifiers.setter
+    def qualifiers(self, qualifiers):
+        """Setter method; for a description see the getter method."""
+        CIMInstance.qualifiers.fset(self, qualifiers)
+
+    def _iter_property_objects(self):
+        """
+        Iterate through new :class:`~pywbem.CIMProperty` objects for the
+        property values in the compact form, as tuples (key, property).
+        """
+        for p, value in six.moves.zip(self._schema.props, self._values):
+            yield p[0], CIMProperty(
+                p[1], value, type=p[2], reference_class=p[3],
+                embedded_object=p[4], is_array=p[5], array_size=p[6],
+                class_origin=p[7], propagated=p[8])
+
+    def _property_dict(self):
+        """
+        Return the properties of the instance as a `NocaseDict`_ of
+        :class:`~pywbem.CIMProperty` objects, without converting the instance
+        to the full representation.
+        """
+        if self._values is None:
+            return self._properties
+        props = NocaseDict()
+        for key, prop in self._iter_property_objects():
+            props[key] = prop
+        return props
+
+    def _index(self, key):
+        """
+        Return the index of the property with name `key` in the values list,
+        or `None` if the instance has no such property.
+        """
+        return self._schema.indexes.get(key.lower())
+
+    def _cmp(self, other):
+        """
+        Comparator function for a :class:`~pywbem.CompactCIMInstance` object
+        and a :class:`~pywbem.CIMInstance` object, see
+        :meth:`pywbem.CIMInstance._cmp`.
+
+        If both objects are in the compact form with the same property layout
+        and equal property values, they are found to be equal without creating
+        :class:`~pywbem.CIMProperty` objects.
+        """
+        if self is other:
+            return 0
+        if not isinstance(other, CIMInstance):
+            raise TypeError("other must be CIMInstance, but is: %s" %
+                            type(other))
+        rv = cmpname(self.classname, other.classname) or \
+            cmpitem(self.path, other.path)
+        if rv:
+            return rv
+        # pylint: disable=protected-access
+        if isinstance(other, CompactCIMInstance):
+            if self._values is not None and other._values is not None and \
+                    (self._schema is other._schema or
+                     self._schema.props == other._schema.props) and \
+                    self._values == other._values:
+                rv = 0
+            else:
+                rv = cmpdict(self._property_dict(), other._property_dict())
+        else:
+            rv = cmpdict(self._property_dict(), other.properties)
+        return rv or cmpdict(self.qualifiers, other.qualifiers)
+
+    def __hash__(self):
+        """
+        Return a hash value that is equal to the hash value of a
+        :class:`~pywbem.CIMInstance` object with the same attributes.
+        """
+        hashes = (
+            _hash_name(self.classname),
+            _hash_item(self.path),
+            _hash_dict(self._property_dict()),
+            _hash_dict(self.qualifiers),
+        )
+        return hash(hashes)
+
+    def __repr__(self):
+        """
+        Return a string representation of the
+        :class:`~pywbem.CompactCIMInstance` object that is suitable for
+        debugging.
+        """
+        return '%s(classname=%r, path=%r, ' \
+               'properties=%r, property_list=%r, ' \
+               'qualifiers=%r)' % \
+               (self.__class__.__name__, self.classname, self.path,
+                self._property_dict(), self.property_list,
+                self.qualifiers)
+
+    def __contains__(self, key):
+        if self._values is None or not isinstance(key, six.string_types):
+            return CIMInstance.__contains__(self, key)
+        return self._index(key) is not None
+
+    def __getitem__(self, key):
+        if self._values is None or not isinstance(key, six.string_types):
+            return CIMInstance.__getitem__(self, key)
+        index = self._index(key)
+        if index is None:
+            raise KeyError('Key %r not found' % key)
+        return self._values[index]
+
+    def __len__(self):
+        if self._values is None:
+            return CIMInstance.__len__(self)
+        return len(self._values)
+
+    def __iter__(self):
+        if self._values is None:
+            return CIMInstance.__iter__(self)
+        return (p[0] for p in self._schema.props)
+
+    def copy(self):
+        """
+        Return copy of the :class:`~pywbem.CompactCIMInstance` object.
+
+        If the instance is in the compact form, the copy is in the compact
+        form as well, and shares the property schema with the instance.
+        """
+        if self._values is None:
+            result = CompactCIMInstance(self.classname)
+            result.properties = self.properties.copy()
+            result.qualifiers = self.qualifiers.copy()
+            result.path = _copy_path(self.path)
+            return result
+        return self._create(
+            self.classname, self._schema, list(self._values),
+            _copy_path(self.path),
+            None if self._qualifiers is None else self._qualifiers.copy())
+
+    def has_key(self, key):
+        """
+        Return a boolean indicating whether the instance has a property with
+        name `key`.
+        """
+        return key in self
+
+    def get(self, key, default=None):
+        """
+        Return the value of the property with name `key`, or a default value if
+        a property with that name does not exist.
+        """
+        if self._values is None or not isinstance(key, six.string_types):
+            return CIMInstance.get(self, key, default)
+        index = self._index(key)
+        return default if index is None else self._values[index]
+
+    def keys(self):
+        """
+        Return a copied list of the property names (in their original lexical
+        case).
+
+        The order of properties is preserved.
+        """
+        return list(self.iterkeys())
+
+    def values(self):
+        """
+        Return a copied list of the property values.
+
+        The order of properties is preserved.
+        """
+        if self._values is None:
+            return CIMInstance.values(self)
+        return list(self._values)
+
+    def items(self):
+        """
+        Return a copied list of the properties, where each item is a tuple
+        of the property name (in the original lexical case) and the property
+        value.
+
+        The order of properties is preserved.
+        """
+        return list(self.iteritems())
+
+    def iterkeys(self):
+        """
+        Iterate through the property names (in their original lexical
+        case).
+
+        The order of properties is preserved.
+        """
+        return iter(self)
+
+    def itervalues(self):
+        """
+        Iterate through the property values.
+
+        The order of properties is preserved.
+        """
+        if self._values is None:
+            return CIMInstance.itervalues(self)
+        return iter(self._values)
+
+    def iteritems(self):
+        """
+        Iterate through the property names (in their original lexical case)
+        and the property values.
+
+        The order of properties is preserved.
+        """
+        if self._values is None:
+            return CIMInstance.iteritems(self)
+        return six.moves.zip((p[0] for p in self._schema.props),
+                             self._values)
+
+    def tomof(self, indent=0, maxline=MAX_MOF_LINE):
+        """
+        Return a MOF string with the instance specification represented by
+        the :class:`~pywbem.CompactCIMInstance` object, see
+        :meth:`pywbem.CIMInstance.tomof`.
+        """
+        if self._values is None or indent != 0:
+            return CIMInstance.tomof(self, indent, maxline)
+
+        mof = [u'instance of ', self.classname, u' {\n']
+        for _, p in self._iter_property_objects():
+            mof.append(p.tomof(True, MOF_INDENT, maxline))
+        mof.append(u'};\n')
+
+        return u''.join(mof)
+
+
 class CIMClassName(_CIMComparisonMixin):
     """
     A CIM class path (aka *CIM class name*).
@@ -2817,8 +3521,19 @@ class CIMClassName(_CIMComparisonMixin):
     value being based on its public attributes. Therefore, objects of this
     class can be used as members in a set (or as dictionary keys) only during
     periods in which their public attributes remain unchanged.
+
+    *New in pywbem 0.13 as experimental:* Objects of this class can be
+    frozen by :meth:`freeze`, which returns a :term:`hashable` copy that
+    cannot be modified.
     """
 
+    # Tuple of the lower-cased host, namespace and class name, for frozen
+    # objects. `None` for objects that are not frozen.
+    _frozen_names = None
+
+    # Cached hash value of frozen objects, or `None`.
+    _hash_cache = None
+
     def __init__(self, classname, host=None, namespace=None):
         """
         Parameters:
@@ -2891,6 +3606,8 @@ class CIMClassName(_CIMComparisonMixin):
     @classname.setter
     def classname(self, classname):
         """Setter method; for a description see the getter method."""
+        if self._frozen_names is not None:
+            raise _frozen_error(self)
 
         # DSP0004 defines a certain format of CIM class names, but we don't
         # check that in pywbem because we don't parse the class name anywhere.
@@ -2921,6 +3638,8 @@ class CIMClassName(_CIMComparisonMixin):
     @namespace.setter
     def namespace(self, namespace):
         """Setter method; for a description see the getter method."""
+        if self._frozen_names is not None:
+            raise _frozen_error(self)
         # pylint: disable=attribute-defined-outside-init
         self._namespace = _ensure_unicode(namespace)
         if self._namespace is not None:
@@ -2948,16 +3667,87 @@ class CIMClassName(_CIMComparisonMixin):
     @host.setter
     def host(self, host):
         """Setter method; for a description see the getter method."""
+        if self._frozen_names is not None:
+            raise _frozen_error(self)
         # pylint: disable=attribute-defined-outside-init
         self._host = _ensure_unicode(host)
 
+    @property
+    def frozen(self):
+        """
+        :class:`py:bool`: Indicates whether the class path is frozen, see
+        :meth:`freeze`.
+
+        *New in pywbem 0.13 as experimental.*
+        """
+        return self._frozen_names is not None
+
+    def freeze(self):
+        """
+        Return a frozen copy of the :class:`~pywbem.CIMClassName` object,
+        or the object itself if it is already frozen.
+
+        *New in pywbem 0.13 as experimental.*
+
+        A frozen class path cannot be modified: Setting its attributes raises
+        `TypeError`. Its hash value and the lower-cased form of its names
+        used for comparisons are computed once when it is frozen. Therefore,
+        frozen class paths are :term:`hashable` and can be shared instead of
+        being copied; for example, :meth:`pywbem.CIMClass.copy` shares a
+        frozen class path with the copy.
+
+        :meth:`copy` returns a modifiable copy of a frozen class path.
+        """
+        if self._frozen_names is not None:
+            return self
+        result = CIMClassName(self.classname, host=self.host,
+                              namespace=self.namespace)
+        # pylint: disable=protected-access
+        result._frozen_names = (
+            None if self.host is None else self.host.lower(),
+            None if self.namespace is None else self.namespace.lower(),
+            self.classname.lower())
+        hash(result)
+        return result
+
     def copy(self):
         """
         Return a copy the :class:`~pywbem.CIMClassName` object.
+
+        The copy of a frozen class path is not frozen.
         """
         return CIMClassName(self.classname, host=self.host,
                             namespace=self.namespace)
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Hash values of strings differ between Python processes
+        self._hash_cache = None
+
+    def __eq__(self, other):
+        """
+        Invoked when two CIM class paths are compared with the `==`
+        operator.
+
+        Frozen class paths are compared using their lower-cased names.
+        Otherwise, the comparison is delegated to the `_cmp()` method.
+        """
+        # pylint: disable=protected-access
+        if self._frozen_names is not None and \
+                isinstance(other, CIMClassName) and \
+                other._frozen_names is not None:
+            return self._frozen_names == other._frozen_names
+        return self._cmp(other) == 0
+
+    def __ne__(self, other):
+        """
+        Invoked when two CIM class paths are compared with the `!=`
+        operator.
+
+        Implemented by delegating to the `==` operator.
+        """
+        return not self == other
+
     def _cmp(self, other):
         """
         Comparator function for two :class:`~pywbem.CIMClassName` objects.
@@ -2987,12 +3777,18 @@ class CIMClassName(_CIMComparisonMixin):
         into account any case insensitivities described for these attributes.
         This approach causes this class to be :term:`unchanged-hashable`.
         """
+        if self._hash_cache is not None:
+            return self._hash_cache
         hashes = (
             _hash_name(self.host),
             _hash_name(self.namespace),
             _hash_name(self.classname),
         )
-        return hash(hashes)
+        hash_ = hash(hashes)
+        if self._frozen_names is not None:
+            # pylint: disable=attribute-defined-outside-init
+            self._hash_cache = hash_
+        return hash_
 
     def __str__(self):
         """
@@ -3079,6 +3875,31 @@ class CIMClassName(_CIMComparisonMixin):
             cim_xml.NAMESPACEPATH(cim_xml.HOST(self.host), localnsp_xml),
             classname_xml)
 
+    def _cimxml_str(self, ignore_host=False, ignore_namespace=False):
+        """
+        Return the CIM-XML representation of the
+        :class:`~pywbem.CIMClassName` object, as a :term:`unicode string`
+        that is built without creating :term:`Element` objects.
+
+        The result is identical to the result of
+        ``tocimxml(ignore_host, ignore_namespace).toxml()``.
+        """
+
+        classname_xml = u'<CLASSNAME%s/>' % \
+            cim_xml._attrs_str([('NAME', self.classname)])
+
+        if self.namespace is None or ignore_namespace:
+            return classname_xml
+
+        if self.host is None or ignore_host:
+            return u'<LOCALCLASSPATH>%s%s</LOCALCLASSPATH>' % \
+                (cim_xml._localnamespacepath_str(self.namespace),
+                 classname_xml)
+
+        return u'<CLASSPATH>%s%s</CLASSPATH>' % \
+            (cim_xml._namespacepath_str(self.host, self.namespace),
+             classname_xml)
+
     def tocimxmlstr(self, indent=None, ignore_host=False,
                     ignore_namespace=False):
         """
@@ -3112,6 +3933,8 @@ class CIMClassName(_CIMComparisonMixin):
             The CIM-XML representation of the object, as a
             :term:`unicode string`.
         """
+        if indent is None:
+            return self._cimxml_str(ignore_host, ignore_namespace)
         xml_elem = self.tocimxml(ignore_host, ignore_namespace)
         return tocimxmlstr(xml_elem, indent)
 
@@ -3689,7 +4512,7 @@ class CIMClass(_CIMComparisonMixin):
         result.methods = self.methods.copy()
         result.superclass = self.superclass
         result.qualifiers = self.qualifiers.copy()
-        result.path = None if self.path is None else self.path.copy()
+        result.path = _copy_path(self.path)
 
         return result
 
@@ -3716,6 +4539,24 @@ class CIMClass(_CIMComparisonMixin):
             qualifiers=[q.tocimxml() for q in self.qualifiers.values()],
             superclass=self.superclass)
 
+    def _cimxml_str(self):
+        """
+        Return the CIM-XML representation of the
+        :class:`~pywbem.CIMClass` object, as a :term:`unicode string`
+        that is built without creating :term:`Element` objects (except for
+        its methods).
+
+        The result is identical to the result of ``tocimxml().toxml()``.
+        """
+        children = [q._cimxml_str() for q in self.qualifiers.values()]
+        children.extend([p._cimxml_str() for p in self.properties.values()])
+        children.extend([m.tocimxml().toxml() for m in self.methods.values()])
+        attrs = cim_xml._attrs_str([('NAME', self.classname),
+                                    ('SUPERCLASS', self.superclass)])
+        if children:
+            return u'<CLASS%s>%s</CLASS>' % (attrs, u''.join(children))
+        return u'<CLASS%s/>' % attrs
+
     def tocimxmlstr(self, indent=None):
         """
         *New in pywbem 0.9.*
@@ -3742,6 +4583,8 @@ class CIMClass(_CIMComparisonMixin):
             The CIM-XML representation of the object, as a
             :term:`unicode string`.
         """
+        if indent is None:
+            return self._cimxml_str()
         xml_elem = self.tocimxml()
         return tocimxmlstr(xml_elem, indent)
 
@@ -4431,6 +5274,88 @@ class CIMProperty(_CIMComparisonMixin):
                 embedded_object=self.embedded_object,
                 qualifiers=qualifiers)
 
+    def _cimxml_str(self):
+        """
+        Return the CIM-XML representation of the
+        :class:`~pywbem.CIMProperty` object, as a :term:`unicode string`
+        that is built without creating :term:`Element` objects.
+
+        The result is identical to the result of ``tocimxml().toxml()``.
+        """
+
+        children = [q._cimxml_str() for q in self.qualifiers.values()]
+        propagated = None if self.propagated is None else \
+            str(self.propagated).lower()
+
+        if self.is_array:
+            assert self.type != 'reference'
+
+            if self.value is not None:
+                array_xml = []
+                for v in self.value:
+                    if v is None:
+                        if SEND_VALUE_NULL:
+                            array_xml.append(u'<VALUE.NULL/>')
+                        else:
+                            array_xml.append(u'<VALUE/>')
+                    elif self.embedded_object is not None:
+                        assert isinstance(v, (CIMInstance, CIMClass))
+                        array_xml.append(cim_xml._value_str(v._cimxml_str()))
+                    else:
+                        array_xml.append(
+                            cim_xml._value_str(atomic_to_cim_xml(v)))
+                if array_xml:
+                    children.append(u'<VALUE.ARRAY>%s</VALUE.ARRAY>' %
+                                    u''.join(array_xml))
+                else:
+                    children.append(u'<VALUE.ARRAY/>')
+
+            tag = u'PROPERTY.ARRAY'
+            attrs = cim_xml._attrs_str([
+                ('NAME', self.name),
+                ('TYPE', self.type),
+                ('ARRAYSIZE', None if self.array_size is None else
+                 str(self.array_size)),
+                ('CLASSORIGIN', self.class_origin),
+                ('EmbeddedObject', self.embedded_object),
+                ('PROPAGATED', propagated)])
+
+        elif self.type == 'reference':  # scalar
+
+            if self.value is not None:
+                children.append(u'<VALUE.REFERENCE>%s</VALUE.REFERENCE>' %
+                                self.value._cimxml_str())
+
+            tag = u'PROPERTY.REFERENCE'
+            attrs = cim_xml._attrs_str([
+                ('NAME', self.name),
+                ('REFERENCECLASS', self.reference_class),
+                ('CLASSORIGIN', self.class_origin),
+                ('PROPAGATED', propagated)])
+
+        else:  # scalar non-reference
+
+            if self.value is not None:
+                if self.embedded_object is not None:
+                    assert isinstance(self.value, (CIMInstance, CIMClass))
+                    children.append(
+                        cim_xml._value_str(self.value._cimxml_str()))
+                else:
+                    children.append(
+                        cim_xml._value_str(atomic_to_cim_xml(self.value)))
+
+            tag = u'PROPERTY'
+            attrs = cim_xml._attrs_str([
+                ('NAME', self.name),
+                ('TYPE', self.type),
+                ('CLASSORIGIN', self.class_origin),
+                ('PROPAGATED', propagated),
+                ('EmbeddedObject', self.embedded_object)])
+
+        if children:
+            return u'<%s%s>%s</%s>' % (tag, attrs, u''.join(children), tag)
+        return u'<%s%s/>' % (tag, attrs)
+
     def tocimxmlstr(self, indent=None):
         """
         *New in pywbem 0.9.*
@@ -4457,6 +5382,8 @@ class CIMProperty(_CIMComparisonMixin):
             The CIM-XML representation of the object, as a
             :term:`unicode string`.
         """
+        if indent is None:
+            return self._cimxml_str()
         xml_elem = self.tocimxml()
         return tocimxmlstr(xml_elem, indent)
 
@@ -6246,6 +7173,53 @@ class CIMQualifier(_CIMComparisonMixin):
                                  toinstance=self.toinstance,
                                  translatable=self.translatable)
 
+    def _cimxml_str(self):
+        """
+        Return the CIM-XML representation of the
+        :class:`~pywbem.CIMQualifier` object, as a :term:`unicode string`
+        that is built without creating :term:`Element` objects.
+
+        The result is identical to the result of ``tocimxml().toxml()``.
+        """
+
+        if self.value is None:
+            value_xml = None
+
+        elif isinstance(self.value, (tuple, list)):
+            array_xml = []
+            for v in self.value:
+                if v is None:
+                    if SEND_VALUE_NULL:
+                        array_xml.append(u'<VALUE.NULL/>')
+                    else:
+                        array_xml.append(u'<VALUE/>')
+                else:
+                    array_xml.append(cim_xml._value_str(atomic_to_cim_xml(v)))
+            if array_xml:
+                value_xml = u'<VALUE.ARRAY>%s</VALUE.ARRAY>' % \
+                    u''.join(array_xml)
+            else:
+                value_xml = u'<VALUE.ARRAY/>'
+
+        else:
+            value_xml = cim_xml._value_str(atomic_to_cim_xml(self.value))
+
+        flavors = [self.propagated, self.overridable, self.tosubclass,
+                   self.toinstance, self.translatable]
+        flavors = [None if f is None else str(f).lower() for f in flavors]
+        attrs = cim_xml._attrs_str([
+            ('NAME', self.name),
+            ('TYPE', self.type),
+            ('PROPAGATED', flavors[0]),
+            ('OVERRIDABLE', flavors[1]),
+            ('TOSUBCLASS', flavors[2]),
+            ('TOINSTANCE', flavors[3]),
+            ('TRANSLATABLE', flavors[4])])
+
+        if value_xml is None:
+            return u'<QUALIFIER%s/>' % attrs
+        return u'<QUALIFIER%s>%s</QUALIFIER>' % (attrs, value_xml)
+
     def tocimxmlstr(self, indent=None):
         """
         *New in pywbem 0.9.*
@@ -6272,6 +7246,8 @@ class CIMQualifier(_CIMComparisonMixin):
             The CIM-XML representation of the object, as a
             :term:`unicode string`.
         """
+        if indent is None:
+            return self._cimxml_str()
         xml_elem = self.tocimxml()
         return tocimxmlstr(xml_elem, indent)
 
@@ -7052,6 +8028,39 @@ def tocimxml(value):
     return cim_xml.VALUE(atomic_to_cim_xml(value))
 
 
+def _tocimxml_str(value):
+    """
+    Return the CIM-XML representation of the input value, as a
+    :term:`unicode string` that is built without creating :term:`Element`
+    objects where possible.
+
+    The result is identical to the result of ``tocimxml(value).toxml()``.
+    `value` must not be `None`.
+    """
+
+    if isinstance(value, (tuple, list)):
+        array_xml = []
+        for v in value:
+            if v is None:
+                if SEND_VALUE_NULL:
+                    array_xml.append(u'<VALUE.NULL/>')
+                else:
+                    array_xml.append(u'<VALUE/>')
+            else:
+                array_xml.append(cim_xml._value_str(atomic_to_cim_xml(v)))
+        if array_xml:
+            return u'<VALUE.ARRAY>%s</VALUE.ARRAY>' % u''.join(array_xml)
+        return u'<VALUE.ARRAY/>'
+
+    if hasattr(value, '_cimxml_str'):
+        return value._cimxml_str()
+
+    if hasattr(value, 'tocimxml'):
+        return _ensure_unicode(value.tocimxml().toxml())
+
+    return cim_xml._value_str(atomic_to_cim_xml(value))
+
+
 def tocimxmlstr(value, indent=None):
     """
     *New in pywbem 0.9.*
@@ -7083,6 +8092,8 @@ def tocimxmlstr(value, indent=None):
 
     if isinstance(value, Element):
         xml_elem = value
+    elif indent is None and value is not None:
+        return _tocimxml_str(value)
     else:
         xml_elem = tocimxml(value)
 
@@ -29,96 +29,100 @@ a WBEM server.
 All WBEM operations defined in :term:`DSP0200` can be issued across this connection.
 Each method of this class corresponds directly to a WBEM operation.
 
-==========================================================  ==============================================================
-WBEMConnection method                                       Purpose
-==========================================================  ==============================================================
-:meth:`~pywbem.WBEMConnection.EnumerateInstances`           Enumerate the instances of a class (including instances of its
-                                                            subclasses)
-:meth:`~pywbem.WBEMConnection.EnumerateInstanceNames`       Enumerate the instance paths of instances of a class
-                                                            (including instances of its subclasses).
-:meth:`~pywbem.WBEMConnection.GetInstance`                  Retrieve an instance
-:meth:`~pywbem.WBEMConnection.ModifyInstance`               Modify the property values of an instance
-:meth:`~pywbem.WBEMConnection.CreateInstance`               Create an instance
-:meth:`~pywbem.WBEMConnection.DeleteInstance`               Delete an instance
-:meth:`~pywbem.WBEMConnection.Associators`                  Retrieve the instances (or classes) associated to a source
-                                                            instance (or source class)
-:meth:`~pywbem.WBEMConnection.AssociatorNames`              Retrieve the instance paths of the instances (or classes)
-                                                            associated to a source instance (or source class)
-:meth:`~pywbem.WBEMConnection.References`                   Retrieve the association instances (or association classes)
-                                                            that reference a source instance (or source class)
-:meth:`~pywbem.WBEMConnection.ReferenceNames`               Retrieve the instance paths of the association instances (or
-                                                            association classes) that reference a source instance (or
-                                                            source class)
-:meth:`~pywbem.WBEMConnection.InvokeMethod`                 Invoke a method on a target instance or on a target class
-:meth:`~pywbem.WBEMConnection.ExecQuery`                    Execute a query in a namespace
-----------------------------------------------------------  --------------------------------------------------------------
-:meth:`~pywbem.WBEMConnection.IterEnumerateInstances`       Iterator API that uses either OpenEnumerateInstances and
-                                                            PullInstancesWithPath or EnumerateInstances depending on
-                                                            the attributes and existence of pull operations in the
-                                                            server.
-:meth:`~pywbem.WBEMConnection.IterEnumerateInstancePaths`   Iterator API that uses either OpenEnumerateInstances and
-                                                            PullInstancesWithPath or EnumerateInstances depending on
-                                                            the attributes and existence of pull operations in the
-                                                            server.
-:meth:`~pywbem.WBEMConnection.IterAssociatorInstances`      Iterator API that uses either OpenAssociatorInstances and
-                                                            PullInstancesWithPath or Associators depending on
-                                                            the attributes and existence of pull operations in the
-                                                            server.
-:meth:`~pywbem.WBEMConnection.IterAssociatorInstancePaths`  Iterator API that uses either OpenAssociatorInstances and
-                                                            PullInstancesWithPath or Associators depending on
-                                                            the attributes and existence of pull operations in the
-                                                            server.
-:meth:`~pywbem.WBEMConnection.IterReferenceInstances`       Iterator API that uses either OpenReferenceInstances and
-                                                            PullInstancesWithPath or References depending on
-                                                            the attributes and existence of pull operations in the
-                                                            server.
-:meth:`~pywbem.WBEMConnection.IterReferenceInstancePaths`   Iterator API that uses either OpenReferenceInstances and
-                                                            PullInstancesWithPath or References depending on
-                                                            the attributes and existence of pull operations in the
-                                                            server.
-:meth:`~pywbem.WBEMConnection.IterQueryInstances`           Iterator API that uses either OpenQueryInstances and
-                                                            PullInstances or ExecQuery depending on
-                                                            the attributes and existence of pull operations in the
-                                                            server.
-----------------------------------------------------------  --------------------------------------------------------------
-:meth:`~pywbem.WBEMConnection.OpenEnumerateInstances`       Open enumeration session to retrieve instances of
-                                                            of a class (including instances of its subclass)
-:meth:`~pywbem.WBEMConnection.OpenEnumerateInstancePaths`   Open enumeration session to retrieve instances of a class
-                                                            (including instances of its subclass)
-:meth:`~pywbem.WBEMConnection.OpenAssociatorInstances`      Open enumeration session to retrieve the instances
-                                                            associated to a source instance
-:meth:`~pywbem.WBEMConnection.OpenAssociatorInstancePaths`  Open enumeration session to retrieve the instances
-                                                            associated to a source instance
-:meth:`~pywbem.WBEMConnection.OpenReferenceInstances`       Open enumeration session to retrieve the instances
-                                                            that reference a source instance
-:meth:`~pywbem.WBEMConnection.OpenReferenceInstancePaths`   Open enumeration session to retrieve the instances that
-                                                            reference a source instance
-:meth:`~pywbem.WBEMConnection.OpenQueryInstances`           Open query request to retrieve instances defined by
-                                                            the query parameter in a namespace
-:meth:`~pywbem.WBEMConnection.PullInstancesWithPath`        Continue enumeration session opened with
-                                                            OpenEnumerateInstances, OpenAssociatorInstances, or
-                                                            OpenReferenceinstances
-:meth:`~pywbem.WBEMConnection.PullInstancePaths`            Continue enumeration session opened with
-                                                            OpenEnumerateInstancePaths, OpenAssociatorInstancePaths,
-                                                            or OpenReferenceInstancePaths
-:meth:`~pywbem.WBEMConnection.PullInstances`                Continue enumeration of enumeration session opened
-                                                            with OpenExecQuery
-:meth:`~pywbem.WBEMConnection.CloseEnumeration`             Close an enumeration session in process.
-----------------------------------------------------------  --------------------------------------------------------------
-:meth:`~pywbem.WBEMConnection.EnumerateClasses`             Enumerate the subclasses of a class, or the top-level classes
-                                                            in a namespace
-:meth:`~pywbem.WBEMConnection.EnumerateClassNames`          Enumerate the names of subclasses of a class, or of the
-                                                            top-level classes in a namespace
-:meth:`~pywbem.WBEMConnection.GetClass`                     Retrieve a class
-:meth:`~pywbem.WBEMConnection.ModifyClass`                  Modify a class
-:meth:`~pywbem.WBEMConnection.CreateClass`                  Create a class
-:meth:`~pywbem.WBEMConnection.DeleteClass`                  Delete a class
-----------------------------------------------------------  --------------------------------------------------------------
-:meth:`~pywbem.WBEMConnection.EnumerateQualifiers`          Enumerate qualifier declarations
-:meth:`~pywbem.WBEMConnection.GetQualifier`                 Retrieve a qualifier declaration
-:meth:`~pywbem.WBEMConnection.SetQualifier`                 Create or modify a qualifier declaration
-:meth:`~pywbem.WBEMConnection.DeleteQualifier`              Delete a qualifier declaration
-==========================================================  ==============================================================
+===========================================================  ==============================================================
+WBEMConnection method                                        Purpose
+===========================================================  ==============================================================
+:meth:`~pywbem.WBEMConnection.EnumerateInstances`            Enumerate the instances of a class (including instances of its
+                                                             subclasses)
+:meth:`~pywbem.WBEMConnection.EnumerateInstanceNames`        Enumerate the instance paths of instances of a class
+                                                             (including instances of its subclasses).
+:meth:`~pywbem.WBEMConnection.GetInstance`                   Retrieve an instance
+:meth:`~pywbem.WBEMConnection.ModifyInstance`                Modify the property values of an instance
+:meth:`~pywbem.WBEMConnection.CreateInstance`                Create an instance
+:meth:`~pywbem.WBEMConnection.DeleteInstance`                Delete an instance
+:meth:`~pywbem.WBEMConnection.Associators`                   Retrieve the instances (or classes) associated to a source
+                                                             instance (or source class)
+:meth:`~pywbem.WBEMConnection.AssociatorNames`               Retrieve the instance paths of the instances (or classes)
+                                                             associated to a source instance (or source class)
+:meth:`~pywbem.WBEMConnection.References`                    Retrieve the association instances (or association classes)
+                                                             that reference a source instance (or source class)
+:meth:`~pywbem.WBEMConnection.ReferenceNames`                Retrieve the instance paths of the association instances (or
+                                                             association classes) that reference a source instance (or
+                                                             source class)
+:meth:`~pywbem.WBEMConnection.InvokeMethod`                  Invoke a method on a target instance or on a target class
+:meth:`~pywbem.WBEMConnection.ExecQuery`                     Execute a query in a namespace
+-----------------------------------------------------------  --------------------------------------------------------------
+:meth:`~pywbem.WBEMConnection.IterEnumerateInstances`        Iterator API that uses either OpenEnumerateInstances and
+                                                             PullInstancesWithPath or EnumerateInstances depending on
+                                                             the attributes and existence of pull operations in the
+                                                             server.
+:meth:`~pywbem.WBEMConnection.IterEnumerateInstancePaths`    Iterator API that uses either OpenEnumerateInstances and
+                                                             PullInstancesWithPath or EnumerateInstances depending on
+                                                             the attributes and existence of pull operations in the
+                                                             server.
+:meth:`~pywbem.WBEMConnection.IterAssociatorInstances`       Iterator API that uses either OpenAssociatorInstances and
+                                                             PullInstancesWithPath or Associators depending on
+                                                             the attributes and existence of pull operations in the
+                                                             server.
+:meth:`~pywbem.WBEMConnection.IterAssociatorInstancePaths`   Iterator API that uses either OpenAssociatorInstances and
+                                                             PullInstancesWithPath or Associators depending on
+                                                             the attributes and existence of pull operations in the
+                                                             server.
+:meth:`~pywbem.WBEMConnection.IterReferenceInstances`        Iterator API that uses either OpenReferenceInstances and
+                                                             PullInstancesWithPath or References depending on
+                                                             the attributes and existence of pull operations in the
+                                                             server.
+:meth:`~pywbem.WBEMConnection.IterReferenceInstancePaths`    Iterator API that uses either OpenReferenceInstances and
+                                                             PullInstancesWithPath or References depending on
+                                                             the attributes and existence of pull operations in the
+                                                             server.
+:meth:`~pywbem.WBEMConnection.IterQueryInstances`            Iterator API that uses either OpenQueryInstances and
+                                                             PullInstances or ExecQuery depending on
+                                                             the attributes and existence of pull operations in the
+                                                             server.
+:meth:`~pywbem.WBEMConnection.StreamEnumerateInstances`      Iterator API that uses EnumerateInstances and parses the
+                                                             response while it is being received.
+:meth:`~pywbem.WBEMConnection.StreamEnumerateInstanceNames`  Iterator API that uses EnumerateInstanceNames and parses the
+                                                             response while it is being received.
+-----------------------------------------------------------  --------------------------------------------------------------
+:meth:`~pywbem.WBEMConnection.OpenEnumerateInstances`        Open enumeration session to retrieve instances of
+                                                             of a class (including instances of its subclass)
+:meth:`~pywbem.WBEMConnection.OpenEnumerateInstancePaths`    Open enumeration session to retrieve instances of a class
+                                                             (including instances of its subclass)
+:meth:`~pywbem.WBEMConnection.OpenAssociatorInstances`       Open enumeration session to retrieve the instances
+                                                             associated to a source instance
+:meth:`~pywbem.WBEMConnection.OpenAssociatorInstancePaths`   Open enumeration session to retrieve the instances
+                                                             associated to a source instance
+:meth:`~pywbem.WBEMConnection.OpenReferenceInstances`        Open enumeration session to retrieve the instances
+                                                             that reference a source instance
+:meth:`~pywbem.WBEMConnection.OpenReferenceInstancePaths`    Open enumeration session to retrieve the instances that
+                                                             reference a source instance
+:meth:`~pywbem.WBEMConnection.OpenQueryInstances`            Open query request to retrieve instances defined by
+                                                             the query parameter in a namespace
+:meth:`~pywbem.WBEMConnection.PullInstancesWithPath`         Continue enumeration session opened with
+                                                             OpenEnumerateInstances, OpenAssociatorInstances, or
+                                                             OpenReferenceinstances
+:meth:`~pywbem.WBEMConnection.PullInstancePaths`             Continue enumeration session opened with
+                                                             OpenEnumerateInstancePaths, OpenAssociatorInstancePaths,
+                                                             or OpenReferenceInstancePaths
+:meth:`~pywbem.WBEMConnection.PullInstances`                 Continue enumeration of enumeration session opened
+                                                             with OpenExecQuery
+:meth:`~pywbem.WBEMConnection.CloseEnumeration`              Close an enumeration session in process.
+-----------------------------------------------------------  --------------------------------------------------------------
+:meth:`~pywbem.WBEMConnection.EnumerateClasses`              Enumerate the subclasses of a class, or the top-level classes
+                                                             in a namespace
+:meth:`~pywbem.WBEMConnection.EnumerateClassNames`           Enumerate the names of subclasses of a class, or of the
+                                                             top-level classes in a namespace
+:meth:`~pywbem.WBEMConnection.GetClass`                      Retrieve a class
+:meth:`~pywbem.WBEMConnection.ModifyClass`                   Modify a class
+:meth:`~pywbem.WBEMConnection.CreateClass`                   Create a class
+:meth:`~pywbem.WBEMConnection.DeleteClass`                   Delete a class
+-----------------------------------------------------------  --------------------------------------------------------------
+:meth:`~pywbem.WBEMConnection.EnumerateQualifiers`           Enumerate qualifier declarations
+:meth:`~pywbem.WBEMConnection.GetQualifier`                  Retrieve a qualifier declaration
+:meth:`~pywbem.WBEMConnection.SetQualifier`                  Create or modify a qualifier declaration
+:meth:`~pywbem.WBEMConnection.DeleteQualifier`               Delete a qualifier declaration
+===========================================================  ==============================================================
 
 NOTE: The method EnumerationCount is to be deprecated from the DMTF specs
 and has not been implemented by any WBEM servers so was not implemented
@@ -134,6 +138,8 @@ from __future__ import absolute_import
 
 import os
 import re
+import threading
+from contextlib import closing
 from datetime import datetime, timedelta
 from xml.dom import minidom
 import warnings
@@ -148,12 +154,14 @@ from .cim_constants import DEFAULT_NAMESPACE, CIM_ERR_INVALID_PARAMETER, \
 from .cim_types import CIMType, CIMDateTime, atomic_to_cim_xml
 from ._nocasedict import NocaseDict
 from .cim_obj import CIMInstance, CIMInstanceName, CIMClass, CIMClassName, \
-    CIMParameter, tocimxml, cimvalue
-from .cim_http import get_cimobject_header, wbem_request
-from .tupleparse import parse_cim
-from .tupletree import xml_to_tupletree_sax
+    CIMParameter, CompactCIMInstance, cimvalue, _tocimxml_str
+from .cim_http import get_cimobject_header, wbem_request, \
+    HTTPConnectionPool
+from ._schema_cache import CACHED_OPERATIONS, INVALIDATING_OPERATIONS
+from .tupleparse import parse_cim, parse_any
+from .tupletree import xml_to_tupletree_sax, IncrementalTupleTreeParser
 from .cim_http import parse_url
-from .exceptions import ParseError, CIMError
+from .exceptions import ParseError, CIMError, HTTPError
 from ._statistics import Statistics
 from ._recorder import LogOperationRecorder
 from ._logging import DEFAULT_LOG_DETAIL_LEVEL, LOG_DESTINATIONS, \
@@ -183,6 +191,17 @@ pull_query_result_tuple = namedtuple("pull_query_result_tuple",
                                      ["instances", "eos", "context",
                                       "query_result_class"])
 
+# Intrinsic operations that do not change the state of the WBEM server, so
+# that their requests can be retried after the server has closed a pooled
+# connection without returning a response. The pull operations are not
+# included, because they change the state of the enumeration context.
+_IDEMPOTENT_OPERATIONS = (
+    'GetClass', 'EnumerateClasses', 'EnumerateClassNames', 'GetInstance',
+    'EnumerateInstances', 'EnumerateInstanceNames', 'Associators',
+    'AssociatorNames', 'References', 'ReferenceNames', 'ExecQuery',
+    'GetQualifier', 'EnumerateQualifiers', 'GetProperty',
+)
+
 
 def _to_pretty_xml(xml_string):
     """
@@ -273,11 +292,16 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
     default namespace (this allows omitting the namespace on subsequent
     operations).
 
-    As usual in HTTP, there is no persistent TCP connection; the connectedness
+    By default, there is no persistent TCP connection; the connectedness
     provided by this class is only conceptual. That is, the creation of the
     connection object does not cause any interaction with the WBEM server, and
     each subsequent WBEM operation performs an independent, state-less
-    HTTP/HTTPS request.
+    HTTP/HTTPS request. If the `keep_alive` init parameter is `True`, the
+    connection object maintains a pool of persistent HTTP/1.1 connections to
+    the WBEM server that are reused by subsequent WBEM operations, which saves
+    the TCP connection setup and TLS handshake for each operation. In that
+    case, :meth:`~pywbem.WBEMConnection.close` should be called when the
+    connection object is no longer needed.
 
     After creating a :class:`~pywbem.WBEMConnection` object, various methods
     may be called on the object, which cause WBEM operations to be issued to
@@ -372,7 +396,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
     def __init__(self, url, creds=None, default_namespace=DEFAULT_NAMESPACE,
                  x509=None, verify_callback=None, ca_certs=None,
                  no_verification=False, timeout=None, use_pull_operations=False,
-                 stats_enabled=False):
+                 stats_enabled=False, keep_alive=False, iter_prefetch=0,
+                 compact_instances=False, schema_cache=None, compression=None):
         # pylint: disable=line-too-long
         """
         Parameters:
@@ -607,6 +632,115 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
             WBEM operations executed via this connection. See the
 
             :ref:`WBEM operation statistics` section for details.
+
+          keep_alive (:class:`py:bool`):
+            *New in pywbem 0.13.*
+
+            Controls the use of persistent HTTP/1.1 connections to the WBEM
+            server.
+
+            If `True`, the connection object maintains a bounded pool of
+            persistent connections per target and TLS settings. Connections
+            are reused by subsequent operations as long as the WBEM server
+            keeps them open. Idle connections are closed after
+            :data:`~pywbem.cim_http.DEFAULT_POOL_IDLE_TIMEOUT` seconds, and
+            a request on a connection that the WBEM server closed in the mean
+            time is transparently retried on a new connection. Requests that
+            were sent completely are retried only for operations that do not
+            change the state of the WBEM server (e.g. `GetInstance`), because
+            the WBEM server may have performed the operation already. This
+            also applies to connections using a file URL (Unix domain socket).
+
+            If `False` (default), each operation uses a new HTTP connection
+            that is closed after the response has been received.
+
+          iter_prefetch (:term:`integer`):
+            *New in pywbem 0.13 as experimental.*
+
+            Prefetch depth for the pull operations issued by the `Iter...()`
+            methods that return generators, i.e. the maximum number of pull
+            responses that are requested ahead of the response whose objects
+            are currently being consumed by the caller.
+
+            If positive, the pull operations of an enumeration session are
+            performed on a background thread, so that the next pull request
+            is in flight while the caller processes the objects of the
+            current one. The enumeration session is closed with
+            :meth:`~pywbem.WBEMConnection.CloseEnumeration` when the
+            generator is closed early, after any pull request still in flight
+            has completed. An exception raised by a prefetched pull operation
+            is raised to the caller when the caller reaches that point of the
+            enumeration. Prefetching is not performed while operation
+            recorders (including logging) are active on the connection, so
+            that the recorded operations remain in sequence.
+
+            While a pull operation is in flight on the background thread, the
+            caller may continue to use the connection for other operations,
+            but the `last_...` attributes of the connection may then reflect
+            the prefetched pull operation.
+
+            0 (default) means that the pull operations are performed on
+            demand by the thread iterating the generator.
+
+          compact_instances (:class:`py:bool`):
+            *New in pywbem 0.13 as experimental.*
+
+            Controls whether the CIM instances returned by the operations are
+            represented in a compact form, for reducing the memory used by
+            large result sets.
+
+            If `True`, the operations return
+            :class:`~pywbem.CompactCIMInstance` objects instead of
+            :class:`~pywbem.CIMInstance` objects (except for instances that
+            have qualifiers on their property values). The instances of a
+            response are converted after the response has been parsed, so the
+            full representation of the instances of one response still exists
+            temporarily. The property schemas of the compact instances are
+            shared across all operations of the connection.
+
+            Embedded instances in property values, method parameters and
+            return values are not converted.
+
+            If `False` (default), the operations return
+            :class:`~pywbem.CIMInstance` objects.
+
+          schema_cache (:class:`~pywbem.SchemaCache`):
+            *New in pywbem 0.13 as experimental.*
+
+            Cache for the class declarations and qualifier declarations
+            retrieved by this connection. The same cache object may be used
+            by multiple connections. See :class:`~pywbem.SchemaCache` for the
+            operations that are served from the cache and the operations that
+            invalidate it.
+
+            An operation that is served from the cache does not send a request
+            to the WBEM server. It is counted in the statistics of the
+            connection and recorded by the operation recorders like other
+            operations, but with request and reply lengths of 0 and without
+            HTTP request and response.
+
+            `None` (default) means that no cache is used.
+
+          compression (:term:`string`):
+            *New in pywbem 0.13 as experimental.*
+
+            HTTP content coding for compressing the CIM-XML messages exchanged
+            with the WBEM server, which typically reduces their size by a
+            factor of 10 or more. Valid values are 'gzip' and 'deflate'.
+
+            If not `None`, the request bodies are compressed with that content
+            coding, and the requests advertise that the WBEM server may
+            compress the response bodies with gzip or deflate. The WBEM server
+            must support compressed requests. Compressed response bodies are
+            decompressed while being received. The sizes, ratio and time of
+            the compression are measured in the statistics of the connection
+            (see :class:`~pywbem.OperationStatistic`).
+
+            The request and reply lengths of the connection (e.g.
+            :attr:`~pywbem.WBEMConnection.last_request_len`) are the sizes of
+            the uncompressed CIM-XML messages.
+
+            `None` (default) means that the messages are not compressed.
         """  # noqa: E501
         # pylint: enable=line-too-long
 
@@ -655,6 +789,33 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
 
         self._statistics = Statistics(stats_enabled)
         self._last_operation_time = None
+
+        # Pool of persistent HTTP connections, or None
+        self._pool = HTTPConnectionPool() if keep_alive else None
+
+        # Status of using multiple operation requests in ExecuteBatch():
+        # None means not yet known.
+        self._use_multi_requests = None
+
+        if iter_prefetch < 0:
+            raise ValueError("iter_prefetch must not be negative, but is: %r" %
+                             iter_prefetch)
+        self._iter_prefetch = iter_prefetch
+
+        # Property schemas shared by the compact instances, or None
+        self._compact_schemas = {} if compact_instances else None
+
+        self._schema_cache = schema_cache
+
+        if compression not in (None, 'gzip', 'deflate'):
+            raise ValueError("Invalid value for compression: %r, must be "
+                             "None, 'gzip' or 'deflate'" % compression)
+        self._compression = compression
+
+        # Measurements for the compressed bodies of the last operation, as a
+        # list of uncompressed size, compressed size and compression time
+        self._last_compression_stats = [0, 0, 0.0]
+
         self._last_server_response_time = None
 
         if self._activate_logging:
@@ -1047,6 +1208,75 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         """
         return self._use_pull_operations
 
+    @property
+    def keep_alive(self):
+        """
+        *New in pywbem 0.13.*
+
+        :class:`py:bool`: Indicates whether persistent HTTP connections to the
+        WBEM server are used.
+
+        For details, see the description of the same-named constructor
+        parameter of :class:`~pywbem.WBEMConnection`.
+        """
+        return self._pool is not None
+
+    @property
+    def iter_prefetch(self):
+        """
+        *New in pywbem 0.13 as experimental.*
+
+        :term:`integer`: Prefetch depth for the pull operations issued by the
+        `Iter...()` methods that return generators. 0 means that no
+        prefetching is performed.
+
+        For details, see the description of the same-named constructor
+        parameter of :class:`~pywbem.WBEMConnection`.
+        """
+        return self._iter_prefetch
+
+    @property
+    def compact_instances(self):
+        """
+        *New in pywbem 0.13 as experimental.*
+
+        :class:`py:bool`: Indicates whether the CIM instances returned by the
+        operations are represented as :class:`~pywbem.CompactCIMInstance`
+        objects.
+
+        For details, see the description of the same-named constructor
+        parameter of :class:`~pywbem.WBEMConnection`.
+        """
+        return self._compact_schemas is not None
+
+    @property
+    def schema_cache(self):
+        """
+        *New in pywbem 0.13 as experimental.*
+
+        :class:`~pywbem.SchemaCache`: Cache for the class declarations and
+        qualifier declarations retrieved by this connection, or `None` if no
+        cache is used.
+
+        For details, see the description of the same-named constructor
+        parameter of :class:`~pywbem.WBEMConnection`.
+        """
+        return self._schema_cache
+
+    @property
+    def compression(self):
+        """
+        *New in pywbem 0.13 as experimental.*
+
+        :term:`string`: HTTP content coding for compressing the CIM-XML
+        messages exchanged with the WBEM server ('gzip' or 'deflate'), or
+        `None` if the messages are not compressed.
+
+        For details, see the description of the same-named constructor
+        parameter of :class:`~pywbem.WBEMConnection`.
+        """
+        return self._compression
+
     @property
     def debug(self):
         """
@@ -1214,12 +1444,30 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         return "%s(url=%r, creds=%s, conn_id=%s, " \
                "default_namespace=%r, x509=%s, verify_callback=%r, " \
                "ca_certs=%r, no_verification=%r, timeout=%r, " \
-               "use_pull_operations=%r, stats_enabled=%r, recorders=%s)" % \
+               "use_pull_operations=%r, stats_enabled=%r, recorders=%s, " \
+               "keep_alive=%r, iter_prefetch=%r, compact_instances=%r, " \
+               "schema_cache=%r, compression=%r)" % \
                (self.__class__.__name__, self.url, creds_repr,
                 self.conn_id, self.default_namespace, x509_repr,
                 self.verify_callback, self.ca_certs, self.no_verification,
                 self.timeout, self.use_pull_operations, self.stats_enabled,
-                recorder_list)
+                recorder_list, self.keep_alive, self.iter_prefetch,
+                self.compact_instances, self.schema_cache, self.compression)
+
+    def close(self):
+        """
+        *New in pywbem 0.13.*
+
+        Close the persistent HTTP connections to the WBEM server that are
+        currently idle.
+
+        This only has an effect if the connection object uses persistent
+        connections (see the `keep_alive` init parameter). The connection
+        object can still be used after this method has been called; the next
+        operation will then open a new HTTP connection.
+        """
+        if self._pool is not None:
+            self._pool.close()
 
     @classmethod
     def _configure_logger(cls, simple_name, log_dest, detail_level,
@@ -1559,7 +1807,139 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
     def _imethodcall(self, methodname, namespace, response_params_rqd=None,
                      **params):
         """
-        Perform an intrinsic CIM-XML operation.
+        Perform an intrinsic CIM-XML operation, using the schema cache of the
+        connection for the operations it applies to.
+        """
+        cache = self._schema_cache
+        if cache is not None:
+            if methodname in CACHED_OPERATIONS:
+                user = self.creds[0] if self.creds else None
+                objects = cache.lookup(self.url, namespace, methodname, params,
+                                       user)
+                if objects is not None:
+                    for recorder in self._operation_recorders:
+                        recorder.stage_schema_cache_hit(self.conn_id,
+                                                        self.url, namespace)
+                    self._last_request_len = 0
+                    self._last_reply_len = 0
+                    self._last_server_response_time = None
+                    self._last_compression_stats = [0, 0, 0.0]
+                    if self.debug:
+                        self._last_raw_request = None
+                        self._last_request = None
+                        self._last_raw_reply = None
+                        self._last_reply = None
+                    return [(u'IRETURNVALUE', {}, objects)]
+                result = self._imethodcall_server(
+                    methodname, namespace, response_params_rqd, **params)
+                cache.store(self.url, namespace, methodname, params,
+                            result[0][2] if result else [], user)
+                return result
+            if methodname in INVALIDATING_OPERATIONS:
+                try:
+                    return self._imethodcall_server(
+                        methodname, namespace, response_params_rqd,
+                        **params)
+                finally:
+                    cache.invalidate(self.url, namespace)
+        return self._imethodcall_server(methodname, namespace,
+                                        response_params_rqd, **params)
+
+    def _imethodcall_server(self, methodname, namespace,
+                            response_params_rqd=None, **params):
+        """
+        Perform an intrinsic CIM-XML operation against the WBEM server.
+        """
+
+        cimxml_headers, request_data = self._imethodcall_request(
+            methodname, namespace, **params)
+
+        reply_xml, self._last_server_response_time = wbem_request(
+            self.url, request_data, self.creds, cimxml_headers,
+            x509=self.x509,
+            verify_callback=self.verify_callback,
+            ca_certs=self.ca_certs,
+            no_verification=self.no_verification,
+            timeout=self.timeout,
+            debug=self.debug,
+            recorders=self._operation_recorders,
+            conn_id=self.conn_id,
+            pool=self._pool,
+            compression=self._compression,
+            compression_stats=self._last_compression_stats,
+            idempotent=methodname in _IDEMPOTENT_OPERATIONS)
+
+        self._last_reply_len = len(reply_xml)
+
+        # Set the raw response before parsing (which can fail)
+        if self.debug:
+            self._last_raw_reply = bytes(reply_xml)
+
+        # Parse the XML into a tuple tree (may raise ParseError), and release
+        # the response data before the CIM objects are created:
+        tt_ = xml_to_tupletree_sax(reply_xml, "CIM-XML response")
+        del reply_xml
+        tup_tree = parse_cim(tt_)
+
+        # Set the pretty response after parsing (it could fail otherwise)
+        if self.debug:
+            self._last_reply = _to_pretty_xml(self._last_raw_reply)
+
+        return self._compact_result(
+            self._imethodcall_result(methodname, tup_tree,
+                                     response_params_rqd))
+
+    def _imethodcall_iter(self, methodname, namespace, **params):
+        """
+        Perform an intrinsic CIM-XML operation and return a generator that
+        parses the response while it is being received, and that yields the
+        CIM objects in its IRETURNVALUE element one by one.
+
+        Only the CIM object being yielded and the XML data of one chunk of
+        the response are held in memory, regardless of the size of the
+        response. Errors returned by the WBEM server (ERROR element) are
+        raised as :exc:`~pywbem.CIMError` when reaching the end of the
+        response.
+
+        The debug and operation recorder support of this class is not
+        available for this method, because it requires the complete response.
+        """
+
+        cimxml_headers, request_data = self._imethodcall_request(
+            methodname, namespace, **params)
+
+        chunks, self._last_server_response_time = wbem_request(
+            self.url, request_data, self.creds, cimxml_headers,
+            x509=self.x509,
+            verify_callback=self.verify_callback,
+            ca_certs=self.ca_certs,
+            no_verification=self.no_verification,
+            timeout=self.timeout,
+            debug=self.debug,
+            conn_id=self.conn_id,
+            pool=self._pool,
+            stream=True,
+            compression=self._compression,
+            compression_stats=self._last_compression_stats,
+            idempotent=methodname in _IDEMPOTENT_OPERATIONS)
+
+        parser = IncrementalTupleTreeParser("CIM-XML response")
+        try:
+            for chunk in chunks:
+                self._last_reply_len += len(chunk)
+                for tt_ in parser.feed(chunk):
+                    yield self._compact_object(parse_any(tt_))
+            tup_tree = parse_cim(parser.close())
+        finally:
+            chunks.close()
+
+        self._imethodcall_result(methodname, tup_tree)
+
+    def _imethodcall_request(self, methodname, namespace, **params):
+        """
+        Create the HTTP extension headers and the CIM-XML request data for an
+        intrinsic CIM-XML operation, and reset the request and reply
+        information of this connection.
         """
 
         # Create HTTP extension headers for CIM-XML.
@@ -1572,64 +1952,86 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
             ('CIMObject', get_cimobject_header(namespace)),
         ]
 
-        # Create parameter list
+        # Build XML request. The XML string is built directly, because
+        # creating the XML request as minidom elements is expensive for
+        # large requests (e.g. CreateInstance, ModifyInstance).
 
-        plist = [cim_xml.IPARAMVALUE(x[0], tocimxml(x[1]))
-                 for x in params.items() if x[1] is not None]
+        request_data = cim_xml._message_str(
+            u'<SIMPLEREQ>%s</SIMPLEREQ>' % cim_xml._imethodcall_str(
+                methodname,
+                namespace,
+                [(x[0], _tocimxml_str(x[1]))
+                 for x in params.items() if x[1] is not None]),
+            '1001', '1.0', '2.0', '2.0')
 
-        # Build XML request
+        self._reset_request_info(request_data)
 
-        req_xml = cim_xml.CIM(
-            cim_xml.MESSAGE(
-                cim_xml.SIMPLEREQ(
-                    cim_xml.IMETHODCALL(
-                        methodname,
-                        cim_xml.LOCALNAMESPACEPATH(
-                            [cim_xml.NAMESPACE(ns)
-                             for ns in namespace.split('/')]),
-                        plist)),
-                '1001', '1.0'),
-            '2.0', '2.0')
+        return cimxml_headers, request_data
 
+    def _reset_request_info(self, request_data):
+        """
+        Set the request information of this connection for the CIM-XML
+        request data, and reset its reply information.
+        """
         if self.debug:
-            self._last_raw_request = req_xml.toxml()
-            self._last_request = req_xml.toprettyxml(indent='  ')
+            self._last_raw_request = request_data
+            self._last_request = minidom.parseString(
+                request_data.encode('utf-8')).documentElement.toprettyxml(
+                    indent='  ')
             # Reset replies in case we fail before they are set
             self._last_raw_reply = None
             self._last_reply = None
 
-        # Send request and receive response
-        self._last_request_len = 0
+        # Reset request and reply information
+        self._last_request_len = len(request_data)
         self._last_reply_len = 0
         self._last_server_response_time = None
+        self._last_compression_stats = [0, 0, 0.0]
 
-        request_data = req_xml.toxml()
-        self._last_request_len = len(request_data)
-
-        reply_xml, self._last_server_response_time = wbem_request(
-            self.url, request_data, self.creds, cimxml_headers,
-            x509=self.x509,
-            verify_callback=self.verify_callback,
-            ca_certs=self.ca_certs,
-            no_verification=self.no_verification,
-            timeout=self.timeout,
-            debug=self.debug,
-            recorders=self._operation_recorders,
-            conn_id=self.conn_id)
-
-        self._last_reply_len = len(reply_xml)
+    def _compact_object(self, obj):
+        """
+        Return a parsed object of the IRETURNVALUE element of a response,
+        with a CIM instance in it converted to a
+        :class:`~pywbem.CompactCIMInstance` object if compact instances are
+        enabled for this connection.
 
-        # Set the raw response before parsing (which can fail)
-        if self.debug:
-            self._last_raw_reply = reply_xml
+        The object may be a CIM instance, or a tuple (name, attrs, object) for
+        the VALUE.OBJECTWITHPATH and similar elements.
+        """
+        schemas = self._compact_schemas
+        if schemas is None:
+            return obj
+        if isinstance(obj, CIMInstance):
+            return CompactCIMInstance.from_instance(obj, schemas)
+        if isinstance(obj, tuple) and len(obj) == 3 and \
+                isinstance(obj[2], CIMInstance):
+            return (obj[0], obj[1],
+                    CompactCIMInstance.from_instance(obj[2], schemas))
+        return obj
 
-        # Parse the XML into a tuple tree (may raise ParseError):
-        tt_ = xml_to_tupletree_sax(reply_xml, "CIM-XML response")
-        tup_tree = parse_cim(tt_)
+    def _compact_result(self, result):
+        """
+        Convert the CIM instances in the IRETURNVALUE elements of the result of
+        :meth:`~pywbem.WBEMConnection._imethodcall_result` in place to
+        :class:`~pywbem.CompactCIMInstance` objects if compact instances are
+        enabled for this connection, and return the result.
+        """
+        if self._compact_schemas is None or not result:
+            return result
+        for elem in result:
+            if elem[0] == 'IRETURNVALUE' and isinstance(elem[2], list):
+                values = elem[2]
+                for i, obj in enumerate(values):
+                    values[i] = self._compact_object(obj)
+        return result
 
-        # Set the pretty response after parsing (it could fail otherwise)
-        if self.debug:
-            self._last_reply = _to_pretty_xml(reply_xml)
+    @staticmethod
+    def _imethodcall_result(methodname, tup_tree, response_params_rqd=None):
+        """
+        Check the parsed tuple tree of the CIM-XML response of an intrinsic
+        operation, raise CIMError if it is an error response, and return the
+        content of its IMETHODRESPONSE element.
+        """
 
         # Check the tuple tree
 
@@ -1644,6 +2046,17 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         if tup_tree[0] != 'SIMPLERSP':
             raise ParseError('Expecting SIMPLERSP element, got %s' %
                              tup_tree[0])
+
+        return WBEMConnection._simplersp_result(methodname, tup_tree,
+                                                response_params_rqd)
+
+    @staticmethod
+    def _simplersp_result(methodname, tup_tree, response_params_rqd=None):
+        """
+        Check the parsed tuple tree of a SIMPLERSP element with the response
+        of an intrinsic operation, raise CIMError if it is an error response,
+        and return the content of its IMETHODRESPONSE element.
+        """
         tup_tree = tup_tree[2]
 
         if tup_tree[0] != 'IMETHODRESPONSE':
@@ -1717,6 +2130,49 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
           **params: CIM method input parameters, for details see InvokeMethod().
         """
 
+        cimxml_headers, request_data = self._methodcall_request(
+            methodname, objectname, Params, **params)
+
+        reply_xml, self._last_server_response_time = wbem_request(
+            self.url, request_data, self.creds, cimxml_headers,
+            x509=self.x509,
+            verify_callback=self.verify_callback,
+            ca_certs=self.ca_certs,
+            no_verification=self.no_verification,
+            timeout=self.timeout,
+            debug=self.debug,
+            recorders=self._operation_recorders,
+            conn_id=self.conn_id,
+            pool=self._pool,
+            compression=self._compression,
+            compression_stats=self._last_compression_stats)
+
+        self._last_reply_len = len(reply_xml)
+
+        # Set the raw response before parsing (which can fail)
+        if self.debug:
+            self._last_raw_reply = bytes(reply_xml)
+
+        # Parse the XML into a tuple tree (may raise ParseError), and release
+        # the response data before the CIM objects are created:
+        tt_ = xml_to_tupletree_sax(reply_xml, "CIM-XML response")
+        del reply_xml
+        tup_tree = parse_cim(tt_)
+
+        # Set the pretty response after parsing (it could fail otherwise)
+        if self.debug:
+            self._last_reply = _to_pretty_xml(self._last_raw_reply)
+
+        return self._methodcall_result(methodname, tup_tree)
+
+    def _methodcall_request(self, methodname, objectname, Params=None,
+                            **params):
+        """
+        Create the HTTP extension headers and the CIM-XML request data for an
+        extrinsic CIM-XML method call, and reset the request and reply
+        information of this connection.
+        """
+
         if isinstance(objectname, (CIMInstanceName, CIMClassName)):
             localobject = objectname.copy()
             if localobject.namespace is None:
@@ -1835,39 +2291,25 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
             self._last_raw_reply = None
             self._last_reply = None
 
-        # Send request and receive response
+        # Reset request and reply information
 
         self._last_request_len = 0
         self._last_reply_len = 0
         self._last_server_response_time = None
+        self._last_compression_stats = [0, 0, 0.0]
 
         request_data = req_xml.toxml()
         self._last_request_len = len(request_data)
 
-        reply_xml, self._last_server_response_time = wbem_request(
-            self.url, request_data, self.creds, cimxml_headers,
-            x509=self.x509,
-            verify_callback=self.verify_callback,
-            ca_certs=self.ca_certs,
-            no_verification=self.no_verification,
-            timeout=self.timeout,
-            debug=self.debug,
-            recorders=self._operation_recorders,
-            conn_id=self.conn_id)
-
-        self._last_reply_len = len(reply_xml)
-
-        # Set the raw response before parsing (which can fail)
-        if self.debug:
-            self._last_raw_reply = reply_xml
+        return cimxml_headers, request_data
 
-        # Parse the XML into a tuple tree (may raise ParseError):
-        tt_ = xml_to_tupletree_sax(reply_xml, "CIM-XML response")
-        tup_tree = parse_cim(tt_)
-
-        # Set the pretty response after parsing (it could fail otherwise)
-        if self.debug:
-            self._last_reply = _to_pretty_xml(reply_xml)
+    @staticmethod
+    def _methodcall_result(methodname, tup_tree):
+        """
+        Check the parsed tuple tree of the CIM-XML response of an extrinsic
+        method call, raise CIMError if it is an error response, and return
+        the return value and output parameters.
+        """
 
         # Check the tuple tree
 
@@ -2020,6 +2462,80 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
                             'got: %s' % type(instancename))
         return instancename
 
+    def _iter_pull_results(self, pull_result, pull_method, MaxObjectCount):
+        # pylint: disable=invalid-name
+        """
+        Generator that yields the result tuple of an open operation and then
+        the result tuples of the subsequent pull operations of the
+        enumeration session, until end of sequence.
+
+        The pull operations are performed using `pull_method` (e.g.
+        PullInstancesWithPath), on a background thread if the prefetch depth
+        of the connection is positive.
+
+        If the generator is closed before end of sequence, or if a pull
+        operation fails, the enumeration session is closed using the
+        enumeration context of the last successful open or pull operation.
+        """
+        prefetch = self._iter_prefetch
+        if not prefetch or self._operation_recorders:
+            try:
+                yield pull_result
+                while not pull_result.eos:
+                    pull_result = pull_method(pull_result.context,
+                                              MaxObjectCount=MaxObjectCount)
+                    yield pull_result
+            finally:
+                if not pull_result.eos:
+                    self.CloseEnumeration(pull_result.context)
+            return
+
+        # Results of the pull operations, as tuples (result, exc)
+        results = six.moves.queue.Queue()
+        # Limits the pull operations issued ahead of the caller
+        slots = threading.Semaphore(prefetch)
+        # Last successful result, and flag to stop pulling
+        state = {'last': pull_result, 'stop': False}
+
+        def pull_worker():
+            """Perform the pull operations until end of sequence."""
+            result = pull_result
+            while not result.eos:
+                slots.acquire()
+                if state['stop']:
+                    return
+                try:
+                    result = pull_method(result.context,
+                                         MaxObjectCount=MaxObjectCount)
+                except Exception as exc:  # pylint: disable=broad-except
+                    results.put((None, exc))
+                    return
+                state['last'] = result
+                results.put((result, None))
+
+        worker = None
+        if not pull_result.eos:
+            worker = threading.Thread(target=pull_worker)
+            worker.daemon = True
+            worker.start()
+        try:
+            yield pull_result
+            while not pull_result.eos:
+                pull_result, exc = results.get()
+                slots.release()
+                if exc is not None:
+                    raise exc
+                yield pull_result
+        finally:
+            if worker is not None:
+                # Stop the worker and wait for a pull still in flight, so
+                # that the session is closed with the latest context
+                state['stop'] = True
+                slots.release()
+                worker.join()
+            if not state['last'].eos:
+                self.CloseEnumeration(state['last'].context)
+
     @staticmethod
     def _get_rslt_params(result, namespace):
         """Common processing for pull results to separate
@@ -2250,7 +2766,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(instances, exc)
 
@@ -2347,10 +2864,174 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(instancenames, exc)
 
+    def StreamEnumerateInstances(self, ClassName, namespace=None,
+                                 LocalOnly=None, DeepInheritance=None,
+                                 IncludeQualifiers=None,
+                                 IncludeClassOrigin=None, PropertyList=None,
+                                 **extra):
+        # pylint: disable=invalid-name,line-too-long
+        """
+        *New in pywbem 0.13 as experimental.*
+
+        Enumerate the instances of a class (including instances of its
+        subclasses) in a namespace, parsing the response while it is being
+        received and using the Python :term:`py:generator` idiom to return
+        the result.
+
+        This method performs the EnumerateInstances operation
+        (see :term:`DSP0200`), like
+        :meth:`~pywbem.WBEMConnection.EnumerateInstances`. However, each
+        instance is yielded as soon as its VALUE.NAMEDINSTANCE element has
+        been received, so that only one instance (and one chunk of the
+        response data) is held in memory at any time, regardless of the
+        size of the response. This is useful for very large responses from
+        WBEM servers that do not support pull operations.
+
+        If the WBEM server returns an error, :exc:`~pywbem.CIMError` is raised
+        when the generator reaches the end of the response.
+
+        If debug is enabled for the connection, or if operation recorders are
+        enabled, the complete response is needed, and this method simply
+        iterates over the result of
+        :meth:`~pywbem.WBEMConnection.EnumerateInstances`.
+
+        The parameters are the same as for
+        :meth:`~pywbem.WBEMConnection.EnumerateInstances`.
+
+        Returns:
+
+          :term:`py:generator` iterating :class:`~pywbem.CIMInstance`:
+          A generator object that iterates the resulting CIM instances.
+          These instances include an instance path that has its namespace
+          component set.
+
+        Raises:
+
+            Exceptions described in :class:`~pywbem.WBEMConnection`.
+        """  # noqa: E501
+
+        if self.debug or self._operation_recorders:
+            for instance in self.EnumerateInstances(
+                    ClassName, namespace=namespace, LocalOnly=LocalOnly,
+                    DeepInheritance=DeepInheritance,
+                    IncludeQualifiers=IncludeQualifiers,
+                    IncludeClassOrigin=IncludeClassOrigin,
+                    PropertyList=PropertyList, **extra):
+                yield instance
+            return
+
+        exc = None
+        method_name = 'EnumerateInstances'
+
+        try:
+            stats = self.statistics.start_timer(method_name)
+            if namespace is None and isinstance(ClassName, CIMClassName):
+                namespace = ClassName.namespace
+            namespace = self._iparam_namespace_from_namespace(namespace)
+            classname = self._iparam_classname(ClassName)
+            PropertyList = _iparam_propertylist(PropertyList)
+
+            for instance in self._imethodcall_iter(
+                    method_name,
+                    namespace,
+                    ClassName=classname,
+                    LocalOnly=LocalOnly,
+                    DeepInheritance=DeepInheritance,
+                    IncludeQualifiers=IncludeQualifiers,
+                    IncludeClassOrigin=IncludeClassOrigin,
+                    PropertyList=PropertyList,
+                    **extra):
+                instance.path.namespace = namespace
+                yield instance
+
+        except Exception as exce:
+            exc = exce
+            raise
+        finally:
+            self._last_operation_time = stats.stop_timer(
+                self.last_request_len, self.last_reply_len,
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
+
+    def StreamEnumerateInstanceNames(self, ClassName, namespace=None,
+                                     **extra):
+        # pylint: disable=invalid-name,line-too-long
+        """
+        *New in pywbem 0.13 as experimental.*
+
+        Enumerate the instance paths of instances of a class (including
+        instances of its subclasses) in a namespace, parsing the response
+        while it is being received and using the Python :term:`py:generator`
+        idiom to return the result.
+
+        This method performs the EnumerateInstanceNames operation
+        (see :term:`DSP0200`), like
+        :meth:`~pywbem.WBEMConnection.EnumerateInstanceNames`. However, each
+        instance path is yielded as soon as its INSTANCENAME element has
+        been received, so that only one instance path (and one chunk of the
+        response data) is held in memory at any time, regardless of the size
+        of the response.
+
+        If the WBEM server returns an error, :exc:`~pywbem.CIMError` is raised
+        when the generator reaches the end of the response.
+
+        If debug is enabled for the connection, or if operation recorders are
+        enabled, the complete response is needed, and this method simply
+        iterates over the result of
+        :meth:`~pywbem.WBEMConnection.EnumerateInstanceNames`.
+
+        The parameters are the same as for
+        :meth:`~pywbem.WBEMConnection.EnumerateInstanceNames`.
+
+        Returns:
+
+          :term:`py:generator` iterating :class:`~pywbem.CIMInstanceName`:
+          A generator object that iterates the resulting instance paths.
+          These instance paths have their namespace component set.
+
+        Raises:
+
+            Exceptions described in :class:`~pywbem.WBEMConnection`.
+        """
+
+        if self.debug or self._operation_recorders:
+            for instancename in self.EnumerateInstanceNames(
+                    ClassName, namespace=namespace, **extra):
+                yield instancename
+            return
+
+        exc = None
+        method_name = 'EnumerateInstanceNames'
+
+        try:
+            stats = self.statistics.start_timer(method_name)
+            if namespace is None and isinstance(ClassName, CIMClassName):
+                namespace = ClassName.namespace
+            namespace = self._iparam_namespace_from_namespace(namespace)
+            classname = self._iparam_classname(ClassName)
+
+            for instancename in self._imethodcall_iter(
+                    method_name,
+                    namespace,
+                    ClassName=classname,
+                    **extra):
+                instancename.namespace = namespace
+                yield instancename
+
+        except Exception as exce:
+            exc = exce
+            raise
+        finally:
+            self._last_operation_time = stats.stop_timer(
+                self.last_request_len, self.last_reply_len,
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
+
     def GetInstance(self, InstanceName, LocalOnly=None, IncludeQualifiers=None,
                     IncludeClassOrigin=None, PropertyList=None, **extra):
         # pylint: disable=invalid-name,line-too-long
@@ -2492,7 +3173,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(instance, exc)
 
@@ -2681,7 +3363,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(None, exc)
 
@@ -2803,7 +3486,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(instancename, exc)
 
@@ -2869,10 +3553,278 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(None, exc)
 
+    def ExecuteBatch(self, Operations):
+        # pylint: disable=invalid-name
+        """
+        Perform a batch of independent instance operations.
+
+        The operations are sent to the WBEM server in a single multiple
+        operation request (a ``MULTIREQ`` element, see :term:`DSP0200`), and
+        the WBEM server performs them independently of each other.
+
+        If the WBEM server rejects multiple operation requests on the first
+        batch of this connection, this method and subsequent batches perform
+        the operations as individual requests, one after the other. These
+        requests use a persistent HTTP connection if the `keep_alive` init
+        parameter of the connection is `True`.
+
+        The operation recorders of the connection record the individual
+        requests, but not the multiple operation requests.
+
+        *New in pywbem 0.13 as experimental.*
+
+        Parameters:
+
+          Operations (:term:`py:iterable` of tuple(string, dict)):
+            The operations to be performed, as tuples of the name of the
+            operation method of this class and a dictionary with the keyword
+            arguments for that method.
+
+            The supported operation methods are
+            :meth:`~pywbem.WBEMConnection.GetInstance`,
+            :meth:`~pywbem.WBEMConnection.ModifyInstance`,
+            :meth:`~pywbem.WBEMConnection.CreateInstance` and
+            :meth:`~pywbem.WBEMConnection.DeleteInstance`.
+
+        Returns:
+
+            A list with one item for each operation, in the order of
+            `Operations`. The item is the return value of the operation
+            method, or the :exc:`~pywbem.CIMError` exception object if the
+            WBEM server returned an error for the operation.
+
+        Raises:
+
+            Exceptions described in :class:`~pywbem.WBEMConnection`, for the
+            batch as a whole.
+            ValueError: An operation method is not supported.
+        """
+
+        calls = []
+        for method_name, kwargs in Operations:
+            if method_name not in self._BATCH_OPERATIONS:
+                raise ValueError(
+                    "Operation %r is not supported in batches (supported "
+                    "are: %s)" % (method_name,
+                                  ', '.join(self._BATCH_OPERATIONS)))
+            prepare = getattr(self, '_batch_%s' % method_name)
+            calls.append((method_name, kwargs) + prepare(**kwargs))
+
+        if len(calls) >= 2 and self._use_multi_requests is not False:
+            try:
+                results = self._imethodcall_multi(
+                    [(call[0], call[2], call[3]) for call in calls])
+            except (HTTPError, CIMError) as exc:
+                # DSP0200 defines that WBEM servers that do not support
+                # multiple operation requests reject them with HTTP status
+                # 501 and the CIMError header 'multiple-requests-unsupported'.
+                # Some servers return CIM_ERR_NOT_SUPPORTED instead.
+                if isinstance(exc, CIMError):
+                    unsupported = exc.status_code == CIM_ERR_NOT_SUPPORTED
+                else:
+                    unsupported = exc.status == 501
+                if self._use_multi_requests is None and unsupported:
+                    self._use_multi_requests = False
+                else:
+                    raise
+            else:
+                self._use_multi_requests = True
+                return [result if isinstance(result, CIMError) else
+                        call[4](result)
+                        for call, result in zip(calls, results)]
+
+        results = []
+        for method_name, kwargs, _, _, _ in calls:
+            try:
+                results.append(getattr(self, method_name)(**kwargs))
+            except CIMError as exc:
+                results.append(exc)
+        return results
+
+    # Operation methods supported by ExecuteBatch()
+    _BATCH_OPERATIONS = ('GetInstance', 'ModifyInstance', 'CreateInstance',
+                         'DeleteInstance')
+
+    # The _batch_*() methods prepare an operation of ExecuteBatch(). They
+    # have the parameters of the operation method, and return a tuple of
+    # the target namespace, the operation parameters and a function that
+    # returns the result of the operation method from the parsed response.
+
+    def _batch_GetInstance(self, InstanceName, LocalOnly=None,
+                           IncludeQualifiers=None, IncludeClassOrigin=None,
+                           PropertyList=None, **extra):
+        # pylint: disable=invalid-name
+        """Prepare a GetInstance operation of a batch."""
+        namespace = self._iparam_namespace_from_objectname(InstanceName)
+        instancename = self._iparam_instancename(InstanceName)
+        params = dict(InstanceName=instancename, LocalOnly=LocalOnly,
+                      IncludeQualifiers=IncludeQualifiers,
+                      IncludeClassOrigin=IncludeClassOrigin,
+                      PropertyList=_iparam_propertylist(PropertyList),
+                      **extra)
+
+        def result(tup_tree):
+            """Return the result of GetInstance."""
+            instance = self._compact_result(tup_tree)[0][2][0]
+            instance.path = instancename
+            instance.path.namespace = namespace
+            return instance
+
+        return namespace, params, result
+
+    def _batch_ModifyInstance(self, ModifiedInstance, IncludeQualifiers=None,
+                              PropertyList=None, **extra):
+        # pylint: disable=invalid-name
+        """Prepare a ModifyInstance operation of a batch."""
+        if ModifiedInstance.path is None or \
+                ModifiedInstance.path.classname is None or \
+                ModifiedInstance.classname is None:
+            raise ValueError(
+                'ModifiedInstance parameter must have path attribute and '
+                'classname set')
+        namespace = self._iparam_namespace_from_objectname(
+            ModifiedInstance.path)
+        instance = ModifiedInstance.copy()
+        instance.path.namespace = None
+        instance.path.host = None
+        params = dict(ModifiedInstance=instance,
+                      IncludeQualifiers=IncludeQualifiers,
+                      PropertyList=_iparam_propertylist(PropertyList),
+                      **extra)
+        return namespace, params, lambda tup_tree: None
+
+    def _batch_CreateInstance(self, NewInstance, namespace=None, **extra):
+        # pylint: disable=invalid-name
+        """Prepare a CreateInstance operation of a batch."""
+        if namespace is None and \
+                getattr(NewInstance.path, 'namespace', None) is not None:
+            namespace = NewInstance.path.namespace
+        namespace = self._iparam_namespace_from_namespace(namespace)
+        instance = NewInstance.copy()
+        instance.path = None
+        params = dict(NewInstance=instance, **extra)
+
+        def result(tup_tree):
+            """Return the result of CreateInstance."""
+            instancename = tup_tree[0][2][0]
+            instancename.namespace = namespace
+            return instancename
+
+        return namespace, params, result
+
+    def _batch_DeleteInstance(self, InstanceName, **extra):
+        # pylint: disable=invalid-name
+        """Prepare a DeleteInstance operation of a batch."""
+        namespace = self._iparam_namespace_from_objectname(InstanceName)
+        params = dict(InstanceName=self._iparam_instancename(InstanceName),
+                      **extra)
+        return namespace, params, lambda tup_tree: None
+
+    def _imethodcall_multi(self, calls):
+        """
+        Perform intrinsic CIM-XML operations in a multiple operation request
+        against the WBEM server.
+
+        The calls are tuples of method name, namespace and a dictionary of
+        the operation parameters. The result is a list with the content of
+        the IMETHODRESPONSE element (see _imethodcall_result()) of each call,
+        or the CIMError exception object for calls that failed.
+
+        Raises CIMError or HTTPError if the WBEM server rejected the request
+        as a whole.
+        """
+
+        # DSP0200 requires the CIMBatch header, and no CIMMethod and CIMObject
+        # headers for multiple operation requests.
+        cimxml_headers = [
+            ('CIMOperation', 'MethodCall'),
+            ('CIMBatch', ''),
+        ]
+
+        simplereqs = []
+        for methodname, namespace, params in calls:
+            simplereqs.append(
+                u'<SIMPLEREQ>%s</SIMPLEREQ>' % cim_xml._imethodcall_str(
+                    methodname,
+                    namespace,
+                    [(x[0], _tocimxml_str(x[1]))
+                     for x in params.items() if x[1] is not None]))
+        request_data = cim_xml._message_str(
+            u'<MULTIREQ>%s</MULTIREQ>' % u''.join(simplereqs),
+            '1001', '1.0', '2.0', '2.0')
+
+        self._reset_request_info(request_data)
+
+        stats = self.statistics.start_timer('ExecuteBatch')
+        exc = None
+        try:
+            reply_xml, self._last_server_response_time = wbem_request(
+                self.url, request_data, self.creds, cimxml_headers,
+                x509=self.x509,
+                verify_callback=self.verify_callback,
+                ca_certs=self.ca_certs,
+                no_verification=self.no_verification,
+                timeout=self.timeout,
+                debug=self.debug,
+                conn_id=self.conn_id,
+                pool=self._pool,
+                compression=self._compression,
+                compression_stats=self._last_compression_stats)
+
+            self._last_reply_len = len(reply_xml)
+            if self.debug:
+                self._last_raw_reply = bytes(reply_xml)
+
+            tup_tree = parse_cim(xml_to_tupletree_sax(reply_xml,
+                                                      "CIM-XML response"))
+
+            if self.debug:
+                self._last_reply = _to_pretty_xml(self._last_raw_reply)
+
+            if tup_tree[0] != 'CIM':
+                raise ParseError('Expecting CIM element, got %s' %
+                                 tup_tree[0])
+            tup_tree = tup_tree[2]
+            if tup_tree[0] != 'MESSAGE':
+                raise ParseError('Expecting MESSAGE element, got %s' %
+                                 tup_tree[0])
+            tup_tree = tup_tree[2]
+
+            if tup_tree[0] == 'SIMPLERSP':
+                # The WBEM server rejected the request as a whole
+                self._simplersp_result(tup_tree[2][1].get('NAME'), tup_tree)
+                raise ParseError('Expecting MULTIRSP element, got SIMPLERSP '
+                                 'without error')
+            if tup_tree[0] != 'MULTIRSP':
+                raise ParseError('Expecting MULTIRSP element, got %s' %
+                                 tup_tree[0])
+            simplersps = tup_tree[2]
+            if len(simplersps) != len(calls):
+                raise ParseError('Expecting %s SIMPLERSP elements, got %s' %
+                                 (len(calls), len(simplersps)))
+
+            results = []
+            for call, simplersp in zip(calls, simplersps):
+                try:
+                    results.append(self._simplersp_result(call[0], simplersp))
+                except CIMError as ce:
+                    results.append(ce)
+            return results
+
+        except Exception as exce:
+            exc = exce
+            raise
+        finally:
+            self._last_operation_time = stats.stop_timer(
+                self.last_request_len, self.last_reply_len,
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
+
     def Associators(self, ObjectName, AssocClass=None, ResultClass=None,
                     Role=None, ResultRole=None, IncludeQualifiers=None,
                     IncludeClassOrigin=None, PropertyList=None, **extra):
@@ -3083,7 +4035,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(objects, exc)
 
@@ -3237,7 +4190,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(objects, exc)
 
@@ -3434,7 +4388,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(objects, exc)
 
@@ -3570,7 +4525,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(objects, exc)
 
@@ -3692,7 +4648,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(result_tuple, exc)
 
@@ -3790,7 +4747,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(instances, exc)
 
@@ -4079,17 +5037,16 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
                     # Open operation succeeded; set has_pull flag
                     self._use_enum_inst_pull_operations = True
 
-                    for inst in pull_result.instances:
-                        yield inst
-
-                    # loop to pull while more while eos not returned.
-                    while not pull_result.eos:
-                        pull_result = self.PullInstancesWithPath(
-                            pull_result.context, MaxObjectCount=MaxObjectCount)
-
-                        for inst in pull_result.instances:
-                            yield inst
-                    pull_result = None   # clear the pull_result
+                    # _iter_pull_results() now owns the enumeration session and
+                    # closes it if this generator is closed early.
+                    pull_results = self._iter_pull_results(
+                        pull_result, self.PullInstancesWithPath,
+                        MaxObjectCount)
+                    pull_result = None
+                    with closing(pull_results):
+                        for result in pull_results:
+                            for inst in result.instances:
+                                yield inst
                     return
 
                 # If NOT_SUPPORTED and first request, set flag and try
@@ -4356,17 +5313,16 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
                     # Open operation succeeded; set has_pull flag
                     self._use_enum_path_pull_operations = True
 
-                    for inst in pull_result.paths:
-                        yield inst
-
-                    # Loop to pull while more while eos not returned.
-                    while not pull_result.eos:
-                        pull_result = self.PullInstancePaths(
-                            pull_result.context, MaxObjectCount=MaxObjectCount)
-
-                        for inst in pull_result.paths:
-                            yield inst
-                    pull_result = None   # clear the pull_result
+                    # _iter_pull_results() now owns the enumeration session and
+                    # closes it if this generator is closed early.
+                    pull_results = self._iter_pull_results(
+                        pull_result, self.PullInstancePaths,
+                        MaxObjectCount)
+                    pull_result = None
+                    with closing(pull_results):
+                        for result in pull_results:
+                            for inst in result.paths:
+                                yield inst
                     return
 
                 # If NOT_SUPPORTED and first request, set flag and try
@@ -4698,17 +5654,16 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
                     # Open operation succeeded; set has_pull flag
                     self._use_assoc_inst_pull_operations = True
 
-                    for inst in pull_result.instances:
-                        yield inst
-
-                    # Loop to pull while more while eos not returned.
-                    while not pull_result.eos:
-                        pull_result = self.PullInstancesWithPath(
-                            pull_result.context, MaxObjectCount=MaxObjectCount)
-
-                        for inst in pull_result.instances:
-                            yield inst
-                    pull_result = None   # clear the pull_result
+                    # _iter_pull_results() now owns the enumeration session and
+                    # closes it if this generator is closed early.
+                    pull_results = self._iter_pull_results(
+                        pull_result, self.PullInstancesWithPath,
+                        MaxObjectCount)
+                    pull_result = None
+                    with closing(pull_results):
+                        for result in pull_results:
+                            for inst in result.instances:
+                                yield inst
                     return
 
                 # If NOT_SUPPORTED and first request, set flag and try
@@ -4982,17 +5937,16 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
                     # Open operation succeeded; set use_pull flag
                     self._use_assoc_path_pull_operations = True
 
-                    for inst in pull_result.paths:
-                        yield inst
-
-                    # Loop to pull while more while eos not returned.
-                    while not pull_result.eos:
-                        pull_result = self.PullInstancePaths(
-                            pull_result.context, MaxObjectCount=MaxObjectCount)
-
-                        for inst in pull_result.paths:
-                            yield inst
-                    pull_result = None   # clear the pull_result
+                    # _iter_pull_results() now owns the enumeration session and
+                    # closes it if this generator is closed early.
+                    pull_results = self._iter_pull_results(
+                        pull_result, self.PullInstancePaths,
+                        MaxObjectCount)
+                    pull_result = None
+                    with closing(pull_results):
+                        for result in pull_results:
+                            for inst in result.paths:
+                                yield inst
                     return
 
                 # If NOT_SUPPORTED and first request, set flag and try
@@ -5288,16 +6242,16 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
 
                     # Open operation succeeded; set has_pull flag
                     self._use_ref_inst_pull_operations = True
-                    for inst in pull_result.instances:
-                        yield inst
-
-                    # Loop to pull while more while eos not returned.
-                    while not pull_result.eos:
-                        pull_result = self.PullInstancesWithPath(
-                            pull_result.context, MaxObjectCount=MaxObjectCount)
-                        for inst in pull_result.instances:
-                            yield inst
-                    pull_result = None   # clear the pull_result
+                    # _iter_pull_results() now owns the enumeration session and
+                    # closes it if this generator is closed early.
+                    pull_results = self._iter_pull_results(
+                        pull_result, self.PullInstancesWithPath,
+                        MaxObjectCount)
+                    pull_result = None
+                    with closing(pull_results):
+                        for result in pull_results:
+                            for inst in result.instances:
+                                yield inst
                     return
 
                 # If NOT_SUPPORTED and first request, set flag and try
@@ -5552,17 +6506,16 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
                     # Open operation succeeded; set use_pull flag
                     self._use_ref_path_pull_operations = True
 
-                    for inst in pull_result.paths:
-                        yield inst
-
-                    # Loop to pull while more while eos not returned.
-                    while not pull_result.eos:
-                        pull_result = self.PullInstancePaths(
-                            pull_result.context, MaxObjectCount=MaxObjectCount)
-
-                        for inst in pull_result.paths:
-                            yield inst
-                    pull_result = None   # clear the pull_result
+                    # _iter_pull_results() now owns the enumeration session and
+                    # closes it if this generator is closed early.
+                    pull_results = self._iter_pull_results(
+                        pull_result, self.PullInstancePaths,
+                        MaxObjectCount)
+                    pull_result = None
+                    with closing(pull_results):
+                        for result in pull_results:
+                            for inst in result.paths:
+                                yield inst
                     return
 
                 # If NOT_SUPPORTED and first request, set flag and try
@@ -6193,7 +7146,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(result_tuple, exc)
 
@@ -6420,7 +7374,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(result_tuple, exc)
 
@@ -6703,7 +7658,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(result_tuple, exc)
 
@@ -6942,7 +7898,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(result_tuple, exc)
 
@@ -7207,7 +8164,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(result_tuple, exc)
 
@@ -7429,7 +8387,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(result_tuple, exc)
 
@@ -7652,7 +8611,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(result_tuple, exc)
 
@@ -7806,7 +8766,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(result_tuple, exc)
 
@@ -7957,7 +8918,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(result_tuple, exc)
 
@@ -8101,7 +9063,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(result, exc)
 
@@ -8185,7 +9148,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(None, exc)
 
@@ -8343,7 +9307,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(classes, exc)
 
@@ -8458,7 +9423,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(classnames, exc)
 
@@ -8596,7 +9562,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(klass, exc)
 
@@ -8677,7 +9644,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(None, exc)
 
@@ -8757,7 +9725,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(None, exc)
 
@@ -8836,7 +9805,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(None, exc)
 
@@ -8915,7 +9885,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(qualifiers, exc)
 
@@ -8998,7 +9969,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(qualifiername, exc)
 
@@ -9072,7 +10044,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(None, exc)
 
@@ -9145,7 +10118,8 @@ class WBEMConnection(object):  # pylint: disable=too-many-instance-attributes
         finally:
             self._last_operation_time = stats.stop_timer(
                 self.last_request_len, self.last_reply_len,
-                self.last_server_response_time, exc)
+                self.last_server_response_time, exc,
+                compression=self._last_compression_stats)
             if self._operation_recorders:
                 self.operation_recorder_stage_result(None, exc)
 
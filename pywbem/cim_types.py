@@ -295,6 +295,16 @@ class CIMType(object):  # pylint: disable=too-few-public-methods
                (self.__class__.__name__, self.cimtype, self)
 
 
+# Patterns for the point in time and the interval formats of CIM datetime
+# strings, and for the strings supported by CIMDateTime._from_string_lazy()
+_DATETIME_PATTERN = re.compile(
+    r'^(\d{4})(\d{2})(\d{2})(\d{2})(\d{2})(\d{2})\.(\d{6})([+|-])(\d{3})')
+_INTERVAL_PATTERN = re.compile(
+    r'^(\d{8})(\d{2})(\d{2})(\d{2})\.(\d{6})(:)(000)')
+_DATETIME_LAZY_PATTERN = re.compile(
+    r'^\d{14}\.\d{6}(\+\d{3}|-(?!000)\d{3}|:000)\Z')
+
+
 class CIMDateTime(CIMType, _CIMComparisonMixin):
     """
     A value of CIM data type datetime.
@@ -331,43 +341,10 @@ class CIMDateTime(CIMType, _CIMComparisonMixin):
         """
         self.__timedelta = None
         self.__datetime = None
+        self.__dtstr = None
         dtarg = _ensure_unicode(dtarg)
         if isinstance(dtarg, six.text_type):
-            date_pattern = re.compile(
-                r'^(\d{4})(\d{2})(\d{2})(\d{2})(\d{2})(\d{2})\.'
-                r'(\d{6})([+|-])(\d{3})')
-            srch_result = date_pattern.search(dtarg)
-            if srch_result is not None:
-                parts = srch_result.groups()
-                offset = int(parts[8])
-                if parts[7] == '-':
-                    offset = -offset
-                try:
-                    self.__datetime = datetime(int(parts[0]), int(parts[1]),
-                                               int(parts[2]), int(parts[3]),
-                                               int(parts[4]), int(parts[5]),
-                                               int(parts[6]),
-                                               MinutesFromUTC(offset))
-                except ValueError as exc:
-                    raise ValueError('dtarg argument "%s" has invalid field '
-                                     'values for CIM datetime timestamp '
-                                     'format: %s' % (dtarg, exc))
-            else:
-                tv_pattern = re.compile(
-                    r'^(\d{8})(\d{2})(\d{2})(\d{2})\.(\d{6})(:)(000)')
-                srch_result = tv_pattern.search(dtarg)
-                if srch_result is not None:
-                    parts = srch_result.groups()
-                    # Because the input values are limited by the matched
-                    # pattern, timedelta() never throws any exception.
-                    self.__timedelta = timedelta(days=int(parts[0]),
-                                                 hours=int(parts[1]),
-                                                 minutes=int(parts[2]),
-                                                 seconds=int(parts[3]),
-                                                 microseconds=int(parts[4]))
-                else:
-                    raise ValueError('dtarg argument "%s" has an invalid CIM '
-                                     'datetime format' % dtarg)
+            self.__parse(dtarg)
         elif isinstance(dtarg, datetime):
             if dtarg.tzinfo is None:
                 self.__datetime = dtarg.replace(tzinfo=MinutesFromUTC(0))
@@ -383,6 +360,76 @@ class CIMDateTime(CIMType, _CIMComparisonMixin):
                             '(expected datetime, timedelta, string, or '
                             'CIMDateTime)' % (dtarg, type(dtarg)))
 
+    @classmethod
+    def _from_string_lazy(cls, dtstr):
+        """
+        Factory method that returns a new :class:`~pywbem.CIMDateTime` object
+        from a string in CIM datetime format, whose parsing into
+        :class:`py:datetime.datetime` or :class:`py:datetime.timedelta`
+        objects is deferred until its attributes are first used.
+
+        The format of the string is checked right away, but invalid field
+        values (e.g. a month of 13) are detected only when the object is
+        parsed. The string is kept, so that converting the object to a string
+        does not need to parse it.
+
+        This is used when parsing CIM-XML, where many datetime values are
+        never used by the caller.
+        """
+        dtstr = _ensure_unicode(dtstr)
+        if not isinstance(dtstr, six.text_type) or \
+                _DATETIME_LAZY_PATTERN.match(dtstr) is None:
+            return cls(dtstr)
+        obj = cls.__new__(cls)
+        obj.__datetime = None
+        obj.__timedelta = None
+        obj.__dtstr = dtstr
+        return obj
+
+    def __parse(self, dtstr):
+        """
+        Parse a string in CIM datetime format into the datetime or timedelta
+        attribute of this object.
+        """
+        srch_result = _DATETIME_PATTERN.search(dtstr)
+        if srch_result is not None:
+            parts = srch_result.groups()
+            offset = int(parts[8])
+            if parts[7] == '-':
+                offset = -offset
+            try:
+                self.__datetime = datetime(int(parts[0]), int(parts[1]),
+                                           int(parts[2]), int(parts[3]),
+                                           int(parts[4]), int(parts[5]),
+                                           int(parts[6]),
+                                           MinutesFromUTC(offset))
+            except ValueError as exc:
+                raise ValueError('dtarg argument "%s" has invalid field '
+                                 'values for CIM datetime timestamp '
+                                 'format: %s' % (dtstr, exc))
+        else:
+            srch_result = _INTERVAL_PATTERN.search(dtstr)
+            if srch_result is not None:
+                parts = srch_result.groups()
+                # Because the input values are limited by the matched
+                # pattern, timedelta() never throws any exception.
+                self.__timedelta = timedelta(days=int(parts[0]),
+                                             hours=int(parts[1]),
+                                             minutes=int(parts[2]),
+                                             seconds=int(parts[3]),
+                                             microseconds=int(parts[4]))
+            else:
+                raise ValueError('dtarg argument "%s" has an invalid CIM '
+                                 'datetime format' % dtstr)
+
+    def __materialize(self):
+        """
+        Parse the string of an object created with _from_string_lazy(), if
+        not yet parsed.
+        """
+        if self.__datetime is None and self.__timedelta is None:
+            self.__parse(self.__dtstr)
+
     @property
     def minutes_from_utc(self):
         """
@@ -394,6 +441,8 @@ class CIMDateTime(CIMType, _CIMComparisonMixin):
 
         0, if this object represents a time interval.
         """
+        if self.__dtstr is not None:
+            self.__materialize()
         offset = 0
         if self.__datetime is not None and \
                 self.__datetime.utcoffset() is not None:
@@ -410,6 +459,8 @@ class CIMDateTime(CIMType, _CIMComparisonMixin):
 
         `None` if this object represents a time interval.
         """
+        if self.__dtstr is not None:
+            self.__materialize()
         return self.__datetime
 
     @property
@@ -420,6 +471,8 @@ class CIMDateTime(CIMType, _CIMComparisonMixin):
 
         `None` if this object represents a point in time.
         """
+        if self.__dtstr is not None:
+            self.__materialize()
         return self.__timedelta
 
     @property
@@ -428,6 +481,8 @@ class CIMDateTime(CIMType, _CIMComparisonMixin):
         A boolean indicating whether this object represents a time interval
         (`True`) or a point in time (`False`).
         """
+        if self.__dtstr is not None:
+            self.__materialize()
         return self.__timedelta is not None
 
     @staticmethod
@@ -511,6 +566,9 @@ class CIMDateTime(CIMType, _CIMComparisonMixin):
         """
         Return a string representing the object in CIM datetime format.
         """
+        if self.__dtstr is not None:
+            # Created with _from_string_lazy() from a string in this format
+            return self.__dtstr
         if self.is_interval:
             hour = self.timedelta.seconds // 3600
             minute = (self.timedelta.seconds - hour * 3600) // 60
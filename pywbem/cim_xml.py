@@ -196,6 +196,151 @@ class CIMElement(Element):
         for child in children:
             self.appendChild(child)
 
+
+# String serialization
+#
+# The following functions produce CIM-XML text directly as strings, without
+# creating minidom nodes. They are used where CIM-XML is produced on
+# performance sensitive paths (e.g. for building request messages), and
+# produce the same output as the toxml() method of the corresponding minidom
+# elements. Because the minidom escaping and attribute ordering differ
+# between Python versions, they are determined from minidom itself.
+
+
+def _minidom_escapes():
+    """Return the escaping tables and attribute ordering used by minidom.
+
+    Returns a tuple of: list of (char, replacement) tuples for escaping text
+    content, list of (char, replacement) tuples for escaping attribute values,
+    and a boolean indicating whether minidom sorts attributes by name.
+    """
+    # '&' needs to be first because the other replacements introduce it.
+    chars = u'&<>"\r\n\t'
+    text_escapes = []
+    attr_escapes = []
+    for char in chars:
+        text_repl = _text(char).toxml()
+        if text_repl != char:
+            text_escapes.append((char, text_repl))
+        elem = CIMElement('E')
+        elem.setAttribute('A', char)
+        attr_repl = elem.toxml()[len('<E A="'):-len('"/>')]
+        if attr_repl != char:
+            attr_escapes.append((char, attr_repl))
+    elem = CIMElement('E')
+    elem.setAttribute('B', '')
+    elem.setAttribute('A', '')
+    sorted_attrs = elem.toxml() == '<E A="" B=""/>'
+    return text_escapes, attr_escapes, sorted_attrs
+
+
+_TEXT_ESCAPES, _ATTR_ESCAPES, _SORTED_ATTRS = _minidom_escapes()
+
+
+def _escape_text(data):
+    """Return the string escaped for use as XML text content, like minidom
+    does for text nodes."""
+    for char, repl in _TEXT_ESCAPES:
+        if char in data:
+            data = data.replace(char, repl)
+    return data
+
+
+def _attrs_str(attrs):
+    """Return the XML string for the attributes of an element.
+
+    `attrs` is an iterable of tuple(name, value), in the order in which
+    minidom elements would get them set. Attributes with a value of `None` are
+    omitted.
+    """
+    if _SORTED_ATTRS:
+        attrs = sorted(attrs)
+    parts = []
+    for name, value in attrs:
+        if value is None:
+            continue
+        for char, repl in _ATTR_ESCAPES:
+            if char in value:
+                value = value.replace(char, repl)
+        parts.append(u' %s="%s"' % (name, value))
+    return u''.join(parts)
+
+
+def _pcdata_str(pcdata):
+    """Return the properly escaped ``pcdata`` as a string.
+
+    This is the string equivalent of :func:`_pcdata_nodes`, and supports
+    CDATA-based escaping in the same way.
+    """
+
+    if _CDATA_ESCAPING and isinstance(pcdata, six.string_types) and \
+       (pcdata.find("<") >= 0 or
+        pcdata.find(">") >= 0 or
+        pcdata.find("&") >= 0):  # noqa: E129
+
+        pcdata_part_list = pcdata.split("]]>")
+        last = len(pcdata_part_list)
+        parts = []
+        for i, pcdata_part in enumerate(pcdata_part_list, 1):
+            left = "" if i == 1 else "]>"
+            right = "" if i == last else "]"
+            parts.append(u'<![CDATA[%s%s%s]]>' % (left, pcdata_part, right))
+        return u''.join(parts)
+
+    return _escape_text(pcdata)
+
+
+def _value_str(pcdata):
+    """Return the XML string for a VALUE element with the pcdata."""
+    if pcdata is None:
+        return u'<VALUE/>'
+    return u'<VALUE>%s</VALUE>' % _pcdata_str(pcdata)
+
+
+def _localnamespacepath_str(namespace):
+    """Return the XML string for a LOCALNAMESPACEPATH element for the
+    namespace name."""
+    return u'<LOCALNAMESPACEPATH>%s</LOCALNAMESPACEPATH>' % u''.join(
+        [u'<NAMESPACE%s/>' % _attrs_str([('NAME', ns)])
+         for ns in namespace.split('/')])
+
+
+def _namespacepath_str(host, namespace):
+    """Return the XML string for a NAMESPACEPATH element for the host and
+    namespace name."""
+    return u'<NAMESPACEPATH><HOST>%s</HOST>%s</NAMESPACEPATH>' % \
+        (_escape_text(host), _localnamespacepath_str(namespace))
+
+
+def _message_str(data, message_id, protocol_version, cim_version,
+                 dtd_version):
+    """Return the XML string for a CIM element with a MESSAGE element that
+    contains the XML string `data`."""
+    return u'<CIM%s><MESSAGE%s>%s</MESSAGE></CIM>' % (
+        _attrs_str([('CIMVERSION', cim_version),
+                    ('DTDVERSION', dtd_version)]),
+        _attrs_str([('ID', message_id),
+                    ('PROTOCOLVERSION', protocol_version)]),
+        data)
+
+
+def _imethodcall_str(methodname, namespace, iparamvalues):
+    """Return the XML string for an IMETHODCALL element.
+
+    `iparamvalues` is an iterable of tuple(name, value_xml), where value_xml
+    is the XML string of the parameter value, or `None`.
+    """
+    parts = [u'<IMETHODCALL%s>' % _attrs_str([('NAME', methodname)]),
+             _localnamespacepath_str(namespace)]
+    for name, value_xml in iparamvalues:
+        if value_xml is None:
+            parts.append(u'<IPARAMVALUE%s/>' % _attrs_str([('NAME', name)]))
+        else:
+            parts.append(u'<IPARAMVALUE%s>%s</IPARAMVALUE>' %
+                         (_attrs_str([('NAME', name)]), value_xml))
+    parts.append(u'</IMETHODCALL>')
+    return u''.join(parts)
+
 # Root element
 
 
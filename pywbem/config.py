@@ -39,7 +39,7 @@ they should be used from the ``pywbem`` namespace.
 # This module is meant to be safe for 'import *'.
 
 __all__ = ['ENFORCE_INTEGER_RANGE', 'DEFAULT_ITER_MAXOBJECTCOUNT',
-           'SEND_VALUE_NULL']
+           'SEND_VALUE_NULL', 'TRUSTED_SERVER', 'XML_PARSER_BACKEND']
 
 #: Enforce the allowable value range for CIM integer types (e.g.
 #: :class:`~pywbem.Uint8`). For details, see the :class:`~pywbem.CIMInt` base
@@ -93,3 +93,40 @@ DEBUG_WARNING_ORIGIN = False
 #:
 #: *New in pywbem 0.12.*
 SEND_VALUE_NULL = True
+
+#: Trust the WBEM server (or WBEM indication sender) to send CIM-XML that
+#: conforms to :term:`DSP0201`.
+#:
+#: * False (default): Pywbem validates the elements, attributes and child
+#:   elements of received CIM-XML against the local constraints of the DTD,
+#:   and raises :exc:`~pywbem.ParseError` if they are violated.
+#: * True: Pywbem skips these structural checks, which reduces the CPU time
+#:   for parsing large responses. Invalid CIM-XML may then lead to incorrect
+#:   results instead of :exc:`~pywbem.ParseError`.
+#:
+#: Unlike most other configuration variables, this variable is read by pywbem
+#: each time CIM-XML is parsed, so it must be modified in the
+#: ``pywbem.config`` namespace.
+#:
+#: *New in pywbem 0.13 as experimental.*
+TRUSTED_SERVER = False
+
+#: XML parser backend used for parsing received CIM-XML into tuple trees.
+#:
+#: * ``'sax'`` (default): The ``xml.sax`` package of the Python standard
+#:   library, with a Python content handler.
+#: * ``'expat'``: The ``xml.parsers.expat`` package of the Python standard
+#:   library, used directly. This avoids the overhead of the SAX layer.
+#: * ``'lxml'``: The ``iterparse()`` function of the `lxml` package. The `lxml`
+#:   package is not installed with pywbem and needs to be installed
+#:   separately.
+#:
+#: All backends produce the same results. Invalid values cause
+#: :exc:`~py:exceptions.ValueError` to be raised when CIM-XML is parsed.
+#:
+#: Like :data:`TRUSTED_SERVER`, this variable is read by pywbem each time
+#: CIM-XML is parsed, so it must be modified in the ``pywbem.config``
+#: namespace.
+#:
+#: *New in pywbem 0.13 as experimental.*
+XML_PARSER_BACKEND = 'sax'
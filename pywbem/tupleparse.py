@@ -90,6 +90,7 @@ from .cim_obj import CIMInstance, CIMInstanceName, CIMClass, CIMClassName, \
 from .cim_types import CIMDateTime, type_from_name
 from .tupletree import xml_to_tupletree_sax
 from .exceptions import ParseError
+from . import config
 
 __all__ = []
 
@@ -135,6 +136,42 @@ def kids(tup_tree):
     return filter_tuples(tup_tree[2])
 
 
+# Compiled constraints of the check_node() calls, keyed by the tuple of their
+# (nodename, required_attrs, optional_attrs, allowed_children, allow_pcdata)
+# arguments (if hashable). The values are tuples of (required attributes as a
+# tuple, allowed attributes as a frozenset, allowed children as a frozenset or
+# None).
+_NODE_CONSTRAINTS = {}
+
+
+def _node_constraints(nodename, required_attrs, optional_attrs,
+                      allowed_children, allow_pcdata):
+    """
+    Return the compiled constraints for the check_node() arguments, compiling
+    them on first use.
+
+    The parse functions pass their constraints as tuples of constant strings,
+    so the constraints of each element are compiled only once.
+    """
+    key = (nodename, required_attrs, optional_attrs, allowed_children,
+           allow_pcdata)
+    try:
+        return _NODE_CONSTRAINTS[key]
+    except KeyError:
+        pass
+    except TypeError:
+        # Constraints specified as lists are compiled on each use
+        key = None
+    required = tuple(required_attrs or ())
+    constraints = (
+        required,
+        frozenset(required + tuple(optional_attrs or ())),
+        None if allowed_children is None else frozenset(allowed_children))
+    if key is not None:
+        _NODE_CONSTRAINTS[key] = constraints
+    return constraints
+
+
 # pylint: disable=too-many-arguments
 def check_node(tup_tree, nodename, required_attrs=None, optional_attrs=None,
                allowed_children=None, allow_pcdata=False):
@@ -158,49 +195,57 @@ def check_node(tup_tree, nodename, required_attrs=None, optional_attrs=None,
 
     If allow_pcdata is True, then non-whitespace text nodes are allowed as
     children. (Whitespace text nodes are always allowed as children.)
+
+    The constraints are compiled into frozensets once per element and are
+    then checked in a single pass over the attributes and the child nodes.
+    If the :data:`~pywbem.config.TRUSTED_SERVER` config variable is True,
+    no checks are performed.
     """
 
+    if config.TRUSTED_SERVER:
+        return
+
     if name(tup_tree) != nodename:
         raise ParseError("Unexpected element %r (expected element %r)" %
                          (name(tup_tree), nodename))
 
-    # Check we have all the required attributes, and no unexpected ones
-    tt_attrs = {}
-    if attrs(tup_tree) is not None:
-        tt_attrs = attrs(tup_tree).copy()
+    required, allowed_attrs, allowed_kids = _node_constraints(
+        nodename, required_attrs, optional_attrs, allowed_children,
+        allow_pcdata)
 
-    if required_attrs:
-        for attr in required_attrs:
+    # Check we have all the required attributes, and no unexpected ones
+    tt_attrs = attrs(tup_tree)
+    if tt_attrs:
+        for attr in required:
             if attr not in tt_attrs:
                 raise ParseError("Element %r misses required attribute %r "
                                  "(only has attributes %r)" %
-                                 (name(tup_tree), attr, attrs(tup_tree).keys()))
-            del tt_attrs[attr]
-
-    if optional_attrs:
-        for attr in optional_attrs:
-            if attr in tt_attrs:
-                del tt_attrs[attr]
-
-    for k in tt_attrs.keys():
-        raise ParseError("Element %r has invalid attribute %r " %
-                         (name(tup_tree), k))
-
-    if allowed_children is not None:
-        for child in kids(tup_tree):
-            if name(child) not in allowed_children:
+                                 (name(tup_tree), attr, tt_attrs.keys()))
+        if len(tt_attrs) > len(required):
+            for attr in tt_attrs:
+                if attr not in allowed_attrs:
+                    raise ParseError("Element %r has invalid attribute %r " %
+                                     (name(tup_tree), attr))
+    elif required:
+        raise ParseError("Element %r misses required attribute %r "
+                         "(only has attributes %r)" %
+                         (name(tup_tree), required[0],
+                          tt_attrs.keys() if tt_attrs is not None else []))
+
+    if allowed_kids is None and allow_pcdata:
+        return
+
+    for child in tup_tree[2]:
+        if isinstance(child, tuple):
+            if allowed_kids is not None and child[0] not in allowed_kids:
                 raise ParseError("Element %r has invalid child element %r "
                                  "(allowed are child elements %r)" %
                                  (name(tup_tree), name(child),
                                   allowed_children))
-
-    if not allow_pcdata:
-        for child in tup_tree[2]:
-            if isinstance(child, six.string_types):
-                if child.lstrip(' \t\n') != '':
-                    raise ParseError("Element %r has unexpected non-blank "
-                                     "text content %r" %
-                                     (name(tup_tree), child))
+        elif not allow_pcdata and child.lstrip(' \t\n') != '':
+            raise ParseError("Element %r has unexpected non-blank "
+                             "text content %r" %
+                             (name(tup_tree), child))
 
 
 def one_child(tup_tree, acceptable):
@@ -253,7 +298,9 @@ def list_of_various(tup_tree, acceptable):
 
     result = []
 
-    for child in kids(tup_tree):
+    for child in tup_tree[2]:
+        if not isinstance(child, tuple):
+            continue
         if name(child) not in acceptable:
             raise ParseError("Element %r has invalid child element %r "
                              "(allowed are child elements %r)" %
@@ -270,8 +317,8 @@ def list_of_matching(tup_tree, matched):
 
     result = []
 
-    for child in kids(tup_tree):
-        if name(child) not in matched:
+    for child in tup_tree[2]:
+        if not isinstance(child, tuple) or name(child) not in matched:
             continue
         result.append(parse_any(child))
 
@@ -327,7 +374,7 @@ def parse_cim(tup_tree):
             DTDVERSION CDATA #REQUIRED>
     """
 
-    check_node(tup_tree, 'CIM', ['CIMVERSION', 'DTDVERSION'])
+    check_node(tup_tree, 'CIM', ('CIMVERSION', 'DTDVERSION'))
 
     if not attrs(tup_tree)['CIMVERSION'].startswith('2.'):
         raise ParseError("CIMVERSION is %s, expected 2.x.y" %
@@ -396,7 +443,7 @@ def parse_value(tup_tree):
         <!ELEMENT VALUE (#PCDATA)>
     """
 
-    check_node(tup_tree, 'VALUE', [], [], [], allow_pcdata=True)
+    check_node(tup_tree, 'VALUE', (), (), (), allow_pcdata=True)
 
     return pcdata(tup_tree)
 
@@ -625,7 +672,7 @@ def parse_value_null(tup_tree):
         <!ELEMENT VALUE.NULL EMPTY>
     """
 
-    check_node(tup_tree, 'VALUE.NULL', [], [], [])
+    check_node(tup_tree, 'VALUE.NULL', (), (), ())
 
     return None
 
@@ -674,7 +721,7 @@ def parse_localnamespacepath(tup_tree):
         <!ELEMENT LOCALNAMESPACEPATH (NAMESPACE+)>
     """
 
-    check_node(tup_tree, 'LOCALNAMESPACEPATH', [], [], ['NAMESPACE'])
+    check_node(tup_tree, 'LOCALNAMESPACEPATH', (), (), ('NAMESPACE',))
 
     if not kids(tup_tree):
         raise ParseError("Element %r misses child elements "
@@ -697,7 +744,7 @@ def parse_host(tup_tree):
         <!ELEMENT HOST (#PCDATA)>
     """
 
-    check_node(tup_tree, 'HOST', [], [], [], allow_pcdata=True)
+    check_node(tup_tree, 'HOST', (), (), (), allow_pcdata=True)
 
     return pcdata(tup_tree)
 
@@ -714,7 +761,7 @@ def parse_namespace(tup_tree):
             %CIMName;>
     """
 
-    check_node(tup_tree, 'NAMESPACE', ['NAME'], [], [])
+    check_node(tup_tree, 'NAMESPACE', ('NAME',), (), ())
 
     return attrs(tup_tree)['NAME']
 
@@ -786,7 +833,7 @@ def parse_classname(tup_tree):
             %CIMName;>
     """
 
-    check_node(tup_tree, 'CLASSNAME', ['NAME'], [], [])
+    check_node(tup_tree, 'CLASSNAME', ('NAME',), (), ())
 
     classname = attrs(tup_tree)['NAME']
     class_path = CIMClassName(classname)
@@ -861,7 +908,7 @@ def parse_instancename(tup_tree):
             %ClassName;>
     """
 
-    check_node(tup_tree, 'INSTANCENAME', ['CLASSNAME'])
+    check_node(tup_tree, 'INSTANCENAME', ('CLASSNAME',))
 
     if not kids(tup_tree):
         # probably not ever going to see this, but it's valid
@@ -924,7 +971,7 @@ def parse_keybinding(tup_tree):
             %CIMName;>
     """
 
-    check_node(tup_tree, 'KEYBINDING', ['NAME'])
+    check_node(tup_tree, 'KEYBINDING', ('NAME',))
 
     child = one_child(tup_tree, ['KEYVALUE', 'VALUE.REFERENCE'])
 
@@ -958,7 +1005,7 @@ def parse_keyvalue(tup_tree):
             %CIMType;              #IMPLIED>
     """
 
-    check_node(tup_tree, 'KEYVALUE', [], ['VALUETYPE', 'TYPE'], [],
+    check_node(tup_tree, 'KEYVALUE', (), ('VALUETYPE', 'TYPE'), (),
                allow_pcdata=True)
 
     data = pcdata(tup_tree)
@@ -1001,9 +1048,9 @@ def parse_class(tup_tree):
     """
 
     # Doesn't check ordering of elements, but it's not very important
-    check_node(tup_tree, 'CLASS', ['NAME'], ['SUPERCLASS'],
-               ['QUALIFIER', 'PROPERTY', 'PROPERTY.REFERENCE',
-                'PROPERTY.ARRAY', 'METHOD'])
+    check_node(tup_tree, 'CLASS', ('NAME',), ('SUPERCLASS',),
+               ('QUALIFIER', 'PROPERTY', 'PROPERTY.REFERENCE',
+                'PROPERTY.ARRAY', 'METHOD'))
 
     attrl = attrs(tup_tree)
 
@@ -1035,9 +1082,9 @@ def parse_instance(tup_tree):
             xml:lang NMTOKEN #IMPLIED>
     """
 
-    check_node(tup_tree, 'INSTANCE', ['CLASSNAME'], ['xml:lang'],
-               ['QUALIFIER', 'PROPERTY', 'PROPERTY.ARRAY',
-                'PROPERTY.REFERENCE'])
+    check_node(tup_tree, 'INSTANCE', ('CLASSNAME',), ('xml:lang',),
+               ('QUALIFIER', 'PROPERTY', 'PROPERTY.ARRAY',
+                'PROPERTY.REFERENCE'))
 
     # The 'xml:lang' attribute is tolerated but ignored.
 
@@ -1082,9 +1129,9 @@ def parse_scope(tup_tree):
             INDICATION (true | false) "false"
     """
 
-    check_node(tup_tree, 'SCOPE', [],
-               ['CLASS', 'ASSOCIATION', 'REFERENCE', 'PROPERTY', 'METHOD',
-                'PARAMETER', 'INDICATION'], [])
+    check_node(tup_tree, 'SCOPE', (),
+               ('CLASS', 'ASSOCIATION', 'REFERENCE', 'PROPERTY', 'METHOD',
+                'PARAMETER', 'INDICATION'), ())
 
     # Even though XML attributes do not preserve order, we store the
     # scopes in an ordered dict to avoid a warning further down the
@@ -1115,10 +1162,10 @@ def parse_qualifier_declaration(tup_tree):
     """
 
     check_node(tup_tree, 'QUALIFIER.DECLARATION',
-               ['NAME', 'TYPE'],
-               ['ISARRAY', 'ARRAYSIZE', 'OVERRIDABLE', 'TOSUBCLASS',
-                'TOINSTANCE', 'TRANSLATABLE'],
-               ['SCOPE', 'VALUE', 'VALUE.ARRAY'])
+               ('NAME', 'TYPE'),
+               ('ISARRAY', 'ARRAYSIZE', 'OVERRIDABLE', 'TOSUBCLASS',
+                'TOINSTANCE', 'TRANSLATABLE'),
+               ('SCOPE', 'VALUE', 'VALUE.ARRAY'))
 
     attrl = attrs(tup_tree)
     qname = attrl['NAME']
@@ -1175,10 +1222,10 @@ def parse_qualifier(tup_tree):
             xml:lang NMTOKEN #IMPLIED>
     """
 
-    check_node(tup_tree, 'QUALIFIER', ['NAME', 'TYPE'],
-               ['OVERRIDABLE', 'TOSUBCLASS', 'TOINSTANCE',
-                'TRANSLATABLE', 'PROPAGATED', 'xml:lang'],
-               ['VALUE', 'VALUE.ARRAY'])
+    check_node(tup_tree, 'QUALIFIER', ('NAME', 'TYPE'),
+               ('OVERRIDABLE', 'TOSUBCLASS', 'TOINSTANCE',
+                'TRANSLATABLE', 'PROPAGATED', 'xml:lang'),
+               ('VALUE', 'VALUE.ARRAY'))
 
     # The 'xml:lang' attribute is tolerated but ignored.
 
@@ -1219,10 +1266,10 @@ def parse_property(tup_tree):
             xml:lang NMTOKEN #IMPLIED>
     """
 
-    check_node(tup_tree, 'PROPERTY', ['TYPE', 'NAME'],
-               ['CLASSORIGIN', 'PROPAGATED', 'EmbeddedObject',
-                'EMBEDDEDOBJECT', 'xml:lang'],
-               ['QUALIFIER', 'VALUE'])
+    check_node(tup_tree, 'PROPERTY', ('TYPE', 'NAME'),
+               ('CLASSORIGIN', 'PROPAGATED', 'EmbeddedObject',
+                'EMBEDDEDOBJECT', 'xml:lang'),
+               ('QUALIFIER', 'VALUE'))
 
     # The 'xml:lang' attribute is tolerated but ignored.
 
@@ -1271,10 +1318,10 @@ def parse_property_array(tup_tree):
             xml:lang NMTOKEN #IMPLIED>
     """
 
-    check_node(tup_tree, 'PROPERTY.ARRAY', ['NAME', 'TYPE'],
-               ['CLASSORIGIN', 'PROPAGATED', 'ARRAYSIZE', 'EmbeddedObject',
-                'EMBEDDEDOBJECT', 'xml:lang'],
-               ['QUALIFIER', 'VALUE.ARRAY'])
+    check_node(tup_tree, 'PROPERTY.ARRAY', ('NAME', 'TYPE'),
+               ('CLASSORIGIN', 'PROPAGATED', 'ARRAYSIZE', 'EmbeddedObject',
+                'EMBEDDEDOBJECT', 'xml:lang'),
+               ('QUALIFIER', 'VALUE.ARRAY'))
 
     # The 'xml:lang' attribute is tolerated but ignored.
 
@@ -1323,9 +1370,9 @@ def parse_property_reference(tup_tree):
             %Propagated;>
     """
 
-    check_node(tup_tree, 'PROPERTY.REFERENCE', ['NAME'],
-               ['REFERENCECLASS', 'CLASSORIGIN', 'PROPAGATED'],
-               ['QUALIFIER', 'VALUE.REFERENCE'])
+    check_node(tup_tree, 'PROPERTY.REFERENCE', ('NAME',),
+               ('REFERENCECLASS', 'CLASSORIGIN', 'PROPAGATED'),
+               ('QUALIFIER', 'VALUE.REFERENCE'))
 
     value = list_of_matching(tup_tree, ['VALUE.REFERENCE'])
 
@@ -1365,10 +1412,10 @@ def parse_method(tup_tree):
             %Propagated;>
     """
 
-    check_node(tup_tree, 'METHOD', ['NAME'],
-               ['TYPE', 'CLASSORIGIN', 'PROPAGATED'],
-               ['QUALIFIER', 'PARAMETER', 'PARAMETER.REFERENCE',
-                'PARAMETER.ARRAY', 'PARAMETER.REFARRAY'])
+    check_node(tup_tree, 'METHOD', ('NAME',),
+               ('TYPE', 'CLASSORIGIN', 'PROPAGATED'),
+               ('QUALIFIER', 'PARAMETER', 'PARAMETER.REFERENCE',
+                'PARAMETER.ARRAY', 'PARAMETER.REFARRAY'))
 
     attrl = attrs(tup_tree)
 
@@ -1404,7 +1451,7 @@ def parse_parameter(tup_tree):
             %CIMType;              #REQUIRED>
     """
 
-    check_node(tup_tree, 'PARAMETER', ['NAME', 'TYPE'], [], ['QUALIFIER'])
+    check_node(tup_tree, 'PARAMETER', ('NAME', 'TYPE'), (), ('QUALIFIER',))
 
     attrl = attrs(tup_tree)
 
@@ -1424,8 +1471,8 @@ def parse_parameter_reference(tup_tree):
             %ReferenceClass;>
     """
 
-    check_node(tup_tree, 'PARAMETER.REFERENCE', ['NAME'], ['REFERENCECLASS'],
-               ['QUALIFIER'])
+    check_node(tup_tree, 'PARAMETER.REFERENCE', ('NAME',), ('REFERENCECLASS',),
+               ('QUALIFIER',))
 
     attrl = attrs(tup_tree)
 
@@ -1448,8 +1495,8 @@ def parse_parameter_array(tup_tree):
             %ArraySize;>
     """
 
-    check_node(tup_tree, 'PARAMETER.ARRAY', ['NAME', 'TYPE'],
-               ['ARRAYSIZE'], ['QUALIFIER'])
+    check_node(tup_tree, 'PARAMETER.ARRAY', ('NAME', 'TYPE'),
+               ('ARRAYSIZE',), ('QUALIFIER',))
 
     attrl = attrs(tup_tree)
 
@@ -1478,8 +1525,8 @@ def parse_parameter_refarray(tup_tree):
             %ArraySize;>
     """
 
-    check_node(tup_tree, 'PARAMETER.REFARRAY', ['NAME'],
-               ['REFERENCECLASS', 'ARRAYSIZE'], ['QUALIFIER'])
+    check_node(tup_tree, 'PARAMETER.REFARRAY', ('NAME',),
+               ('REFERENCECLASS', 'ARRAYSIZE'), ('QUALIFIER',))
 
     attrl = attrs(tup_tree)
 
@@ -1514,7 +1561,7 @@ def parse_message(tup_tree):
             PROTOCOLVERSION CDATA #REQUIRED>
     """
 
-    check_node(tup_tree, 'MESSAGE', ['ID', 'PROTOCOLVERSION'])
+    check_node(tup_tree, 'MESSAGE', ('ID', 'PROTOCOLVERSION'))
 
     child = one_child(tup_tree,
                       ['SIMPLEREQ', 'MULTIREQ', 'SIMPLERSP', 'MULTIRSP',
@@ -1524,12 +1571,21 @@ def parse_message(tup_tree):
     return name(tup_tree), attrs(tup_tree), child
 
 
-def parse_multireq(tup_tree):   # pylint: disable=unused-argument
-    """Not Implemented. Because this request is generally not implemented
-       by platforms, It will probably never be implemented
+def parse_multireq(tup_tree):
     """
-    raise ParseError("Internal Error: Parsing support for element %r is not "
-                     "implemented" % name(tup_tree))
+      ::
+
+        <!ELEMENT MULTIREQ (SIMPLEREQ, SIMPLEREQ+)>
+    """
+
+    check_node(tup_tree, 'MULTIREQ')
+
+    if len(kids(tup_tree)) < 2:
+        raise ParseError("Element %r must have at least two child elements "
+                         "'SIMPLEREQ'" % name(tup_tree))
+
+    return name(tup_tree), attrs(tup_tree), list_of_same(tup_tree,
+                                                         ['SIMPLEREQ'])
 
 
 def parse_multiexpreq(tup_tree):   # pylint: disable=unused-argument
@@ -1574,7 +1630,7 @@ def parse_imethodcall(tup_tree):
             %CIMName;>
     """
 
-    check_node(tup_tree, 'IMETHODCALL', ['NAME'])
+    check_node(tup_tree, 'IMETHODCALL', ('NAME',))
 
     k = kids(tup_tree)
 
@@ -1600,8 +1656,8 @@ def parse_methodcall(tup_tree):
             %CIMName;>
     """
 
-    check_node(tup_tree, 'METHODCALL', ['NAME'], [],
-               ['LOCALCLASSPATH', 'LOCALINSTANCEPATH', 'PARAMVALUE'])
+    check_node(tup_tree, 'METHODCALL', ('NAME',), (),
+               ('LOCALCLASSPATH', 'LOCALINSTANCEPATH', 'PARAMVALUE'))
 
     path = list_of_matching(tup_tree, ['LOCALCLASSPATH', 'LOCALINSTANCEPATH'])
     if not path:
@@ -1627,7 +1683,7 @@ def parse_expmethodcall(tup_tree):
             %CIMName;>
     """
 
-    check_node(tup_tree, 'EXPMETHODCALL', ['NAME'], [], ['EXPPARAMVALUE'])
+    check_node(tup_tree, 'EXPMETHODCALL', ('NAME',), (), ('EXPPARAMVALUE',))
 
     params = list_of_matching(tup_tree, ['EXPPARAMVALUE'])
 
@@ -1654,8 +1710,8 @@ def parse_paramvalue(tup_tree):
     # Version 2.1.1 of DSP0201 lacks the %ParamType entity but it is present as
     # optional (for backwards compatibility) in version 2.2.
 
-    check_node(tup_tree, 'PARAMVALUE', ['NAME'],
-               ['PARAMTYPE', 'EmbeddedObject', 'EMBEDDEDOBJECT'])
+    check_node(tup_tree, 'PARAMVALUE', ('NAME',),
+               ('PARAMTYPE', 'EmbeddedObject', 'EMBEDDEDOBJECT'))
 
     child = optional_child(tup_tree,
                            ['VALUE', 'VALUE.REFERENCE', 'VALUE.ARRAY',
@@ -1689,7 +1745,7 @@ def parse_iparamvalue(tup_tree):
     :return: NAME, VALUE pair.
     """
 
-    check_node(tup_tree, 'IPARAMVALUE', ['NAME'])
+    check_node(tup_tree, 'IPARAMVALUE', ('NAME',))
 
     child = optional_child(tup_tree,
                            ['VALUE', 'VALUE.ARRAY', 'VALUE.REFERENCE',
@@ -1717,7 +1773,7 @@ def parse_expparamvalue(tup_tree):
             %CIMName;>
     """
 
-    check_node(tup_tree, 'EXPPARAMVALUE', ['NAME'], [], ['INSTANCE'])
+    check_node(tup_tree, 'EXPPARAMVALUE', ('NAME',), (), ('INSTANCE',))
 
     child = optional_child(tup_tree, ['INSTANCE'])
 
@@ -1725,11 +1781,21 @@ def parse_expparamvalue(tup_tree):
     return _name, child
 
 
-def parse_multirsp(tup_tree):   # pylint: disable=unused-argument
-    """This function not implemented. Because this request is generally not
-       implemented. It will probably never be implemented"""
-    raise ParseError("Internal Error: Parsing support for element %r is not "
-                     "implemented" % name(tup_tree))
+def parse_multirsp(tup_tree):
+    """
+      ::
+
+        <!ELEMENT MULTIRSP (SIMPLERSP, SIMPLERSP+)>
+    """
+
+    check_node(tup_tree, 'MULTIRSP')
+
+    if len(kids(tup_tree)) < 2:
+        raise ParseError("Element %r must have at least two child elements "
+                         "'SIMPLERSP'" % name(tup_tree))
+
+    return name(tup_tree), attrs(tup_tree), list_of_same(tup_tree,
+                                                         ['SIMPLERSP'])
 
 
 def parse_multiexprsp(tup_tree):   # pylint: disable=unused-argument
@@ -1774,7 +1840,7 @@ def parse_methodresponse(tup_tree):
             %CIMName;>
     """
 
-    check_node(tup_tree, 'METHODRESPONSE', ['NAME'])
+    check_node(tup_tree, 'METHODRESPONSE', ('NAME',))
 
     return name(tup_tree), attrs(tup_tree), list_of_various(tup_tree,
                                                             ['ERROR',
@@ -1798,7 +1864,7 @@ def parse_imethodresponse(tup_tree):
             %CIMName;>
     """
 
-    check_node(tup_tree, 'IMETHODRESPONSE', ['NAME'])
+    check_node(tup_tree, 'IMETHODRESPONSE', ('NAME',))
 
     return name(tup_tree), attrs(tup_tree), list_of_various(tup_tree,
                                                             ['ERROR',
@@ -1817,7 +1883,7 @@ def parse_error(tup_tree):
             DESCRIPTION CDATA #IMPLIED>
     """
 
-    check_node(tup_tree, 'ERROR', ['CODE'], ['DESCRIPTION'], [])
+    check_node(tup_tree, 'ERROR', ('CODE',), ('DESCRIPTION',), ())
 
     return (name(tup_tree), attrs(tup_tree), None)
 
@@ -1838,8 +1904,8 @@ def parse_returnvalue(tup_tree):
     # is present in version 2.2.  Make it optional to be backwards
     # compatible.
 
-    check_node(tup_tree, 'RETURNVALUE', [],
-               ['PARAMTYPE', 'EmbeddedObject', 'EMBEDDEDOBJECT'])
+    check_node(tup_tree, 'RETURNVALUE', (),
+               ('PARAMTYPE', 'EmbeddedObject', 'EMBEDDEDOBJECT'))
 
     child = optional_child(tup_tree, ['VALUE', 'VALUE.REFERENCE'])
     attrl = attrs(tup_tree)
@@ -2039,8 +2105,11 @@ def unpack_string(data, cimtype):
     if cimtype == 'string':
         value = data
     elif cimtype == 'datetime':
+        # The datetime value is parsed when it is first used, since many
+        # datetime values in responses are never used.
         try:
-            value = CIMDateTime(data)
+            # pylint: disable=protected-access
+            value = CIMDateTime._from_string_lazy(data)
         except ValueError as exc:
             raise ParseError("Invalid datetime value: %r (%s)" % (data, exc))
     elif cimtype == 'char16':
@@ -56,11 +56,13 @@ The fourth element is reserved.
 from __future__ import absolute_import
 
 import xml.sax
+import xml.parsers.expat
 import re
 import sys
 import six
 
 from .exceptions import ParseError
+from . import config
 
 __all__ = []
 
@@ -77,6 +79,15 @@ class CIMContentHandler(xml.sax.ContentHandler):
 
     The end result is that the root node is left in the list and available
     as the root attribute of the object.
+
+    The SAX parser may deliver the text content of an element in many chunks.
+    The chunks are collected in a list and are joined once, when the next
+    child element starts or the element ends, so that consecutive chunks
+    result in a single text child.
+
+    The element names, attribute names and attribute values are interned in
+    a table of the handler, so that equal strings (e.g. the class, property
+    and type names of many instances) are shared across the tupletree.
     """
 
     def __init__(self):
@@ -84,6 +95,8 @@ class CIMContentHandler(xml.sax.ContentHandler):
         self.root = None
         self.elements = []
         self.element = []
+        self.text = []
+        self.interned = {}
 
     def startDocument(self):
         assert self.elements == []
@@ -97,39 +110,211 @@ class CIMContentHandler(xml.sax.ContentHandler):
         # dictionary methods, but does not preserve order. So this handler
         # cannot preserve attribute order, because it is already lost when it
         # gets control.
+        if self.text:
+            self.flush_text()
         if self.element:
             self.elements.append(self.element)
+        intern = self.interned.setdefault
         attr_dict = {}  # No order preservation possible, see note above
         for k, v in attrs.items():
-            attr_dict[k] = v
-        element = (name, attr_dict, list(), None)
+            attr_dict[intern(k, k)] = intern(v, v)
+        element = (intern(name, name), attr_dict, list(), None)
         if self.element:
             self.element[2].append(element)
         self.element = element
 
     def endElement(self, name):
+        if self.text:
+            self.flush_text()
         if self.elements:
             self.element = self.elements.pop()
 
     def characters(self, content):
-        if self.element[2]:
-            try:
-                re.match(r'\s+', self.element[2][-1])
-            except TypeError:
-                pass
-            else:
-                ws = self.element[2].pop()
-                content = '%s%s' % (ws, content)
-        self.element[2].append(content)
+        self.text.append(content)
+
+    def flush_text(self):
+        """
+        Add the text chunks collected since the last element boundary as one
+        text child to the current element.
+        """
+        text = self.text
+        self.element[2].append(text[0] if len(text) == 1 else u''.join(text))
+        self.text = []
+
+
+#: Names of the XML parser backends supported by xml_to_tupletree_sax().
+XML_PARSER_BACKENDS = ('sax', 'expat', 'lxml')
+
+# Namespace of the attributes with the 'xml' prefix (e.g. 'xml:lang'), whose
+# names are reported by lxml in Clark notation.
+_XML_NS_PREFIX = '{http://www.w3.org/XML/1998/namespace}'
+
+
+class _BufferReader(object):
+    """
+    File-like object for reading the data of a :class:`py:bytearray` or
+    :class:`py:memoryview` object, that returns the data in chunks without
+    copying the buffer as a whole.
+    """
+
+    def __init__(self, buf):
+        self._view = memoryview(buf)
+        self._pos = 0
+
+    def read(self, size=-1):
+        """Return up to `size` bytes, or the remaining bytes."""
+        start = self._pos
+        length = len(self._view)
+        end = length if size < 0 else min(start + size, length)
+        self._pos = end
+        return self._view[start:end].tobytes()
+
+    def close(self):
+        """Release the buffer."""
+        self._view = memoryview(b'')
+        self._pos = 0
+
+
+def _parse_sax(xml_string):
+    """
+    Parse an XML string or a _BufferReader object into a tupletree, using
+    xml.sax with the CIMContentHandler class.
+    """
+    handler = CIMContentHandler()
+    if isinstance(xml_string, _BufferReader):
+        xml.sax.parse(xml_string, handler, None)
+    else:
+        xml.sax.parseString(xml_string, handler, None)
+    return handler.root
+
+
+def _parse_expat(xml_string):
+    """
+    Parse an XML string or a _BufferReader object into a tupletree, using the
+    expat parser directly.
+
+    This avoids the SAX layer and its Attributes objects: The attribute
+    dictionaries created by expat are used as they are, and text is buffered
+    by expat. Like CIMContentHandler, the strings are interned.
+    """
+    parser = xml.parsers.expat.ParserCreate()
+    parser.buffer_text = True
+    parser.buffer_size = 65536
+
+    # The element being built, and the stack of its ancestors
+    stack = []
+    state = {'element': None, 'root': None}
+    text = []
+    # Expat interns the element and attribute names, but not the attribute
+    # values
+    intern = {}.setdefault
+
+    def flush_text():
+        """Add the collected text chunks as one text child."""
+        state['element'][2].append(
+            text[0] if len(text) == 1 else u''.join(text))
+        del text[:]
+
+    def start_element(name, attrs):
+        """Expat handler for start tags."""
+        if text:
+            flush_text()
+        parent = state['element']
+        for k in attrs:
+            v = attrs[k]
+            attrs[k] = intern(v, v)
+        element = (name, attrs, [], None)
+        if parent is not None:
+            parent[2].append(element)
+            stack.append(parent)
+        state['element'] = element
+
+    def end_element(name):  # pylint: disable=unused-argument
+        """Expat handler for end tags."""
+        if text:
+            flush_text()
+        if stack:
+            state['element'] = stack.pop()
+        else:
+            state['root'] = state['element']
+
+    def character_data(data):
+        """Expat handler for text."""
+        # Text outside of the root element is ignorable whitespace
+        if state['element'] is not None:
+            text.append(data)
+
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.CharacterDataHandler = character_data
+    if isinstance(xml_string, _BufferReader):
+        parser.ParseFile(xml_string)
+    else:
+        parser.Parse(xml_string, True)
+    return state['root']
+
+
+def _parse_lxml(xml_string):
+    """
+    Parse an XML string or a _BufferReader object into a tupletree, using the
+    iterparse() function of lxml.
+
+    The elements are converted into tupletree tuples as they are completed,
+    and are then removed from the lxml tree. Like CIMContentHandler, the
+    strings are interned.
+    """
+    from lxml import etree  # pylint: disable=import-error
+
+    if isinstance(xml_string, six.text_type):
+        xml_string = xml_string.encode('utf-8')
+    if not isinstance(xml_string, _BufferReader):
+        xml_string = six.BytesIO(xml_string)
+
+    # Tuples of the completed elements whose parent is not yet complete. The
+    # child elements of an element are completed in document order before
+    # the element itself, so they are the last entries of the list.
+    pending = []
+    intern = {}.setdefault
+    for _, elem in etree.iterparse(
+            xml_string, events=('end',),
+            resolve_entities=False, no_network=True, huge_tree=True,
+            remove_comments=True, remove_pis=True):
+        contents = []
+        text = [elem.text] if elem.text else []
+        num_children = len(elem)
+        if num_children:
+            child_tuples = pending[-num_children:]
+            del pending[-num_children:]
+            for child, child_tuple in zip(elem, child_tuples):
+                if text:
+                    contents.append(u''.join(text))
+                    text = []
+                contents.append(child_tuple)
+                if child.tail:
+                    text.append(child.tail)
+            # The tail of this element is still needed by its parent
+            del elem[:]
+        if text:
+            contents.append(u''.join(text))
+        attrs = {}
+        for k, v in elem.attrib.items():
+            if k.startswith(_XML_NS_PREFIX):
+                k = 'xml:' + k[len(_XML_NS_PREFIX):]
+            attrs[intern(k, k)] = intern(v, v)
+        tag = elem.tag
+        pending.append((intern(tag, tag), attrs, contents, None))
+    return pending[0]
 
 
 def xml_to_tupletree_sax(xml_string, meaning):
     """
     Parse an XML string into tupletree with SAX parser.
 
-    Parses the string using the class CIMContentHandler and
-    returns the root element. As a SAX parser it uses minimal
-    memory.
+    Parses the string using the XML parser backend selected with the
+    :data:`~pywbem.config.XML_PARSER_BACKEND` config variable, and returns
+    the root element. By default, this is the class CIMContentHandler with
+    the SAX parser, which uses minimal memory. All backends produce the same
+    tupletree.
 
     This is a replacement for the previous parser (xml_to_tuple)
     which used the dom parser.
@@ -138,7 +323,9 @@ def xml_to_tupletree_sax(xml_string, meaning):
 
       xml_string (:term:`string`): A unicode string (when called for embedded
         objects) or byte string (when called for CIM-XML replies) containing
-        the XML to be parsed.
+        the XML to be parsed. CIM-XML replies may also be specified as a
+        :class:`py:bytearray` or :class:`py:memoryview` object, whose data is
+        parsed without copying it as a whole.
 
       meaning (:term:`string`):
         Short text with meaning of the XML string, for messages in exceptions.
@@ -149,10 +336,25 @@ def xml_to_tupletree_sax(xml_string, meaning):
 
     Raises:
 
-      pywbem.ParseError: Error detected by SAX parser or UTF-8/XML checkers
+      pywbem.ParseError: Error detected by XML parser or UTF-8/XML checkers
+      ValueError: Invalid XML parser backend in the config variable.
     """
 
-    handler = CIMContentHandler()
+    backend = config.XML_PARSER_BACKEND
+    if backend == 'sax':
+        parse = _parse_sax
+        parse_errors = (xml.sax.SAXParseException,)
+    elif backend == 'expat':
+        parse = _parse_expat
+        parse_errors = (xml.parsers.expat.ExpatError,)
+    elif backend == 'lxml':
+        from lxml import etree  # pylint: disable=import-error
+        parse = _parse_lxml
+        parse_errors = (etree.XMLSyntaxError,)
+    else:
+        raise ValueError("Invalid XML parser backend %r in config variable "
+                         "XML_PARSER_BACKEND (must be one of %r)" %
+                         (backend, XML_PARSER_BACKENDS))
 
     # The following conversion to a byte string is required because the SAX
     # parser in Python 2.6 and 3.4 (pywbem does not support 3.1 - 3.3) does not
@@ -164,31 +366,172 @@ def xml_to_tupletree_sax(xml_string, meaning):
         if isinstance(xml_string, six.text_type):
             xml_string = xml_string.encode("utf-8")
 
+    if isinstance(xml_string, (bytearray, memoryview)):
+        source = _BufferReader(xml_string)
+    else:
+        source = xml_string
+
     try:
-        xml.sax.parseString(xml_string, handler, None)
-    except (xml.sax.SAXParseException, UnicodeEncodeError) as exc:
+        root = parse(source)
+    except parse_errors + (UnicodeEncodeError,) as exc:
 
         # xml.sax.parse() is documented to only raise SAXParseException, and
         # xml.sax.parseString() in addition has been found to raise
-        # UnicodeEncodeError, so only those are caught. Other exception types
-        # are unexpected and will perculate upwards.
+        # UnicodeEncodeError, so only those are caught. The same applies to
+        # the exceptions of the other backends. Other exception types are
+        # unexpected and will perculate upwards.
 
         # Traceback of the exception that was caught
         org_tb = sys.exc_info()[2]
 
         # Improve quality of exception info (the check...() functions may
         # raise ParseError):
+        if isinstance(xml_string, (bytearray, memoryview)):
+            xml_string = memoryview(xml_string).tobytes()
         if isinstance(xml_string, six.binary_type):
             xml_string = check_invalid_utf8_sequences(xml_string, meaning)
         check_invalid_xml_chars(xml_string, meaning)
 
-        # If the checks above pass, re-raise the SAX exception info, with its
-        # original traceback info:
-        pe = ParseError("SAXParseException raised when parsing %s: %s" %
-                        (meaning, exc))
+        # If the checks above pass, re-raise the parser exception info, with
+        # its original traceback info:
+        pe = ParseError("%s raised when parsing %s: %s" %
+                        (exc.__class__.__name__, meaning, exc))
         six.reraise(type(pe), pe, org_tb)  # ignore this call in traceback!
 
-    return handler.root
+    return root
+
+
+class _StreamContentHandler(CIMContentHandler):
+    """SAX handler for CIM XML that detaches completed subtrees.
+
+    This handler builds the tuple tree like its base class, except that
+    child elements of the specified parent elements are removed from the tree
+    as soon as they are complete, and are collected in the `completed` list.
+    This keeps the tuple tree that is held by the handler small, regardless of
+    the number of such child elements in the document.
+    """
+
+    def __init__(self, parent_names, element_names=None):
+        CIMContentHandler.__init__(self)
+        self.parent_names = parent_names
+        self.element_names = element_names
+        self.completed = []
+
+    def endElement(self, name):
+        if self.elements:
+            parent = self.elements[-1]
+            if parent[0] in self.parent_names and \
+                    (self.element_names is None or
+                     name in self.element_names):
+                children = parent[2]
+                children.pop()
+                # Drop the whitespace preceding the detached element, so that
+                # it does not accumulate in the parent.
+                if children and isinstance(children[-1], six.string_types) \
+                        and not children[-1].strip():
+                    children.pop()
+                self.completed.append(self.element)
+        CIMContentHandler.endElement(self, name)
+
+
+class IncrementalTupleTreeParser(object):
+    """
+    Incremental parser for an XML document that is provided in chunks,
+    producing tuple trees for the child elements of specific parent elements
+    as soon as they are complete.
+
+    This parser is used for parsing CIM-XML responses while they are being
+    received, so that the objects in the response can be processed before
+    the complete response has arrived. The chunks are fed into the expat
+    parser (via its SAX interface) using its incremental mode. Only the
+    child elements that have not yet been returned, and the remaining
+    skeleton of the document, are held in memory.
+    """
+
+    def __init__(self, meaning, parent_names=('IRETURNVALUE',),
+                 element_names=None):
+        """
+        Parameters:
+
+          meaning (:term:`string`):
+            Short text with meaning of the XML document, for messages in
+            exceptions.
+
+          parent_names (:term:`py:iterable` of :term:`string`):
+            Names of the parent elements whose child elements are returned
+            as they are completed.
+
+          element_names (:term:`py:iterable` of :term:`string`):
+            Names of the child elements to be returned. Other child
+            elements remain in the tuple tree.
+            `None` means that all child elements are returned.
+        """
+        self._meaning = meaning
+        self._handler = _StreamContentHandler(
+            frozenset(parent_names),
+            None if element_names is None else frozenset(element_names))
+        self._parser = xml.sax.make_parser()
+        self._parser.setContentHandler(self._handler)
+        self._offset = 0
+
+    def feed(self, data):
+        """
+        Feed the next chunk of the XML document into the parser.
+
+        Parameters:
+
+          data (:term:`byte string`):
+            The next chunk of the XML document. A chunk may end anywhere,
+            including in the middle of an element or of a UTF-8 sequence.
+
+        Returns:
+
+          list of tupletree tuples: The child elements that have been
+          completed by this chunk, in document order. They have been removed
+          from the tuple tree of the document.
+
+        Raises:
+
+          pywbem.ParseError: Error detected by SAX parser.
+        """
+        self._parse(self._parser.feed, data)
+        self._offset += len(data)
+        completed = self._handler.completed
+        self._handler.completed = []
+        return completed
+
+    def close(self):
+        """
+        Indicate the end of the XML document to the parser.
+
+        Returns:
+
+          tupletree tuple with the remaining parsed XML tree, i.e. without
+          the child elements that have been returned by :meth:`feed`.
+
+        Raises:
+
+          pywbem.ParseError: Error detected by SAX parser, e.g. because the
+          document is incomplete.
+        """
+        self._parse(self._parser.close)
+        return self._handler.root
+
+    def _parse(self, func, *args):
+        """Invoke a parser function, translating parse errors."""
+        try:
+            func(*args)
+        except (xml.sax.SAXParseException, UnicodeEncodeError) as exc:
+            # The checks that xml_to_tupletree_sax() performs on the complete
+            # document are not possible here, because only the current chunk
+            # is still available, and it may start or end in the middle of a
+            # UTF-8 sequence. The position in the SAX exception message
+            # identifies the error location in the document.
+            org_tb = sys.exc_info()[2]
+            pe = ParseError("SAXParseException raised when parsing %s "
+                            "(after %s bytes): %s" %
+                            (self._meaning, self._offset, exc))
+            six.reraise(type(pe), pe, org_tb)  # ignore this call in traceback!
 
 
 # Patterns for check_invalid_utf8_sequences()
@@ -0,0 +1,294 @@
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the Free Software
+# Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+"""
+Instance store used by :class:`~pywbem_mock.FakedWBEMConnection` for the CIM
+instances of one CIM namespace of its mock repository.
+
+The instances are kept in insertion order and are indexed by their instance
+path, so that the lookups done by GetInstance, ModifyInstance, DeleteInstance
+and the duplicate check of CreateInstance do not need to scan all instances
+of the namespace. Secondary indexes by creation class name and by the
+instance paths that the reference properties of an instance point to serve
+the enumeration and the association operations.
+
+Copies of an instance store share the instances and the indexes until one of
+the stores is modified (copy-on-write), so that snapshots of the mock
+repository can be taken and restored in constant time.
+"""
+
+from __future__ import absolute_import
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+import six
+
+from pywbem import CIMInstanceName
+
+__all__ = []
+
+
+class InstanceRepository(object):
+    """
+    The CIM instances of one CIM namespace, indexed by instance path.
+
+    Iterating over the repository returns the instances in the order in
+    which they were added.
+
+    The instance paths are indexed by a frozen copy taken when the instance
+    is added (see :meth:`~pywbem.CIMInstanceName.freeze`), so that the index
+    is not affected when the path of an instance in the repository is
+    modified afterwards. The keys are compared and
+    hashed like :class:`~pywbem.CIMInstanceName` objects, i.e. case
+    insensitively for host, namespace, class name and key binding names.
+
+    The instance objects may be shared with other repositories (see
+    :meth:`copy`). Therefore, they are never modified in place; an instance
+    whose properties are updated is replaced by an updated copy.
+    """
+
+    def __init__(self, instances=None):
+        """
+        Parameters:
+
+          instances (iterable of :class:`~pywbem.CIMInstance`):
+            Instances to be added initially. Each instance must have a path.
+        """
+        # Instances by instance path, in the order they were added
+        self._instances = OrderedDict()
+
+        # Stored key object and insertion sequence number by instance path.
+        # The sequence number is used to return the instances of multiple
+        # classes in the order they were added.
+        self._keys = {}
+        self._seqnos = {}
+        self._next_seqno = 0
+
+        # Instances by creation class name, then instance path
+        self._by_classname = {}
+
+        # Referencing instances by the instance path a reference property
+        # points to, then by the path of the referencing instance
+        self._by_reference = {}
+
+        # Flag indicating that the indexes above are shared with a copy of
+        # this repository, and must be copied before they are modified
+        self._shared = False
+
+        if instances:
+            for inst in instances:
+                self.append(inst)
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, list(self))
+
+    def __len__(self):
+        return len(self._instances)
+
+    def __iter__(self):
+        return six.itervalues(self._instances)
+
+    def __contains__(self, path):
+        return path in self._instances
+
+    def copy(self):
+        """
+        Return a copy of the repository that shares the instances and the
+        indexes with this repository until either of them is modified.
+        The copy is created in constant time.
+        """
+        result = InstanceRepository()
+        result.__dict__.update(self.__dict__)
+        self._shared = result._shared = True
+        return result
+
+    def _unshare(self):
+        """
+        Copy the indexes if they are shared with a copy of this repository,
+        before this repository is modified. The instances are not copied.
+        """
+        if not self._shared:
+            return
+        self._instances = self._instances.copy()
+        self._keys = self._keys.copy()
+        self._seqnos = self._seqnos.copy()
+        self._by_classname = dict(
+            (classname, bucket.copy())
+            for classname, bucket in six.iteritems(self._by_classname))
+        self._by_reference = dict(
+            (ref_path, referencing.copy())
+            for ref_path, referencing in six.iteritems(self._by_reference))
+        self._shared = False
+
+    @staticmethod
+    def _reference_paths(inst):
+        """
+        Return the set of instance paths that the reference properties of
+        the instance point to.
+        """
+        return set(prop.value for prop in six.itervalues(inst.properties)
+                   if prop.type == 'reference' and isinstance(
+                       prop.value, CIMInstanceName))
+
+    def _index_references(self, key, inst):
+        """Add the reference properties of the instance to the index."""
+        for ref_path in self._reference_paths(inst):
+            try:
+                self._by_reference[ref_path][key] = inst
+            except KeyError:
+                self._by_reference[ref_path.freeze()] = OrderedDict(
+                    [(key, inst)])
+
+    def _unindex_references(self, key, inst):
+        """Remove the reference properties of the instance from the index."""
+        for ref_path in self._reference_paths(inst):
+            referencing = self._by_reference.get(ref_path)
+            if referencing is not None:
+                referencing.pop(key, None)
+                if not referencing:
+                    del self._by_reference[ref_path]
+
+    def append(self, inst):
+        """
+        Add an instance to the repository.
+
+        Parameters:
+
+          inst (:class:`~pywbem.CIMInstance`):
+            The instance to be added. It must have a path. The instance
+            object is stored as-is, i.e. it is not copied.
+
+        Raises:
+
+          ValueError: An instance with the same path already exists.
+        """
+        if inst.path in self._instances:
+            raise ValueError("An instance with path %s already exists" %
+                             inst.path)
+        self._unshare()
+        key = inst.path.freeze()
+        self._instances[key] = inst
+        self._keys[key] = key
+        self._seqnos[key] = self._next_seqno
+        self._next_seqno += 1
+        classname = key.classname
+        try:
+            self._by_classname[classname][key] = inst
+        except KeyError:
+            self._by_classname[classname] = OrderedDict([(key, inst)])
+        self._index_references(key, inst)
+
+    def find(self, path):
+        """
+        Return a tuple (seqno, instance) for the instance with the specified
+        instance path, where seqno is the insertion sequence number of the
+        instance in the repository. The instance is not copied.
+
+        If there is no such instance, return (None, None).
+        """
+        inst = self._instances.get(path)
+        if inst is None:
+            return (None, None)
+        return (self._seqnos[path], inst)
+
+    def remove(self, path):
+        """
+        Remove the instance with the specified instance path from the
+        repository and return it.
+
+        Raises:
+
+          KeyError: No instance with that path exists.
+        """
+        if path not in self._instances:
+            raise KeyError(path)
+        self._unshare()
+        inst = self._instances.pop(path)
+        classname = self._keys.pop(path).classname
+        del self._seqnos[path]
+        del self._by_classname[classname][path]
+        if not self._by_classname[classname]:
+            del self._by_classname[classname]
+        self._unindex_references(path, inst)
+        return inst
+
+    def update_properties(self, path, properties):
+        """
+        Update the properties of the instance with the specified instance
+        path, keeping the reference index consistent.
+
+        The instance is replaced by a copy with the updated properties,
+        because the instance object may be shared with other repositories.
+
+        Parameters:
+
+          path (:class:`~pywbem.CIMInstanceName`):
+            Instance path of the instance to be updated.
+
+          properties:
+            The properties to be updated, in any form accepted by
+            :meth:`pywbem.CIMInstance.update`.
+
+        Raises:
+
+          KeyError: No instance with that path exists.
+        """
+        inst = self._instances[path]
+        self._unshare()
+        key = self._keys[path]
+        self._unindex_references(key, inst)
+        inst = inst.copy()
+        inst.update(properties)
+        self._instances[key] = inst
+        self._by_classname[key.classname][key] = inst
+        self._index_references(key, inst)
+
+    def iter_classnames(self, classnames):
+        """
+        Return an iterator over the instances whose creation class is one of
+        the specified class names, in the order the instances were added.
+
+        Parameters:
+
+          classnames (iterable of :term:`string`):
+            The class names. They are matched case-sensitively against the
+            class names in the instance paths.
+        """
+        buckets = []
+        for classname in set(classnames):
+            bucket = self._by_classname.get(classname)
+            if bucket:
+                buckets.append(bucket)
+        if not buckets:
+            return iter([])
+        if len(buckets) == 1:
+            return six.itervalues(buckets[0])
+        keys = [key for bucket in buckets for key in bucket]
+        keys.sort(key=self._seqnos.__getitem__)
+        return (self._instances[key] for key in keys)
+
+    def iter_referencing(self, path):
+        """
+        Return an iterator over the instances that have at least one
+        reference property whose value is equal to the specified instance
+        path, in the order the instances were added.
+        """
+        referencing = self._by_reference.get(path)
+        if not referencing:
+            return iter([])
+        keys = sorted(referencing, key=self._seqnos.__getitem__)
+        return (referencing[key] for key in keys)
@@ -0,0 +1,152 @@
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the Free Software
+# Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+"""
+Copy-on-write snapshots of the mock repository of
+:class:`~pywbem_mock.FakedWBEMConnection`.
+
+A snapshot shares the class, qualifier declaration and instance tables of the
+namespaces with the mock repository. A table is copied when it is modified
+for the first time after the snapshot was taken or restored, either in the
+mock repository or in the repository of another connection the snapshot was
+restored to. The CIM objects themselves are never modified in place by the
+mock repository and are therefore never copied.
+"""
+
+from __future__ import absolute_import
+
+import six
+
+from pywbem._nocasedict import NocaseDict
+from ._instancerepository import InstanceRepository
+
+__all__ = []
+
+
+class _CopyOnWriteDict(NocaseDict):
+    """
+    A NocaseDict whose items may be shared with other dictionaries of this
+    class, and that copies its items before it is modified for the first
+    time.
+    """
+
+    def __init__(self, *args, **kwargs):
+        # Set before the initial items are added
+        self._shared = False
+        super(_CopyOnWriteDict, self).__init__(*args, **kwargs)
+
+    def share(self):
+        """
+        Return a new dictionary that shares the items with this dictionary.
+        The new dictionary is created in constant time.
+        """
+        result = _CopyOnWriteDict()
+        result._data = self._data  # pylint: disable=protected-access
+        self._shared = result._shared = True
+        return result
+
+    def _unshare(self):
+        """Copy the items if they are shared with another dictionary."""
+        if self._shared:
+            self._data = self._data.copy()
+            self._shared = False
+
+    def __setitem__(self, key, value):
+        self._unshare()
+        super(_CopyOnWriteDict, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._unshare()
+        super(_CopyOnWriteDict, self).__delitem__(key)
+
+    def clear(self):
+        if self._shared:
+            self._data = type(self._data)()
+            self._shared = False
+        super(_CopyOnWriteDict, self).clear()
+
+
+def _share_tables(repo):
+    """
+    Return a tuple (repo, shared) for a mock repository dictionary
+    (by namespace) of classes, qualifier declarations or instances.
+
+    repo is the dictionary to be used by the mock repository from now on,
+    and shared is a dictionary with the same content for use by a snapshot.
+    Both share the tables of the namespaces until the tables are modified.
+    """
+    new_repo = NocaseDict()
+    shared = NocaseDict()
+    for ns, table in six.iteritems(repo):
+        if isinstance(table, InstanceRepository):
+            new_repo[ns] = table.copy()
+            shared[ns] = table.copy()
+        else:
+            if not isinstance(table, _CopyOnWriteDict):
+                table = _CopyOnWriteDict(table)
+            new_repo[ns] = table.share()
+            shared[ns] = table.share()
+    return new_repo, shared
+
+
+class RepositorySnapshot(object):
+    # pylint: disable=too-few-public-methods
+    """
+    A snapshot of the mock repository of a
+    :class:`~pywbem_mock.FakedWBEMConnection` object, created by
+    :meth:`~pywbem_mock.FakedWBEMConnection.snapshot_repository`.
+
+    A snapshot is not affected by later modifications of the mock
+    repository, and can be restored any number of times into the mock
+    repository of any connection with
+    :meth:`~pywbem_mock.FakedWBEMConnection.restore_repository`.
+    """
+
+    def __init__(self, conn):
+        """
+        Take a snapshot of the mock repository of the connection.
+
+        Parameters:
+
+          conn (:class:`~pywbem_mock.FakedWBEMConnection`):
+            The connection whose mock repository is snapshotted. Its
+            repository dictionaries are replaced by new dictionaries with
+            the same content.
+        """
+        conn.classes, self._classes = _share_tables(conn.classes)
+        conn.qualifiers, self._qualifiers = _share_tables(conn.qualifiers)
+        conn.instances, self._instances = _share_tables(conn.instances)
+        self._methods = _copy_methods(conn.methods)
+
+    def restore(self, conn):
+        """
+        Replace the mock repository of the connection with the content of
+        this snapshot.
+        """
+        self._classes, conn.classes = _share_tables(self._classes)
+        self._qualifiers, conn.qualifiers = _share_tables(self._qualifiers)
+        self._instances, conn.instances = _share_tables(self._instances)
+        conn.methods = _copy_methods(self._methods)
+
+
+def _copy_methods(methods):
+    """
+    Return a copy of the dictionary of method callbacks, by namespace and
+    class name, without copying the callbacks.
+    """
+    return NocaseDict([
+        (ns, NocaseDict([(cln, callbacks.copy())
+                         for cln, callbacks in six.iteritems(classes)]))
+        for ns, classes in six.iteritems(methods)])
@@ -27,8 +27,11 @@ For documentation, see mocksupport.rst.
 
 from __future__ import absolute_import, print_function
 
+import os
 import copy
+import itertools
 import uuid
+import hashlib
 import time
 import sys
 import locale
@@ -37,6 +40,7 @@ import re
 from xml.dom import minidom
 from mock import Mock
 import six
+from six.moves import cPickle as pickle
 
 
 from pywbem import WBEMConnection, CIMClass, CIMClassName, \
@@ -47,9 +51,12 @@ from pywbem import WBEMConnection, CIMClass, CIMClassName, \
     CIM_ERR_INVALID_CLASS, CIM_ERR_ALREADY_EXISTS, \
     CIM_ERR_INVALID_NAMESPACE, CIM_ERR_INVALID_ENUMERATION_CONTEXT, \
     CIM_ERR_NOT_SUPPORTED, CIM_ERR_QUERY_LANGUAGE_NOT_SUPPORTED, \
-    DEFAULT_NAMESPACE, MOFCompiler, MOFWBEMConnection
+    CIM_ERR_SERVER_LIMITS_EXCEEDED, DEFAULT_NAMESPACE, MOFCompiler, \
+    MOFWBEMConnection, __version__
 from pywbem._nocasedict import NocaseDict
 from ._dmtf_cim_schema import DMTFCIMSchema
+from ._instancerepository import InstanceRepository
+from ._repositorysnapshot import RepositorySnapshot
 
 
 __all__ = ['FakedWBEMConnection', 'method_callback_interface']
@@ -62,6 +69,12 @@ _DEFAULT_MAX_OBJECT_COUNT = 100
 # Maximum Open... timeout if not set by request
 OPEN_MAX_TIMEOUT = 40
 
+# Default Open... timeout in seconds if not specified by request
+_DEFAULT_OPERATION_TIMEOUT = 40
+
+# Default maximum number of open enumeration contexts of the Fake Server
+_DEFAULT_MAX_ENUMERATION_CONTEXTS = 256
+
 # per DSP0200, the default behavior for EnumerateInstance DeepInheritance
 # if not set by server.  Default is True.
 DEFAULT_DEEP_INHERITANCE = True
@@ -227,7 +240,8 @@ class FakedWBEMConnection(WBEMConnection):
     """
     def __init__(self, default_namespace=DEFAULT_NAMESPACE,
                  use_pull_operations=False, stats_enabled=False,
-                 response_delay=None, repo_lite=False):
+                 response_delay=None, repo_lite=False,
+                 max_enumeration_contexts=None):
         """
         Parameters:
 
@@ -263,6 +277,19 @@ class FakedWBEMConnection(WBEMConnection):
             repository.
             If `True`, lite mode is set.
             If `False`, full mode is set.
+
+          max_enumeration_contexts (:term:`integer`):
+            *New in pywbem 0.13 as experimental.*
+
+            Maximum number of enumeration contexts of the open and pull
+            operations that can be open at the same time. Open operations
+            that would need more enumeration contexts fail with
+            CIM_ERR_SERVER_LIMITS_EXCEEDED. Enumeration contexts are closed
+            when their last objects have been pulled, when they are closed
+            with :meth:`~pywbem.WBEMConnection.CloseEnumeration`, or when no
+            pull operation is performed on them within the `OperationTimeout`
+            of the open operation.
+            `None` sets a default of 256.
         """
         # Response delay in seconds. Any operation is delayed by this time.
         # Initialize before superclass init because otherwise logger may
@@ -291,11 +318,10 @@ class FakedWBEMConnection(WBEMConnection):
 
         # The CIM instances in the mock repository.
         # Because instances do not have a name, the format is slightly
-        # different: This is a dictionary of lists where the top level key is
-        # the CIM namespace name and the value is a list of CIM instances in
-        # that namespace, represented as CIMInstance objects.
-        # TODO: ks. FUTURE maybe we should really have a subdict per class but
-        #           it is not important for initial release.
+        # different: This is a dictionary where the top level key is the CIM
+        # namespace name and the value is an InstanceRepository with the CIM
+        # instances in that namespace, represented as CIMInstance objects and
+        # indexed by their instance path.
         self.instances = NocaseDict()
 
         self.methods = NocaseDict()
@@ -303,12 +329,24 @@ class FakedWBEMConnection(WBEMConnection):
         self._repo_lite = repo_lite
 
         # Open Pull Contexts. The key for each context is an enumeration
-        # context id.  The data is the total list of instances/names to
-        # be returned and the current position in the list. Any context in
-        # this list is still open.
+        # context id.  The data is an iterator that creates the remaining
+        # instances/names to be returned on demand, and the expiration time
+        # of the context. Any context in this list is still open.
         self.enumeration_contexts = {}
 
+        if max_enumeration_contexts is None:
+            max_enumeration_contexts = _DEFAULT_MAX_ENUMERATION_CONTEXTS
+        elif max_enumeration_contexts < 1:
+            raise ValueError("Invalid value for max_enumeration_contexts: "
+                             "%r, must be a positive integer" %
+                             max_enumeration_contexts)
+        self.max_enumeration_contexts = max_enumeration_contexts
+
         self._imethodcall = Mock(side_effect=self._mock_imethodcall)
+        self._imethodcall_iter = Mock(
+            side_effect=self._mock_imethodcall_iter)
+        self._imethodcall_multi = Mock(
+            side_effect=self._mock_imethodcall_multi)
         self._methodcall = Mock(side_effect=self._mock_methodcall)
 
     @property
@@ -482,7 +520,8 @@ class FakedWBEMConnection(WBEMConnection):
         self._merge_repos(mof_repo)
 
     def compile_dmtf_schema(self, schema_version, schema_root_dir, class_names,
-                            use_experimental=False, verbose=False):
+                            use_experimental=False, verbose=False,
+                            cache_dir=None):
         """
         Compile the classes defined by `class_names` and their dependent
         classes from the DMTF CIM schema version defined by
@@ -543,6 +582,28 @@ class FakedWBEMConnection(WBEMConnection):
           verbose (:class:`py:bool`):
             If `True`, progress messages are output to stdout
 
+          cache_dir (:term:`string`):
+            *New in pywbem 0.13 as experimental.*
+
+            Directory in which snapshots of the compiled CIM classes and
+            qualifier declarations are kept, so that compiling the same
+            classes again loads them from a snapshot file instead of parsing
+            the MOF files. The directory is created if it does not exist.
+
+            A snapshot is identified by the schema version, the class names
+            in `class_names`, a hash of the content of the MOF files of the
+            schema, and the CIM classes and qualifier declarations that
+            already exist in the target namespace before the compilation.
+            Any change to these inputs therefore causes a recompilation.
+            Snapshots are kept separately for each Python version and each
+            pywbem version.
+
+            Snapshot files are stored in a binary format (Python pickle) that
+            must only be loaded from trusted directories. They are not removed
+            automatically when they are no longer used.
+
+            `None` means that no snapshots are used.
+
         Raises:
             ValueError: The schema cannot be retrieved from the DMTF web
               site, the schema_version is invalid, or a class name cannot
@@ -553,12 +614,27 @@ class FakedWBEMConnection(WBEMConnection):
         schema = DMTFCIMSchema(schema_version, schema_root_dir,
                                use_experimental=use_experimental,
                                verbose=verbose)
+        # The namespace used by compile_mof_string() for namespace=None
+        namespace = DEFAULT_NAMESPACE
+
+        snapshot_file = None
+        if cache_dir is not None:
+            snapshot_file = self._schema_snapshot_file(
+                schema, class_names, namespace, cache_dir)
+            if self._load_schema_snapshot(snapshot_file, namespace):
+                if verbose:
+                    print('Loaded compiled schema from %s' % snapshot_file)
+                return
+
         schema_mof = schema.build_schema_mof(class_names)
         search_paths = schema.schema_mof_dir
         self.compile_mof_string(schema_mof, namespace=None,
                                 search_paths=[search_paths],
                                 verbose=verbose)
 
+        if snapshot_file is not None:
+            self._save_schema_snapshot(snapshot_file, namespace)
+
     def add_cimobjects(self, objects, namespace=None):
         # pylint: disable=line-too-long
         """
@@ -640,10 +716,10 @@ class FakedWBEMConnection(WBEMConnection):
                     if self._find_instance(inst.path, inst_repo)[1] is not None:
                         raise ValueError('The instance %s already exists in '
                                          'namespace %s' % (inst, namespace))
-                    self.instances[namespace].append(inst)
+                    inst_repo.append(inst)
                 except CIMError as ce:
                     if ce.status_code == CIM_ERR_INVALID_NAMESPACE:
-                        self.instances[namespace] = [inst]
+                        self.instances[namespace] = InstanceRepository([inst])
                     else:
                         raise CIMError(CIM_ERR_FAILED, 'Internal failure of '
                                        'add_cimobject operation. Rcvd '
@@ -711,6 +787,56 @@ class FakedWBEMConnection(WBEMConnection):
             raise ValueError("Duplicate method specification")
         self.methods[namespace][classname][methodname] = method_callback
 
+    def snapshot_repository(self):
+        """
+        *New in pywbem 0.13 as experimental.*
+
+        Take a snapshot of the mock repository, that can later be restored
+        with :meth:`restore_repository`.
+
+        The snapshot is taken in constant time, independent of the number of
+        CIM objects in the mock repository: The snapshot and the mock
+        repository share the CIM objects and the tables of the CIM namespaces,
+        and a table is copied only when it is modified for the first time
+        after the snapshot was taken.
+
+        The dictionaries of the mock repository (the `classes`,
+        `qualifiers`, `instances` and `methods` attributes and the tables of
+        the CIM namespaces therein) are replaced by new dictionaries with the
+        same content, so references to these dictionaries that were obtained
+        before the snapshot was taken must not be used to modify the mock
+        repository. The CIM objects in the mock repository must not be
+        modified in place at all, because they are shared with the snapshot.
+
+        Returns:
+
+          Snapshot object, that is not affected by later modifications of the
+          mock repository. It is to be treated as opaque.
+        """
+        return RepositorySnapshot(self)
+
+    def restore_repository(self, snapshot):
+        """
+        *New in pywbem 0.13 as experimental.*
+
+        Replace the content of the mock repository with a snapshot taken
+        with :meth:`snapshot_repository`, and close any open enumeration
+        contexts.
+
+        The snapshot may have been taken on a different
+        :class:`~pywbem_mock.FakedWBEMConnection` object, and it can be
+        restored any number of times. Like taking the snapshot, restoring it
+        is done in constant time, independent of the number of CIM objects
+        in the snapshot.
+
+        Parameters:
+
+          snapshot:
+            The snapshot object returned by :meth:`snapshot_repository`.
+        """
+        snapshot.restore(self)
+        self.enumeration_contexts.clear()
+
     def display_repository(self, namespaces=None, dest=None, summary=False,
                            output_format='mof'):
         """
@@ -876,9 +1002,118 @@ class FakedWBEMConnection(WBEMConnection):
         Move our repo to the mofcompile repo to provide a basis
         for the compile.
         """
+        # The classes are copied because the MOF compiler repository modifies
+        # classes in place when resolving them.
         repo.classes = copy.deepcopy(self.classes)
         repo.qualifiers = copy.deepcopy(self.qualifiers)
-        repo.instances = copy.deepcopy(self.instances)
+        # The MOF compiler repository holds plain lists of instances. It
+        # replaces instances rather than modifying them, so the instance
+        # objects do not need to be copied.
+        repo.instances = NocaseDict(
+            [(ns, list(insts))
+             for ns, insts in six.iteritems(self.instances)])
+
+    def _schema_snapshot_file(self, schema, class_names, namespace,
+                              cache_dir):
+        """
+        Return the path name of the snapshot file for compiling the classes
+        `class_names` of the DMTF CIM schema `schema` into the namespace
+        `namespace` of the mock repository in its current state.
+
+        The file name contains the Python version and a hash over all inputs
+        of the compilation, including the pywbem version.
+        """
+        if isinstance(class_names, six.string_types):
+            class_names = [class_names]
+
+        hasher = hashlib.sha1()
+
+        def update(text):
+            """Add a string to the hash, terminated by a zero byte."""
+            if isinstance(text, six.text_type):
+                text = text.encode('utf-8')
+            hasher.update(text + b'\0')
+
+        # The pickled objects depend on the implementation of the pywbem
+        # classes, and the compiled classes on the MOF compiler
+        update(__version__)
+        update(schema.schema_version_str)
+        for cln in sorted(set(cln.lower() for cln in class_names)):
+            update(cln)
+        update(namespace.lower())
+
+        # The existing classes and qualifier declarations of the namespace
+        # are used by the MOF compiler instead of searching the schema
+        for repo in (self.qualifiers, self.classes):
+            if namespace in repo:
+                for name in sorted(repo[namespace], key=six.text_type.lower):
+                    update(repo[namespace][name].tomof())
+
+        mof_dir = schema.schema_mof_dir
+        for root, dirs, files in os.walk(mof_dir):
+            dirs.sort()
+            for file_ in sorted(files):
+                if not file_.endswith('.mof'):
+                    continue
+                path = os.path.join(root, file_)
+                update(os.path.relpath(path, mof_dir).replace(os.sep, '/'))
+                with open(path, 'rb') as fp:
+                    update(fp.read())
+
+        # The snapshot is pickled with the highest pickle protocol of the
+        # Python version, which older Python versions cannot load
+        return os.path.join(cache_dir, 'cim_schema_%s_py%s.%s_%s.pickle' %
+                            ((schema.schema_version_str,) +
+                             tuple(sys.version_info[0:2]) +
+                             (hasher.hexdigest(),)))
+
+    def _load_schema_snapshot(self, snapshot_file, namespace):
+        """
+        Replace the classes and qualifier declarations of the namespace
+        `namespace` of the mock repository with those in the snapshot file.
+
+        Returns `True` if the snapshot file was loaded, and `False` if it does
+        not exist or is invalid.
+        """
+        try:
+            with open(snapshot_file, 'rb') as fp:
+                qualifiers, classes = pickle.load(fp)
+        except (IOError, OSError):
+            return False
+        except Exception:  # pylint: disable=broad-except
+            # Truncated or written by an incompatible version. It is
+            # replaced after the compilation.
+            return False
+
+        self.qualifiers[namespace] = NocaseDict(
+            [(qual.name, qual) for qual in qualifiers])
+        self.classes[namespace] = NocaseDict(
+            [(cl.classname, cl) for cl in classes])
+        return True
+
+    def _save_schema_snapshot(self, snapshot_file, namespace):
+        """
+        Save the classes and qualifier declarations of the namespace
+        `namespace` of the mock repository in the snapshot file, replacing
+        any existing file atomically.
+        """
+        qualifiers = list(self.qualifiers[namespace].values()) \
+            if namespace in self.qualifiers else []
+        classes = list(self.classes[namespace].values()) \
+            if namespace in self.classes else []
+
+        cache_dir = os.path.dirname(snapshot_file)
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        tmp_file = '%s.%s.tmp' % (snapshot_file, os.getpid())
+        with open(tmp_file, 'wb') as fp:
+            pickle.dump((qualifiers, classes), fp, pickle.HIGHEST_PROTOCOL)
+        try:
+            os.rename(tmp_file, snapshot_file)
+        except OSError:
+            # On Windows, the target file must not exist
+            os.remove(snapshot_file)
+            os.rename(tmp_file, snapshot_file)
 
     def _merge_repos(self, repo):
         """
@@ -908,9 +1143,13 @@ class FakedWBEMConnection(WBEMConnection):
                                            IncludeClassOrigin=True)
                         inst.path = CIMInstanceName.from_instance(cc, inst, ns)
                     try:
-                        self.instances[ns].append(inst)
+                        inst_repo = self.instances[ns]
                     except KeyError:
-                        self.instances[ns] = [inst]
+                        inst_repo = self.instances[ns] = InstanceRepository()
+                    # The MOF compiler overwrites existing instances
+                    if inst.path in inst_repo:
+                        inst_repo.remove(inst.path)
+                    inst_repo.append(inst)
         if repo.qualifiers:
             self.qualifiers.clear()
             for ns in repo.qualifiers:
@@ -924,8 +1163,8 @@ class FakedWBEMConnection(WBEMConnection):
     ##########################################################
     #
     #   Functions Mocked. WBEMConnection only mocks the WBEMConnection
-    #   _imethodcall and _methodcall methods.  This captures all calls
-    #   to the wbem server.
+    #   _imethodcall, _imethodcall_iter, _imethodcall_multi and _methodcall
+    #   methods.  This captures all calls to the wbem server.
     #
     ##########################################################
 
@@ -953,6 +1192,32 @@ class FakedWBEMConnection(WBEMConnection):
 
         return result
 
+    def _mock_imethodcall_iter(self, methodname, namespace, **params):
+        """
+        Mocks the WBEMConnection._imethodcall_iter() method.
+
+        This mock performs the faked operation like _mock_imethodcall() and
+        returns an iterator through the objects in its IRETURNVALUE.
+        """
+        result = self._mock_imethodcall(methodname, namespace, **params)
+        return iter(result[0][2] if result else [])
+
+    def _mock_imethodcall_multi(self, calls):
+        """
+        Mocks the WBEMConnection._imethodcall_multi() method.
+
+        This mock performs the faked operations like _mock_imethodcall(), one
+        after the other, and returns their results or CIMError exceptions.
+        """
+        results = []
+        for methodname, namespace, params in calls:
+            try:
+                results.append(
+                    self._mock_imethodcall(methodname, namespace, **params))
+            except CIMError as exc:
+                results.append(exc)
+        return results
+
     def _mock_methodcall(self, methodname, localobject, Params=None, **params):
         # pylint: disable=invalid-name
         """
@@ -1075,15 +1340,15 @@ class FakedWBEMConnection(WBEMConnection):
         and if it does, returns the handle to that repository. If the
         repo for namespace does not exist, it generates a CIM_Error
 
-        The instance repository is a list if instances within the
-        defined namespace
+        The instance repository is an InstanceRepository with the instances
+        within the defined namespace, indexed by instance path
 
         Parameters:
 
           namespace(:term:`string`):
             String containing the name of the namespace to get
 
-        Returns: List of instances
+        Returns: InstanceRepository of instances
 
         Raises:
            CIM_Error, CIM_ERR_INVALID_NAMESPACE if this namespace
@@ -1226,7 +1491,7 @@ class FakedWBEMConnection(WBEMConnection):
 
         # try to get the target class and create a copy for response
         try:
-            cc = classes_repo[classname].copy()
+            cc = self._copy_class(classes_repo[classname])
             for prop in cc.properties.values():
                 prop.propagated = False
             for method in cc.properties.values():
@@ -1252,7 +1517,7 @@ class FakedWBEMConnection(WBEMConnection):
                         cc.properties[prop.name].propagated = True
                 for meth in super_class.methods.values():
                     if meth.name not in cc.methods:
-                        cc.methods[meth.name] = meth.copy()
+                        cc.methods[meth.name] = self._copy_method(meth)
                         cc.methods[meth.name].propagated = True
 
                 sc_name = super_class.superclass
@@ -1267,6 +1532,32 @@ class FakedWBEMConnection(WBEMConnection):
 
         return cc
 
+    @staticmethod
+    def _copy_method(method):
+        """
+        Return a copy of the CIMMethod object including copies of its
+        parameters, so that the attributes of the copied method and
+        parameters can be modified without modifying the original.
+        """
+        method = method.copy()
+        for pname, param in list(method.parameters.items()):
+            method.parameters[pname] = param.copy()
+        return method
+
+    def _copy_class(self, klass):
+        """
+        Return a copy of the CIMClass object including copies of its
+        properties, methods and parameters, so that the attributes of the
+        copied class and its elements can be modified without modifying the
+        class in the repository.
+        """
+        klass = klass.copy()
+        for pname, prop in list(klass.properties.items()):
+            klass.properties[pname] = prop.copy()
+        for mname, method in list(klass.methods.items()):
+            klass.methods[mname] = self._copy_method(method)
+        return klass
+
     def _get_association_classes(self, namespace):
         """
         Return list of associator classes from the class repo
@@ -1291,32 +1582,20 @@ class FakedWBEMConnection(WBEMConnection):
         Find an instance in the instance repo by iname and return the
         index of that instance.
 
+        The lookup uses the instance path index of the instance repo and
+        therefore does not depend on the number of instances in the repo.
+
         Parameters:
 
           iname: CIMInstancename to find
 
           inst_repo: the instance repo to search
 
-        Return (None, None if not found. Otherwise return tuple of
-               index, instance
-
-        Raises:
-
-          CIMError: Failed if repo invalid.
-        """
-        rtn_inst = None
-        rtn_index = None
-        for index, inst in enumerate(inst_repo):
-            if iname == inst.path:
-                if rtn_inst is not None:
-                    # TODO:ks Future Remove dup test since we should be
-                    # insuring no dups on instance creation
-                    raise CIMError(CIM_ERR_FAILED, 'Invalid Repository. '
-                                   'Multiple instances with same path %s'
-                                   % rtn_inst.path)
-                rtn_inst = inst
-                rtn_index = index
-        return(rtn_index, rtn_inst)
+        Return (None, None) if not found. Otherwise return tuple of
+               index, instance. The index is the insertion sequence number
+               of the instance in the instance repo.
+        """
+        return inst_repo.find(iname)
 
     def _get_instance(self, iname, namespace, property_list, local_only,
                       include_class_origin, include_qualifiers):
@@ -1325,9 +1604,9 @@ class FakedWBEMConnection(WBEMConnection):
         other instance methods that need to get an instance from the
         repository.
 
-        It attempts to get the instance, copies it, and filters it
-        for input parameters like localonly, includequalifiers, and
-        propertylist.
+        It attempts to get the instance and returns a copy of it that is
+        filtered for input parameters like localonly, includequalifiers, and
+        propertylist (see :meth:`_filter_instance`).
 
         Returns:
           CIMInstance copy from the repository with property_list filtered,
@@ -1337,49 +1616,97 @@ class FakedWBEMConnection(WBEMConnection):
         """
         inst_repo = self._get_instance_repo(namespace)
 
-        rtn_tup = self._find_instance(iname, inst_repo)
-        inst = rtn_tup[1]
+        inst = self._find_instance(iname, inst_repo)[1]
 
         if inst is None:
             raise CIMError(CIM_ERR_NOT_FOUND,
                            'Instance not found in repository namespace %s. '
                            'Path=%s' % (namespace, iname))
-        rtn_inst = inst.copy()
 
-        # If local_only remove properties where class_origin
-        # differs from class of target instance
-        if local_only:
-            for p in rtn_inst:
-                class_origin = rtn_inst.properties[p].class_origin
-                if class_origin and class_origin != inst.classname:
-                    del rtn_inst[p]
+        return self._filter_instance(inst, namespace, property_list,
+                                     local_only, include_class_origin,
+                                     include_qualifiers)
+
+    def _filter_instance(self, inst, namespace, property_list, local_only,
+                         include_class_origin, include_qualifiers):
+        """
+        Return a copy of an instance that was found in the repository,
+        filtered for the local_only, property_list, include_class_origin and
+        include_qualifiers parameters of the instance operations.
+
+        The enumeration and association responders use this method directly
+        on the instances they found, so that the instances do not have to be
+        looked up in the repository again.
+
+        Only the properties that are returned are put into the copy. A
+        property object is copied only if its qualifiers or class origin need
+        to be removed, so the instance in the repository is never modified.
+
+        Parameters:
+
+          inst (:class:`~pywbem.CIMInstance`): Instance in the repository.
+
+          namespace (:term:`string`): Namespace of the instance.
+
+          property_list (iterable of :term:`string`): Names of the properties
+            to be returned. If None, all properties are returned.
+
+          local_only (:class:`py:bool`): Return only the properties that are
+            defined in the creation class of the instance.
+
+          include_class_origin (:class:`py:bool`): Keep the class origin of
+            the properties.
+
+          include_qualifiers (:class:`py:bool`): Keep the qualifiers of the
+            instance and its properties.
+        """
+        classname = inst.classname
+
+        if property_list is not None:
+            property_list = set(p.lower() for p in property_list)
 
         # if not repo_lite test against class properties
-        if not self._repo_lite and local_only:
+        class_pl = None
+        if local_only and not self._repo_lite:
             # gets class propertylist which may be local only or all
             # superclasses
             try:
-                cl = self._get_class(iname.classname, namespace,
+                cl = self._get_class(classname, namespace,
                                      local_only=local_only)
             except CIMError as ce:
                 if ce.status_code == CIM_ERR_NOT_FOUND:
                     raise CIMError(CIM_ERR_INVALID_CLASS, 'Class %s not found '
                                    ' for instance %s in namespace %s.' %
-                                   (iname.classname, iname, namespace))
-
-            class_pl = cl.properties.keys()
-
-            for p in list(rtn_inst):
-                if p not in class_pl:
-                    del rtn_inst[p]
-
-        self._filter_properties(rtn_inst, property_list)
-
-        if not include_qualifiers:
-            self._remove_qualifiers(rtn_inst)
+                                   (classname, inst.path, namespace))
+                raise
+            class_pl = cl.properties
+
+        rtn_inst = CIMInstance(classname)
+        rtn_inst.path = inst.path.copy()
+        if include_qualifiers:
+            rtn_inst.qualifiers = inst.qualifiers.copy()
+
+        rtn_props = rtn_inst.properties
+        for pname, prop in inst.properties.items():
+            # If local_only remove properties where class_origin
+            # differs from class of target instance
+            if local_only and prop.class_origin and \
+                    prop.class_origin != classname:
+                continue
+            if class_pl is not None and pname not in class_pl:
+                continue
+            if property_list is not None and \
+                    pname.lower() not in property_list:
+                continue
+            if (not include_qualifiers and prop.qualifiers) or \
+                    (not include_class_origin and prop.class_origin):
+                prop = prop.copy()
+                if not include_qualifiers:
+                    prop.qualifiers = NocaseDict()
+                if not include_class_origin:
+                    prop.class_origin = None
+            rtn_props[pname] = prop
 
-        if not include_class_origin:
-            self._remove_classorigin(rtn_inst)
         return rtn_inst
 
     def _get_class_list_enums(self, classname, namespace):
@@ -1923,17 +2250,19 @@ class FakedWBEMConnection(WBEMConnection):
         try:
             # TODO:ks Future use internal function of repo to create namespace
             #         for this repo. ex. _set_instance
-            for inst in self.instances[namespace]:
-                if inst.path == new_instance.path:
-                    raise CIMError(CIM_ERR_ALREADY_EXISTS,
-                                   'NewInstance already exists. %s in '
-                                   'namespace %s.' %
-                                   (new_instance.path, namespace))
-            self.instances[namespace].append(new_instance)
+            inst_repo = self.instances[namespace]
         except KeyError:
-            self.instances[namespace] = [new_instance]
+            self.instances[namespace] = InstanceRepository([new_instance])
             if namespace not in self.methods:
                 self.methods[namespace] = NocaseDict()
+        else:
+            if self._find_instance(new_instance.path,
+                                   inst_repo)[1] is not None:
+                raise CIMError(CIM_ERR_ALREADY_EXISTS,
+                               'NewInstance already exists. %s in '
+                               'namespace %s.' %
+                               (new_instance.path, namespace))
+            inst_repo.append(new_instance)
 
         # Create instance returns model path, path relative to namespace
         return self._make_tuple([new_instance.path.copy()])
@@ -2004,12 +2333,11 @@ class FakedWBEMConnection(WBEMConnection):
         if modified_instance.path.namespace is None:
             mod_inst_path.namespace = namespace
 
-        orig_instance_tup = self._find_instance(mod_inst_path, inst_repo)
-        if orig_instance_tup[0] is None:
+        original_instance = self._find_instance(mod_inst_path, inst_repo)[1]
+        if original_instance is None:
             raise CIMError(CIM_ERR_NOT_FOUND,
                            'Original Instance %s not found in namespace %s' %
                            (modified_instance.path, namespace))
-        original_instance = orig_instance_tup[1]
 
         # Remove duplicate properties from property_list
         if property_list:
@@ -2080,8 +2408,8 @@ class FakedWBEMConnection(WBEMConnection):
 
         # Modify the value of properties in the repo with those from
         # modified instance
-        index = orig_instance_tup[0]
-        inst_repo[index].update(modified_instance.properties)
+        inst_repo.update_properties(mod_inst_path,
+                                    modified_instance.properties)
         return
 
     def _fake_getinstance(self, namespace, **params):
@@ -2143,22 +2471,9 @@ class FakedWBEMConnection(WBEMConnection):
                                ' Cannot delete instance %s' %
                                (iname.classname, namespace, iname))
 
-        del_inst = None
-        for enum_tup in enumerate(insts_repo):
-            index = enum_tup[0]
-            inst = enum_tup[1]
-            if iname == inst.path:
-                if del_inst is not None:
-                    raise CIMError(CIM_ERR_FAILED, 'Internal Error: Invalid '
-                                   ' Repository. Multiple instances with same '
-                                   ' path %s' % inst.path)
-                # TODO:ks Future remove this test for duplicate inst paths since
-                #       we test for dups on insertion
-                else:
-                    del insts_repo[index]
-                    del_inst = iname
-
-        if not del_inst:
+        try:
+            insts_repo.remove(iname)
+        except KeyError:
             raise CIMError(CIM_ERR_NOT_FOUND, 'Instance %s not found in '
                            'repository namespace %s' % (iname, namespace))
 
@@ -2168,13 +2483,26 @@ class FakedWBEMConnection(WBEMConnection):
         :meth:`~pywbem.WBEMConnection.EnumerateInstances`.
 
         Gets a list of subclasses if the classes exist in the repository
-        then executes getInstance for each to create the list of instances
-        to be returned.
+        then creates a filtered copy of each of their instances to build the
+        list of instances to be returned.
 
         Raises:
 
             CIMError: CIM_ERR_INVALID_NAMESPACE
         """
+        insts = list(self._iter_enumerate_instances(namespace, **params))
+
+        return self._make_tuple(insts)
+
+    def _iter_enumerate_instances(self, namespace, **params):
+        """
+        Return an iterator over the instances to be returned for the
+        EnumerateInstances and OpenEnumerateInstances operations.
+
+        The parameters are checked when this method is called. The filtered
+        copies of the instances are created while iterating, from a list of
+        the instances in the repository at the time of the call.
+        """
         inst_repo = self._get_instance_repo(namespace)
 
         cname = params['ClassName']
@@ -2213,14 +2541,13 @@ class FakedWBEMConnection(WBEMConnection):
                     pl = class_pl
                 else:      # reduce pl to properties in class_properties
                     pl = [pc for pc in class_pl if pc in pl]
-        insts = [self._get_instance(inst.path, namespace,
-                                    pl,
-                                    None,  # LocalOnly never gets passed
-                                    params['IncludeClassOrigin'],
-                                    params['IncludeQualifiers'])
-                 for inst in inst_repo if inst.path.classname in clns]
+        ico = params['IncludeClassOrigin']
+        iq = params['IncludeQualifiers']
+        insts = list(inst_repo.iter_classnames(clns))
 
-        return self._make_tuple(insts)
+        # LocalOnly never gets passed
+        return (self._filter_instance(inst, namespace, pl, None, ico, iq)
+                for inst in insts)
 
     def _fake_enumerateinstancenames(self, namespace, **params):
         """
@@ -2230,6 +2557,19 @@ class FakedWBEMConnection(WBEMConnection):
             Get instance names for instances that match the path define
             by `ClassName` and returns a list of the names.
 
+        """
+        rtn_paths = list(self._iter_enumerate_instancenames(namespace,
+                                                            **params))
+
+        return self._make_tuple(rtn_paths)
+
+    def _iter_enumerate_instancenames(self, namespace, **params):
+        """
+        Return an iterator over the instance names to be returned for the
+        EnumerateInstanceNames and OpenEnumerateInstancePaths operations.
+
+        The parameters are checked when this method is called. The instance
+        names are copied while iterating.
         """
         cname = params['ClassName']
         assert isinstance(cname, CIMClassName)
@@ -2239,12 +2579,9 @@ class FakedWBEMConnection(WBEMConnection):
 
         inst_repo = self._get_instance_repo(namespace)
 
-        inst_paths = [inst.path for inst in inst_repo
-                      if inst.path.classname in clns]
+        insts = list(inst_repo.iter_classnames(clns))
 
-        rtn_paths = [path.copy() for path in inst_paths]
-
-        return self._make_tuple(rtn_paths)
+        return (inst.path.copy() for inst in insts)
 
     def _fake_execquery(self, namespace, **params):
         """
@@ -2264,13 +2601,17 @@ class FakedWBEMConnection(WBEMConnection):
     #
     #####################################################################
 
-    @staticmethod
-    def _appendpath_unique(list_, path):
-        """Append path to list if not already in list"""
-        for p in list_:
-            if p == path:
-                return
-        list_.append(path)
+    def _iter_with_host(self, objects):
+        """
+        Return an iterator over the objects (instances or instance names) of
+        the iterator `objects`, after setting the host of the mock server in
+        the instance paths that have no host.
+        """
+        for obj in objects:
+            path = obj.path if isinstance(obj, CIMInstance) else obj
+            if path.host is None:
+                path.host = self.host
+            yield obj
 
     def _return_assoc_tuple(self, objects):
         """
@@ -2396,13 +2737,14 @@ class FakedWBEMConnection(WBEMConnection):
                     rtn_classnames_set.add(cl.classname)
         return list(rtn_classnames_set)
 
-    def _get_reference_instnames(self, instname, namespace, result_class, role):
+    def _get_reference_instances(self, instname, namespace, result_class,
+                                 role):
         """
         Get the reference instances from the repository for the target
         instname and filtered by the result_class and role parameters.
 
-        Returns a list of the reference instance names. The returned list is
-        the original, not a copy so the user must copy them
+        Returns a list of the reference instances. The returned list contains
+        the originals, not copies so the user must copy them
         """
         insts_repo = self._get_instance_repo(namespace)
 
@@ -2416,24 +2758,35 @@ class FakedWBEMConnection(WBEMConnection):
             result_classes = []
 
         instname.namespace = namespace
-        rtn_instpaths = []
+        rtn_insts = []
         role = role.lower() if role else role
-        # TODO:ks FUTURE: Make list from _get_reference_classnames if classes
-        #       exist. Otherwise set list to insts_repo to search every instance
-        for inst in insts_repo:
+        # Only the instances that reference instname are visited, using the
+        # reference index of the instance repo. Each instance is returned
+        # once, even if several of its reference properties match.
+        for inst in insts_repo.iter_referencing(instname):
+            if result_class and inst.classname not in result_classes:
+                continue
             for prop in six.itervalues(inst.properties):
                 if prop.type == 'reference':
                     # does this prop instance name match target inst name
                     if prop.value == instname:
-                        if result_class:
-                            if inst.classname not in result_classes:
-                                continue
                         if role and prop.name.lower() != role:
                             continue
+                        rtn_insts.append(inst)
+                        break
 
-                        self._appendpath_unique(rtn_instpaths, inst.path)
+        return rtn_insts
 
-        return rtn_instpaths
+    def _get_reference_instnames(self, instname, namespace, result_class, role):
+        """
+        Get the reference instances from the repository for the target
+        instname and filtered by the result_class and role parameters.
+
+        Returns a list of the reference instance names. The returned list is
+        the original, not a copy so the user must copy them
+        """
+        return [inst.path for inst in self._get_reference_instances(
+            instname, namespace, result_class, role)]
 
     def _get_associated_classnames(self, classname, namespace, assoc_class,
                                    result_class, result_role, role):
@@ -2484,20 +2837,19 @@ class FakedWBEMConnection(WBEMConnection):
         Returns a list of the reference instance names. The returned list is
         the original, not a copy so the user must copy them
         """
-        instance_repo = self._get_instance_repo(namespace)
         result_classes = self._classnamelist(result_class, namespace)
         assoc_classes = self._classnamelist(assoc_class, namespace)
 
         inst_name.namespace = namespace
         rtn_instpaths = []
+        rtn_instpaths_set = set()
         role = role.lower() if role else role
         result_role = result_role.lower() if result_role else result_role
 
-        ref_paths = self._get_reference_instnames(inst_name, namespace,
+        ref_insts = self._get_reference_instances(inst_name, namespace,
                                                   assoc_class, role)
         # Get associated instance names
-        for ref_path in ref_paths:
-            inst = self._find_instance(ref_path, instance_repo)[1]
+        for inst in ref_insts:
             for prop in six.itervalues(inst.properties):
                 if prop.type == 'reference':
                     if prop.value == inst_name:
@@ -2511,7 +2863,9 @@ class FakedWBEMConnection(WBEMConnection):
                             continue
                         if result_role and prop.name.lower() != result_role:
                             continue
-                        self._appendpath_unique(rtn_instpaths, prop.value)
+                        if prop.value not in rtn_instpaths_set:
+                            rtn_instpaths_set.add(prop.value)
+                            rtn_instpaths.append(prop.value)
 
         return rtn_instpaths
 
@@ -2541,16 +2895,27 @@ class FakedWBEMConnection(WBEMConnection):
             return self._return_assoc_tuple(ref_result)
 
         assert isinstance(obj_name, CIMInstanceName)
-        ref_paths = self._get_reference_instnames(obj_name, namespace,
-                                                  rc, role)
-        rtn_names = [r.copy() for r in ref_paths]
-
-        for iname in rtn_names:
-            if iname.host is None:
-                iname.host = self.host
+        rtn_names = list(self._iter_reference_names(namespace, **params))
 
         return self._return_assoc_tuple(rtn_names)
 
+    def _iter_reference_names(self, namespace, **params):
+        """
+        Return an iterator over the instance names to be returned for the
+        ReferenceNames and OpenReferenceInstancePaths operations on an
+        instance.
+
+        The reference instances are determined when this method is called.
+        Their instance names are copied while iterating.
+        """
+        rc = None if params['ResultClass'] is None else \
+            params['ResultClass'].classname
+        ref_paths = self._get_reference_instnames(params['ObjectName'],
+                                                  namespace, rc,
+                                                  params['Role'])
+
+        return self._iter_with_host(r.copy() for r in ref_paths)
+
     def _fake_references(self, namespace, **params):
         """
         Implements a mock WBEM server responder for
@@ -2573,22 +2938,31 @@ class FakedWBEMConnection(WBEMConnection):
                                                    iq, ico, pl)
 
         assert isinstance(obj_name, CIMInstanceName)
-        ref_paths = self._get_reference_instnames(obj_name, namespace, rc,
-                                                  role)
-        rtn_insts = []
-        for path in ref_paths:
-            rtn_insts.append(self._get_instance(
-                path, namespace, None,
-                params['PropertyList'],
-                params['IncludeClassOrigin'],
-                params['IncludeQualifiers']))
-
-        for inst in rtn_insts:
-            if inst.path.host is None:
-                inst.path.host = self.host
+        rtn_insts = list(self._iter_reference_instances(namespace, **params))
 
         return self._return_assoc_tuple(rtn_insts)
 
+    def _iter_reference_instances(self, namespace, **params):
+        """
+        Return an iterator over the instances to be returned for the
+        References and OpenReferenceInstances operations on an instance.
+
+        The reference instances are determined when this method is called.
+        Their filtered copies are created while iterating.
+        """
+        rc = None if params['ResultClass'] is None else \
+            params['ResultClass'].classname
+        pl = params['PropertyList']
+        ico = params['IncludeClassOrigin']
+        iq = params['IncludeQualifiers']
+        ref_insts = self._get_reference_instances(params['ObjectName'],
+                                                  namespace, rc,
+                                                  params['Role'])
+
+        return self._iter_with_host(
+            self._filter_instance(inst, namespace, pl, None, ico, iq)
+            for inst in ref_insts)
+
     def _fake_associatornames(self, namespace, **params):
         # pylint: disable=invalid-name
         """
@@ -2619,17 +2993,32 @@ class FakedWBEMConnection(WBEMConnection):
             return self._return_assoc_tuple(assoc_result)
 
         assert isinstance(obj_name, CIMInstanceName)
-        rtn_paths = self._get_associated_instancenames(obj_name,
+        results = list(self._iter_associator_names(namespace, **params))
+
+        return self._return_assoc_tuple(results)
+
+    def _iter_associator_names(self, namespace, **params):
+        """
+        Return an iterator over the instance names to be returned for the
+        AssociatorNames and OpenAssociatorInstancePaths operations on an
+        instance.
+
+        The associated instance names are determined when this method is
+        called. They are copied while iterating.
+        """
+        self._get_instance_repo(namespace)
+
+        rc = None if params['ResultClass'] is None else \
+            params['ResultClass'].classname
+        ac = None if params['AssocClass'] is None else \
+            params['AssocClass'].classname
+        rtn_paths = self._get_associated_instancenames(params['ObjectName'],
                                                        namespace,
                                                        ac, rc,
-                                                       result_role, role)
-        results = [p.copy() for p in rtn_paths]
-
-        for iname in results:
-            if iname.host is None:
-                iname.host = self.host
+                                                       params['ResultRole'],
+                                                       params['Role'])
 
-        return self._return_assoc_tuple(results)
+        return self._iter_with_host(p.copy() for p in rtn_paths)
 
     def _fake_associators(self, namespace, **params):
         """
@@ -2661,29 +3050,56 @@ class FakedWBEMConnection(WBEMConnection):
                                                    iq, ico, pl)
 
         assert isinstance(obj_name, CIMInstanceName)
-        assoc_names = self._get_associated_instancenames(obj_name,
+        results = list(self._iter_associator_instances(namespace, **params))
+
+        return self._return_assoc_tuple(results)
+
+    def _iter_associator_instances(self, namespace, **params):
+        """
+        Return an iterator over the instances to be returned for the
+        Associators and OpenAssociatorInstances operations on an instance.
+
+        The associated instances are determined when this method is called,
+        so that instances that are deleted afterwards do not break the
+        iteration. The filtered copies of the instances are created while
+        iterating.
+        """
+        inst_repo = self._get_instance_repo(namespace)
+
+        rc = None if params['ResultClass'] is None else \
+            params['ResultClass'].classname
+        ac = None if params['AssocClass'] is None else \
+            params['AssocClass'].classname
+        pl = params['PropertyList']
+        ico = params['IncludeClassOrigin']
+        iq = params['IncludeQualifiers']
+        assoc_names = self._get_associated_instancenames(params['ObjectName'],
                                                          namespace,
                                                          ac, rc,
-                                                         result_role, role)
-        results = []
-        for obj_name in assoc_names:
-            results.append(self._get_instance(
-                obj_name, namespace, None,
-                params['PropertyList'],
-                params['IncludeClassOrigin'],
-                params['IncludeQualifiers']))
+                                                         params['ResultRole'],
+                                                         params['Role'])
 
-        return self._return_assoc_tuple(results)
+        assoc_insts = []
+        for path in assoc_names:
+            inst = self._find_instance(path, inst_repo)[1]
+            if inst is None:
+                raise CIMError(CIM_ERR_NOT_FOUND,
+                               'Instance not found in repository namespace '
+                               '%s. Path=%s' % (namespace, path))
+            assoc_insts.append(inst)
+
+        return (self._filter_instance(inst, namespace, pl, None, ico, iq)
+                for inst in assoc_insts)
 
     #####################################################################
     #
     #  Faked WBEMConnection Open and Pull Instances Methods
     #
-    #  All of the following methods take the simplistic approach of getting
-    #  all of the data from the original functions and saving it
-    #  in the contexts dictionary.
-    #  We could improve performance by using an iterator to get the data
-    #  but are taking the simple approach since this is a mock tool.
+    #  The open methods get an iterator over the result objects from the
+    #  same functions as the corresponding traditional operations. The
+    #  iterator is saved in the enumeration context, and the pull methods
+    #  take the next objects from it, so that the result objects are
+    #  created on demand instead of all at once.
     #
     #####################################################################
 
@@ -2702,39 +3118,90 @@ class FakedWBEMConnection(WBEMConnection):
 
         return [("IRETURNVALUE", {}, objs), enum_ctxt_tup, eos_tup]
 
+    @staticmethod
+    def _next_objects(context_data, max_obj_cnt):
+        """
+        Get the next objects of an enumeration context.
+
+        The objects are taken from the iterator in the context. One object is
+        read ahead in order to detect the end of the sequence.
+
+        Returns a tuple of the list of up to max_obj_cnt objects and a
+        boolean indicating whether the end of the sequence has been reached.
+        """
+        read_ahead = context_data['next']  # Contains 0 or 1 object
+        objs = read_ahead[0:max_obj_cnt]
+        del read_ahead[0:max_obj_cnt]
+        objs.extend(itertools.islice(context_data['data'],
+                                     max_obj_cnt - len(objs)))
+        if not read_ahead:
+            read_ahead.extend(itertools.islice(context_data['data'], 1))
+        return objs, not read_ahead
+
+    def _expire_enumeration_contexts(self):
+        """
+        Remove the enumeration contexts whose operation timeout has expired
+        since the last open or pull operation on them.
+        """
+        now = time.time()
+        expired = [context_id for context_id, context_data
+                   in six.iteritems(self.enumeration_contexts)
+                   if context_data['expiration'] is not None and
+                   context_data['expiration'] < now]
+        for context_id in expired:
+            del self.enumeration_contexts[context_id]
+
     def _open_response(self, objects, namespace, pull_type, **params):
         """
-        Build an open... response once the objects have been extracted from
-        the repository.
+        Build an open... response from an iterator over the objects to be
+        returned.
+
+        If not all objects are returned, an enumeration context is created
+        that keeps the iterator for the subsequent pull operations. The
+        context expires if no pull operation is performed on it within the
+        `OperationTimeout` of the request (0 means no expiration). At most
+        `max_enumeration_contexts` contexts can be open at the same time.
+
+        Raises:
+
+            CIMError: CIM_ERR_SERVER_LIMITS_EXCEEDED
         """
+        self._expire_enumeration_contexts()
+
         max_obj_cnt = params['MaxObjectCount']
         if max_obj_cnt is None:
             max_obj_cnt = _DEFAULT_MAX_OBJECT_COUNT
 
-        default_server_timeout = 40
-        timeout = default_server_timeout if params['OperationTimeout'] is None \
+        timeout = _DEFAULT_OPERATION_TIMEOUT \
+            if params['OperationTimeout'] is None \
             else params['OperationTimeout']
 
-        if len(objects) <= max_obj_cnt:
-            eos = u'TRUE'
+        context_data = {'pull_type': pull_type,
+                        'data': iter(objects),
+                        'next': [],
+                        'namespace': namespace,
+                        'interoptimeout': timeout,
+                        'expiration': None}
+
+        rtn_objs, eos = self._next_objects(context_data, max_obj_cnt)
+
+        if eos:
             context_id = ""
-            rtn_inst_names = objects
         else:
-            eos = u'FALSE'
+            if len(self.enumeration_contexts) >= \
+                    self.max_enumeration_contexts:
+                raise CIMError(CIM_ERR_SERVER_LIMITS_EXCEEDED,
+                               'Maximum number of %s open enumeration '
+                               'contexts exceeded in mock server.' %
+                               self.max_enumeration_contexts)
             context_id = self._create_contextid()
-            # TODO:ks Future. Use the timeout along with response delay. Then
-            # user could timeout pulls. This means adding timer test to
-            # pulls and close. Timer should be used to close old contexts
-            # also.
-            self.enumeration_contexts[context_id] = {'pull_type': pull_type,
-                                                     'data': objects,
-                                                     'namespace': namespace,
-                                                     'time': time.clock(),
-                                                     'interoptimeout': timeout}
-            rtn_inst_names = objects[0:max_obj_cnt]
-            del objects[0: max_obj_cnt]
-
-        return self._make_pull_imethod_resp(rtn_inst_names, eos, context_id)
+            if timeout:
+                context_data['expiration'] = time.time() + timeout
+            self.enumeration_contexts[context_id] = context_data
+
+        return self._make_pull_imethod_resp(rtn_objs,
+                                            u'TRUE' if eos else u'FALSE',
+                                            context_id)
 
     def _pull_response(self, namespace, req_type, **params):
         """
@@ -2753,6 +3220,7 @@ class FakedWBEMConnection(WBEMConnection):
             CIMError: CIM_ERR_INVALID_ENUMERATION_CONTEXT
         """
         self._get_instance_repo(namespace)
+        self._expire_enumeration_contexts()
         context_id = params['EnumerationContext']
 
         try:
@@ -2768,23 +3236,22 @@ class FakedWBEMConnection(WBEMConnection):
                            '%s for EnumerationContext %s'
                            % (context_data['pull_type'], req_type, context_id))
 
-        objs_list = context_data['data']
-
         max_obj_cnt = params['MaxObjectCount']
         if not max_obj_cnt:
             max_obj_cnt = _DEFAULT_MAX_OBJECT_COUNT
 
-        if len(objs_list) <= max_obj_cnt:
-            eos = u'TRUE'
-            rtn_objs_list = objs_list
+        rtn_objs_list, eos = self._next_objects(context_data, max_obj_cnt)
+
+        if eos:
             del self.enumeration_contexts[context_id]
             context_id = ""
-        else:
-            eos = u'FALSE'
-            rtn_objs_list = objs_list[0: max_obj_cnt]
-            del objs_list[0: max_obj_cnt]
+        elif context_data['expiration'] is not None:
+            context_data['expiration'] = \
+                time.time() + context_data['interoptimeout']
 
-        return self._make_pull_imethod_resp(rtn_objs_list, eos, context_id)
+        return self._make_pull_imethod_resp(rtn_objs_list,
+                                            u'TRUE' if eos else u'FALSE',
+                                            context_id)
 
     @staticmethod
     def _validate_open_params(**params):
@@ -2817,9 +3284,9 @@ class FakedWBEMConnection(WBEMConnection):
         self._get_instance_repo(namespace)
 
         self._validate_open_params(**params)
-        result_t = self._fake_enumerateinstancenames(namespace, **params)
+        objects = self._iter_enumerate_instancenames(namespace, **params)
 
-        return self._open_response(result_t[0][2], namespace,
+        return self._open_response(objects, namespace,
                                    'PullInstancePaths', **params)
 
     def _fake_openenumerateinstances(self, namespace, **params):
@@ -2831,9 +3298,9 @@ class FakedWBEMConnection(WBEMConnection):
         self._get_instance_repo(namespace)
         self._validate_open_params(**params)
 
-        result_t = self._fake_enumerateinstances(namespace, **params)
+        objects = self._iter_enumerate_instances(namespace, **params)
 
-        return self._open_response(result_t[0][2], namespace,
+        return self._open_response(objects, namespace,
                                    'PullInstancesWithPath', **params)
 
     def _fake_openreferenceinstancepaths(self, namespace, **params):
@@ -2848,9 +3315,7 @@ class FakedWBEMConnection(WBEMConnection):
         params['ObjectName'] = params['InstanceName']
         del params['InstanceName']
 
-        result = self._fake_referencenames(namespace, **params)
-
-        objects = [] if result is None else [x[2] for x in result[0][2]]
+        objects = self._iter_reference_names(namespace, **params)
 
         return self._open_response(objects, namespace,
                                    'PullInstancePaths', **params)
@@ -2866,9 +3331,7 @@ class FakedWBEMConnection(WBEMConnection):
         params['ObjectName'] = params['InstanceName']
         del params['InstanceName']
 
-        result = self._fake_references(namespace, **params)
-
-        objects = [] if result is None else [x[2] for x in result[0][2]]
+        objects = self._iter_reference_instances(namespace, **params)
 
         return self._open_response(objects, namespace,
                                    'PullInstancesWithPath', **params)
@@ -2885,9 +3348,7 @@ class FakedWBEMConnection(WBEMConnection):
         params['ObjectName'] = params['InstanceName']
         del params['InstanceName']
 
-        result = self._fake_associatornames(namespace, **params)
-
-        objects = [] if result is None else [x[2] for x in result[0][2]]
+        objects = self._iter_associator_names(namespace, **params)
 
         return self._open_response(objects, namespace,
                                    'PullInstancePaths', **params)
@@ -2903,9 +3364,7 @@ class FakedWBEMConnection(WBEMConnection):
         params['ObjectName'] = params['InstanceName']
         del params['InstanceName']
 
-        result = self._fake_associators(namespace, **params)
-
-        objects = [] if result is None else [x[2] for x in result[0][2]]
+        objects = self._iter_associator_instances(namespace, **params)
 
         return self._open_response(objects, namespace,
                                    'PullInstancesWithPath', **params)
@@ -2962,6 +3421,7 @@ class FakedWBEMConnection(WBEMConnection):
             context repository. Otherwise it returns an exception.
         """
         self._get_instance_repo(namespace)
+        self._expire_enumeration_contexts()
 
         context_id = params['EnumerationContext']
 
@@ -0,0 +1,54 @@
+#
+# (C) Copyright 2018 IBM Corp.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the Free Software
+# Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+"""
+Setup commands for pywbem, that are configured in the 'commands' option of
+the 'global' section in setup.cfg.
+"""
+
+import os
+import sys
+
+from setuptools.command.install_lib import install_lib
+
+# Modules of the pywbem package that use syntax of Python 3.6 and higher
+# (async/await and asynchronous generators). They are imported by the pywbem
+# package only on these Python versions.
+# Keep in sync with py36_src_files in makefile.
+PY36_MODULES = [
+    '_async_http.py',
+    '_async_listener.py',
+    '_async_operations.py',
+]
+
+
+class InstallLib(install_lib):
+    """
+    The install_lib command, except that on Python versions before 3.6 it
+    does not byte-compile the modules that use syntax of Python 3.6.
+    """
+
+    # Name of the command that is replaced by this class
+    command_name = 'install_lib'
+
+    def byte_compile(self, files):
+        """Byte-compile the installed Python files."""
+        if sys.version_info[0:2] < (3, 6):
+            files = [f for f in files
+                     if os.path.basename(f) not in PY36_MODULES]
+        install_lib.byte_compile(self, files)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+
+"""
+Test the AsyncWBEMListener class.
+
+The tests do not use the async/await syntax, so that this module can be
+collected on all Python versions.
+"""
+
+from __future__ import absolute_import
+
+import sys
+import errno
+import socket
+import threading
+
+import pytest
+from six.moves import http_client
+
+import pywbem
+from pywbem import WBEMListener, cim_http
+
+pytestmark = pytest.mark.skipif(
+    sys.version_info[0:2] < (3, 6),
+    reason="AsyncWBEMListener requires Python 3.6")
+
+AsyncWBEMListener = getattr(pywbem, 'AsyncWBEMListener', None)
+
+HOST = 'localhost'
+PORT = 50010
+
+HEADERS = {'Content-Type': 'application/xml; charset=utf-8',
+           'CIMExport': 'MethodRequest',
+           'CIMExportMethod': 'ExportIndication',
+           'CIMProtocolVersion': '1.4'}
+
+_REQUEST = u"""<?xml version="1.0" encoding="utf-8" ?>
+<CIM CIMVERSION="2.0" DTDVERSION="2.4">
+<MESSAGE ID="%(msg_id)s" PROTOCOLVERSION="1.4">
+<SIMPLEEXPREQ>
+<EXPMETHODCALL NAME="%(method)s">
+<EXPPARAMVALUE NAME="NewIndication">
+<INSTANCE CLASSNAME="CIM_AlertIndication">
+<PROPERTY NAME="SequenceNumber" TYPE="string">
+<VALUE>%(msg_id)s</VALUE>
+</PROPERTY>
+</INSTANCE>
+</EXPPARAMVALUE>
+</EXPMETHODCALL>
+</SIMPLEEXPREQ>
+</MESSAGE>
+</CIM>
+"""
+
+
+def export_request(msg_id, method='ExportIndication'):
+    """Return the body of an export request message."""
+    return (_REQUEST % dict(msg_id=msg_id, method=method)).encode('utf-8')
+
+
+class EventLoopThread(object):
+    """
+    An asyncio event loop that runs in a separate thread, so that the tests
+    can use synchronous HTTP clients.
+    """
+
+    def __init__(self):
+        import asyncio  # Python 3 only
+        self.asyncio = asyncio
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self, coro):
+        """Run a coroutine in the event loop and return its result."""
+        future = self.asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return future.result(10)
+
+    def close(self):
+        """Stop the event loop and its thread."""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+@pytest.fixture
+def loop_thread():
+    """Fixture providing an event loop running in a separate thread."""
+    loop_thread_ = EventLoopThread()
+    yield loop_thread_
+    loop_thread_.close()
+
+
+@pytest.fixture
+def listener(loop_thread):  # pylint: disable=redefined-outer-name
+    """
+    Fixture providing a started AsyncWBEMListener that records the sequence
+    numbers of the indications it receives.
+    """
+    listener_ = AsyncWBEMListener(HOST, PORT)
+    listener_.received = []
+    listener_.add_callback(
+        lambda ind, host: listener_.received.append(
+            ind.properties['SequenceNumber'].value))
+    loop_thread.run(listener_.start())
+    yield listener_
+    loop_thread.run(listener_.stop())
+
+
+def post(conn, body, headers=None):
+    """Send a POST request on the connection and return the response."""
+    conn.request('POST', '/', body=body,
+                 headers=HEADERS if headers is None else headers)
+    resp = conn.getresponse()
+    resp.data = resp.read()
+    return resp
+
+
+def test_keepalive(listener):  # pylint: disable=redefined-outer-name
+    """
+    Test that several indications are received on one persistent connection.
+    """
+    conn = http_client.HTTPConnection(HOST, PORT, timeout=5)
+
+    for i in range(5):
+        resp = post(conn, export_request(i))
+        assert resp.status == 200
+        assert resp.getheader('CIMExport') == 'MethodResponse'
+        assert b'EXPMETHODRESPONSE NAME="ExportIndication"' in resp.data
+        assert b'ERROR' not in resp.data
+        assert resp.getheader('Connection') is None
+
+    conn.close()
+    assert listener.received == ['0', '1', '2', '3', '4']
+    assert listener.http_started is True
+
+
+def test_connection_close(listener):  # pylint: disable=redefined-outer-name
+    """Test that a request with 'Connection: close' closes the connection."""
+    sock = socket.create_connection((HOST, PORT), timeout=5)
+    body = export_request(1)
+    head = 'POST / HTTP/1.1\r\nHost: %s\r\nConnection: close\r\n' \
+        'Content-Type: application/xml\r\nContent-Length: %s\r\n\r\n' % \
+        (HOST, len(body))
+    sock.sendall(head.encode('ascii') + body)
+
+    data = b''
+    while True:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    sock.close()
+
+    assert data.startswith(b'HTTP/1.1 200 ')
+    assert b'Connection: close' in data
+    assert listener.received == ['1']
+
+
+@pytest.mark.parametrize(
+    "method, headers, body, exp_status, exp_cim_error", [
+        ('GET', {}, None, 405, None),
+        ('POST', dict(HEADERS, Accept='text/html'), export_request(1),
+         406, 'header-mismatch'),
+        ('POST', dict((k, v) for k, v in HEADERS.items()
+                      if k != 'Content-Type'), export_request(1),
+         406, 'header-mismatch'),
+        ('POST', HEADERS, b'<CIM', 400, 'request-not-well-formed'),
+    ]
+)
+def test_http_error(listener, method, headers, body, exp_status,
+                    exp_cim_error):
+    # pylint: disable=redefined-outer-name
+    """Test the HTTP errors returned for invalid requests."""
+    conn = http_client.HTTPConnection(HOST, PORT, timeout=5)
+    conn.request(method, '/', body=body, headers=headers)
+    resp = conn.getresponse()
+    resp.read()
+
+    assert resp.status == exp_status
+    assert resp.getheader('CIMError') == exp_cim_error
+    if exp_status == 405:
+        assert resp.getheader('Allow') == 'POST'
+
+    # The connection can still be used
+    resp = post(conn, export_request(2))
+    assert resp.status == 200
+    conn.close()
+    assert listener.received == ['2']
+
+
+def test_unknown_method(listener):  # pylint: disable=redefined-outer-name
+    """Test the CIM error returned for an unknown export method."""
+    conn = http_client.HTTPConnection(HOST, PORT, timeout=5)
+
+    resp = post(conn, export_request(1, method='ExportBlah'))
+
+    conn.close()
+    assert resp.status == 200
+    assert b'ERROR CODE="7"' in resp.data
+    assert listener.received == []
+
+
+@pytest.mark.parametrize("encoding", ['gzip', 'deflate'])
+def test_compressed(listener, encoding):
+    # pylint: disable=redefined-outer-name
+    """Test that compressed indications are received."""
+    conn = http_client.HTTPConnection(HOST, PORT, timeout=5)
+
+    resp = post(conn, cim_http.compress_body(export_request(1), encoding),
+                headers=dict(HEADERS, **{'Content-Encoding': encoding}))
+
+    conn.close()
+    assert resp.status == 200
+    assert b'ERROR' not in resp.data
+    assert listener.received == ['1']
+
+
+def test_compressed_too_large(loop_thread):
+    # pylint: disable=redefined-outer-name
+    """Test that too large decompressed requests are rejected."""
+    listener_ = AsyncWBEMListener(HOST, PORT, max_request_size=300)
+    loop_thread.run(listener_.start())
+    try:
+        conn = http_client.HTTPConnection(HOST, PORT, timeout=5)
+        resp = post(conn, cim_http.compress_body(export_request(1), 'gzip'),
+                    headers=dict(HEADERS, **{'Content-Encoding': 'gzip'}))
+        conn.close()
+    finally:
+        loop_thread.run(listener_.stop())
+
+    assert resp.status == 413
+
+
+def test_request_too_large(loop_thread):
+    # pylint: disable=redefined-outer-name
+    """Test that too large requests are rejected."""
+    listener_ = AsyncWBEMListener(HOST, PORT, max_request_size=100)
+    loop_thread.run(listener_.start())
+    try:
+        conn = http_client.HTTPConnection(HOST, PORT, timeout=5)
+        resp = post(conn, export_request(1))
+        conn.close()
+    finally:
+        loop_thread.run(listener_.stop())
+
+    assert resp.status == 413
+    assert resp.getheader('Connection') == 'close'
+
+
+def test_queue(loop_thread):  # pylint: disable=redefined-outer-name
+    """
+    Test that indications are delivered through a delivery queue, including
+    those remaining in the queue when the listener is stopped.
+    """
+    received = []
+    listener_ = AsyncWBEMListener(HOST, PORT, queue_size=2,
+                                  stats_enabled=True)
+    listener_.add_callback(
+        lambda ind, host: received.append(
+            ind.properties['SequenceNumber'].value))
+    loop_thread.run(listener_.start())
+    try:
+        conn = http_client.HTTPConnection(HOST, PORT, timeout=5)
+        for i in range(10):
+            assert post(conn, export_request(i)).status == 200
+        conn.close()
+    finally:
+        loop_thread.run(listener_.stop())
+
+    assert received == [str(i) for i in range(10)]
+    assert listener_.statistics.get_op_statistic(
+        'DeliverIndication').count == 10
+
+
+def test_port_in_use(loop_thread):  # pylint: disable=redefined-outer-name
+    """Test starting the listener when the port is in use."""
+    listener1 = WBEMListener(HOST, PORT)
+    listener1.start()
+    listener2 = AsyncWBEMListener(HOST, PORT)
+    try:
+        with pytest.raises(OSError) as exc_info:
+            loop_thread.run(listener2.start())
+    finally:
+        listener1.stop()
+
+    assert exc_info.value.errno == errno.EADDRINUSE
+    assert listener2.http_started is False
+
+
+def test_context_mgr():
+    """Test that the listener is not a synchronous context manager."""
+    with pytest.raises(TypeError):
+        with AsyncWBEMListener(HOST, PORT):
+            pass
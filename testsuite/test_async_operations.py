@@ -0,0 +1,506 @@
+#!/usr/bin/env python
+
+"""
+Test the AsyncWBEMConnection class against a local HTTP server.
+
+The tests do not use the async/await syntax, so that this module can be
+collected on all Python versions.
+"""
+
+from __future__ import absolute_import
+
+import sys
+import time
+import threading
+
+import pytest
+from six.moves import BaseHTTPServer, socketserver
+from six.moves import urllib
+
+import pywbem
+from pywbem import CIMInstanceName, CIMError, HTTPError, TimeoutError, \
+    cim_http
+
+pytestmark = pytest.mark.skipif(
+    sys.version_info[0:2] < (3, 6),
+    reason="AsyncWBEMConnection requires Python 3.6")
+
+AsyncWBEMConnection = getattr(pywbem, 'AsyncWBEMConnection', None)
+
+_RESPONSE = u"""<?xml version="1.0" encoding="utf-8" ?>
+<CIM CIMVERSION="2.0" DTDVERSION="2.0">
+<MESSAGE ID="1001" PROTOCOLVERSION="1.0">
+<SIMPLERSP>
+<%(elem)s NAME="%(method)s">
+%(content)s
+</%(elem)s>
+</SIMPLERSP>
+</MESSAGE>
+</CIM>
+"""
+
+_INSTANCE = u"""<INSTANCE CLASSNAME="PyWBEM_Person">
+<PROPERTY NAME="Name" TYPE="string"><VALUE>%s</VALUE></PROPERTY>
+</INSTANCE>"""
+
+_NAMED_INSTANCE = u"""<VALUE.NAMEDINSTANCE>
+<INSTANCENAME CLASSNAME="PyWBEM_Person">
+<KEYBINDING NAME="Name"><KEYVALUE VALUETYPE="string">%s</KEYVALUE>
+</KEYBINDING>
+</INSTANCENAME>
+%s
+</VALUE.NAMEDINSTANCE>"""
+
+_INSTANCE_WITH_PATH = u"""<VALUE.INSTANCEWITHPATH>
+<INSTANCEPATH>
+<NAMESPACEPATH>
+<HOST>server</HOST>
+<LOCALNAMESPACEPATH>
+<NAMESPACE NAME="root"/>
+<NAMESPACE NAME="cimv2"/>
+</LOCALNAMESPACEPATH>
+</NAMESPACEPATH>
+<INSTANCENAME CLASSNAME="PyWBEM_Person">
+<KEYBINDING NAME="Name"><KEYVALUE VALUETYPE="string">%s</KEYVALUE>
+</KEYBINDING>
+</INSTANCENAME>
+</INSTANCEPATH>
+%s
+</VALUE.INSTANCEWITHPATH>"""
+
+_PULL_PARAMS = u"""<PARAMVALUE NAME="EndOfSequence">
+<VALUE>%s</VALUE>
+</PARAMVALUE>
+<PARAMVALUE NAME="EnumerationContext">
+<VALUE>%s</VALUE>
+</PARAMVALUE>"""
+
+
+def _response(method, content, elem='IMETHODRESPONSE'):
+    """Return a CIM-XML response for a method."""
+    return _RESPONSE % dict(elem=elem, method=method, content=content)
+
+
+def _error_response(method, code):
+    """Return a CIM-XML error response for an intrinsic method."""
+    return _response(method, u'<ERROR CODE="%s"/>' % code)
+
+
+def _enum_response(method, names):
+    """Return an EnumerateInstances response."""
+    return _response(method, u'<IRETURNVALUE>%s</IRETURNVALUE>' % u''.join(
+        [_NAMED_INSTANCE % (name, _INSTANCE % name) for name in names]))
+
+
+def _pull_response(method, names, context):
+    """Return an Open/Pull response, with eos if context is empty."""
+    return _response(method, u'<IRETURNVALUE>%s</IRETURNVALUE>%s' % (
+        u''.join([_INSTANCE_WITH_PATH % (name, _INSTANCE % name)
+                  for name in names]),
+        _PULL_PARAMS % ('FALSE' if context else 'TRUE', context)))
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    HTTP/1.1 handler that returns the response for the CIM method of the
+    request from the `responses` dictionary of the server.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Return the response for the CIM method."""
+        server = self.server
+        method = urllib.parse.unquote(self.headers['CIMMethod'])
+        body = self.rfile.read(int(self.headers['Content-length']))
+        if self.headers.get('Content-Encoding'):
+            body = cim_http.get_decompressor(
+                self.headers['Content-Encoding']).decompress(body)
+        with server.lock:
+            server.requests.append((method, body))
+            if server.drop_requests:
+                # Close the connection without returning a response, as a
+                # server does when its keep-alive timeout expires while the
+                # request is on its way.
+                server.drop_requests -= 1
+                self.close_connection = True
+                return
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        time.sleep(server.delay)
+        with server.lock:
+            server.active -= 1
+        response = server.responses[method]
+        if isinstance(response, list):
+            response = response.pop(0)
+        if isinstance(response, tuple):
+            status, headers, data = response
+        else:
+            status, headers, data = 200, [], response
+        data = data.encode('utf-8')
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        if server.compression:
+            data = cim_http.compress_body(data, server.compression)
+            self.send_header('Content-Encoding', server.compression)
+        if server.chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for i in range(0, len(data), 100):
+                chunk = data[i:i + 100]
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.write(b'0\r\n\r\n')
+        else:
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Suppress logging."""
+        pass
+
+
+class _Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Multi-threaded HTTP server."""
+    daemon_threads = True
+
+
+@pytest.fixture
+def server():
+    """
+    Fixture that runs a multi-threaded HTTP/1.1 server on a free local port
+    and returns it.
+    """
+    srv = _Server(('127.0.0.1', 0), _Handler)
+    srv.lock = threading.Lock()
+    srv.responses = {}
+    srv.requests = []
+    srv.active = 0
+    srv.max_active = 0
+    srv.delay = 0
+    srv.chunked = False
+    srv.compression = None
+    srv.drop_requests = 0
+    srv.url = 'http://127.0.0.1:%s' % srv.server_address[1]
+    thread = threading.Thread(target=srv.serve_forever,
+                              kwargs=dict(poll_interval=0.05))
+    thread.daemon = True
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def loop():
+    """Fixture that returns a new asyncio event loop, set as current loop."""
+    import asyncio
+    evloop = asyncio.new_event_loop()
+    asyncio.set_event_loop(evloop)
+    yield evloop
+    asyncio.set_event_loop(None)
+    evloop.close()
+
+
+def _collect(evloop, aiter, count=None):
+    """
+    Return the items of an asynchronous iterator as a list, or its first
+    `count` items.
+    """
+    items = []
+    while count is None or len(items) < count:
+        try:
+            items.append(evloop.run_until_complete(aiter.__anext__()))
+        except StopAsyncIteration:  # noqa: F821
+            break
+    return items
+
+
+class TestAsyncWBEMConnection(object):
+    """
+    Test the AsyncWBEMConnection class.
+    """
+
+    # pylint: disable=no-self-use,redefined-outer-name
+
+    def test_get_instance(self, server, loop):
+        """GetInstance returns the instance with its path."""
+        server.responses['GetInstance'] = _response(
+            'GetInstance', u'<IRETURNVALUE>%s</IRETURNVALUE>' %
+            (_INSTANCE % 'Fritz'))
+        conn = AsyncWBEMConnection(server.url)
+        path = CIMInstanceName('PyWBEM_Person', keybindings={'Name': 'Fritz'})
+        inst = loop.run_until_complete(conn.GetInstance(path))
+        assert inst['Name'] == u'Fritz'
+        assert inst.path.namespace == u'root/cimv2'
+        assert b'<IMETHODCALL NAME="GetInstance">' in server.requests[0][1]
+
+    def test_concurrent(self, server, loop):
+        """Operations on one connection execute concurrently."""
+        import asyncio
+        server.responses['EnumerateInstances'] = _enum_response(
+            'EnumerateInstances', ['Fritz', 'Alice'])
+        server.delay = 0.2
+        conn = AsyncWBEMConnection(server.url, stats_enabled=True,
+                                   keep_alive=True)
+        results = loop.run_until_complete(asyncio.gather(
+            *[conn.EnumerateInstances('PyWBEM_Person') for _ in range(10)]))
+        assert [[inst['Name'] for inst in insts] for insts in results] == \
+            [[u'Fritz', u'Alice']] * 10
+        assert server.max_active > 1
+        stats = conn.statistics.get_op_statistic('EnumerateInstances')
+        assert stats.count == 10
+        assert stats.min_time >= 0.2
+        assert conn.last_reply_len > 0
+        conn.close()
+
+    def test_keep_alive(self, server, loop):
+        """Sequential operations reuse the persistent connection."""
+        server.responses['EnumerateInstances'] = _enum_response(
+            'EnumerateInstances', ['Fritz'])
+        server.chunked = True
+        conn = AsyncWBEMConnection(server.url, keep_alive=True)
+        for _ in range(3):
+            insts = loop.run_until_complete(
+                conn.EnumerateInstances('PyWBEM_Person'))
+            assert len(insts) == 1
+        assert len(conn._pool) == 1  # pylint: disable=protected-access
+        conn.close()
+
+    @pytest.mark.parametrize('idempotent', [True, False])
+    def test_keep_alive_no_response(self, server, loop, idempotent):
+        """
+        A request that was sent on a pooled connection that the server then
+        closed without a response is retried only for idempotent operations.
+        """
+        server.responses['EnumerateInstances'] = _enum_response(
+            'EnumerateInstances', ['Fritz'])
+        server.responses['DeleteInstance'] = _response(
+            'DeleteInstance', u'')
+        conn = AsyncWBEMConnection(server.url, keep_alive=True)
+        loop.run_until_complete(conn.EnumerateInstances('PyWBEM_Person'))
+        server.drop_requests = 1
+        if idempotent:
+            insts = loop.run_until_complete(
+                conn.EnumerateInstances('PyWBEM_Person'))
+            assert len(insts) == 1
+            assert len(server.requests) == 3
+        else:
+            path = CIMInstanceName('PyWBEM_Person',
+                                   keybindings={'Name': 'Fritz'})
+            with pytest.raises(pywbem.ConnectionError):
+                loop.run_until_complete(conn.DeleteInstance(path))
+            assert len(server.requests) == 2
+        conn.close()
+
+    def test_compression(self, server, loop):
+        """Compressed requests and responses are measured in statistics."""
+        server.responses['EnumerateInstances'] = _enum_response(
+            'EnumerateInstances', ['Fritz', 'Alice'])
+        server.compression = 'deflate'
+        conn = AsyncWBEMConnection(server.url, stats_enabled=True,
+                                   compression='gzip')
+        insts = loop.run_until_complete(
+            conn.EnumerateInstances('PyWBEM_Person'))
+        assert [inst['Name'] for inst in insts] == [u'Fritz', u'Alice']
+        assert b'<IMETHODCALL NAME="EnumerateInstances">' in \
+            server.requests[0][1]
+        stats = conn.statistics.get_op_statistic('EnumerateInstances')
+        assert stats.compression_count == 1
+        assert stats.avg_compression_ratio > 1
+
+    def test_cim_error(self, server, loop):
+        """An error response is raised as CIMError and counted."""
+        server.responses['GetClass'] = _error_response('GetClass', 6)
+        conn = AsyncWBEMConnection(server.url, stats_enabled=True)
+        with pytest.raises(CIMError) as exc_info:
+            loop.run_until_complete(conn.GetClass('PyWBEM_Person'))
+        assert exc_info.value.status_code == 6
+        stats = conn.statistics.get_op_statistic('GetClass')
+        assert stats.exception_count == 1
+
+    def test_http_error(self, server, loop):
+        """An HTTP error status is raised as HTTPError."""
+        server.responses['GetClass'] = (
+            500, [('CIMError', 'request-not-valid')], u'')
+        conn = AsyncWBEMConnection(server.url)
+        with pytest.raises(HTTPError) as exc_info:
+            loop.run_until_complete(conn.GetClass('PyWBEM_Person'))
+        assert exc_info.value.status == 500
+        assert exc_info.value.cimerror == 'request-not-valid'
+
+    def test_timeout(self, server, loop):
+        """A server that does not respond in time raises TimeoutError."""
+        server.responses['GetClass'] = _error_response('GetClass', 6)
+        server.delay = 1
+        conn = AsyncWBEMConnection(server.url, timeout=0.1)
+        with pytest.raises(TimeoutError):
+            loop.run_until_complete(conn.GetClass('PyWBEM_Person'))
+
+    def test_invalid_parameter(self, server, loop):
+        """Invalid parameters are raised without sending a request."""
+        conn = AsyncWBEMConnection(server.url)
+        with pytest.raises(ValueError):
+            loop.run_until_complete(
+                conn.ModifyInstance(pywbem.CIMInstance('PyWBEM_Person')))
+        assert server.requests == []
+
+    def test_invoke_method(self, server, loop):
+        """InvokeMethod returns the return value and output parameters."""
+        server.responses['Reset'] = _response(
+            'Reset',
+            u'<RETURNVALUE PARAMTYPE="string"><VALUE>done</VALUE>'
+            u'</RETURNVALUE>'
+            u'<PARAMVALUE NAME="Log" PARAMTYPE="string"><VALUE>ok</VALUE>'
+            u'</PARAMVALUE>',
+            elem='METHODRESPONSE')
+        conn = AsyncWBEMConnection(server.url)
+        result = loop.run_until_complete(
+            conn.InvokeMethod('Reset', 'PyWBEM_Person', Force=True))
+        assert result[0] == u'done'
+        assert result[1]['Log'] == u'ok'
+
+    def test_iter_pull(self, server, loop):
+        """IterEnumerateInstances uses the pull operations."""
+        server.responses['OpenEnumerateInstances'] = _pull_response(
+            'OpenEnumerateInstances', ['Fritz'], 'ctx1')
+        server.responses['PullInstancesWithPath'] = _pull_response(
+            'PullInstancesWithPath', ['Alice', 'Bert'], '')
+        conn = AsyncWBEMConnection(server.url, use_pull_operations=None)
+        insts = _collect(loop, conn.IterEnumerateInstances(
+            'PyWBEM_Person', MaxObjectCount=2))
+        assert [inst['Name'] for inst in insts] == \
+            [u'Fritz', u'Alice', u'Bert']
+        assert [req[0] for req in server.requests] == \
+            ['OpenEnumerateInstances', 'PullInstancesWithPath']
+
+    def test_iter_pull_closed(self, server, loop):
+        """Closing the iterator early closes the enumeration context."""
+        server.responses['OpenEnumerateInstances'] = _pull_response(
+            'OpenEnumerateInstances', ['Fritz'], 'ctx1')
+        server.responses['CloseEnumeration'] = _response(
+            'CloseEnumeration', u'')
+        conn = AsyncWBEMConnection(server.url, use_pull_operations=None)
+        insts = conn.IterEnumerateInstances('PyWBEM_Person')
+        assert len(_collect(loop, insts, 1)) == 1
+        loop.run_until_complete(insts.aclose())
+        assert [req[0] for req in server.requests] == \
+            ['OpenEnumerateInstances', 'CloseEnumeration']
+        assert b'ctx1' in server.requests[1][1]
+
+    def test_iter_not_supported(self, server, loop):
+        """IterEnumerateInstances falls back to EnumerateInstances."""
+        server.responses['OpenEnumerateInstances'] = _error_response(
+            'OpenEnumerateInstances', 7)
+        server.responses['EnumerateInstances'] = _enum_response(
+            'EnumerateInstances', ['Fritz'])
+        conn = AsyncWBEMConnection(server.url, use_pull_operations=None)
+        for _ in range(2):
+            insts = _collect(loop, conn.IterEnumerateInstances(
+                'PyWBEM_Person'))
+            assert [inst['Name'] for inst in insts] == [u'Fritz']
+            assert insts[0].path.host == u'127.0.0.1'
+        assert [req[0] for req in server.requests] == \
+            ['OpenEnumerateInstances', 'EnumerateInstances',
+             'EnumerateInstances']
+
+    def test_iter_invalid_parameter(self, server):
+        """Invalid Iter parameters are raised when calling the method."""
+        conn = AsyncWBEMConnection(server.url)
+        with pytest.raises(ValueError):
+            conn.IterEnumerateInstances('PyWBEM_Person', MaxObjectCount=0)
+
+    def test_iter_query_instances(self, server, loop):
+        """IterQueryInstances returns the instances of all pulls."""
+        server.responses['OpenQueryInstances'] = _response(
+            'OpenQueryInstances',
+            u'<IRETURNVALUE>%s</IRETURNVALUE>%s' %
+            (_INSTANCE % 'Fritz', _PULL_PARAMS % ('FALSE', 'ctx1')))
+        server.responses['PullInstances'] = _response(
+            'PullInstances',
+            u'<IRETURNVALUE>%s</IRETURNVALUE>%s' %
+            (_INSTANCE % 'Alice', _PULL_PARAMS % ('TRUE', '')))
+        conn = AsyncWBEMConnection(server.url, use_pull_operations=None)
+        result = loop.run_until_complete(
+            conn.IterQueryInstances('DMTF:CQL', 'SELECT * FROM X'))
+        assert [inst['Name'] for inst in result.generator] == \
+            [u'Fritz', u'Alice']
+        assert result.query_result_class is None
+
+    def test_debug(self, server, loop):
+        """The debug information of the last operation is set."""
+        server.responses['GetClass'] = _error_response('GetClass', 6)
+        conn = AsyncWBEMConnection(server.url)
+        conn.debug = True
+        with pytest.raises(CIMError):
+            loop.run_until_complete(conn.GetClass('PyWBEM_Person'))
+        assert '<IMETHODCALL NAME="GetClass">' in conn.last_raw_request
+        assert '<IMETHODCALL NAME="GetClass">' in conn.last_request
+        assert b'<ERROR CODE="6"/>' in conn.last_raw_reply
+        assert conn.last_request_len == len(conn.last_raw_request)
+
+    def test_recorder(self, server, loop):
+        """The operation and its HTTP request are recorded."""
+        import io
+        server.responses['GetClass'] = _error_response('GetClass', 6)
+        conn = AsyncWBEMConnection(server.url)
+        output = io.StringIO()
+        conn.add_operation_recorder(pywbem.TestClientRecorder(output))
+        with pytest.raises(CIMError):
+            loop.run_until_complete(conn.GetClass('PyWBEM_Person'))
+        record = output.getvalue()
+        assert 'pywbem_method: GetClass' in record
+        assert 'CIMMethod: GetClass' in record
+        assert 'status: 200' in record
+
+    def test_stream_not_supported(self, server):
+        """The StreamEnumerate methods are not supported."""
+        conn = AsyncWBEMConnection(server.url)
+        with pytest.raises(NotImplementedError):
+            conn.StreamEnumerateInstances('PyWBEM_Person')
+
+    def test_batch(self, server, loop):
+        """
+        ExecuteBatch performs the operations concurrently, and returns the
+        errors of individual operations as CIMError objects.
+        """
+        server.responses['GetInstance'] = _response(
+            'GetInstance',
+            u'<IRETURNVALUE>%s</IRETURNVALUE>' % (_INSTANCE % 'Fritz'))
+        server.responses['DeleteInstance'] = _error_response(
+            'DeleteInstance', 6)
+        server.delay = 0.2
+        conn = AsyncWBEMConnection(server.url)
+        path = CIMInstanceName('PyWBEM_Person', {'Name': 'Fritz'})
+        results = loop.run_until_complete(conn.ExecuteBatch(
+            [('GetInstance', dict(InstanceName=path)),
+             ('DeleteInstance', dict(InstanceName=path)),
+             ('GetInstance', dict(InstanceName=path))]))
+        assert results[0]['Name'] == u'Fritz'
+        assert results[0].path.classname == u'PyWBEM_Person'
+        assert isinstance(results[1], CIMError)
+        assert results[1].status_code == 6
+        assert results[2]['Name'] == u'Fritz'
+        assert server.max_active == 3
+
+    def test_batch_invalid_operation(self, server, loop):
+        """ExecuteBatch rejects unsupported operations before any request."""
+        conn = AsyncWBEMConnection(server.url)
+        with pytest.raises(ValueError):
+            loop.run_until_complete(conn.ExecuteBatch(
+                [('GetInstance', dict(InstanceName=None)),
+                 ('GetClass', dict(ClassName='PyWBEM_Person'))]))
+        assert server.requests == []
+
+    def test_schema_cache_not_supported(self, server):
+        """The schema_cache init parameter is not supported."""
+        with pytest.raises(ValueError):
+            AsyncWBEMConnection(server.url, schema_cache=pywbem.SchemaCache())
+
+    def test_not_awaited(self, server):
+        """The low-level call methods cannot be used directly."""
+        conn = AsyncWBEMConnection(server.url)
+        with pytest.raises(RuntimeError):
+            conn._imethodcall(  # pylint: disable=protected-access
+                'GetClass', 'root/cimv2', ClassName='PyWBEM_Person')
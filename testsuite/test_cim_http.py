@@ -4,9 +4,19 @@
 
 from __future__ import absolute_import
 
+import os
 import unittest
+import select
+import socket
+import threading
+import time
+import zlib
 
-from pywbem import cim_http
+import pytest
+import six
+from six.moves import BaseHTTPServer
+
+from pywbem import cim_http, WBEMConnection, CIMError, ConnectionError
 
 
 class Parse_url(unittest.TestCase):  # pylint: disable=invalid-name
@@ -348,5 +358,455 @@ class Parse_url(unittest.TestCase):  # pylint: disable=invalid-name
             pass
 
 
+class _KeepAliveHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    HTTP/1.1 request handler that returns a fixed body and records the client
+    address of each request in the server.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Handle a POST request."""
+        length = int(self.headers.get('Content-Length', 0))
+        self.server.requests.append((self.headers, self.rfile.read(length)))
+        self.server.client_addresses.append(self.client_address)
+        if self.server.drop_requests:
+            # Close the connection without returning a response, as a server
+            # does when its keep-alive timeout expires while the request is
+            # on its way.
+            self.server.drop_requests -= 1
+            self.close_connection = True
+            return
+        body = self.server.body
+        encoding = self.server.response_encoding
+        if encoding and self.server.compress_response:
+            body = cim_http.compress_body(body, encoding)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml; charset="utf-8"')
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        self.wfile.write(body)
+        if self.server.close_after_response:
+            # Close the connection without announcing it to the client, as
+            # a server does when its keep-alive timeout expires.
+            self.close_connection = True
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Suppress logging."""
+        pass
+
+
+@pytest.fixture
+def http_server():
+    """
+    Fixture that runs an HTTP/1.1 server on a free local port and returns it.
+    """
+    server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+    server.client_addresses = []
+    server.requests = []
+    server.response_encoding = None
+    server.compress_response = True
+    server.close_after_response = False
+    server.drop_requests = 0
+    server.body = b'<CIM/>'
+    server.url = 'http://127.0.0.1:%s' % server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever,
+                              kwargs=dict(poll_interval=0.05))
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestHTTPConnectionPool(object):
+    """
+    Test the HTTPConnectionPool class and its use in wbem_request().
+    """
+
+    def test_no_pool(self, http_server):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """Without a pool, each request uses a new connection."""
+        for _ in range(3):
+            body, _ = cim_http.wbem_request(http_server.url, '<CIM/>', None)
+            assert body == b'<CIM/>'
+        ports = set([addr[1] for addr in http_server.client_addresses])
+        assert len(ports) == 3
+
+    def test_pool_reuse(self, http_server):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """With a pool, the connection is reused for subsequent requests."""
+        pool = cim_http.HTTPConnectionPool()
+        for _ in range(3):
+            body, _ = cim_http.wbem_request(http_server.url, '<CIM/>', None,
+                                            pool=pool)
+            assert body == b'<CIM/>'
+            assert len(pool) == 1
+        ports = set([addr[1] for addr in http_server.client_addresses])
+        assert len(ports) == 1
+        pool.close()
+        assert len(pool) == 0
+
+    def test_pool_stale_detected(self, http_server):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """A pooled connection closed by the server is not handed out."""
+        http_server.close_after_response = True
+        pool = cim_http.HTTPConnectionPool()
+        cim_http.wbem_request(http_server.url, '<CIM/>', None, pool=pool)
+        time.sleep(0.1)  # let the server close its side
+        body, _ = cim_http.wbem_request(http_server.url, '<CIM/>', None,
+                                        pool=pool)
+        assert body == b'<CIM/>'
+        assert len(http_server.client_addresses) == 2
+        pool.close()
+
+    def test_pool_stale_retried(self, http_server, monkeypatch):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """An idempotent request on an undetected stale connection is
+        retried."""
+        http_server.close_after_response = True
+        pool = cim_http.HTTPConnectionPool()
+        monkeypatch.setattr(cim_http.HTTPConnectionPool, '_is_stale',
+                            staticmethod(lambda conn: False))
+        cim_http.wbem_request(http_server.url, '<CIM/>', None, pool=pool)
+        time.sleep(0.1)  # let the server close its side
+        body, _ = cim_http.wbem_request(http_server.url, '<CIM/>', None,
+                                        pool=pool, idempotent=True)
+        assert body == b'<CIM/>'
+        assert len(http_server.client_addresses) == 2
+        pool.close()
+
+    @pytest.mark.parametrize(
+        "idempotent, exp_requests", [
+            (True, 3),
+            (False, 2),
+        ]
+    )
+    def test_pool_sent_no_response(self, http_server, idempotent,
+                                   exp_requests):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """A request on a pooled connection that was sent completely, but
+        got no response, is retried only if it is idempotent."""
+        pool = cim_http.HTTPConnectionPool()
+        cim_http.wbem_request(http_server.url, '<CIM/>', None, pool=pool)
+        http_server.drop_requests = 1
+
+        if idempotent:
+            body, _ = cim_http.wbem_request(http_server.url, '<CIM/>', None,
+                                            pool=pool, idempotent=True)
+            assert body == b'<CIM/>'
+        else:
+            with pytest.raises(ConnectionError):
+                cim_http.wbem_request(http_server.url, '<CIM/>', None,
+                                      pool=pool)
+        assert len(http_server.requests) == exp_requests
+        pool.close()
+
+    @pytest.mark.skipif(not hasattr(select, 'poll'),
+                        reason="select.select() is used without poll()")
+    def test_pool_stale_high_fileno(self):
+        # pylint: disable=no-self-use
+        """Idle connections whose file descriptor is beyond FD_SETSIZE are
+        checked like others."""
+        fcntl = pytest.importorskip('fcntl')
+
+        class _Sock(object):
+            # pylint: disable=too-few-public-methods
+            """Fake socket with a file descriptor."""
+            def __init__(self, fileno):
+                self._fileno = fileno
+
+            def fileno(self):
+                """Return the file descriptor."""
+                return self._fileno
+
+        class _Conn(object):
+            # pylint: disable=too-few-public-methods
+            """Fake connection with a socket."""
+            def __init__(self, sock):
+                self.sock = sock
+
+        # pylint: disable=protected-access
+        sock1, sock2 = socket.socketpair()
+        fileno = fcntl.fcntl(sock1.fileno(), fcntl.F_DUPFD, 2048)
+        try:
+            assert fileno >= 2048
+            conn = _Conn(_Sock(fileno))
+            assert not cim_http.HTTPConnectionPool._is_stale(conn)
+            sock2.sendall(b'x')
+            time.sleep(0.05)
+            assert cim_http.HTTPConnectionPool._is_stale(conn)
+        finally:
+            os.close(fileno)
+            sock1.close()
+            sock2.close()
+        assert cim_http.HTTPConnectionPool._is_stale(_Conn(_Sock(-1)))
+
+    def test_pool_idle_timeout(self, http_server):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """Idle connections expire after the idle timeout."""
+        pool = cim_http.HTTPConnectionPool(idle_timeout=0.05)
+        cim_http.wbem_request(http_server.url, '<CIM/>', None, pool=pool)
+        time.sleep(0.1)
+        cim_http.wbem_request(http_server.url, '<CIM/>', None, pool=pool)
+        ports = set([addr[1] for addr in http_server.client_addresses])
+        assert len(ports) == 2
+        pool.close()
+
+    def test_pool_maxsize(self):
+        # pylint: disable=no-self-use
+        """Connections beyond the maximum size are closed."""
+
+        class _Conn(object):
+            # pylint: disable=too-few-public-methods
+            """Fake connection."""
+            def __init__(self):
+                self.closed = False
+
+            def close(self):
+                """Close the fake connection."""
+                self.closed = True
+
+        pool = cim_http.HTTPConnectionPool(maxsize=2)
+        conns = [_Conn() for _ in range(3)]
+        for conn in conns:
+            pool.put('key', conn)
+        assert len(pool) == 2
+        assert [conn.closed for conn in conns] == [False, False, True]
+        pool.close()
+        assert len(pool) == 0
+        assert [conn.closed for conn in conns] == [True, True, True]
+
+    def test_pool_invalid_maxsize(self):
+        # pylint: disable=no-self-use
+        """A maximum size of 0 is rejected."""
+        with pytest.raises(ValueError):
+            cim_http.HTTPConnectionPool(maxsize=0)
+
+
+_ENUM_RESPONSE = b"""<?xml version="1.0" encoding="utf-8" ?>
+<CIM CIMVERSION="2.0" DTDVERSION="2.0">
+<MESSAGE ID="1001" PROTOCOLVERSION="1.0">
+<SIMPLERSP>
+<IMETHODRESPONSE NAME="EnumerateInstances">
+<IRETURNVALUE>
+%s
+</IRETURNVALUE>
+</IMETHODRESPONSE>
+</SIMPLERSP>
+</MESSAGE>
+</CIM>
+"""
+
+_NAMED_INSTANCE = b"""<VALUE.NAMEDINSTANCE>
+<INSTANCENAME CLASSNAME="PyWBEM_Person">
+<KEYBINDING NAME="Name"><KEYVALUE VALUETYPE="string">%d</KEYVALUE>
+</KEYBINDING>
+</INSTANCENAME>
+<INSTANCE CLASSNAME="PyWBEM_Person">
+<PROPERTY NAME="Name" TYPE="string"><VALUE>%d</VALUE></PROPERTY>
+</INSTANCE>
+</VALUE.NAMEDINSTANCE>
+"""
+
+
+class TestStreamedResponse(object):
+    """
+    Test streamed responses in wbem_request() and their use in
+    WBEMConnection.
+    """
+
+    def test_wbem_request_stream(self, http_server):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """The body is returned in chunks and the connection is pooled."""
+        http_server.body = b'<CIM>' + b'x' * 200000 + b'</CIM>'
+        pool = cim_http.HTTPConnectionPool()
+        chunks, _ = cim_http.wbem_request(http_server.url, '<CIM/>', None,
+                                          pool=pool, stream=True)
+        chunks = list(chunks)
+        assert len(chunks) > 1
+        assert b''.join(chunks) == http_server.body
+        assert len(pool) == 1
+        pool.close()
+
+    def test_wbem_request_stream_closed(self, http_server):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """A connection whose stream is closed early is not pooled."""
+        http_server.body = b'<CIM>' + b'x' * 200000 + b'</CIM>'
+        pool = cim_http.HTTPConnectionPool()
+        chunks, _ = cim_http.wbem_request(http_server.url, '<CIM/>', None,
+                                          pool=pool, stream=True)
+        next(chunks)
+        chunks.close()
+        assert len(pool) == 0
+
+    def test_stream_enumerate_instances(self, http_server):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """Instances are yielded while the response is being parsed."""
+        http_server.body = _ENUM_RESPONSE % b''.join(
+            [_NAMED_INSTANCE % (i, i) for i in range(1000)])
+        conn = WBEMConnection(http_server.url)
+        insts = conn.StreamEnumerateInstances('PyWBEM_Person')
+        inst = next(insts)
+        assert inst['Name'] == u'0'
+        assert inst.path.namespace == u'root/cimv2'
+        insts = [inst] + list(insts)
+        assert [i['Name'] for i in insts] == \
+            [six.text_type(i) for i in range(1000)]
+        assert conn.last_reply_len == len(http_server.body)
+
+    def test_stream_enumerate_instances_error(self, http_server):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """An error response is raised as CIMError."""
+        http_server.body = _ENUM_RESPONSE.replace(
+            b'<IRETURNVALUE>\n%s\n</IRETURNVALUE>',
+            b'<ERROR CODE="5" DESCRIPTION="Invalid class"/>')
+        conn = WBEMConnection(http_server.url)
+        with pytest.raises(CIMError) as exc_info:
+            list(conn.StreamEnumerateInstances('PyWBEM_Person'))
+        assert exc_info.value.status_code == 5
+
+
+class TestCompression(object):
+    """
+    Test the compression of request and response bodies in wbem_request()
+    and WBEMConnection.
+    """
+
+    @pytest.mark.parametrize("encoding", ['gzip', 'deflate'])
+    def test_wbem_request(self, http_server, encoding):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """The request is compressed and the response is decompressed."""
+        http_server.body = b'<CIM>' + b'x' * 100000 + b'</CIM>'
+        http_server.response_encoding = encoding
+        stats = [0, 0, 0.0]
+        request = '<CIM>' + 'y' * 10000 + '</CIM>'
+
+        body, _ = cim_http.wbem_request(http_server.url, request, None,
+                                        compression=encoding,
+                                        compression_stats=stats)
+
+        assert body == http_server.body
+        headers, req_body = http_server.requests[0]
+        assert headers['Content-Encoding'] == encoding
+        assert headers['Accept-Encoding'] == 'gzip, deflate'
+        assert cim_http.get_decompressor(encoding).decompress(req_body). \
+            endswith(request.encode('utf-8'))
+        assert stats[0] > len(http_server.body) + len(request)
+        assert stats[1] < stats[0] / 10
+        assert stats[2] > 0
+
+    def test_wbem_request_stream(self, http_server):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """A streamed response is decompressed chunk by chunk."""
+        http_server.body = b'<CIM>' + b'x' * 1000000 + b'</CIM>'
+        http_server.response_encoding = 'gzip'
+        chunks, _ = cim_http.wbem_request(http_server.url, '<CIM/>', None,
+                                          stream=True, compression='gzip')
+        chunks = list(chunks)
+        assert len(chunks) > 1
+        assert b''.join(chunks) == http_server.body
+
+    def test_wbem_request_identity(self, http_server):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """Compression is not used by default."""
+        body, _ = cim_http.wbem_request(http_server.url, '<CIM/>', None)
+        assert body == b'<CIM/>'
+        headers, req_body = http_server.requests[0]
+        assert headers.get('Content-Encoding') is None
+        assert headers.get('Accept-Encoding') == 'identity'
+        assert req_body.endswith(b'<CIM/>')
+
+    def test_wbem_request_invalid(self, http_server):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """An invalid compressed response raises ConnectionError."""
+        # Compress the response with deflate, but announce gzip
+        http_server.response_encoding = 'gzip'
+        http_server.compress_response = False
+        http_server.body = zlib.compress(b'<CIM/>')
+        with pytest.raises(ConnectionError):
+            cim_http.wbem_request(http_server.url, '<CIM/>', None,
+                                  compression='gzip')
+
+    def test_enumerate_instances(self, http_server):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """The compression is measured in the statistics."""
+        http_server.body = _ENUM_RESPONSE % b''.join(
+            [_NAMED_INSTANCE % (i, i) for i in range(100)])
+        http_server.response_encoding = 'gzip'
+        conn = WBEMConnection(http_server.url, compression='gzip',
+                              stats_enabled=True)
+        assert conn.compression == 'gzip'
+
+        insts = conn.EnumerateInstances('PyWBEM_Person')
+
+        assert len(insts) == 100
+        assert conn.last_reply_len == len(http_server.body)
+        stat = conn.statistics.get_op_statistic('EnumerateInstances')
+        assert stat.compression_count == 1
+        assert stat.avg_compression_ratio > 10
+        assert stat.avg_compression_time > 0
+
+    def test_invalid_compression(self):
+        # pylint: disable=no-self-use
+        """An unsupported compression is rejected."""
+        with pytest.raises(ValueError):
+            WBEMConnection('http://localhost', compression='br')
+
+
+class _ChunkedResponse(object):
+    # pylint: disable=too-few-public-methods
+    """
+    Stands in for an HTTP response with chunked transfer encoding, whose
+    body length is not known in advance.
+    """
+    length = None
+
+    def __init__(self, body):
+        self.body = body
+        self.pos = 0
+
+    def read(self, size):
+        """Return up to size Bytes of the body."""
+        chunk = self.body[self.pos:self.pos + size]
+        self.pos += len(chunk)
+        return chunk
+
+
+class TestBufferHandling(object):
+    """
+    Test the handling of request and response bodies in wbem_request()
+    without copying them.
+    """
+
+    def test_wbem_request(self, http_server):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """The request is sent in pieces and the response is a bytearray."""
+        http_server.body = b'<CIM>' + b'x' * 100000 + b'</CIM>'
+        request = u'<CIM>\u20ac</CIM>'
+
+        body, _ = cim_http.wbem_request(http_server.url, request, None)
+
+        assert isinstance(body, bytearray)
+        assert body == http_server.body
+        headers, req_body = http_server.requests[0]
+        assert req_body == cim_http.XML_DECLARATION + request.encode('utf-8')
+        assert headers['Content-Length'] == str(len(req_body))
+
+    def test_read_chunked(self):
+        # pylint: disable=no-self-use
+        """A body of unknown length is read in chunks."""
+        data = b'<CIM>' + b'x' * 100000 + b'</CIM>'
+
+        # pylint: disable=protected-access
+        body = cim_http._read_response_body(_ChunkedResponse(data),
+                                            chunk_size=1000)
+
+        assert isinstance(body, bytearray)
+        assert body == data
+
+
 if __name__ == '__main__':
     unittest.main()
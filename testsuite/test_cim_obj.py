@@ -29,11 +29,12 @@ except ImportError:
 
 import pytest
 import six
+from six.moves import cPickle as pickle
 
 from pywbem import cim_obj, cim_types, __version__
 from pywbem import CIMInstance, CIMInstanceName, CIMClass, CIMClassName, \
     CIMProperty, CIMMethod, CIMParameter, CIMQualifier, \
-    CIMQualifierDeclaration, Uint8, Uint16, Uint32, \
+    CIMQualifierDeclaration, CompactCIMInstance, Uint8, Uint16, Uint32, \
     Uint64, Sint8, Sint16, Sint32, Sint64, Real32, Real64, CIMDateTime, \
     tocimobj
 from pywbem._nocasedict import NocaseDict
@@ -1548,6 +1549,150 @@ def test_CIMInstanceName_hash(testcase,
         assert hash1 != hash2
 
 
+@pytest.mark.parametrize(
+    "modify", [
+        lambda path: setattr(path, 'classname', 'CIM_Bar'),
+        lambda path: setattr(path, 'namespace', 'root/bar'),
+        lambda path: setattr(path, 'host', 'bar'),
+        lambda path: setattr(path, 'keybindings', {'Foo': 'Bar'}),
+        lambda path: path.keybindings.__setitem__('Foo', 'Bar'),
+        lambda path: path.__setitem__('Foo2', 42),
+        lambda path: path.__delitem__('Foo'),
+        lambda path: path.update(Foo='Bar'),
+    ],
+    ids=['classname', 'namespace', 'host', 'keybindings', 'keybinding',
+         'setitem', 'delitem', 'update']
+)
+def test_CIMInstanceName_cached_hash(modify):
+    """
+    Test that the cached hash value of CIMInstanceName is invalidated by
+    modifications of the instance path.
+    """
+    obj = CIMInstanceName('CIM_Foo', keybindings={'Foo': 'Foo'},
+                          namespace='root/foo', host='foo')
+    org_obj = obj.copy()
+    org_hash = hash(obj)
+    assert hash(obj) == org_hash
+    assert obj == org_obj
+
+    modify(obj)
+
+    assert obj != org_obj
+    assert org_obj != obj
+    exp_obj = CIMInstanceName(obj.classname, keybindings=obj.keybindings,
+                              namespace=obj.namespace, host=obj.host)
+    assert hash(obj) == hash(exp_obj)
+    assert hash(obj) != org_hash
+
+
+def test_CIMInstanceName_cached_hash_ref():
+    """
+    Test that the hash value of an instance path with a reference
+    keybinding reflects modifications of the referenced instance path.
+    """
+    ref = CIMInstanceName('CIM_Foo', keybindings={'Foo': 'Foo'})
+    obj = CIMInstanceName('CIM_Ref', keybindings={'Ref': ref})
+    org_obj = CIMInstanceName('CIM_Ref', keybindings={'Ref': ref.copy()})
+    assert hash(obj) == hash(org_obj)
+
+    ref['Foo'] = 'Bar'
+
+    assert hash(obj) != hash(org_obj)
+    assert obj != org_obj
+
+
+@pytest.mark.parametrize(
+    "modify", [
+        lambda path: setattr(path, 'classname', 'CIM_Bar'),
+        lambda path: setattr(path, 'namespace', 'root/bar'),
+        lambda path: setattr(path, 'host', 'bar'),
+        lambda path: setattr(path, 'keybindings', {'Foo': 'Bar'}),
+        lambda path: path.keybindings.__setitem__('Foo', 'Bar'),
+        lambda path: path.__setitem__('Foo2', 42),
+        lambda path: path.__delitem__('Foo'),
+        lambda path: path.update(Foo='Bar'),
+        lambda path: path.keybindings.clear(),
+    ],
+    ids=['classname', 'namespace', 'host', 'keybindings', 'keybinding',
+         'setitem', 'delitem', 'update', 'clear']
+)
+def test_CIMInstanceName_freeze(modify):
+    """
+    Test that a frozen CIMInstanceName cannot be modified, and that it is
+    equal to the original instance path.
+    """
+    ref = CIMInstanceName('CIM_Ref', keybindings={'Ref': 'Ref'})
+    obj = CIMInstanceName('CIM_Foo', keybindings={'Foo': 'Foo', 'Ref': ref},
+                          namespace='root/foo', host='foo')
+
+    frozen = obj.freeze()
+
+    assert frozen is not obj
+    assert frozen.frozen
+    assert not obj.frozen
+    assert frozen.freeze() is frozen
+    assert frozen == obj
+    assert obj == frozen
+    assert hash(frozen) == hash(obj)
+    assert frozen['Ref'].frozen
+    assert not ref.frozen
+
+    with pytest.raises(TypeError):
+        modify(frozen)
+    with pytest.raises(TypeError):
+        modify(frozen['Ref'])
+
+    assert frozen == obj
+    copied = frozen.copy()
+    assert not copied.frozen
+    assert copied == frozen
+    modify(copied)
+    assert copied != frozen
+    assert frozen != copied
+
+
+def test_CIMInstanceName_freeze_eq():
+    """
+    Test the comparison of frozen CIMInstanceName objects.
+    """
+    obj1 = CIMInstanceName('CIM_Foo', keybindings={'Foo': 'Foo'},
+                           namespace='root/foo', host='foo').freeze()
+    obj2 = CIMInstanceName('cim_foo', keybindings={'foo': 'Foo'},
+                           namespace='ROOT/foo', host='FOO').freeze()
+    obj3 = CIMInstanceName('CIM_Foo', keybindings={'Foo': 'foo'},
+                           namespace='root/foo', host='foo').freeze()
+
+    assert obj1 == obj2
+    assert hash(obj1) == hash(obj2)
+    assert obj1 != obj3
+    assert {obj1: 1}[obj2.copy()] == 1
+
+
+def test_CIMInstance_frozen_path():
+    """
+    Test that a frozen instance path is shared by copies of a CIMInstance,
+    and replaced by a modifiable copy when a key property is modified.
+    """
+    path = CIMInstanceName('CIM_Foo', keybindings={'Foo': 'Foo'},
+                           namespace='root/foo').freeze()
+    inst = CIMInstance('CIM_Foo', properties={'Foo': 'Foo', 'Bar': 'Bar'},
+                       path=path)
+    assert inst.path is path
+
+    inst_copy = inst.copy()
+    assert inst_copy.path is path
+
+    inst_copy['Bar'] = 'Bar2'
+    inst_copy['Foo'] = 'Foo'
+    assert inst_copy.path is path
+
+    inst_copy['Foo'] = 'Foo2'
+    assert not inst_copy.path.frozen
+    assert inst_copy.path['Foo'] == 'Foo2'
+    assert inst.path is path
+    assert path['Foo'] == 'Foo'
+
+
 class Test_CIMInstanceName_repr(object):
     # pylint: disable=too-few-public-methods
     """
@@ -6214,6 +6359,161 @@ class CIMInstanceUpdateExisting(unittest.TestCase):
         self.assertEqual(i['string'], 'STRING')
 
 
+class Test_CompactCIMInstance(object):
+    """
+    Test `CompactCIMInstance` objects against the `CIMInstance` objects they
+    were created from.
+    """
+
+    @staticmethod
+    def make_instance(instance_id, qualifiers=None):
+        """Return a CIMInstance with a path and properties of several types."""
+        path = CIMInstanceName('CIM_Foo', {'InstanceID': instance_id},
+                               namespace='root/cimv2')
+        return CIMInstance(
+            'CIM_Foo',
+            properties=[
+                CIMProperty('InstanceID', instance_id),
+                CIMProperty('Count', Uint32(7)),
+                CIMProperty('Flags', [True, False]),
+                CIMProperty('Caption', None, type='string',
+                            qualifiers=qualifiers),
+                CIMProperty('Ref', CIMInstanceName('CIM_Bar'),
+                            reference_class='CIM_Bar'),
+            ],
+            path=path)
+
+    def test_from_instance(self):  # pylint: disable=no-self-use
+        """Test the compact form and its dictionary-like access."""
+        inst = self.make_instance('a')
+        schemas = {}
+
+        compact = CompactCIMInstance.from_instance(inst, schemas)
+        compact2 = CompactCIMInstance.from_instance(self.make_instance('b'),
+                                                    schemas)
+
+        assert isinstance(compact, CIMInstance)
+        assert compact.is_compact
+        assert len(schemas) == 1
+        # pylint: disable=protected-access
+        assert compact._schema is compact2._schema
+        assert compact.classname == inst.classname
+        assert compact.path == inst.path
+        assert compact['count'] == Uint32(7)
+        assert compact['Caption'] is None
+        assert compact.get('flags') == [True, False]
+        assert compact.get('foo', 'dflt') == 'dflt'
+        with pytest.raises(KeyError):
+            compact['foo']  # pylint: disable=pointless-statement
+        assert 'ref' in compact
+        assert 'foo' not in compact
+        assert compact.has_key('Ref')
+        assert len(compact) == 5
+        assert list(compact) == inst.keys()
+        assert compact.keys() == inst.keys()
+        assert compact.values() == inst.values()
+        assert compact.items() == inst.items()
+        assert compact.is_compact
+
+    def test_equality(self):  # pylint: disable=no-self-use
+        """Test equality and hash value of compact and full instances."""
+        inst = self.make_instance('a')
+        compact = CompactCIMInstance.from_instance(self.make_instance('a'))
+        compact2 = CompactCIMInstance.from_instance(self.make_instance('a'))
+        other = CompactCIMInstance.from_instance(self.make_instance('b'))
+
+        assert compact == inst
+        assert inst == compact
+        assert compact == compact2
+        assert compact != other
+        assert hash(compact) == hash(inst)
+        assert compact.is_compact
+        assert compact2.is_compact
+
+    def test_ordering(self):  # pylint: disable=no-self-use
+        """Test that ordering comparisons are the same as for CIMInstance."""
+        insts = [self.make_instance('a'), self.make_instance('a')]
+        insts[1]['Count'] = Uint32(8)
+        schemas = {}
+        compacts = [CompactCIMInstance.from_instance(inst, schemas)
+                    for inst in insts]
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            for i, j in ((0, 1), (1, 0)):
+                assert (compacts[i] < compacts[j]) == (insts[i] < insts[j])
+                assert (compacts[i] > compacts[j]) == (insts[i] > insts[j])
+                assert (compacts[i] <= compacts[j]) == \
+                    (insts[i] <= insts[j])
+        assert compacts[0].is_compact
+        assert compacts[1].is_compact
+
+    @pytest.mark.parametrize(
+        "protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+    def test_pickle(self, protocol):  # pylint: disable=no-self-use
+        """Test that compact instances can be pickled."""
+        schemas = {}
+        compacts = [CompactCIMInstance.from_instance(self.make_instance(id_),
+                                                     schemas)
+                    for id_ in ('a', 'b')]
+
+        result = pickle.loads(pickle.dumps(compacts, protocol))
+
+        assert result == compacts
+        assert all(isinstance(c, CompactCIMInstance) for c in result)
+        assert all(c.is_compact for c in result)
+        # pylint: disable=protected-access
+        assert result[0]._schema is result[1]._schema
+        assert result[1]['InstanceID'] == 'b'
+
+    def test_tomof(self):  # pylint: disable=no-self-use
+        """Test that tomof() does not convert the instance."""
+        inst = CIMInstance('CIM_Foo', properties={'Name': 'a', 'Flag': True})
+        compact = CompactCIMInstance.from_instance(inst)
+
+        assert compact.tomof() == inst.tomof()
+        assert compact.is_compact
+
+    def test_copy(self):  # pylint: disable=no-self-use
+        """Test that a copy is in the compact form and independent."""
+        compact = CompactCIMInstance.from_instance(self.make_instance('a'))
+
+        cpy = compact.copy()
+        cpy['InstanceID'] = 'b'
+
+        assert compact.is_compact
+        assert compact['InstanceID'] == 'a'
+        assert compact.path.keybindings['InstanceID'] == 'a'
+        assert cpy.path.keybindings['InstanceID'] == 'b'
+
+    def test_conversion(self):  # pylint: disable=no-self-use
+        """Test the conversion to the full representation."""
+        inst = self.make_instance('a')
+        compact = CompactCIMInstance.from_instance(self.make_instance('a'))
+
+        props = compact.properties
+
+        assert not compact.is_compact
+        assert props == inst.properties
+        assert all(isinstance(p, CIMProperty) for p in props.values())
+        assert compact == inst
+
+        compact['InstanceID'] = 'b'
+        assert compact['InstanceID'] == 'b'
+        assert compact.path.keybindings['InstanceID'] == 'b'
+        del compact['Count']
+        assert compact.keys() == ['InstanceID', 'Flags', 'Caption', 'Ref']
+        assert compact.tocimxmlstr() == \
+            CIMInstance(compact.classname, properties=compact.properties,
+                        path=compact.path).tocimxmlstr()
+
+    def test_property_qualifiers(self):  # pylint: disable=no-self-use
+        """Test that instances with property qualifiers are not converted."""
+        inst = self.make_instance('a', qualifiers={'Key': True})
+
+        assert CompactCIMInstance.from_instance(inst) is inst
+
+
 class Test_CIMProperty_init(object):
     """
     Test CIMProperty.__init__().
@@ -15623,6 +15923,43 @@ def test_CIMClassName_hash(testcase,
         assert hash1 != hash2
 
 
+@pytest.mark.parametrize(
+    "attr, value", [
+        ('classname', 'CIM_Bar'),
+        ('namespace', 'root/bar'),
+        ('host', 'bar'),
+    ]
+)
+def test_CIMClassName_freeze(attr, value):
+    """
+    Test that a frozen CIMClassName cannot be modified, and that it is
+    equal to the original class path.
+    """
+    obj = CIMClassName('CIM_Foo', namespace='root/foo', host='foo')
+
+    frozen = obj.freeze()
+
+    assert frozen.frozen
+    assert not obj.frozen
+    assert frozen.freeze() is frozen
+    assert frozen == obj
+    assert frozen == CIMClassName('cim_foo', namespace='ROOT/foo',
+                                  host='FOO').freeze()
+    assert hash(frozen) == hash(obj)
+
+    with pytest.raises(TypeError):
+        setattr(frozen, attr, value)
+
+    copied = frozen.copy()
+    assert not copied.frozen
+    setattr(copied, attr, value)
+    assert copied != frozen
+    assert frozen != copied
+
+    cls = CIMClass('CIM_Foo', path=frozen)
+    assert cls.copy().path is frozen
+
+
 class Test_CIMClassName_repr(object):  # pylint: disable=too-few-public-methods
     """
     Test CIMClassName.__repr__().
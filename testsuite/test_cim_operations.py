@@ -9,8 +9,12 @@ from __future__ import print_function, absolute_import
 
 import os
 import pytest
+from mock import patch
 
-from pywbem import WBEMConnection, CIMError
+from pywbem import WBEMConnection, CIMError, CIMInstance, \
+    CompactCIMInstance, CIMInstanceName, HTTPError
+from pywbem.tupleparse import parse_cim
+from pywbem.tupletree import xml_to_tupletree_sax
 
 from pywbem._recorder import LogOperationRecorder
 from pywbem._recorder import TestClientRecorder as MyTestClientRecorder
@@ -31,6 +35,7 @@ class TestCreateConnection(object):
         assert conn.x509 is None
         assert conn.use_pull_operations is False
         assert conn.stats_enabled is False
+        assert conn.keep_alive is False
 
     @pytest.mark.parametrize(
         'attr_name, value', [
@@ -101,6 +106,29 @@ class TestCreateConnection(object):
         assert conn.stats_enabled is True
         assert conn.use_pull_operations is True
 
+    def test_keep_alive(self):  # pylint: disable=no-self-use
+        """Test creation of a connection with persistent connections"""
+        conn = WBEMConnection('http://localhost', keep_alive=True)
+        assert conn.keep_alive is True
+        # pylint: disable=protected-access
+        assert len(conn._pool) == 0
+        conn.close()
+        assert len(conn._pool) == 0
+
+    def test_repr(self):  # pylint: disable=no-self-use
+        """Test that the representation shows the init parameters"""
+        conn = WBEMConnection('http://localhost', ('myuser', 'mypw'),
+                              keep_alive=True, iter_prefetch=2,
+                              compact_instances=True, compression='gzip')
+        result = repr(conn)
+        assert result.startswith("WBEMConnection(url='http://localhost', ")
+        assert 'mypw' not in result
+        for item in ("keep_alive=True", "iter_prefetch=2",
+                     "compact_instances=True", "schema_cache=None",
+                     "compression='gzip'"):
+            assert item in result
+        conn.close()
+
     def test_namespace_slashes_init(self):  # pylint: disable=no-self-use
         """Test stripping of leading and trailing slashes in default namespace
         of wbem connection when initializing"""
@@ -210,3 +238,186 @@ class TestGetRsltParams(object):
 
         exc = exec_info.value
         assert exc.status_code_name == 'CIM_ERR_INVALID_PARAMETER'
+
+
+COMPACT_RESPONSE = """<?xml version="1.0" encoding="utf-8" ?>
+<CIM CIMVERSION="2.0" DTDVERSION="2.0">
+<MESSAGE ID="1001" PROTOCOLVERSION="1.0">
+<SIMPLERSP>
+<IMETHODRESPONSE NAME="EnumerateInstances">
+<IRETURNVALUE>
+<VALUE.NAMEDINSTANCE>
+<INSTANCENAME CLASSNAME="CIM_Foo">
+<KEYBINDING NAME="InstanceID"><KEYVALUE>1</KEYVALUE></KEYBINDING>
+</INSTANCENAME>
+<INSTANCE CLASSNAME="CIM_Foo">
+<PROPERTY NAME="InstanceID" TYPE="string"><VALUE>1</VALUE></PROPERTY>
+<PROPERTY NAME="Count" TYPE="uint32"><VALUE>42</VALUE></PROPERTY>
+</INSTANCE>
+</VALUE.NAMEDINSTANCE>
+<VALUE.NAMEDINSTANCE>
+<INSTANCENAME CLASSNAME="CIM_Foo">
+<KEYBINDING NAME="InstanceID"><KEYVALUE>2</KEYVALUE></KEYBINDING>
+</INSTANCENAME>
+<INSTANCE CLASSNAME="CIM_Foo">
+<PROPERTY NAME="InstanceID" TYPE="string"><VALUE>2</VALUE></PROPERTY>
+<PROPERTY NAME="Count" TYPE="uint32"></PROPERTY>
+</INSTANCE>
+</VALUE.NAMEDINSTANCE>
+</IRETURNVALUE>
+</IMETHODRESPONSE>
+</SIMPLERSP>
+</MESSAGE>
+</CIM>
+"""
+
+
+class TestCompactInstances(object):
+    """Test the compact_instances parameter of WBEMConnection."""
+
+    @staticmethod
+    def parse_response(conn):
+        """Return the instances of COMPACT_RESPONSE, as returned by conn."""
+        tup_tree = parse_cim(xml_to_tupletree_sax(COMPACT_RESPONSE,
+                                                  "CIM-XML response"))
+        # pylint: disable=protected-access
+        result = conn._compact_result(conn._imethodcall_result(
+            'EnumerateInstances', tup_tree))
+        return result[0][2]
+
+    def test_disabled(self):  # pylint: disable=no-self-use
+        """Test that instances are not converted by default."""
+        conn = WBEMConnection('http://localhost')
+        assert conn.compact_instances is False
+
+        instances = self.parse_response(conn)
+
+        assert [type(inst) for inst in instances] == [CIMInstance] * 2
+
+    def test_enabled(self):  # pylint: disable=no-self-use
+        """Test that instances are converted and share their schema."""
+        conn = WBEMConnection('http://localhost', compact_instances=True)
+        assert conn.compact_instances is True
+
+        instances = self.parse_response(conn)
+        full_instances = self.parse_response(
+            WBEMConnection('http://localhost'))
+
+        assert [type(inst) for inst in instances] == [CompactCIMInstance] * 2
+        assert all(inst.is_compact for inst in instances)
+        # pylint: disable=protected-access
+        assert instances[0]._schema is instances[1]._schema
+        assert instances == full_instances
+        assert instances[0]['count'] == 42
+        assert instances[1]['Count'] is None
+        assert instances[1].path == full_instances[1].path
+
+
+BATCH_RESPONSE = b"""<?xml version="1.0" encoding="utf-8" ?>
+<CIM CIMVERSION="2.0" DTDVERSION="2.0">
+<MESSAGE ID="1001" PROTOCOLVERSION="1.0">
+<MULTIRSP>
+<SIMPLERSP>
+<IMETHODRESPONSE NAME="GetInstance">
+<IRETURNVALUE>
+<INSTANCE CLASSNAME="CIM_Foo">
+<PROPERTY NAME="InstanceID" TYPE="string"><VALUE>1</VALUE></PROPERTY>
+</INSTANCE>
+</IRETURNVALUE>
+</IMETHODRESPONSE>
+</SIMPLERSP>
+<SIMPLERSP>
+<IMETHODRESPONSE NAME="GetInstance">
+<ERROR CODE="6" DESCRIPTION="Not found"/>
+</IMETHODRESPONSE>
+</SIMPLERSP>
+<SIMPLERSP>
+<IMETHODRESPONSE NAME="DeleteInstance"/>
+</SIMPLERSP>
+</MULTIRSP>
+</MESSAGE>
+</CIM>
+"""
+
+
+def batch_instancename(instance_id):
+    """Return an instance path for the batch tests."""
+    return CIMInstanceName('CIM_Foo', keybindings={'InstanceID': instance_id},
+                           namespace='root/cimv2')
+
+
+BATCH_OPERATIONS = [
+    ('GetInstance', dict(InstanceName=batch_instancename('1'))),
+    ('GetInstance', dict(InstanceName=batch_instancename('2'))),
+    ('DeleteInstance', dict(InstanceName=batch_instancename('3'))),
+]
+
+
+class TestExecuteBatch(object):
+    """Test the ExecuteBatch() method of WBEMConnection."""
+
+    def test_multireq(self):  # pylint: disable=no-self-use
+        """Test that the batch is sent in one multiple operation request."""
+        conn = WBEMConnection('http://localhost', stats_enabled=True)
+        with patch('pywbem.cim_operations.wbem_request',
+                   return_value=(BATCH_RESPONSE, None)) as wbem_request:
+
+            results = conn.ExecuteBatch(BATCH_OPERATIONS)
+
+        assert wbem_request.call_count == 1
+        request_data = wbem_request.call_args[0][1]
+        assert request_data.count('<SIMPLEREQ>') == 3
+        assert '<MULTIREQ>' in request_data
+        assert ('CIMBatch', '') in wbem_request.call_args[0][3]
+
+        assert results[0].classname == 'CIM_Foo'
+        assert results[0].path == batch_instancename('1')
+        assert isinstance(results[1], CIMError)
+        assert results[1].status_code == 6
+        assert results[2] is None
+        # pylint: disable=protected-access
+        assert conn._use_multi_requests is True
+        assert conn.statistics.get_op_statistic('ExecuteBatch').count == 1
+
+    def test_fallback(self):  # pylint: disable=no-self-use
+        """
+        Test that the operations are performed individually if the WBEM
+        server does not support multiple operation requests.
+        """
+        conn = WBEMConnection('http://localhost')
+        with patch('pywbem.cim_operations.wbem_request',
+                   side_effect=HTTPError(501, 'Not Implemented',
+                                         'multiple-requests-unsupported')) \
+                as wbem_request, \
+                patch.object(conn, 'GetInstance',
+                             side_effect=['inst', CIMError(6)]), \
+                patch.object(conn, 'DeleteInstance', return_value=None):
+
+            results = conn.ExecuteBatch(BATCH_OPERATIONS)
+            assert wbem_request.call_count == 1
+
+            # Subsequent batches are not sent as multiple operation requests
+            conn.GetInstance.side_effect = None
+            conn.ExecuteBatch(BATCH_OPERATIONS)
+            assert wbem_request.call_count == 1
+
+        assert results[0] == 'inst'
+        assert isinstance(results[1], CIMError)
+        assert results[2] is None
+        # pylint: disable=protected-access
+        assert conn._use_multi_requests is False
+
+    def test_error(self):  # pylint: disable=no-self-use
+        """Test that other errors of the batch as a whole are raised."""
+        conn = WBEMConnection('http://localhost')
+        with patch('pywbem.cim_operations.wbem_request',
+                   side_effect=HTTPError(401, 'Unauthorized')):
+            with pytest.raises(HTTPError):
+                conn.ExecuteBatch(BATCH_OPERATIONS)
+
+    def test_invalid_operation(self):  # pylint: disable=no-self-use
+        """Test that an unsupported operation raises ValueError."""
+        conn = WBEMConnection('http://localhost')
+        with pytest.raises(ValueError):
+            conn.ExecuteBatch([('EnumerateInstances',
+                                dict(ClassName='CIM_Foo'))])
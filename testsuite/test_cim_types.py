@@ -402,6 +402,34 @@ def test_datetime_init(datetime_init_tuple):
         assert str(obj) == exp_str
 
 
+def test_datetime_init_lazy(datetime_init_tuple):
+    """Test lazy initialization from strings using
+       datetime_init_tuple pytest.fixture.
+    """
+    # pylint: disable=redefined-outer-name
+    (dtarg, exp_kind, exp_datetime, exp_timedelta, exp_minutesfromutc,
+     exp_str) = datetime_init_tuple
+    if not isinstance(dtarg, six.string_types):
+        pytest.skip("Lazy initialization is only supported for strings")
+    # pylint: disable=protected-access
+    if not isinstance(exp_kind, six.string_types):
+        # Invalid formats are detected at initialization, invalid field
+        # values when the object is first used.
+        with pytest.raises(exp_kind):
+            obj = CIMDateTime._from_string_lazy(dtarg)
+            obj.datetime  # pylint: disable=pointless-statement
+    else:
+        obj = CIMDateTime._from_string_lazy(dtarg)
+        assert str(obj) == exp_str
+        assert obj == CIMDateTime(dtarg)
+        assert hash(obj) == hash(CIMDateTime(dtarg))
+        assert obj.is_interval == (exp_kind == 'interval')
+        assert obj.datetime == exp_datetime
+        assert obj.timedelta == exp_timedelta
+        assert obj.minutes_from_utc == exp_minutesfromutc
+        assert str(obj) == exp_str
+
+
 # TODO: Add testcases for get_local_utcoffset()
 # TODO: Add testcases for now()
 # TODO: Add testcases for fromtimestamp()
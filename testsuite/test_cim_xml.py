@@ -13,8 +13,12 @@ from __future__ import absolute_import
 
 import sys
 import unittest
+import pytest
 
-from pywbem import cim_xml
+from pywbem import cim_xml, CIMInstance, CIMInstanceName, CIMClassName, \
+    CIMClass, CIMProperty, CIMQualifier, CIMMethod, CIMParameter, \
+    CIMDateTime
+from pywbem.cim_obj import tocimxml, _tocimxml_str
 from pywbem._utils import _ensure_bytes
 
 DTD_FILE = 'CIM_DTD_V22.dtd'
@@ -1848,5 +1852,139 @@ class SimpleReqAck(UnimplementedTest):
     """
 
 
+#
+# String serialization
+#
+
+_PATH = CIMInstanceName(
+    'CIM_Foo',
+    keybindings=[('Str', u'a&b<c>"d\u00e4'), ('Int', 42), ('Bool', True),
+                 ('Ref', CIMInstanceName('CIM_Bar', {'Name': ''},
+                                         namespace='root/cimv2',
+                                         host='woot.com'))],
+    namespace='root/cimv2')
+
+_EMB_INST = CIMInstance(
+    'CIM_Emb',
+    properties=[CIMProperty('Str', u'x & <y>'),
+                CIMProperty('Arr', [u'a', None, u''], array_size=3)],
+    qualifiers=[CIMQualifier('Q', [True, None], tosubclass=False)])
+
+_INST = CIMInstance(
+    'CIM_Foo',
+    properties=[
+        CIMProperty('Str', u'a&b', class_origin='CIM_Foo', propagated=True),
+        CIMProperty('Null', None, type='string'),
+        CIMProperty('Empty', u''),
+        CIMProperty('Real', 1.5, type='real64'),
+        CIMProperty('Date', CIMDateTime('20140924193040.654321+120')),
+        CIMProperty('Ref', _PATH),
+        CIMProperty('NullRef', None, type='reference',
+                    reference_class='CIM_Foo'),
+        CIMProperty('EmbInst', _EMB_INST),
+        CIMProperty('EmbInstArr', [_EMB_INST, None]),
+        CIMProperty('EmptyArr', [], type='string'),
+        CIMProperty('NullArr', None, type='boolean', is_array=True),
+    ],
+    qualifiers=[CIMQualifier('Description', u'<desc>', overridable=True,
+                             translatable=False)])
+
+_INST_WITH_PATH = _INST.copy()
+_INST_WITH_PATH.path = _PATH
+
+_CLASS = CIMClass(
+    'CIM_Foo', superclass='CIM_Base',
+    properties=[CIMProperty('Key', None, type='uint8',
+                            qualifiers=[CIMQualifier('Key', True)])],
+    methods=[CIMMethod('Meth', 'uint32',
+                       parameters=[CIMParameter('P', 'string')])],
+    qualifiers=[CIMQualifier('Abstract', True)])
+
+
+class TestStringSerialization(object):
+    """
+    Test that the string serialization of CIM objects produces the same
+    result as the serialization through minidom elements.
+    """
+
+    @pytest.mark.parametrize('cdata_escaping', [False, True])
+    @pytest.mark.parametrize(
+        'obj', [
+            _PATH,
+            CIMInstanceName('CIM_Foo'),
+            CIMInstanceName('CIM_Foo', namespace='root', host='h&h'),
+            CIMClassName('CIM_Foo'),
+            CIMClassName('CIM_Foo', namespace='root/cimv2'),
+            CIMClassName('CIM_Foo', namespace='root/cimv2', host='woot.com'),
+            _EMB_INST,
+            _INST,
+            _INST_WITH_PATH,
+            CIMInstance('CIM_Foo'),
+            _CLASS,
+            CIMClass('CIM_Foo'),
+            CIMProperty('P', [False, None], type='boolean',
+                        array_size=2, class_origin='C', propagated=False),
+            CIMQualifier('Q', None, type='string'),
+            CIMMethod('M', 'uint8'),
+            [u'a', None, u'<b>'],
+            [],
+            True,
+            u'a&b',
+        ]
+    )
+    def test_tocimxml_str(self, obj, cdata_escaping, monkeypatch):
+        # pylint: disable=no-self-use
+        """
+        _tocimxml_str() and tocimxmlstr() return the same string as
+        tocimxml().toxml().
+        """
+        monkeypatch.setattr(cim_xml, '_CDATA_ESCAPING', cdata_escaping)
+
+        exp_xml = tocimxml(obj).toxml()
+
+        assert _tocimxml_str(obj) == exp_xml
+        if hasattr(obj, 'tocimxmlstr'):
+            assert obj.tocimxmlstr() == exp_xml
+
+    @pytest.mark.parametrize(
+        'obj, kwargs', [
+            (_PATH, dict(ignore_namespace=True)),
+            (_PATH.copy(), dict(ignore_host=True)),
+            (_INST_WITH_PATH, dict(ignore_path=True)),
+        ]
+    )
+    def test_tocimxml_str_args(self, obj, kwargs):
+        # pylint: disable=no-self-use
+        """The string serialization supports the tocimxml() arguments."""
+        assert obj.tocimxmlstr(**kwargs) == obj.tocimxml(**kwargs).toxml()
+
+    def test_imethodcall_str(self):
+        # pylint: disable=no-self-use
+        """The request message is identical to the minidom based one."""
+        params = [('ClassName', CIMClassName('CIM_Foo')),
+                  ('NewInstance', _INST_WITH_PATH),
+                  ('PropertyList', [u'A', u'B']),
+                  ('DeepInheritance', True)]
+
+        exp_xml = cim_xml.CIM(
+            cim_xml.MESSAGE(
+                cim_xml.SIMPLEREQ(
+                    cim_xml.IMETHODCALL(
+                        'CreateInstance',
+                        LOCALNAMESPACEPATH(),
+                        [cim_xml.IPARAMVALUE(n, tocimxml(v))
+                         for n, v in params])),
+                '1001', '1.0'),
+            '2.0', '2.0').toxml()
+
+        act_xml = cim_xml._message_str(
+            u'<SIMPLEREQ>%s</SIMPLEREQ>' % cim_xml._imethodcall_str(
+                'CreateInstance', 'root/cimv2',
+                [(n, _tocimxml_str(v)) for n, v in params]),
+            '1001', '1.0', '2.0', '2.0')
+
+        assert act_xml == exp_xml
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+
+"""
+Tests for the fan-out executor (`_fanout` in pywbem module).
+"""
+
+from __future__ import absolute_import, print_function
+
+import time
+import threading
+import pytest
+
+from pywbem import FanOutExecutor, TimeoutError, CIMError, CIMInstance, \
+    CIMClass, CIMProperty, CIMQualifier, CIMInstanceName
+from pywbem_mock import FakedWBEMConnection
+
+
+class FakeTarget(object):
+    # pylint: disable=too-few-public-methods
+    """
+    Stands in for a WBEMConnection or WBEMServer object.
+    """
+
+    def __init__(self, url, delay=0, error=None):
+        self.url = url
+        self.delay = delay
+        self.error = error
+        self.name = url.upper()
+
+    def Identify(self, suffix=''):
+        # pylint: disable=invalid-name
+        """Return the URL of the target, after the delay."""
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.url + suffix
+
+
+def test_execute_callable():
+    """Test that all targets return their results from a callable."""
+    targets = [FakeTarget('http://srv%s' % i) for i in range(20)]
+    executor = FanOutExecutor(targets, max_workers=4)
+
+    results = list(executor.execute(lambda t, sfx: t.Identify(sfx), '/x'))
+
+    assert len(results) == len(targets)
+    for target, result, exc in results:
+        assert exc is None
+        assert result == target.url + '/x'
+    assert set(r.target for r in results) == set(targets)
+
+
+def test_execute_named():
+    """Test operations specified by method name and by property name."""
+    targets = [FakeTarget('http://srv%s' % i) for i in range(3)]
+    executor = FanOutExecutor(targets)
+
+    results = list(executor.execute('Identify', suffix='/y'))
+    assert sorted(r.result for r in results) == \
+        sorted(t.url + '/y' for t in targets)
+
+    results = list(executor.execute('name'))
+    assert sorted(r.result for r in results) == \
+        sorted(t.name for t in targets)
+
+
+def test_execute_exception():
+    """Test that a failing target returns its exception."""
+    error = CIMError(1)
+    targets = [FakeTarget('http://good'),
+               FakeTarget('http://bad', error=error)]
+    executor = FanOutExecutor(targets, stats_enabled=True)
+
+    results = dict((r.target.url, r) for r in executor.execute('Identify'))
+
+    assert results['http://good'].exception is None
+    assert results['http://good'].result == 'http://good'
+    assert results['http://bad'].exception is error
+    assert results['http://bad'].result is None
+
+    stats = dict(executor.statistics.snapshot())
+    assert stats['http://good'].count == 1
+    assert stats['http://good'].exception_count == 0
+    assert stats['http://bad'].count == 1
+    assert stats['http://bad'].exception_count == 1
+
+
+def test_execute_completion_order():
+    """Test that results are returned in the order of completion."""
+    targets = [FakeTarget('http://slow', delay=0.4),
+               FakeTarget('http://fast', delay=0)]
+    executor = FanOutExecutor(targets, max_workers=2)
+
+    urls = [r.target.url for r in executor.execute('Identify')]
+
+    assert urls == ['http://fast', 'http://slow']
+
+
+def test_execute_bounded():
+    """Test that no more than max_workers operations run at the same time."""
+    lock = threading.Lock()
+    counts = {'active': 0, 'max': 0}
+
+    def operation(target):
+        """Count the concurrently active operations."""
+        with lock:
+            counts['active'] += 1
+            counts['max'] = max(counts['max'], counts['active'])
+        time.sleep(0.02)
+        with lock:
+            counts['active'] -= 1
+        return target.url
+
+    targets = [FakeTarget('http://srv%s' % i) for i in range(12)]
+    executor = FanOutExecutor(targets, max_workers=3)
+
+    assert len(list(executor.execute(operation))) == 12
+    assert counts['max'] <= 3
+
+
+def test_execute_timeout():
+    """Test that a hanging target times out without delaying the others."""
+    targets = [FakeTarget('http://hang', delay=1.0)] + \
+        [FakeTarget('http://srv%s' % i, delay=0.05) for i in range(4)]
+    executor = FanOutExecutor(targets, max_workers=2, timeout=0.3,
+                              stats_enabled=True)
+
+    start = time.time()
+    results = list(executor.execute('Identify'))
+    elapsed = time.time() - start
+
+    assert len(results) == 5
+    hang = [r for r in results if r.target.url == 'http://hang'][0]
+    assert isinstance(hang.exception, TimeoutError)
+    assert hang.result is None
+    assert all(r.exception is None for r in results if r is not hang)
+    assert elapsed < 0.9
+
+    stats = dict(executor.statistics.snapshot())
+    assert stats['http://hang'].exception_count == 1
+    assert stats['http://hang'].max_time >= 0.3
+
+
+def test_execute_abandoned():
+    """Test that no operations are started after the generator is closed."""
+    started = []
+
+    def operation(target):
+        """Record the started operations."""
+        started.append(target)
+        time.sleep(0.05)
+        return target.url
+
+    targets = [FakeTarget('http://srv%s' % i) for i in range(10)]
+    executor = FanOutExecutor(targets, max_workers=1)
+
+    gen = executor.execute(operation)
+    next(gen)
+    gen.close()
+    time.sleep(0.2)
+
+    assert len(started) <= 2
+
+
+@pytest.mark.parametrize(
+    "max_workers, timeout",
+    [(0, None), (1, 0), (1, -1)]
+)
+def test_init_invalid(max_workers, timeout):
+    """Test invalid init parameters."""
+    with pytest.raises(ValueError):
+        FanOutExecutor([], max_workers=max_workers, timeout=timeout)
+
+
+def test_execute_iter_method():
+    """Test that the generators of Iter methods are consumed."""
+    cls = CIMClass(
+        'CIM_Foo', properties=[
+            CIMProperty('InstanceID', None, type='string',
+                        qualifiers=[CIMQualifier('Key', True)])])
+    conns = []
+    for i in range(3):
+        conn = FakedWBEMConnection()
+        conn.add_cimobjects(cls)
+        insts = []
+        for j in range(i + 1):
+            inst = CIMInstance('CIM_Foo', properties={'InstanceID': str(j)})
+            inst.path = CIMInstanceName.from_instance(cls, inst)
+            insts.append(inst)
+        conn.add_cimobjects(insts)
+        conns.append(conn)
+    executor = FanOutExecutor(conns)
+
+    results = list(executor.execute('IterEnumerateInstances', 'CIM_Foo'))
+
+    for conn, result, exc in results:
+        assert exc is None
+        assert isinstance(result, list)
+        assert len(result) == conns.index(conn) + 1
@@ -20,9 +20,12 @@ import logging as _logging
 from time import time
 import datetime
 from random import randint
+import threading
 import requests
+import pytest
 
-from pywbem import WBEMListener
+from pywbem import WBEMListener, CIMInstance, CIMError, cim_http, \
+    CIM_ERR_SERVER_LIMITS_EXCEEDED, CIM_ERR_SERVER_IS_SHUTTING_DOWN
 
 RCV_COUNT = 0
 RCV_FAIL = False
@@ -146,7 +149,7 @@ class TestIndications(unittest.TestCase):
 
     @staticmethod
     def createlistener(host, http_port=None, https_port=None,
-                       certfile=None, keyfile=None):
+                       certfile=None, keyfile=None, **kwargs):
         """
         Create and start a listener based on host, ports, etc.
         """
@@ -163,12 +166,13 @@ class TestIndications(unittest.TestCase):
                                 http_port=http_port,
                                 https_port=https_port,
                                 certfile=certfile,
-                                keyfile=keyfile)
+                                keyfile=keyfile,
+                                **kwargs)
         LISTENER.add_callback(_process_indication)
         LISTENER.start()
 
     # pylint: disable=unused-argument
-    def send_indications(self, send_count, http_port):
+    def send_indications(self, send_count, http_port, **kwargs):
         """
         Send the number of indications defined by the send_count attribute
         using the specified listener HTTP port.
@@ -186,7 +190,7 @@ class TestIndications(unittest.TestCase):
         RCV_FAIL = False
         host = 'localhost'
         try:
-            self.createlistener(host, http_port)
+            self.createlistener(host, http_port, **kwargs)
 
             start_time = time()
 
@@ -227,6 +231,9 @@ class TestIndications(unittest.TestCase):
                 print('Sent %s indications in %s sec or %.2f ind/sec' %
                       (send_count, endtime, (send_count / endtime)))
 
+            # Deliver the indications remaining in the delivery queue
+            LISTENER.stop()
+
             self.assertEqual(send_count, RCV_COUNT,
                              'Mismatch between sent and rcvd')
             self.assertFalse(RCV_FAIL, 'Sequence numbers do not match')
@@ -242,6 +249,10 @@ class TestIndications(unittest.TestCase):
         """Test sending 100 indications"""
         self.send_indications(100, 50000)
 
+    def test_send_100_queued(self):
+        """Test sending 100 indications through a small delivery queue"""
+        self.send_indications(100, 50000, queue_size=5)
+
     # Disabled the following tests, because in some environments it takes 30min.
     # def test_send_1000(self):
     #     """Test sending 1000 indications"""
@@ -359,6 +370,258 @@ class TestIndications(unittest.TestCase):
         listener2.stop()
 
 
+def make_indication(sequence_number):
+    """Return an indication instance with a sequence number."""
+    return CIMInstance('CIM_AlertIndication',
+                       properties={'SequenceNumber': str(sequence_number)})
+
+
+class TestDeliveryQueue(object):
+    """
+    Test the delivery queue of WBEMListener.
+    """
+
+    @pytest.mark.parametrize(
+        "kwargs", [
+            dict(queue_size=0),
+            dict(queue_size=10, delivery_workers=0),
+            dict(queue_size=10, overflow_policy='drop-newest'),
+        ]
+    )
+    def test_init_invalid(self, kwargs):  # pylint: disable=no-self-use
+        """Test invalid init parameters."""
+        with pytest.raises(ValueError):
+            WBEMListener('localhost', 50000, **kwargs)
+
+    def test_drop_oldest(self):  # pylint: disable=no-self-use
+        """
+        Test that the oldest indications are dropped from a full queue, and
+        that the remaining ones are delivered when the listener is started.
+        """
+        received = []
+        listener = WBEMListener('localhost', 50000, queue_size=2,
+                                overflow_policy='drop-oldest')
+        listener.add_callback(
+            lambda ind, host: received.append(
+                ind.properties['SequenceNumber'].value))
+
+        for i in range(5):
+            listener.deliver_indication(make_indication(i), 'srv')
+
+        assert listener.queue_depth == 2
+        assert listener.max_queue_depth == 2
+        assert listener.dropped_count == 3
+        assert received == []
+
+        listener.start()
+        listener.stop()
+
+        assert received == ['3', '4']
+        assert listener.queue_depth == 0
+
+    def test_drop_oldest_stopping(self):  # pylint: disable=no-self-use
+        """
+        Test that an indication received while the listener is being stopped
+        is rejected instead of dropping the items that stop the delivery
+        threads, and that the listener can be started again.
+        """
+        started = threading.Event()
+        release = threading.Event()
+        received = []
+
+        def callback(indication, host):  # pylint: disable=unused-argument
+            """Block the delivery thread until released."""
+            started.set()
+            release.wait(10)
+            received.append(indication.properties['SequenceNumber'].value)
+
+        listener = WBEMListener('localhost', 50000, queue_size=1,
+                                overflow_policy='drop-oldest')
+        listener.add_callback(callback)
+        listener.start()
+        listener.deliver_indication(make_indication(0), 'srv')
+        assert started.wait(4)
+        listener.deliver_indication(make_indication(1), 'srv')
+
+        # Blocks while the queue is full and the delivery thread is busy
+        stopper = threading.Thread(target=listener.stop)
+        stopper.start()
+        try:
+            for _ in range(400):
+                if listener._stopping:  # pylint: disable=protected-access
+                    break
+                stopper.join(0.01)
+            with pytest.raises(CIMError) as exc_info:
+                listener.deliver_indication(make_indication(2), 'srv')
+        finally:
+            release.set()
+            stopper.join(10)
+
+        assert not stopper.is_alive()
+        assert exc_info.value.status_code == CIM_ERR_SERVER_IS_SHUTTING_DOWN
+        assert listener.dropped_count == 0
+        assert received == ['0', '1']
+
+        listener.start()
+        listener.deliver_indication(make_indication(3), 'srv')
+        listener.stop()
+
+        assert received == ['0', '1', '3']
+
+    def test_reject(self):  # pylint: disable=no-self-use
+        """Test that indications are rejected when the queue is full."""
+        listener = WBEMListener('localhost', 50000, queue_size=1,
+                                overflow_policy='reject')
+        listener.deliver_indication(make_indication(0), 'srv')
+
+        with pytest.raises(CIMError) as exc_info:
+            listener.deliver_indication(make_indication(1), 'srv')
+
+        assert exc_info.value.status_code == CIM_ERR_SERVER_LIMITS_EXCEEDED
+        assert listener.rejected_count == 1
+        assert listener.queue_depth == 1
+
+    def test_reject_response(self):  # pylint: disable=no-self-use
+        """
+        Test that the WBEM server receives an error response for a rejected
+        indication, and that a slow callback does not delay the response.
+        """
+        started = threading.Event()
+        release = threading.Event()
+
+        def callback(indication, host):  # pylint: disable=unused-argument
+            """Block the delivery thread until released."""
+            started.set()
+            release.wait(10)
+
+        url = 'http://localhost:50000'
+        headers = {'content-type': 'application/xml; charset=utf-8',
+                   'CIMExport': 'MethodRequest',
+                   'CIMExportMethod': 'ExportIndication',
+                   'Accept-Encoding': 'Identity',
+                   'CIMProtocolVersion': '1.4'}
+        listener = WBEMListener('localhost', 50000, queue_size=1,
+                                overflow_policy='reject', stats_enabled=True)
+        listener.add_callback(callback)
+        listener.start()
+        try:
+            responses = []
+            for i in range(3):
+                responses.append(requests.post(
+                    url, headers=headers, timeout=4,
+                    data=create_indication_data(i, i, 0, '1.4')))
+                if i == 0:
+                    assert started.wait(4)
+        finally:
+            release.set()
+            listener.stop()
+
+        assert [r.status_code for r in responses] == [200, 200, 200]
+        assert 'ERROR' not in responses[1].text
+        assert 'CODE="27"' in responses[2].text
+        assert listener.rejected_count == 1
+        op_stat = listener.statistics.get_op_statistic('DeliverIndication')
+        assert op_stat.count == 2
+        assert op_stat.exception_count == 0
+
+
+class TestCompressedIndications(object):
+    """
+    Test that WBEMListener accepts compressed export requests.
+    """
+
+    @pytest.mark.parametrize(
+        "encoding, exp_status", [
+            ('gzip', 200),
+            ('deflate', 200),
+            ('identity', 200),
+            ('br', 406),
+        ]
+    )
+    def test_compressed(self, encoding, exp_status):
+        # pylint: disable=no-self-use
+        """Test an indication with a compressed request body."""
+        received = []
+        url = 'http://localhost:50000'
+        headers = {'content-type': 'application/xml; charset=utf-8',
+                   'CIMExport': 'MethodRequest',
+                   'CIMExportMethod': 'ExportIndication',
+                   'Accept-Encoding': 'Identity',
+                   'Content-Encoding': encoding,
+                   'CIMProtocolVersion': '1.4'}
+        body = create_indication_data(1, 1, 0, '1.4').encode('utf-8')
+        if encoding in ('gzip', 'deflate'):
+            body = cim_http.compress_body(body, encoding)
+        listener = WBEMListener('localhost', 50000)
+        listener.add_callback(
+            lambda ind, host: received.append(
+                ind.properties['SequenceNumber'].value))
+        listener.start()
+        try:
+            response = requests.post(url, headers=headers, data=body,
+                                     timeout=4)
+        finally:
+            listener.stop()
+
+        assert response.status_code == exp_status
+        assert received == (['1'] if exp_status == 200 else [])
+
+    def test_invalid(self):  # pylint: disable=no-self-use
+        """Test an invalid compressed request body."""
+        url = 'http://localhost:50000'
+        headers = {'content-type': 'application/xml; charset=utf-8',
+                   'CIMExport': 'MethodRequest',
+                   'CIMExportMethod': 'ExportIndication',
+                   'Accept-Encoding': 'Identity',
+                   'Content-Encoding': 'gzip',
+                   'CIMProtocolVersion': '1.4'}
+        listener = WBEMListener('localhost', 50000)
+        listener.start()
+        try:
+            response = requests.post(url, headers=headers, timeout=4,
+                                     data=b'<CIM')
+        finally:
+            listener.stop()
+
+        assert response.status_code == 400
+        assert response.headers['CIMError'] == 'request-not-well-formed'
+
+    @pytest.mark.parametrize(
+        "encoding, max_request_size", [
+            ('gzip', 400),
+            ('identity', 100),
+        ]
+    )
+    def test_too_large(self, encoding, max_request_size):
+        # pylint: disable=no-self-use
+        """Test that too large request bodies are rejected, also after they
+        have been decompressed."""
+        received = []
+        url = 'http://localhost:50000'
+        headers = {'content-type': 'application/xml; charset=utf-8',
+                   'CIMExport': 'MethodRequest',
+                   'CIMExportMethod': 'ExportIndication',
+                   'Accept-Encoding': 'Identity',
+                   'Content-Encoding': encoding,
+                   'CIMProtocolVersion': '1.4'}
+        body = create_indication_data(1, 1, 0, '1.4').encode('utf-8')
+        if encoding == 'gzip':
+            body = cim_http.compress_body(body, encoding)
+            assert len(body) <= max_request_size
+        listener = WBEMListener('localhost', 50000,
+                                max_request_size=max_request_size)
+        listener.add_callback(lambda ind, host: received.append(ind))
+        listener.start()
+        try:
+            response = requests.post(url, headers=headers, data=body,
+                                     timeout=4)
+        finally:
+            listener.stop()
+
+        assert response.status_code == 413
+        assert received == []
+
+
 if __name__ == '__main__':
     VERBOSE = False
     unittest.main()
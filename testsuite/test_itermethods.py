@@ -21,13 +21,16 @@ level methods because those are the methods that are mocked.
 
 from __future__ import absolute_import, print_function
 
+import time
+import threading
 import pytest
 import six
 
 from mock import Mock
 
 from pywbem import WBEMConnection, CIMInstance, CIMClass, CIMInstanceName, \
-    CIMProperty, CIMError, CIM_ERR_NOT_SUPPORTED, DEFAULT_ITER_MAXOBJECTCOUNT
+    CIMProperty, CIMError, CIM_ERR_NOT_SUPPORTED, CIM_ERR_FAILED, \
+    DEFAULT_ITER_MAXOBJECTCOUNT, LogOperationRecorder
 
 from pywbem.cim_operations import pull_inst_result_tuple, \
     pull_path_result_tuple, pull_query_result_tuple
@@ -1660,3 +1663,173 @@ class TestIterQueryInstances(object):  # pylint: disable=invalid-name
             # pylint: disable=unused-variable
             q_result = conn.IterQueryInstances(  # noqa=F841
                 'CQL', 'Select from *', MaxObjectCount=max_cnt)
+
+
+########################################################################
+#
+#               Prefetching of pull operations tests
+#
+########################################################################
+
+
+def prefetch_pulls(batches, delay=0, error_at=None):
+    """
+    Return a side effect function for a mocked pull operation that returns
+    the batches of objects in sequence, with the context of a batch being
+    its index. If error_at is a batch index, a CIMError is raised for that
+    batch instead.
+    """
+    def pull(context, MaxObjectCount=None):
+        # pylint: disable=invalid-name,unused-argument
+        """Return the batch after the one defined by the context."""
+        time.sleep(delay)
+        index = int(context[0]) + 1
+        if index == error_at:
+            raise CIMError(CIM_ERR_FAILED, 'Pull failed')
+        return pull_inst_result_tuple(instances=batches[index],
+                                      eos=(index == len(batches) - 1),
+                                      context=(str(index), 'root/cimv2'))
+    return pull
+
+
+def prefetch_conn(batches, prefetch, delay=0, error_at=None):
+    """
+    Return a WBEMConnection with mocked open, pull and close operations
+    for IterEnumerateInstances.
+    """
+    conn = WBEMConnection('dummy', use_pull_operations=True,
+                          iter_prefetch=prefetch)
+    conn.OpenEnumerateInstances = Mock(return_value=pull_inst_result_tuple(
+        instances=batches[0], eos=False, context=('0', 'root/cimv2')))
+    conn.PullInstancesWithPath = Mock(
+        side_effect=prefetch_pulls(batches, delay, error_at))
+    conn.CloseEnumeration = Mock(return_value=None)
+    return conn
+
+
+def make_batches(batch_count, batch_size):
+    """Return a list of lists of instances."""
+    return [[CIMInstance('CIM_Foo', properties={'Name': '%s-%s' % (b, i)})
+             for i in six.moves.range(batch_size)]
+            for b in six.moves.range(batch_count)]
+
+
+class TestIterPrefetch(object):
+    """Test prefetching of pull operations in the Iter methods."""
+
+    @pytest.mark.parametrize(
+        "prefetch", [0, 1, 3]
+    )
+    def test_prefetch_result(self, prefetch):
+        # pylint: disable=no-self-use
+        """All objects are returned in sequence, without closing."""
+        batches = make_batches(5, 3)
+        conn = prefetch_conn(batches, prefetch)
+        assert conn.iter_prefetch == prefetch
+
+        result = list(conn.IterEnumerateInstances('CIM_Foo',
+                                                  MaxObjectCount=3))
+
+        assert result == [inst for batch in batches for inst in batch]
+        assert conn.PullInstancesWithPath.call_count == 4
+        assert conn.CloseEnumeration.call_count == 0
+
+    def test_prefetch_overlap(self):
+        # pylint: disable=no-self-use
+        """The pull requests are performed while the caller is busy."""
+        batches = make_batches(5, 1)
+
+        def consume(conn):
+            """Consume the instances slowly; return elapsed time."""
+            start = time.time()
+            for _ in conn.IterEnumerateInstances('CIM_Foo'):
+                time.sleep(0.1)
+            return time.time() - start
+
+        serial = consume(prefetch_conn(batches, 0, delay=0.1))
+        prefetched = consume(prefetch_conn(batches, 1, delay=0.1))
+
+        assert serial >= 0.8
+        assert prefetched < 0.7
+
+    @pytest.mark.parametrize(
+        "prefetch", [0, 1, 2]
+    )
+    def test_prefetch_close(self, prefetch):
+        # pylint: disable=no-self-use
+        """Early close closes the session with the latest context."""
+        batches = make_batches(6, 2)
+        conn = prefetch_conn(batches, prefetch, delay=0.02)
+
+        gen = conn.IterEnumerateInstances('CIM_Foo')
+        result = [next(gen) for _ in six.moves.range(3)]
+        gen.close()
+
+        assert result == batches[0] + batches[1][0:1]
+        pulls = conn.PullInstancesWithPath.call_count
+        assert 1 <= pulls <= 1 + prefetch
+        conn.CloseEnumeration.assert_called_once_with((str(pulls),
+                                                       'root/cimv2'))
+
+    @pytest.mark.parametrize(
+        "prefetch", [0, 1, 3]
+    )
+    def test_prefetch_error(self, prefetch):
+        # pylint: disable=no-self-use
+        """A failing pull raises after the preceding objects."""
+        batches = make_batches(5, 2)
+        conn = prefetch_conn(batches, prefetch, error_at=3)
+
+        result = []
+        with pytest.raises(CIMError) as exec_info:
+            for inst in conn.IterEnumerateInstances('CIM_Foo'):
+                result.append(inst)
+
+        assert exec_info.value.status_code == CIM_ERR_FAILED
+        assert result == batches[0] + batches[1] + batches[2]
+        conn.CloseEnumeration.assert_called_once_with(('2', 'root/cimv2'))
+
+    def test_prefetch_paths(self, tst_paths):
+        # pylint: disable=no-self-use
+        """Prefetching applies to the Iter methods returning paths."""
+        conn = WBEMConnection('dummy', use_pull_operations=True,
+                              iter_prefetch=1)
+        conn.OpenEnumerateInstancePaths = Mock(
+            return_value=pull_path_result_tuple(paths=[], eos=False,
+                                                context=('0', 'root/cimv2')))
+        conn.PullInstancePaths = Mock(
+            return_value=pull_path_result_tuple(paths=tst_paths, eos=True,
+                                                context=None))
+
+        result = list(conn.IterEnumerateInstancePaths('CIM_Foo'))
+
+        assert result == tst_paths
+        assert conn.PullInstancePaths.call_count == 1
+
+    def test_prefetch_recorder(self):
+        # pylint: disable=no-self-use
+        """No background thread is used while recorders are active."""
+        batches = make_batches(3, 1)
+        conn = prefetch_conn(batches, 2)
+        conn.add_operation_recorder(
+            LogOperationRecorder(conn_id=conn.conn_id))
+        pull = conn.PullInstancesWithPath.side_effect
+        threads = []
+
+        def recording_pull(*args, **kwargs):
+            """Record the thread performing the pull."""
+            threads.append(threading.current_thread())
+            return pull(*args, **kwargs)
+
+        conn.PullInstancesWithPath.side_effect = recording_pull
+
+        result = list(conn.IterEnumerateInstances('CIM_Foo'))
+
+        assert len(result) == 3
+        assert threads == [threading.current_thread()] * 2
+
+    def test_prefetch_invalid(self):
+        # pylint: disable=no-self-use
+        """A negative prefetch depth is rejected."""
+        with pytest.raises(ValueError):
+            WBEMConnection('dummy', iter_prefetch=-1)
@@ -6,6 +6,7 @@ from __future__ import absolute_import
 
 import re
 import six
+from six.moves import cPickle as pickle
 try:
     from collections import OrderedDict
 except ImportError:
@@ -2434,6 +2435,66 @@ def test_NocaseDict_ordering(testcase,
     assert result == exp_result
 
 
+@pytest.mark.parametrize(
+    "modify", [
+        lambda dic: dic.__setitem__('Dog', 'Dog'),
+        lambda dic: dic.__delitem__('Dog'),
+        lambda dic: dic.update(Cat='Cat'),
+        lambda dic: dic.setdefault('Cat', 'Cat'),
+        lambda dic: dic.clear(),
+    ],
+    ids=['setitem', 'delitem', 'update', 'setdefault', 'clear']
+)
+def test_cached_hash(modify):
+    """
+    Test that the cached hash value is invalidated by modifications of the
+    dictionary, and that equality of dictionaries with different cached hash
+    values is determined correctly.
+    """
+    dic = NocaseDict([('Dog', 'Cat'), ('Budgie', 42)])
+    org_dic = dic.copy()
+    org_hash = hash(dic)
+    assert hash(org_dic) == org_hash
+    assert dic == org_dic
+
+    modify(dic)
+
+    assert dic != org_dic
+    assert org_dic != dic
+    assert hash(dic) == hash(NocaseDict(list(dic.items())))
+    assert hash(dic) != org_hash
+
+
+def test_cached_hash_mutable_value():
+    """
+    Test that the hash value of a dictionary with values of mutable types
+    reflects modifications of the values.
+    """
+    value = NocaseDict([('Dog', 'Cat')])
+    dic = NocaseDict([('Value', value)])
+    org_hash = hash(dic)
+
+    value['Dog'] = 'Budgie'
+
+    assert hash(dic) != org_hash
+
+
+def test_cached_hash_pickle():
+    """
+    Test that the cached hash value is not restored by unpickling, because
+    hash values of strings differ between Python processes.
+    """
+    dic = NocaseDict([('Dog', 'Cat')])
+    hash(dic)
+
+    dic2 = pickle.loads(pickle.dumps(dic))
+
+    # pylint: disable=protected-access
+    assert dic2._hash is None
+    assert dic2 == dic
+    assert hash(dic2) == hash(dic)
+
+
 def test_unnamed_keys():
     """
     Test function for unnamed keys (key=None). This can be allowed in the
@@ -2453,3 +2514,23 @@ def test_unnamed_keys():
     del dic[None]
     assert None not in dic
     assert not dic
+
+
+def test_shared_lower_keys():
+    """
+    Test that the lower-cased keys of equal keys in different NocaseDict
+    objects are shared.
+    """
+    key1 = u''.join([u'Shared', u'Key'])
+    key2 = u''.join([u'Shared', u'Key'])
+    assert key1 is not key2
+
+    dic1 = NocaseDict([(key1, 1)])
+    dic2 = NocaseDict([(key2, 2)])
+
+    # pylint: disable=protected-access
+    lower1 = list(dic1._data.keys())[0]
+    lower2 = list(dic2._data.keys())[0]
+    assert lower1 == u'sharedkey'
+    assert lower1 is lower2
+    assert dic2['SHAREDKEY'] == 2
@@ -739,7 +739,12 @@ class LogOperationRecorderStagingTests(BaseLogOperationRecorderTests):
                   "default_namespace=u'root/cimv2', x509=None, "
                   "verify_callback=None, ca_certs=None, no_verification=False, "
                   "timeout=None, use_pull_operations=False, "
-                  "stats_enabled=False, recorders=['LogOperationRecorder'])")
+                  "stats_enabled=False, recorders=['LogOperationRecorder'], "
+                  "keep_alive=False, "
+                  "iter_prefetch=0, "
+                  "compact_instances=False, "
+                  "schema_cache=None, "
+                  "compression=None)")
         result = result.replace('<REPLACE_THIS>', conn.conn_id)
 
         if six.PY2:
@@ -776,7 +781,12 @@ class LogOperationRecorderStagingTests(BaseLogOperationRecorderTests):
             "x509='cert_file': 'Certfile.x', 'key_file': 'keyfile.x', "
             "verify_callback=None, ca_certs=None, no_verification=True, "
             "timeout=10, use_pull_operations=True, stats_enabled=True, "
-            "recorders=['LogOperationRecorder'])")
+            "recorders=['LogOperationRecorder'], "
+            "keep_alive=False, "
+            "iter_prefetch=0, "
+            "compact_instances=False, "
+            "schema_cache=None, "
+            "compression=None)")
         result = result.replace('<REPLACE_THIS>', conn.conn_id)
 
         if six.PY2:
@@ -1797,7 +1807,12 @@ class TestExternLoggerDef(BaseLogOperationRecorderTests):
               " conn_id=%s, default_namespace=u'root/cimv2', x509=None, " \
               "verify_callback=None, ca_certs=None, no_verification=False, " \
               "timeout=1, use_pull_operations=False, stats_enabled=False, " \
-              "recorders=['LogOperationRecorder'])" % (conn_id, conn_id)
+              "recorders=['LogOperationRecorder'], " \
+              "keep_alive=False, " \
+              "iter_prefetch=0, " \
+              "compact_instances=False, " \
+              "schema_cache=None, " \
+              "compression=None)" % (conn_id, conn_id)
 
         req = "Request:%s GetClass(ClassName='blah', IncludeClassOrigin=None," \
               " IncludeQualifiers=None, LocalOnly=None, PropertyList=None, " \
@@ -2087,7 +2102,12 @@ class TestLoggingEndToEnd(BaseLogOperationRecorderTests):
               'u\'http://blah\', x509=None, verify_callback=None, ' \
               'ca_certs=None, no_verification=False, timeout=None, ' \
               "use_pull_operations=False, " \
-              "stats_enabled=False, recorders=[\'LogOperationRecorder\']" \
+              "stats_enabled=False, recorders=[\'LogOperationRecorder\'], " \
+              "keep_alive=False, " \
+              "iter_prefetch=0, " \
+              "compact_instances=False, " \
+              "schema_cache=None, " \
+              "compression=None" \
               ')"))' % (conn_id, conn_id)
 
         if six.PY3:
@@ -2128,7 +2148,12 @@ class TestLoggingEndToEnd(BaseLogOperationRecorderTests):
               'u\'http://blah\', x509=None, verify_callback=None, ' \
               'ca_certs=None, no_verification=False, timeout=None, ' \
               "use_pull_operations=False, " \
-              "stats_enabled=False, recorders=[\'LogOperationRecorder\']" \
+              "stats_enabled=False, recorders=[\'LogOperationRecorder\'], " \
+              "keep_alive=False, " \
+              "iter_prefetch=0, " \
+              "compact_instances=False, " \
+              "schema_cache=None, " \
+              "compression=None" \
               ')"))' % (conn_id, conn_id)
 
         if six.PY3:
@@ -2175,7 +2200,12 @@ class TestLoggingEndToEnd(BaseLogOperationRecorderTests):
               'u\'http://blah\', x509=None, verify_callback=None, ' \
               'ca_certs=None, no_verification=False, timeout=None, ' \
               "use_pull_operations=False, " \
-              "stats_enabled=False, recorders=[\'LogOperationRecorder\']" \
+              "stats_enabled=False, recorders=[\'LogOperationRecorder\'], " \
+              "keep_alive=False, " \
+              "iter_prefetch=0, " \
+              "compact_instances=False, " \
+              "schema_cache=None, " \
+              "compression=None" \
               ')"))' % (conn_id, conn_id)
 
         if six.PY3:
@@ -2218,7 +2248,12 @@ class TestLoggingEndToEnd(BaseLogOperationRecorderTests):
               'u\'http://blah\', x509=None, verify_callback=None, ' \
               'ca_certs=None, no_verification=False, timeout=None, ' \
               "use_pull_operations=False, " \
-              "stats_enabled=False, recorders=[\'LogOperationRecorder\']" \
+              "stats_enabled=False, recorders=[\'LogOperationRecorder\'], " \
+              "keep_alive=False, " \
+              "iter_prefetch=0, " \
+              "compact_instances=False, " \
+              "schema_cache=None, " \
+              "compression=None" \
               ')"))' % (conn_id, conn_id)
 
         if six.PY3:
@@ -2260,7 +2295,12 @@ class TestLoggingEndToEnd(BaseLogOperationRecorderTests):
               'u\'http://blah\', x509=None, verify_callback=None, ' \
               'ca_certs=None, no_verification=False, timeout=None, ' \
               "use_pull_operations=False, " \
-              "stats_enabled=False, recorders=[\'LogOperationRecorder\']" \
+              "stats_enabled=False, recorders=[\'LogOperationRecorder\'], " \
+              "keep_alive=False, " \
+              "iter_prefetch=0, " \
+              "compact_instances=False, " \
+              "schema_cache=None, " \
+              "compression=None" \
               ')"))' % (conn_id, conn_id)
 
         if six.PY3:
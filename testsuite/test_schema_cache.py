@@ -0,0 +1,365 @@
+#!/usr/bin/env python
+
+"""
+Tests for the schema cache (`_schema_cache` in pywbem module).
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import time
+import shutil
+import tempfile
+import pytest
+from mock import Mock
+
+from pywbem import SchemaCache, WBEMConnection, CIMClass, CIMClassName, \
+    CIMProperty, CIMQualifier, CIMQualifierDeclaration, CIMError, \
+    BaseOperationRecorder
+from pywbem_mock import FakedWBEMConnection
+
+URL = 'http://srv'
+NAMESPACE = 'root/cimv2'
+
+
+@pytest.fixture(autouse=True)
+def reset_logging():
+    """
+    Reset the logging configuration for new connections that may have been
+    left activated by other test modules.
+    """
+    WBEMConnection._reset_logging_config()  # pylint: disable=protected-access
+
+
+def make_class(classname, superclass=None, description='Foo'):
+    """Return a CIMClass with a key property and a qualifier."""
+    return CIMClass(
+        classname, superclass=superclass,
+        properties=[CIMProperty('InstanceID', None, type='string',
+                                qualifiers=[CIMQualifier('Key', True)])],
+        qualifiers=[CIMQualifier('Description', description)])
+
+
+def make_conn(cache, creds=None):
+    """
+    Return a WBEMConnection with the schema cache, whose WBEM server is
+    a mock repository with a class hierarchy and a qualifier declaration.
+    """
+    server = FakedWBEMConnection(default_namespace=NAMESPACE)
+    server.add_cimobjects([
+        CIMQualifierDeclaration('Key', 'boolean', value=False,
+                                scopes={'PROPERTY': True}),
+        CIMQualifierDeclaration('Description', 'string',
+                                scopes={'ANY': True}),
+    ])
+    server.add_cimobjects([make_class('CIM_Foo'),
+                           make_class('CIM_FooSub', 'CIM_Foo')])
+    conn = WBEMConnection(URL, creds, default_namespace=NAMESPACE,
+                          schema_cache=cache)
+    # pylint: disable=protected-access
+    conn._imethodcall_server = Mock(side_effect=server._mock_imethodcall)
+    return conn
+
+
+class ListRecorder(BaseOperationRecorder):
+    """An operation recorder that keeps the recorded operations in a list."""
+
+    def __init__(self):
+        super(ListRecorder, self).__init__()
+        self.records = []
+
+    def record(self, pywbem_args, pywbem_result, http_request, http_response):
+        """Append the recorded operation to the list."""
+        self.records.append(
+            (pywbem_args, pywbem_result, http_request, http_response))
+
+
+class TestSchemaCacheConnection(object):
+    """Test a WBEMConnection using a schema cache."""
+
+    def test_get_class(self):  # pylint: disable=no-self-use
+        """Test that repeated GetClass operations are served from the cache."""
+        cache = SchemaCache()
+        conn = make_conn(cache)
+
+        cls1 = conn.GetClass('CIM_Foo')
+        cls2 = conn.GetClass('cim_foo')
+        cls3 = conn.GetClass(CIMClassName('CIM_Foo', namespace='ROOT/cimv2'))
+
+        # pylint: disable=protected-access
+        assert conn._imethodcall_server.call_count == 1
+        assert cache.hits == 2
+        assert cache.misses == 1
+        assert cls1 == cls2 == cls3
+        assert cls2.path == CIMClassName('CIM_Foo', host='srv',
+                                         namespace=NAMESPACE)
+        assert conn.last_request_len == 0
+        assert conn.last_reply_len == 0
+
+        # The cached result is not affected by changes of a returned class
+        cls2.properties['InstanceID'].type = 'uint32'
+        assert conn.GetClass('CIM_Foo') == cls1
+
+        # Different parameters are cached separately
+        conn.GetClass('CIM_Foo', IncludeQualifiers=False)
+        assert conn._imethodcall_server.call_count == 2
+
+    def test_enumerate(self):  # pylint: disable=no-self-use
+        """Test the cached enumeration operations."""
+        cache = SchemaCache()
+        conn = make_conn(cache)
+
+        results = []
+        for _ in range(2):
+            results.append((conn.EnumerateClasses(DeepInheritance=True),
+                            conn.EnumerateClassNames(),
+                            conn.EnumerateQualifiers(),
+                            conn.GetQualifier('Key')))
+
+        # pylint: disable=protected-access
+        assert conn._imethodcall_server.call_count == 4
+        assert results[1] == results[0]
+        classes, classnames, qualifiers, qualifier = results[1]
+        assert sorted(c.classname for c in classes) == \
+            ['CIM_Foo', 'CIM_FooSub']
+        assert all(c.path.namespace == NAMESPACE for c in classes)
+        assert classnames == ['CIM_Foo']
+        assert sorted(q.name for q in qualifiers) == ['Description', 'Key']
+        assert qualifier.name == 'Key'
+
+    @pytest.mark.parametrize(
+        "operation, args", [
+            ('CreateClass', (make_class('CIM_Bar'),)),
+            ('DeleteClass', ('CIM_FooSub',)),
+            ('SetQualifier', (CIMQualifierDeclaration(
+                'Abstract', 'boolean', scopes={'CLASS': True}),)),
+        ]
+    )
+    def test_invalidation(self, operation, args):
+        # pylint: disable=no-self-use
+        """Test that schema changes invalidate the cache of the namespace."""
+        cache = SchemaCache()
+        conn = make_conn(cache)
+        conn.GetClass('CIM_Foo')
+        conn.EnumerateQualifiers()
+
+        getattr(conn, operation)(*args)
+        conn.GetClass('CIM_Foo')
+        conn.EnumerateQualifiers()
+
+        # pylint: disable=protected-access
+        assert conn._imethodcall_server.call_count == 5
+        assert cache.hits == 0
+
+    def test_invalidation_failed(self):  # pylint: disable=no-self-use
+        """Test that failing schema changes invalidate the cache as well."""
+        cache = SchemaCache()
+        conn = make_conn(cache)
+        conn.GetClass('CIM_Foo')
+
+        with pytest.raises(CIMError):
+            # Not supported by the mock repository
+            conn.ModifyClass(make_class('CIM_Foo', description='Bar'))
+
+        assert len(cache) == 0
+
+    def test_error_not_cached(self):  # pylint: disable=no-self-use
+        """Test that failing operations are not cached."""
+        cache = SchemaCache()
+        conn = make_conn(cache)
+
+        for _ in range(2):
+            with pytest.raises(CIMError):
+                conn.GetClass('CIM_Blah')
+
+        # pylint: disable=protected-access
+        assert conn._imethodcall_server.call_count == 2
+        assert len(cache) == 0
+
+    def test_users(self):  # pylint: disable=no-self-use
+        """Test that the results are cached separately for each user."""
+        cache = SchemaCache()
+        conn1 = make_conn(cache, ('alice', 'pw1'))
+        conn2 = make_conn(cache, ('bob', 'pw2'))
+        conn3 = make_conn(cache, ('alice', 'pw3'))
+
+        conn1.GetClass('CIM_Foo')
+        conn2.GetClass('CIM_Foo')
+        conn3.GetClass('CIM_Foo')
+
+        # pylint: disable=protected-access
+        assert conn1._imethodcall_server.call_count == 1
+        assert conn2._imethodcall_server.call_count == 1
+        assert conn3._imethodcall_server.call_count == 0
+        assert cache.hits == 1
+
+    def test_recorder(self):  # pylint: disable=no-self-use
+        """Test that results served from the cache are recorded."""
+        conn = make_conn(SchemaCache())
+        recorder = ListRecorder()
+        conn.add_operation_recorder(recorder)
+
+        cls1 = conn.GetClass('CIM_Foo')
+        cls2 = conn.GetClass('CIM_Foo')
+        conn.EnumerateQualifiers()
+
+        assert [r[0].method for r in recorder.records] == \
+            ['GetClass', 'GetClass', 'EnumerateQualifiers']
+        assert recorder.records[0][1].ret == cls1
+        assert recorder.records[0][2] is not None
+        assert recorder.records[1][1].ret == cls2
+        assert recorder.records[1][2] is None
+        assert recorder.records[1][3] is None
+        assert recorder.records[2][2] is not None
+
+    def test_no_cache(self):  # pylint: disable=no-self-use
+        """Test that no cache is used by default."""
+        conn = WBEMConnection(URL)
+        assert conn.schema_cache is None
+
+
+class TestSchemaCache(object):
+    """Test the SchemaCache class."""
+
+    def setup_method(self):
+        """Create a temporary directory for the on-disk tier."""
+        # pylint: disable=attribute-defined-outside-init
+        self.directory = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_key(self):  # pylint: disable=no-self-use
+        """
+        Test that the key of a result is the same for all string types and
+        Python versions, and ignores the lexical case of names.
+        """
+        # pylint: disable=protected-access
+        key = SchemaCache._key(
+            'GetClass', {'ClassName': CIMClassName('CIM_Foo'),
+                         'PropertyList': [u'Name', 'ID'],
+                         'LocalOnly': False, 'IncludeClassOrigin': None},
+            u'alice')
+
+        assert key == \
+            u'["GetClass", "alice", {"ClassName": "cim_foo", ' \
+            u'"IncludeClassOrigin": null, "LocalOnly": false, ' \
+            u'"PropertyList": ["name", "id"]}]'
+        assert key == SchemaCache._key(
+            'GetClass', {'ClassName': u'cim_foo',
+                         'PropertyList': ('NAME', u'Id'),
+                         'LocalOnly': False, 'IncludeClassOrigin': None},
+            'alice')
+
+    def test_lru(self):  # pylint: disable=no-self-use
+        """Test that the least recently used results are evicted."""
+        cache = SchemaCache(maxsize=2)
+        for name in ('A', 'B'):
+            cache.store(URL, NAMESPACE, 'GetClass', {'ClassName': name},
+                        [make_class(name)])
+        assert cache.lookup(URL, NAMESPACE, 'GetClass',
+                            {'ClassName': 'a'}) is not None
+
+        cache.store(URL, NAMESPACE, 'GetClass', {'ClassName': 'C'},
+                    [make_class('C')])
+
+        assert len(cache) == 2
+        assert cache.lookup(URL, NAMESPACE, 'GetClass',
+                            {'ClassName': 'B'}) is None
+        assert cache.lookup(URL, NAMESPACE, 'GetClass',
+                            {'ClassName': 'A'}) is not None
+
+    def test_ttl(self):
+        """Test that results expire in both tiers."""
+        cache = SchemaCache(ttl=0.2, directory=self.directory)
+        cache.store(URL, NAMESPACE, 'GetClass', {'ClassName': 'A'},
+                    [make_class('A')])
+        assert cache.lookup(URL, NAMESPACE, 'GetClass',
+                            {'ClassName': 'A'}) is not None
+
+        time.sleep(0.3)
+
+        assert cache.lookup(URL, NAMESPACE, 'GetClass',
+                            {'ClassName': 'A'}) is None
+        assert len(cache) == 0
+
+    def test_disk(self):
+        """Test that results are shared through the on-disk tier."""
+        # The attributes that get defaults when parsing CIM-XML are specified
+        flavors = dict(propagated=False, overridable=True, tosubclass=True,
+                       toinstance=False, translatable=False)
+        cls = CIMClass(
+            'CIM_Foo',
+            properties=[CIMProperty('InstanceID', None, type='string',
+                                    propagated=False)],
+            qualifiers=[CIMQualifier('Description', 'Foo', **flavors)])
+        del flavors['propagated']
+        qual = CIMQualifierDeclaration('Key', 'boolean', value=False,
+                                       scopes={'PROPERTY': True}, **flavors)
+        cache1 = SchemaCache(directory=self.directory)
+        cache1.store(URL, NAMESPACE, 'GetClass', {'ClassName': 'CIM_Foo'},
+                     [cls])
+        cache1.store(URL, NAMESPACE, 'EnumerateQualifiers', {}, [qual])
+        cache1.store(URL, NAMESPACE, 'EnumerateClassNames', {},
+                     [CIMClassName('CIM_Foo')])
+
+        cache2 = SchemaCache(directory=self.directory)
+
+        assert cache2.lookup(URL, 'ROOT/CIMV2', 'GetClass',
+                             {'ClassName': 'cim_foo'}) == [cls]
+        assert cache2.lookup(URL, NAMESPACE, 'EnumerateQualifiers', {}) == \
+            [qual]
+        assert cache2.lookup(URL, NAMESPACE, 'EnumerateClassNames', {}) == \
+            [CIMClassName('CIM_Foo')]
+        assert cache2.lookup('http://other', NAMESPACE, 'GetClass',
+                             {'ClassName': 'CIM_Foo'}) is None
+
+        cache2.invalidate(URL, NAMESPACE)
+
+        assert cache1.lookup(URL, 'root/other', 'GetClass',
+                             {'ClassName': 'CIM_Foo'}) is None
+        cache3 = SchemaCache(directory=self.directory)
+        assert cache3.lookup(URL, NAMESPACE, 'GetClass',
+                             {'ClassName': 'CIM_Foo'}) is None
+
+    def test_disk_invalid_file(self):
+        """Test that an invalid file in the on-disk tier is ignored."""
+        cache = SchemaCache(directory=self.directory)
+        cache.store(URL, NAMESPACE, 'GetClass', {'ClassName': 'A'},
+                    [make_class('A')])
+        # pylint: disable=protected-access
+        path = cache._path(URL, NAMESPACE, cache._key('GetClass',
+                                                      {'ClassName': 'A'},
+                                                      None))
+        with open(path, 'wb') as fp:
+            fp.write(b'<IRETURNVALUE><CLASS')
+
+        cache2 = SchemaCache(directory=self.directory)
+
+        assert cache2.lookup(URL, NAMESPACE, 'GetClass',
+                             {'ClassName': 'A'}) is None
+        assert not os.path.exists(path)
+
+    def test_clear(self):
+        """Test that clear() keeps unrelated files in the directory."""
+        other = os.path.join(self.directory, 'other.txt')
+        with open(other, 'w') as fp:
+            fp.write('x')
+        cache = SchemaCache(directory=self.directory)
+        cache.store(URL, NAMESPACE, 'GetClass', {'ClassName': 'A'},
+                    [make_class('A')])
+
+        cache.clear()
+
+        assert len(cache) == 0
+        assert os.listdir(self.directory) == ['other.txt']
+
+    @pytest.mark.parametrize(
+        "maxsize, ttl",
+        [(0, None), (1, 0), (1, -1)]
+    )
+    def test_init_invalid(self, maxsize, ttl):  # pylint: disable=no-self-use
+        """Test invalid init parameters."""
+        with pytest.raises(ValueError):
+            SchemaCache(maxsize=maxsize, ttl=ttl)
@@ -283,6 +283,33 @@ class StatisticsTests(unittest.TestCase):
             self.assertEqual(stats.min_reply_len, 200)
             self.assertEqual(stats.avg_reply_len, 300)
 
+    def test_measure_start_time(self):
+        """Test measuring overlapping operations with a start time."""
+
+        statistics = Statistics()
+        statistics.enable()
+
+        duration = 0.2
+
+        # Allowable delta in seconds between expected and actual duration.
+        delta = 0.5
+
+        start_time1 = time.time()
+        time.sleep(duration)
+        start_time2 = time.time()
+        time.sleep(duration)
+
+        stats = statistics.get_op_statistic('EnumerateInstances')
+        stats.stop_timer(100, 200, start_time=start_time2)
+        stats.stop_timer(100, 200, start_time=start_time1)
+
+        self.assertEqual(stats.count, 2)
+        self.assertEqual(stats.stat_start_time, start_time2)
+        self.assertTrue(time_abs_delta(stats.min_time, duration) < delta,
+                        "actual min duration: %r" % stats.min_time)
+        self.assertTrue(time_abs_delta(stats.max_time, 2 * duration) < delta,
+                        "actual max duration: %r" % stats.max_time)
+
     def test_snapshot(self):
         """Test that snapshot() takes a stable snapshot."""
 
@@ -6,6 +6,7 @@ from __future__ import absolute_import
 
 import pytest
 
+import pywbem
 from pywbem import tupletree, tupleparse
 from pywbem import CIMInstance, CIMInstanceName, CIMClass, CIMClassName, \
     CIMProperty, CIMMethod, CIMParameter, CIMQualifier, \
@@ -9834,3 +9835,39 @@ def test_tupleparse_xml(testcase, xml_str, exp_result):
     assert testcase.exp_exc_types is None
 
     assert result == exp_result, "Input CIM-XML:\n%s" % xml_str
+
+
+@pytest.mark.parametrize(
+    "xml_str", [
+        '<CLASSNAME NAME="CIM_Foo" FOO="bar"/>',
+        '<CLASSNAME/>',
+        '<CLASSNAME NAME="CIM_Foo">text</CLASSNAME>',
+        '<CLASSNAME NAME="CIM_Foo"><VALUE>x</VALUE></CLASSNAME>',
+    ]
+)
+def test_check_node_invalid(xml_str):
+    """
+    Test that structural violations are detected on repeated checks of the
+    compiled element constraints.
+    """
+    tt = tupletree.xml_to_tupletree_sax(xml_str, 'Test-XML')
+
+    for _ in range(2):
+        with pytest.raises(ParseError):
+            tupleparse.parse_any(tt)
+
+
+def test_check_node_trusted_server():
+    """Test that the structural checks are skipped for a trusted server."""
+    xml_str = '<CLASSNAME NAME="CIM_Foo" FOO="bar">  text  </CLASSNAME>'
+    tt = tupletree.xml_to_tupletree_sax(xml_str, 'Test-XML')
+
+    pywbem.config.TRUSTED_SERVER = True
+    try:
+        result = tupleparse.parse_any(tt)
+    finally:
+        pywbem.config.TRUSTED_SERVER = False
+
+    assert result == CIMClassName('CIM_Foo')
+    with pytest.raises(ParseError):
+        tupleparse.parse_any(tt)
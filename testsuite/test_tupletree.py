@@ -4,6 +4,7 @@
     sax implementation
 """
 import os
+import time
 import xml
 import pprint
 import unittest
@@ -11,6 +12,7 @@ import six
 import pytest
 from pkg_resources import resource_filename
 
+import pywbem
 from pywbem import tupletree, ParseError
 
 pp = pprint.PrettyPrinter(indent=4)  # pylint: disable=invalid-name
@@ -244,6 +246,298 @@ class TestTupleTreeSax(unittest.TestCase):
                          % (path, pp.pformat(tree_sax), pp.pformat(tree_sax)))
 
 
+class TestIncrementalTupleTreeParser(object):
+    """Tests for IncrementalTupleTreeParser"""
+
+    @staticmethod
+    def _read_xml():
+        """Return the content of the test XML file."""
+        data_dir = resource_filename(__name__, 'tupletree_ok')
+        path = os.path.join(data_dir, 'Associators_StorageVolume_small.xml')
+        with open(path, 'rb') as fh:
+            return fh.read()
+
+    @staticmethod
+    def _child_elements(node, name):
+        """Return the child elements of the first element with the name."""
+        if node[0] == name:
+            return [c for c in node[2] if not isinstance(c, six.string_types)]
+        for child in node[2]:
+            if not isinstance(child, six.string_types):
+                result = TestIncrementalTupleTreeParser._child_elements(
+                    child, name)
+                if result is not None:
+                    return result
+        return None
+
+    @pytest.mark.parametrize('chunk_size', [1, 7, 4096, 1000000])
+    def test_feed(self, chunk_size):
+        """
+        The completed child elements are returned in document order and are
+        identical to the ones produced by xml_to_tupletree_sax(), regardless
+        of the chunk size.
+        """
+        xml_str = self._read_xml()
+        tree = tupletree.xml_to_tupletree_sax(xml_str, 'Test XML')
+        exp_elements = self._child_elements(tree, 'IRETURNVALUE')
+        assert exp_elements
+
+        parser = tupletree.IncrementalTupleTreeParser('Test XML')
+        elements = []
+        for pos in range(0, len(xml_str), chunk_size):
+            elements.extend(parser.feed(xml_str[pos:pos + chunk_size]))
+        root = parser.close()
+
+        assert elements == exp_elements
+        assert root[0] == 'CIM'
+        assert self._child_elements(root, 'IRETURNVALUE') == []
+
+    def test_element_names(self):
+        # pylint: disable=no-self-use
+        """Only the specified child elements are detached."""
+        parser = tupletree.IncrementalTupleTreeParser(
+            'Test XML', parent_names=['P'], element_names=['A'])
+        elements = parser.feed(b'<R><P><A/><B/><A x="1"/></P><A/></R>')
+        root = parser.close()
+        assert elements == [('A', {}, [], None), ('A', {'x': '1'}, [], None)]
+        assert root == ('R', {}, [('P', {}, [('B', {}, [], None)], None),
+                                  ('A', {}, [], None)], None)
+
+    def test_incomplete(self):
+        """An incomplete document raises ParseError when closed."""
+        xml_str = self._read_xml()
+        parser = tupletree.IncrementalTupleTreeParser('Test XML')
+        parser.feed(xml_str[:len(xml_str) // 2])
+        with pytest.raises(ParseError):
+            parser.close()
+
+    def test_invalid(self):
+        # pylint: disable=no-self-use
+        """Ill-formed XML raises ParseError when fed."""
+        parser = tupletree.IncrementalTupleTreeParser('Test XML')
+        with pytest.raises(ParseError):
+            parser.feed(b'<R><A></B></R>')
+
+
+class TestParserBackends(object):
+    """Tests for the XML parser backends of xml_to_tupletree_sax()"""
+
+    XML_STRINGS = [
+        b'<R a="1" xml:lang="en">  x &amp; y <!-- c --> z<A/>t<B>\n</B></R>',
+        u'<?xml version="1.0"?>\n<R><![CDATA[<x>]]>\u00e4<?pi x?>\u20ac</R>',
+    ]
+
+    @pytest.fixture(params=tupletree.XML_PARSER_BACKENDS)
+    def backend(self, request):  # pylint: disable=no-self-use
+        """Fixture that selects each XML parser backend."""
+        if request.param == 'lxml':
+            pytest.importorskip('lxml')
+        saved = pywbem.config.XML_PARSER_BACKEND
+        pywbem.config.XML_PARSER_BACKEND = request.param
+        yield request.param
+        pywbem.config.XML_PARSER_BACKEND = saved
+
+    @staticmethod
+    def _parse_sax(xml_str):
+        """Return the tupletree produced by the default backend."""
+        saved = pywbem.config.XML_PARSER_BACKEND
+        pywbem.config.XML_PARSER_BACKEND = 'sax'
+        try:
+            return tupletree.xml_to_tupletree_sax(xml_str, 'Test XML')
+        finally:
+            pywbem.config.XML_PARSER_BACKEND = saved
+
+    @pytest.mark.parametrize(
+        'filename',
+        ['Associators_Empty.xml', 'Associators_StorageVolume_small.xml'])
+    def test_files(self, backend, filename):
+        # pylint: disable=redefined-outer-name,unused-argument
+        """All backends produce the same tupletree for the test files."""
+        data_dir = resource_filename(__name__, 'tupletree_ok')
+        with open(os.path.join(data_dir, filename), 'rb') as fh:
+            xml_str = fh.read()
+
+        tree = tupletree.xml_to_tupletree_sax(xml_str, 'Test XML')
+
+        assert tree == self._parse_sax(xml_str)
+
+    @pytest.mark.parametrize('xml_str', XML_STRINGS)
+    def test_strings(self, backend, xml_str):
+        # pylint: disable=redefined-outer-name,unused-argument
+        """
+        All backends produce the same tupletree for text with entity
+        references, CDATA sections, comments and processing instructions.
+        """
+        tree = tupletree.xml_to_tupletree_sax(xml_str, 'Test XML')
+
+        assert tree == self._parse_sax(xml_str)
+
+    @pytest.mark.parametrize('buffer_type', [bytearray, memoryview])
+    @pytest.mark.parametrize('xml_str', XML_STRINGS)
+    def test_buffers(self, backend, xml_str, buffer_type):
+        # pylint: disable=redefined-outer-name,unused-argument
+        """All backends parse bytearray and memoryview objects."""
+        if isinstance(xml_str, six.text_type):
+            xml_str = xml_str.encode('utf-8')
+
+        tree = tupletree.xml_to_tupletree_sax(buffer_type(bytearray(xml_str)),
+                                              'Test XML')
+
+        assert tree == self._parse_sax(xml_str)
+
+    @pytest.mark.parametrize(
+        'xml_str, exp_msg', [
+            (b'<R>\xc3\x28</R>', 'Incorrectly encoded UTF-8'),
+            (b'<R>\x01</R>', 'Invalid XML characters'),
+            (b'<R><A></B></R>', 'raised when parsing Test XML'),
+        ]
+    )
+    def test_errors(self, backend, xml_str, exp_msg):
+        # pylint: disable=redefined-outer-name,unused-argument
+        """All backends provide the diagnostics of invalid XML."""
+        with pytest.raises(ParseError) as exc_info:
+            tupletree.xml_to_tupletree_sax(xml_str, 'Test XML')
+
+        assert exp_msg in str(exc_info.value)
+
+    def test_interned(self, backend):
+        # pylint: disable=redefined-outer-name,unused-argument
+        """All backends share equal names and attribute values."""
+        xml_str = b'<R><P NAME="Foo" TYPE="string"/>' \
+            b'<P NAME="Foo" TYPE="string"/></R>'
+
+        tree = tupletree.xml_to_tupletree_sax(xml_str, 'Test XML')
+
+        elem1, elem2 = tree[2]
+        assert elem1[0] is elem2[0]
+        assert elem1[1] == {'NAME': 'Foo', 'TYPE': 'string'}
+        assert elem1[1]['NAME'] is elem2[1]['NAME']
+        assert elem1[1]['TYPE'] is elem2[1]['TYPE']
+
+    def test_invalid_backend(self):  # pylint: disable=no-self-use
+        """An invalid backend raises ValueError."""
+        saved = pywbem.config.XML_PARSER_BACKEND
+        pywbem.config.XML_PARSER_BACKEND = 'dom'
+        try:
+            with pytest.raises(ValueError):
+                tupletree.xml_to_tupletree_sax(b'<R/>', 'Test XML')
+        finally:
+            pywbem.config.XML_PARSER_BACKEND = saved
+
+    @staticmethod
+    def _many_instances_xml(count):
+        """
+        Return a response with the instances of the StorageVolume test file
+        repeated the specified number of times.
+        """
+        data_dir = resource_filename(__name__, 'tupletree_ok')
+        path = os.path.join(data_dir, 'Associators_StorageVolume_small.xml')
+        with open(path, 'rb') as fh:
+            xml_str = fh.read()
+        start = xml_str.index(b'<VALUE.OBJECTWITHPATH>')
+        end = xml_str.rindex(b'</VALUE.OBJECTWITHPATH>') + \
+            len(b'</VALUE.OBJECTWITHPATH>')
+        return xml_str[:start] + xml_str[start:end] * count + xml_str[end:]
+
+    def test_many_instances(self, backend):
+        # pylint: disable=redefined-outer-name,unused-argument
+        """
+        All backends produce the same tupletree for a response with many
+        instances.
+        """
+        xml_str = self._many_instances_xml(100)
+
+        tree = tupletree.xml_to_tupletree_sax(xml_str, 'Test XML')
+
+        assert tree == self._parse_sax(xml_str)
+
+    def test_throughput(self, backend):
+        # pylint: disable=redefined-outer-name
+        """
+        Micro-benchmark for the throughput of the backend, for a response
+        with many instances. The throughput is shown with 'pytest -s'.
+        """
+        if 'TEST_PARSER_BENCHMARK' not in os.environ:
+            pytest.skip("Test run only if TEST_PARSER_BENCHMARK set.")
+
+        xml_str = self._many_instances_xml(1000)
+
+        durations = []
+        for _ in range(3):
+            start_time = time.time()
+            tree = tupletree.xml_to_tupletree_sax(xml_str, 'Test XML')
+            durations.append(time.time() - start_time)
+        duration = min(durations)
+
+        assert tree == self._parse_sax(xml_str)
+        print("\nXML parser backend %r: %.1f MB/s" %
+              (backend, len(xml_str) / 1024.0 / 1024 / max(duration, 1e-6)))
+
+
+class TestLargePCDATA(object):
+    """
+    Tests for elements with large text content, such as large string
+    properties or embedded objects.
+
+    The SAX parser delivers such text content in many chunks (at least one
+    per line and per entity reference), which must be joined into a single
+    text child.
+    """
+
+    LINE = u'&lt;PROPERTY NAME=&quot;P&quot;&gt;value&lt;/PROPERTY&gt;\n'
+    EXP_LINE = u'<PROPERTY NAME="P">value</PROPERTY>\n'
+
+    @pytest.mark.parametrize('size_mb', [1, 4])
+    @pytest.mark.parametrize('chunk_size', [None, 4096])
+    def test_large_value(self, monkeypatch, size_mb, chunk_size):
+        """
+        The text content is returned as a single text child, and the text
+        chunks delivered by the SAX parser are joined only once.
+
+        Counting the joins instead of measuring the parse time keeps the test
+        independent of the speed of the machine, while still detecting a
+        return to repeated string concatenation, which is quadratic in the
+        size of the text.
+        """
+        count = size_mb * 1024 * 1024 // len(self.LINE)
+        xml_str = (u'<R><VALUE>%s</VALUE></R>' %
+                   (self.LINE * count)).encode('utf-8')
+
+        # Number of text chunks for each join
+        joins = []
+        orig_flush_text = tupletree.CIMContentHandler.flush_text
+
+        def flush_text(handler):
+            """Wrapper for CIMContentHandler.flush_text() that counts."""
+            joins.append(len(handler.text))
+            orig_flush_text(handler)
+
+        monkeypatch.setattr(tupletree.CIMContentHandler, 'flush_text',
+                            flush_text)
+        monkeypatch.setattr(pywbem.config, 'XML_PARSER_BACKEND', 'sax')
+
+        if chunk_size is None:
+            tree = tupletree.xml_to_tupletree_sax(xml_str, 'Test XML')
+        else:
+            parser = tupletree.IncrementalTupleTreeParser(
+                'Test XML', parent_names=['R'])
+            elements = []
+            for pos in range(0, len(xml_str), chunk_size):
+                elements.extend(parser.feed(xml_str[pos:pos + chunk_size]))
+            tree = parser.close()
+            tree[2].extend(elements)
+
+        assert len(tree[2]) == 1
+        value = tree[2][0]
+        assert value[0] == 'VALUE'
+        assert value[2] == [self.EXP_LINE * count]
+
+        # The only text is the content of VALUE, which the parser delivers in
+        # at least one chunk per line
+        assert len(joins) == 1
+        assert joins[0] >= count
+
+
 class Test_check_invalid_utf8_sequences(object):
     # pylint: disable=too-few-public-methods
     """Tests for check_invalid_utf8_sequences()"""
@@ -27,7 +27,10 @@ using a set of local mock qualifiers, classes, and instances.
 from __future__ import absolute_import, print_function
 
 import os
+import copy
 import shutil
+import sys
+import time
 from datetime import datetime
 import operator
 try:
@@ -36,6 +39,7 @@ except ImportError:
     from ordereddict import OrderedDict
 import six
 import pytest
+from mock import Mock, patch
 from testfixtures import OutputCapture
 
 from pywbem import CIMClass, CIMProperty, CIMInstance, CIMMethod, \
@@ -48,6 +52,7 @@ from pywbem._nocasedict import NocaseDict
 from pywbem.cim_operations import pull_path_result_tuple
 
 from pywbem_mock import FakedWBEMConnection, DMTFCIMSchema
+from pywbem_mock._instancerepository import InstanceRepository
 
 from dmtf_mof_schema_def import TOTAL_QUALIFIERS, TOTAL_CLASSES, \
     install_test_dmtf_schema, DMTF_TEST_SCHEMA_VER
@@ -972,6 +977,83 @@ class TestRepoMethods(object):
             assert inst_tup[0] is None
             assert inst_tup[1] is None
 
+    @pytest.mark.parametrize(
+        "ns", [DEFAULT_NAMESPACE, 'root/blah'])
+    def test_instance_path_index(self, conn, tst_classes, tst_instances, ns):
+        # pylint: disable=no-self-use
+        """
+        Test that the instance path index of the instance repo follows
+        the create and delete operations and is case insensitive for the
+        names in the path.
+        """
+        conn.add_cimobjects(tst_classes, namespace=ns)
+        conn.add_cimobjects(tst_instances, namespace=ns)
+        inst_repo = \
+            conn._get_instance_repo(ns)  # pylint: disable=protected-access
+
+        iname = CIMInstanceName('cim_foo',
+                                keybindings={'instanceid': 'CIM_Foo1'},
+                                namespace=ns)
+        # pylint: disable=protected-access
+        inst = conn._find_instance(iname, inst_repo)[1]
+        assert inst.path.classname == 'CIM_Foo'
+        assert len(inst_repo) == len(tst_instances)
+
+        conn.DeleteInstance(iname)
+        # pylint: disable=protected-access
+        assert conn._find_instance(iname, inst_repo) == (None, None)
+        assert len(inst_repo) == len(tst_instances) - 1
+        assert iname not in conn.EnumerateInstanceNames('CIM_Foo',
+                                                        namespace=ns)
+
+        new_inst = inst.copy()
+        new_inst.path = None
+        rtn_path = conn.CreateInstance(new_inst, namespace=ns)
+        # pylint: disable=protected-access
+        assert conn._find_instance(iname, inst_repo)[1].path == rtn_path
+
+        with pytest.raises(CIMError) as exec_info:
+            conn.CreateInstance(new_inst, namespace=ns)
+        assert exec_info.value.status_code_name == 'CIM_ERR_ALREADY_EXISTS'
+        assert len(inst_repo) == len(tst_instances)
+
+    @pytest.mark.parametrize(
+        "ns", [None, 'root/blah'])
+    def test_reference_index(self, conn, tst_assoc_mof, ns):
+        # pylint: disable=no-self-use
+        """
+        Test that the reference index of the instance repo follows
+        modifications of reference properties by ModifyInstance.
+        """
+        conn.compile_mof_string(tst_assoc_mof, namespace=ns)
+        tst_ns = ns or conn.default_namespace
+
+        def lineage_refs(target):
+            """Return the model paths of the TST_Lineage references"""
+            return [model_path(p) for p in
+                    conn.ReferenceNames(target, ResultClass='TST_Lineage')]
+
+        sofi = CIMInstanceName('TST_Person', keybindings={'name': 'Sofi'},
+                               namespace=tst_ns)
+        gabi = CIMInstanceName('TST_Person', keybindings={'name': 'Gabi'},
+                               namespace=tst_ns)
+        mikesofi = CIMInstanceName('TST_Lineage',
+                                   keybindings={'InstanceID': 'MikeSofi'},
+                                   namespace=tst_ns)
+
+        assert model_path(mikesofi) in lineage_refs(sofi)
+        assert model_path(mikesofi) not in lineage_refs(gabi)
+
+        mod_inst = conn.GetInstance(mikesofi)
+        mod_inst['child'] = gabi
+        conn.ModifyInstance(mod_inst)
+
+        assert model_path(mikesofi) not in lineage_refs(sofi)
+        assert model_path(mikesofi) in lineage_refs(gabi)
+
+        conn.DeleteInstance(mikesofi)
+        assert model_path(mikesofi) not in lineage_refs(gabi)
+
     @staticmethod
     def method2_callback(conn, methodname, object_name, **params):
         """Test callback function for ethod2. Not really used but
@@ -1412,6 +1494,81 @@ class TestRepoMethods(object):
 
         assert set(rslt_classes) == set(exp_classes)
 
+    def test_compile_dmtf_schema_cache(self, conn, tmpdir):
+        # pylint: disable=no-self-use
+        """
+        Test that compile_dmtf_schema with a cache directory loads the
+        compiled classes and qualifier declarations from a snapshot when the
+        same classes are compiled again.
+        """
+        ns = 'root/cimv2'
+        cache_dir = str(tmpdir.join('compiled'))
+        classnames = ['CIM_ElementConformsToProfile']
+        conn.compile_dmtf_schema(DMTF_TEST_SCHEMA_VER, TESTSUITE_SCHEMA_DIR,
+                                 classnames, cache_dir=cache_dir)
+        snapshots = os.listdir(cache_dir)
+        assert len(snapshots) == 1
+        assert '_py%s.%s_' % sys.version_info[0:2] in snapshots[0]
+
+        conn2 = FakedWBEMConnection()
+        conn2.compile_mof_string = Mock()
+        conn2.compile_dmtf_schema(DMTF_TEST_SCHEMA_VER, TESTSUITE_SCHEMA_DIR,
+                                  ['cim_elementconformstoprofile'],
+                                  cache_dir=cache_dir)
+
+        assert conn2.compile_mof_string.call_count == 0
+        assert conn2.classes[ns] == conn.classes[ns]
+        assert conn2.qualifiers[ns] == conn.qualifiers[ns]
+        assert set(conn2.EnumerateClassNames(DeepInheritance=True)) == \
+            set(['CIM_ElementConformsToProfile', 'CIM_ManagedElement',
+                 'CIM_RegisteredSpecification', 'CIM_RegisteredProfile'])
+
+        # Other class names and a different namespace content are compiled
+        conn3 = FakedWBEMConnection()
+        conn3.compile_dmtf_schema(DMTF_TEST_SCHEMA_VER, TESTSUITE_SCHEMA_DIR,
+                                  'CIM_ManagedElement', cache_dir=cache_dir)
+        conn4 = FakedWBEMConnection()
+        conn4.add_cimobjects(CIMClass('TST_Blah'))
+        conn4.compile_dmtf_schema(DMTF_TEST_SCHEMA_VER, TESTSUITE_SCHEMA_DIR,
+                                  classnames, cache_dir=cache_dir)
+        assert conn4.qualifiers[ns] == conn.qualifiers[ns]
+        assert 'TST_Blah' in conn4.classes[ns]
+        assert len(os.listdir(cache_dir)) == 3
+
+        # Another pywbem version does not use the existing snapshots
+        with patch('pywbem_mock._wbemconnection_mock.__version__', '0.0.1'):
+            conn5 = FakedWBEMConnection()
+            conn5.compile_mof_string = Mock(
+                side_effect=conn5.compile_mof_string)
+            conn5.compile_dmtf_schema(DMTF_TEST_SCHEMA_VER,
+                                      TESTSUITE_SCHEMA_DIR, classnames,
+                                      cache_dir=cache_dir)
+        assert conn5.compile_mof_string.call_count == 1
+        assert conn5.classes[ns] == conn.classes[ns]
+        assert len(os.listdir(cache_dir)) == 4
+
+    def test_compile_dmtf_schema_cache_invalid(self, conn, tmpdir):
+        # pylint: disable=no-self-use
+        """
+        Test that an invalid snapshot file causes a recompilation that
+        replaces it.
+        """
+        ns = 'root/cimv2'
+        cache_dir = str(tmpdir)
+        conn.compile_dmtf_schema(DMTF_TEST_SCHEMA_VER, TESTSUITE_SCHEMA_DIR,
+                                 'CIM_ManagedElement', cache_dir=cache_dir)
+        snapshot_file = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+        with open(snapshot_file, 'wb') as fp:
+            fp.write(b'blah')
+
+        conn2 = FakedWBEMConnection()
+        conn2.compile_dmtf_schema(DMTF_TEST_SCHEMA_VER, TESTSUITE_SCHEMA_DIR,
+                                  'CIM_ManagedElement', cache_dir=cache_dir)
+
+        assert conn2.classes[ns] == conn.classes[ns]
+        assert os.listdir(cache_dir) == [os.path.basename(snapshot_file)]
+        assert os.path.getsize(snapshot_file) > 4
+
     def test_compile_err(self, conn, capsys):
         # pylint: disable=no-self-use
         """
@@ -1429,6 +1586,107 @@ class TestRepoMethods(object):
         captured_out = capsys.readouterr()[0]
         assert "Scope(associations)" in captured_out
 
+    @staticmethod
+    def repo_content(conn):
+        """
+        Return a copy of the content of the mock repository of the connection
+        for comparisons.
+        """
+        return copy.deepcopy((
+            dict((ns, dict(conn.classes[ns])) for ns in conn.classes),
+            dict((ns, dict(conn.qualifiers[ns])) for ns in conn.qualifiers),
+            dict((ns, list(conn.instances[ns])) for ns in conn.instances),
+            dict((ns, dict((cln, dict(conn.methods[ns][cln]))
+                           for cln in conn.methods[ns]))
+                 for ns in conn.methods)))
+
+    def test_snapshot_restore(self, conn, tst_instances_mof):
+        """
+        Test that modifications of the mock repository are undone by
+        restoring a snapshot, any number of times.
+        """
+        conn.compile_mof_string(tst_instances_mof)
+        conn.add_method_callback('CIM_Foo', 'Fuzzy', self.fuzzy_callback)
+        exp_content = self.repo_content(conn)
+
+        snapshot = conn.snapshot_repository()
+
+        assert self.repo_content(conn) == exp_content
+        for _ in range(2):
+            inst = conn.GetInstance(
+                CIMInstanceName('CIM_Foo_sub', {'InstanceID': 'CIM_Foo_sub4'}))
+            inst['cimfoo_sub'] = 'modified'
+            conn.ModifyInstance(inst)
+            conn.DeleteInstance(
+                CIMInstanceName('CIM_Foo', {'InstanceID': 'CIM_Foo1'}))
+            conn.CreateInstance(CIMInstance(
+                'CIM_Foo', properties={'InstanceID': 'CIM_Foo3'}))
+            conn.DeleteClass('CIM_Foo_sub2')
+            conn.SetQualifier(CIMQualifierDeclaration(
+                'Blah', 'boolean', scopes={'CLASS': True}))
+            conn.add_method_callback('CIM_Foo', 'Delete',
+                                     self.fuzzy_callback)
+            conn.compile_mof_string(
+                'instance of CIM_Foo { InstanceID = "CIM_Foo4"; };')
+            assert self.repo_content(conn) != exp_content
+
+            conn.restore_repository(snapshot)
+
+            assert self.repo_content(conn) == exp_content
+            assert conn.GetInstance(
+                CIMInstanceName('CIM_Foo_sub', {'InstanceID': 'CIM_Foo_sub4'})
+            )['cimfoo_sub'] == 'data sub 4'
+
+    def test_snapshot_restore_other_conn(self, conn, tst_instances_mof):
+        """
+        Test that a snapshot can be restored into another connection, and
+        that the repositories of both connections are independent.
+        """
+        conn.compile_mof_string(tst_instances_mof)
+        exp_content = self.repo_content(conn)
+        snapshot = conn.snapshot_repository()
+        conn2 = FakedWBEMConnection()
+
+        conn2.restore_repository(snapshot)
+
+        assert self.repo_content(conn2) == exp_content
+        conn2.DeleteInstance(
+            CIMInstanceName('CIM_Foo', {'InstanceID': 'CIM_Foo1'}))
+        conn.CreateInstance(CIMInstance(
+            'CIM_Foo', properties={'InstanceID': 'CIM_Foo3'}))
+        assert len(conn2.EnumerateInstanceNames('CIM_Foo')) == 7
+        assert len(conn.EnumerateInstanceNames('CIM_Foo')) == 9
+
+    def test_restore_closes_contexts(self, conn, tst_instances_mof):
+        """Test that restoring a snapshot closes the enumeration contexts."""
+        conn.compile_mof_string(tst_instances_mof)
+        snapshot = conn.snapshot_repository()
+        result = conn.OpenEnumerateInstances('CIM_Foo', MaxObjectCount=1)
+        assert not result.eos
+
+        conn.restore_repository(snapshot)
+
+        assert conn.enumeration_contexts == {}
+        with pytest.raises(CIMError) as exec_info:
+            conn.PullInstancesWithPath(result.context, MaxObjectCount=1)
+        assert exec_info.value.status_code_name == \
+            'CIM_ERR_INVALID_ENUMERATION_CONTEXT'
+
+    def test_snapshot_restore_big(self, repo_accesses):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """
+        Test that taking and restoring snapshots does not access the
+        instances in the repository.
+        """
+        for size in SCALING_SIZES:
+            conn = scaling_conn(size)
+            repo_accesses[0] = 0
+            for _ in range(10):
+                snapshot = conn.snapshot_repository()
+                conn.restore_repository(snapshot)
+            assert repo_accesses[0] == 0
+            assert len(conn.instances[DEFAULT_NAMESPACE]) == size + 1
+
 
 class TestClassOperations(object):
     """
@@ -1442,7 +1700,8 @@ class TestClassOperations(object):
 
         """
         conn.add_cimobjects(tst_class)
-        cl = conn.GetClass('CIM_Foo', IncludeQualifiers=True)
+        cl = conn.GetClass('CIM_Foo', IncludeQualifiers=True,
+                           IncludeClassOrigin=True)
 
         cl.path = None
         assert cl == tst_class
@@ -1501,10 +1760,10 @@ class TestClassOperations(object):
         conn.add_cimobjects(tst_classes, namespace=ns)
         if iq is None:
             cl = conn.GetClass(cn, namespace=ns, IncludeQualifiers=iq,
-                               LocalOnly=True)
+                               IncludeClassOrigin=ico, LocalOnly=True)
         else:
             cl = conn.GetClass(cn, namespace=ns, IncludeQualifiers=iq,
-                               LocalOnly=True)
+                               IncludeClassOrigin=ico, LocalOnly=True)
 
         cl.path = None
 
@@ -1529,6 +1788,21 @@ class TestClassOperations(object):
 
         assert(cl == c_tst)
 
+    @pytest.mark.parametrize(
+        "cn", ['CIM_Foo', 'CIM_Foo_sub_sub'])
+    def test_getclass_repo_unchanged(self, conn, tst_classes_mof, cn):
+        # pylint: disable=no-self-use
+        """
+        Test that GetClass does not modify the classes in the repository.
+        """
+        conn.compile_mof_string(tst_classes_mof)
+        exp_classes = copy.deepcopy(dict(conn.classes[DEFAULT_NAMESPACE]))
+
+        conn.GetClass(cn, LocalOnly=False, IncludeQualifiers=False,
+                      IncludeClassOrigin=False)
+
+        assert dict(conn.classes[DEFAULT_NAMESPACE]) == exp_classes
+
     @pytest.mark.parametrize(
         "ns", [None, 'root/blah'])
     @pytest.mark.parametrize(
@@ -2248,6 +2522,28 @@ class TestInstanceOperations(object):
             exc = exec_info.value
             assert(exc.status_code_name == exp_er)
 
+    @pytest.mark.parametrize(
+        "ns", [None, 'root/blah'])
+    def test_streamenumerateinstances(self, conn, tst_classes, tst_instances,
+                                      ns):
+        # pylint: disable=no-self-use
+        """
+        Test mock StreamEnumerateInstances and StreamEnumerateInstanceNames
+        return the same results as the corresponding non-streamed operations.
+        """
+        conn.add_cimobjects(tst_classes, namespace=ns)
+        conn.add_cimobjects(tst_instances, namespace=ns)
+
+        exp_insts = conn.EnumerateInstances('CIM_Foo', namespace=ns)
+        rtn_insts = list(conn.StreamEnumerateInstances('CIM_Foo',
+                                                       namespace=ns))
+        assert rtn_insts == exp_insts
+
+        exp_paths = conn.EnumerateInstanceNames('CIM_Foo', namespace=ns)
+        rtn_paths = list(conn.StreamEnumerateInstanceNames('CIM_Foo',
+                                                           namespace=ns))
+        assert rtn_paths == exp_paths
+
     def test_enumerateinstances_lite(self, conn_lite, tst_instances):
         # pylint: disable=no-self-use
         """
@@ -2833,6 +3129,29 @@ class TestInstanceOperations(object):
             exc = exec_info.value
             assert exc.status_code_name == exp_err
 
+    def test_executebatch(self, conn, tst_classes, tst_instances):
+        # pylint: disable=no-self-use
+        """
+        Test a batch of get and delete operations, where one of the
+        operations fails.
+        """
+        conn.add_cimobjects(tst_classes)
+        conn.add_cimobjects(tst_instances)
+        inst_names = conn.EnumerateInstanceNames('CIM_Foo')
+        bad_name = CIMInstanceName('CIM_Foo', keybindings={'InstanceID': 'xxx'},
+                                   namespace=DEFAULT_NAMESPACE)
+
+        results = conn.ExecuteBatch(
+            [('GetInstance', dict(InstanceName=inst_names[0])),
+             ('GetInstance', dict(InstanceName=bad_name)),
+             ('DeleteInstance', dict(InstanceName=inst_names[1]))])
+
+        assert results[0].path == inst_names[0]
+        assert results[1].status_code_name == 'CIM_ERR_NOT_FOUND'
+        assert results[2] is None
+        assert len(conn.EnumerateInstanceNames('CIM_Foo')) == \
+            len(inst_names) - 1
+
 
 class TestPullOperations(object):
     """
@@ -3288,6 +3607,143 @@ class TestPullOperations(object):
         else:
             assert False, 'Invalid test code %s' % test
 
+    def test_pull_on_demand(self, conn, tst_classes, tst_instances,
+                            tst_insts_big):
+        # pylint: disable=no-self-use
+        """
+        Test that the instances of an enumeration context are created when
+        they are pulled, and that changes of the repository during the
+        enumeration do not affect the remaining instances.
+        """
+        conn.add_cimobjects(tst_classes)
+        conn.add_cimobjects(tst_instances)
+        conn.add_cimobjects(tst_insts_big)
+        paths = conn.EnumerateInstanceNames('CIM_Foo')
+        exp_paths = [str(p) for p in paths]
+        # pylint: disable=protected-access
+        conn._filter_instance = Mock(side_effect=conn._filter_instance)
+
+        result_tuple = conn.OpenEnumerateInstances('CIM_Foo',
+                                                   MaxObjectCount=10)
+
+        # One instance is read ahead to detect the end of the sequence
+        assert conn._filter_instance.call_count == 11
+        insts = result_tuple.instances
+        conn.DeleteInstance(paths[-1])
+        conn.CreateInstance(build_cimfoo_instance(1000))
+        while not result_tuple.eos:
+            result_tuple = conn.PullInstancesWithPath(result_tuple.context,
+                                                      MaxObjectCount=10)
+            insts.extend(result_tuple.instances)
+            assert conn._filter_instance.call_count == \
+                min(len(insts) + 1, len(exp_paths))
+
+        assert [str(i.path) for i in insts] == exp_paths
+        assert not conn.enumeration_contexts
+
+    def test_pull_associators_deleted(self, conn, tst_assoc_mof):
+        # pylint: disable=no-self-use
+        """
+        Test that associated instances that are deleted between the open and
+        the pull operations are still returned by the pull operation.
+        """
+        conn.compile_mof_string(tst_assoc_mof)
+        source_inst_name = CIMInstanceName('TST_Person',
+                                           keybindings=dict(name='Mike'))
+        exp_paths = [str(inst.path) for inst in conn.Associators(
+            source_inst_name, AssocClass='TST_Lineage', Role='parent')]
+        assert len(exp_paths) == 2
+
+        result_tuple = conn.OpenAssociatorInstances(
+            source_inst_name, AssocClass='TST_Lineage', Role='parent',
+            MaxObjectCount=0)
+        assert result_tuple.eos is False
+        for path in conn.AssociatorNames(source_inst_name,
+                                         AssocClass='TST_Lineage',
+                                         Role='parent'):
+            conn.DeleteInstance(path)
+        result_tuple = conn.PullInstancesWithPath(result_tuple.context,
+                                                  MaxObjectCount=10)
+
+        assert result_tuple.eos is True
+        assert sorted(str(inst.path) for inst in result_tuple.instances) == \
+            sorted(exp_paths)
+
+    @pytest.mark.parametrize(
+        "timeout, exp_expired", [
+            [1, True],
+            [0, False],
+        ]
+    )
+    def test_context_expiration(self, conn, tst_classes, tst_instances,
+                                timeout, exp_expired):
+        # pylint: disable=no-self-use
+        """
+        Test that an enumeration context expires when it is not used
+        within the operation timeout.
+        """
+        conn.add_cimobjects(tst_classes)
+        conn.add_cimobjects(tst_instances)
+
+        result_tuple = conn.OpenEnumerateInstancePaths(
+            'CIM_Foo', MaxObjectCount=1, OperationTimeout=timeout)
+        assert result_tuple.eos is False
+        time.sleep(0.6)
+        # The timeout applies to the time between the operations
+        result_tuple = conn.PullInstancePaths(result_tuple.context,
+                                              MaxObjectCount=1)
+        assert result_tuple.eos is False
+        time.sleep(0.6)
+        result_tuple = conn.PullInstancePaths(result_tuple.context,
+                                              MaxObjectCount=1)
+        assert result_tuple.eos is False
+        time.sleep(1.2)
+
+        if exp_expired:
+            with pytest.raises(CIMError) as exec_info:
+                conn.PullInstancePaths(result_tuple.context, MaxObjectCount=1)
+            exc = exec_info.value
+            assert exc.status_code_name == \
+                'CIM_ERR_INVALID_ENUMERATION_CONTEXT'
+            assert not conn.enumeration_contexts
+        else:
+            conn.PullInstancePaths(result_tuple.context, MaxObjectCount=1)
+            assert len(conn.enumeration_contexts) == 1
+
+    def test_max_enumeration_contexts(self, tst_classes, tst_instances):
+        # pylint: disable=no-self-use
+        """
+        Test the maximum number of open enumeration contexts.
+        """
+        conn = FakedWBEMConnection(max_enumeration_contexts=2)
+        conn.add_cimobjects(tst_classes)
+        conn.add_cimobjects(tst_instances)
+
+        contexts = [conn.OpenEnumerateInstancePaths(
+            'CIM_Foo', MaxObjectCount=1).context for _ in range(2)]
+
+        with pytest.raises(CIMError) as exec_info:
+            conn.OpenEnumerateInstancePaths('CIM_Foo', MaxObjectCount=1)
+        exc = exec_info.value
+        assert exc.status_code_name == 'CIM_ERR_SERVER_LIMITS_EXCEEDED'
+
+        # Complete responses do not need an enumeration context
+        result_tuple = conn.OpenEnumerateInstancePaths('CIM_Foo')
+        assert result_tuple.eos is True
+
+        conn.CloseEnumeration(contexts[0])
+        result_tuple = conn.OpenEnumerateInstancePaths('CIM_Foo',
+                                                       MaxObjectCount=1)
+        assert result_tuple.eos is False
+
+    def test_max_enumeration_contexts_invalid(self):
+        # pylint: disable=no-self-use
+        """
+        Test an invalid maximum number of open enumeration contexts.
+        """
+        with pytest.raises(ValueError):
+            FakedWBEMConnection(max_enumeration_contexts=0)
+
 
 class TestQualifierOperations(object):
     """
@@ -3735,7 +4191,34 @@ class TestReferenceOperations(object):
 
         assert set(paths) == set(exp_paths)
 
-    # TODO test for references propertylist.
+    @pytest.mark.parametrize(
+        "pl, exp_props", [
+            [None, ['InstanceID', 'parent', 'child']],
+            [['InstanceID'], ['InstanceID']],
+            [['PARENT', 'blah'], ['parent']],
+            [[], []],
+        ]
+    )
+    def test_reference_instances_pl(self, conn, pl, exp_props,
+                                    tst_assoc_mof):
+        # pylint: disable=no-self-use
+        """
+        Test getting reference instances with the PropertyList option.
+        """
+        conn.compile_mof_string(tst_assoc_mof)
+
+        inst_name = CIMInstanceName('TST_Person',
+                                    keybindings=dict(name='Mike'))
+
+        insts = conn.References(inst_name, ResultClass='TST_Lineage',
+                                PropertyList=pl)
+
+        assert len(insts) == 2
+        for inst in insts:
+            assert set(inst.keys()) == set(exp_props)
+            # The instance in the repository is not modified
+            assert set(conn.GetInstance(inst.path).keys()) == \
+                set(['InstanceID', 'parent', 'child'])
 
 
 class TestAssociationOperations(object):
@@ -4632,3 +5115,140 @@ class TestDMTFCIMSchema(object):
                   '#pragma include ("Device/CIM_Door.mof")\n'
 
         assert schema_mof == exp_mof
+
+
+SCALING_SIZES = [10, 100]
+
+
+def scaling_conn(size):
+    """
+    Return a FakedWBEMConnection whose repository has a TST_Target instance
+    that is referenced by `size` TST_Ref association instances. The other
+    reference of each association points to a different TST_Target instance
+    path.
+    """
+    conn = FakedWBEMConnection()
+    conn.add_cimobjects([
+        CIMClass('TST_Target', properties=[
+            CIMProperty('InstanceID', None, type='string',
+                        qualifiers=[CIMQualifier('Key', True)])]),
+        CIMClass('TST_Ref', properties=[
+            CIMProperty('InstanceID', None, type='string',
+                        qualifiers=[CIMQualifier('Key', True)]),
+            CIMProperty('Target', None, type='reference',
+                        reference_class='TST_Target'),
+            CIMProperty('Other', None, type='reference',
+                        reference_class='TST_Target'),
+            CIMProperty('Data', None, type='uint32')],
+            qualifiers=[CIMQualifier('Association', True)]),
+    ])
+    target = CIMInstanceName('TST_Target', keybindings={'InstanceID': 'T'},
+                             namespace=DEFAULT_NAMESPACE)
+    target_inst = CIMInstance('TST_Target', properties={'InstanceID': 'T'},
+                              path=target)
+    refs = []
+    for i in range(size):
+        other = CIMInstanceName('TST_Target',
+                                keybindings={'InstanceID': str(i)},
+                                namespace=DEFAULT_NAMESPACE)
+        ref = CIMInstance('TST_Ref', properties=[
+            CIMProperty('InstanceID', str(i)),
+            CIMProperty('Target', target),
+            CIMProperty('Other', other),
+            CIMProperty('Data', Uint32(i))])
+        ref.path = CIMInstanceName('TST_Ref',
+                                   keybindings={'InstanceID': str(i)},
+                                   namespace=DEFAULT_NAMESPACE)
+        refs.append(ref)
+    conn.add_cimobjects([target_inst] + refs)
+    conn.scaling_target = target
+    return conn
+
+
+@pytest.fixture
+def repo_accesses(monkeypatch):
+    """
+    Fixture that counts the instances that are accessed in the instance
+    repositories of FakedWBEMConnection objects, by lookup or by iteration.
+    It returns a list whose only item is the count.
+    """
+    count = [0]
+
+    def counting_iter(method):
+        """Return a wrapper for method that counts the returned instances."""
+        def wrapper(*args, **kwargs):
+            # pylint: disable=missing-docstring
+            for inst in method(*args, **kwargs):
+                count[0] += 1
+                yield inst
+        return wrapper
+
+    def counting_find(method):
+        """Return a wrapper for method that counts the lookups."""
+        def wrapper(*args, **kwargs):
+            # pylint: disable=missing-docstring
+            count[0] += 1
+            return method(*args, **kwargs)
+        return wrapper
+
+    for name in ('__iter__', 'iter_classnames', 'iter_referencing'):
+        monkeypatch.setattr(InstanceRepository, name,
+                            counting_iter(getattr(InstanceRepository, name)))
+    monkeypatch.setattr(InstanceRepository, 'find',
+                        counting_find(InstanceRepository.find))
+    return count
+
+
+def _open_pull(conn):
+    """Enumerate the TST_Ref instances with OpenEnumerateInstances/Pull."""
+    result = conn.OpenEnumerateInstances('TST_Ref', MaxObjectCount=1000)
+    insts = result.instances
+    while not result.eos:
+        result = conn.PullInstancesWithPath(result.context,
+                                            MaxObjectCount=1000)
+        insts.extend(result.instances)
+    return insts
+
+
+class TestResponderScaling(object):
+    """
+    Test the scaling of the enumeration, association and pull responders of
+    FakedWBEMConnection with the number of instances in the repository.
+
+    The number of instances accessed in the repository per returned instance
+    must not grow with the number of instances, as it would if each returned
+    instance caused another scan of the repository.
+    """
+
+    @pytest.mark.parametrize(
+        "operation", [
+            lambda conn: conn.EnumerateInstances('TST_Ref',
+                                                 PropertyList=['Data'],
+                                                 IncludeQualifiers=False),
+            lambda conn: conn.EnumerateInstanceNames('TST_Ref'),
+            lambda conn: conn.References(conn.scaling_target),
+            lambda conn: conn.ReferenceNames(conn.scaling_target),
+            lambda conn: conn.AssociatorNames(conn.scaling_target),
+            _open_pull,
+        ],
+        ids=['EnumerateInstances', 'EnumerateInstanceNames', 'References',
+             'ReferenceNames', 'AssociatorNames', 'OpenEnumerateInstances']
+    )
+    def test_scaling(self, operation, repo_accesses):
+        # pylint: disable=no-self-use,redefined-outer-name
+        """Test the repository accesses per returned object."""
+        accesses = []
+        for size in SCALING_SIZES:
+            conn = scaling_conn(size)
+            repo_accesses[0] = 0
+            result = operation(conn)
+            assert len(result) == size
+            accesses.append(repo_accesses[0])
+
+        # Rescanning the repository for each returned object makes the
+        # accesses per object grow 10 times from the first to the last size
+        assert accesses[-1] * SCALING_SIZES[0] <= \
+            accesses[0] * SCALING_SIZES[-1], \
+            "Repository accesses for %s instances: %s" % \
+            (', '.join(str(s) for s in SCALING_SIZES),
+             ', '.join(str(a) for a in accesses))